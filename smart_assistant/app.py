@@ -4,26 +4,37 @@ app.py
 Flask web interface for the Smart AI Personal Assistant.
 Start with: python app.py
 Then open: http://localhost:5000
+
+In production run it under gunicorn (see gunicorn.conf.py and wsgi.py):
+init_app() loads the database, intent model and caches once in the master
+process before workers are forked, and start_worker() starts per-process
+background work after the fork.
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify
+from werkzeug.exceptions import BadRequest
+import functools
 import os
 import sys
-from datetime import datetime
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
 
 # Add project root to path
 ROOT = os.path.dirname(os.path.abspath(__file__))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+# The web server never speaks – don't probe audio drivers (override with 0)
+os.environ.setdefault("ASSISTANT_HEADLESS", "1")
+
 from modules import database as db
-from modules.intent_classifier import predict, predict_with_confidence
-from modules.reminder import set_reminder
-from modules.study_mode import start_study_mode
-from modules.expense_tracker import log_expense
-from modules.app_launcher import open_app
-from modules.web_search import search_google
-from modules.contacts import handle_contact_intent
+from modules import nlu
+from modules import intents
+from modules import admission
+from modules import metrics
+from modules import profiling
+from modules import events
 
 app = Flask(__name__)
 app.config['JSON_SORT_KEYS'] = False
@@ -32,152 +43,64 @@ app.config['JSON_SORT_KEYS'] = False
 user_name = None
 CONFIDENCE_THRESHOLD = 0.35
 
+SCHEDULER_LOCK = os.path.join(db.DB_DIR, "scheduler.lock")
 
-def handle_greeting(name: str | None) -> str:
-    """Return a time-based greeting."""
-    hour = datetime.now().hour
-    if hour < 12:
-        greeting = "Good morning"
-    elif hour < 17:
-        greeting = "Good afternoon"
-    else:
-        greeting = "Good evening"
-    
-    if name:
-        return f"{greeting}, {name}! How can I help you today?"
-    return f"{greeting}! How can I assist you?"
+_initialised    = False
+_worker_started = False
+_scheduler_lock = None     # open lock file while this process owns the timers
 
 
-def handle_tell_time() -> str:
-    """Return current time and date."""
-    now = datetime.now()
-    time_str = now.strftime("%I:%M %p")
-    date_str = now.strftime("%A, %d %B %Y")
-    return f"The current time is {time_str} and today is {date_str}."
-
-
-def handle_daily_summary(name: str | None) -> str:
-    """Return a summary of reminders, expenses, and memories."""
-    lines = []
-    if name:
-        lines.append(f"Here is your daily summary, {name}.")
-    
-    # Reminders
-    reminders = db.get_todays_reminders()
-    if reminders:
-        lines.append(f"You have {len(reminders)} reminder(s):")
-        for r in reminders:
-            status = "✔ done" if r["notified"] else "⏳ pending"
-            lines.append(f"  • {r['message']} at {r['remind_at']} ({status})")
-    else:
-        lines.append("No reminders set for today.")
-    
-    # Expenses
-    expenses = db.get_todays_expenses()
-    total = db.get_total_expenses_today()
-    if expenses:
-        lines.append(f"Today's expenses total ₹{total:.2f} across {len(expenses)} transaction(s).")
-    else:
-        lines.append("No expenses logged today.")
-    
-    # Memories
-    memories = db.get_all_memories()
-    if memories:
-        lines.append(f"You have {len(memories)} stored memory/memories.")
-    
-    return "  ".join(lines)
-
-
-def handle_store_memory(text: str) -> str:
-    """Store user memory."""
-    for phrase in ["remember that", "save this", "note that", "store", "remember", "save"]:
-        if text.lower().startswith(phrase):
-            content = text[len(phrase):].strip(" :.")
-            break
-    else:
-        content = text
-    
-    if content:
-        db.add_memory(content)
-        return f"Memory saved: \"{content}\"."
-    return "I didn't catch what to remember. Could you repeat that?"
-
-
-def handle_exit(name: str | None) -> str:
-    """Return exit message."""
-    if name:
-        return f"Goodbye, {name}! Have a great day!"
-    return "Goodbye! Have a great day!"
+def _current_user_name() -> str | None:
+    """The stored user name (re-read: another worker may have changed it)."""
+    global user_name
+    user_name = db.get_user_name()
+    return user_name
 
 
 def process_command(user_text: str) -> str:
     """
     Process user input and return response.
     """
+    return handle_message(user_text)[0]
+
+
+def handle_message(user_text: str, result: dict | None = None) -> tuple[str, str | None]:
+    """
+    Process user input and return (response, detected intent).
+    `result` is nlu.parse() of the text when the caller already has it.
+    """
     if not user_text or not user_text.strip():
-        return "Please say something."
+        return "Please say something.", None
     
     user_text = user_text.strip().lower()
     
-    # Classify intent
-    intent, confidence = predict_with_confidence(user_text)
+    # Single NLU pass: intent + slots
+    if result is None:
+        result = nlu.parse(user_text)
+    intent, confidence, slots = result["intent"], result["confidence"], result["slots"]
     
     if confidence < CONFIDENCE_THRESHOLD:
-        return "I'm not sure I understood that. Could you rephrase?"
-    
-    # Route to handler
-    if intent == "greeting":
-        response = handle_greeting(user_name)
-    
-    elif intent == "tell_time":
-        response = handle_tell_time()
-    
-    elif intent == "open_app":
-        response = open_app(user_text)
-    
-    elif intent == "search_google":
-        response = search_google(user_text)
+        return "I'm not sure I understood that. Could you rephrase?", intent
     
-    elif intent == "set_reminder":
-        response = set_reminder(user_text)
-    
-    elif intent == "daily_summary":
-        response = handle_daily_summary(user_name)
-    
-    elif intent == "study_mode":
-        response = start_study_mode()
-    
-    elif intent == "log_expense":
-        response = log_expense(user_text)
-    
-    elif intent == "store_memory":
-        response = handle_store_memory(user_text)
-    
-    elif intent == "add_contact":
-        response = handle_contact_intent("add_contact", user_text)
-    
-    elif intent == "view_contact":
-        response = handle_contact_intent("view_contact", user_text)
-    
-    elif intent == "list_contacts":
-        response = handle_contact_intent("list_contacts", user_text)
-    
-    elif intent == "delete_contact":
-        response = handle_contact_intent("delete_contact", user_text)
-    
-    elif intent == "exit":
-        response = handle_exit(user_name)
-    
-    else:
+    with metrics.HANDLER_SECONDS.time(intent):
+        response = intents.dispatch(intent, user_text, slots)
+    if response is None:
         response = "I don't know how to handle that yet. Could you try rephrasing?"
     
-    return response
+    return response, intent
+
+
+@app.before_request
+def _ensure_worker_started():
+    # For servers without a post-fork hook: the first request starts the worker
+    if not _worker_started:
+        start_worker()
 
 
 @app.route("/")
 def index():
     """Render the main chat interface."""
-    return render_template("index.html", user_name=user_name)
+    return render_template("index.html", user_name=_current_user_name())
 
 
 @app.route("/api/chat", methods=["POST"])
@@ -186,15 +109,46 @@ def chat():
     API endpoint for chat messages.
     Expects: {"message": "user input text"}
     Returns: {"response": "assistant response", "intent": "detected intent"}
+    with a Server-Timing header (classify / handler / db / total, in ms).
     """
+    trace    = metrics.start_trace()
+    start    = time.perf_counter()
+    with profiling.profile("chat"):
+        response = app.make_response(_chat())
+    elapsed  = time.perf_counter() - start
+    metrics.end_trace()
+    metrics.CHAT_SECONDS.observe(elapsed)
+    metrics.CHAT_REQUESTS.inc(g.get("chat_intent") or "none", str(response.status_code))
+    response.headers["Server-Timing"] = metrics.server_timing({**trace, "total": elapsed})
+    return response
+
+
+def _chat():
     data = request.json
     user_message = data.get("message", "").strip()
     
     if not user_message:
         return jsonify({"response": "Please type something.", "intent": None})
     
-    response = process_command(user_message)
-    intent, _ = predict_with_confidence(user_message.lower())
+    wait = admission.take_token(request.remote_addr or "-")
+    if wait:
+        return _too_busy("Too many messages – slow down a little.", wait)
+    
+    # Classify first: cheap answers skip the work queue entirely
+    result = nlu.parse(user_message)
+    intent = g.chat_intent = result["intent"]
+    if intents.is_cheap(intent) or result["confidence"] < CONFIDENCE_THRESHOLD:
+        admission.note_cheap()
+        response, intent = handle_message(user_message, result)
+    else:
+        slot = admission.acquire(intent)
+        if slot is None:
+            return _too_busy("I'm busy with other requests right now – try again in a moment.",
+                             admission.BUSY_RETRY_AFTER, intent)
+        try:
+            response, intent = handle_message(user_message, result)
+        finally:
+            slot.release()
     
     return jsonify({
         "response": response,
@@ -202,6 +156,85 @@ def chat():
     })
 
 
+def _too_busy(message: str, retry_after: float, intent: str | None = None):
+    """429 with Retry-After for a request refused by admission control."""
+    return (jsonify({"response": message, "intent": intent, "error": "rate_limited"}), 429,
+            {"Retry-After": admission.retry_after(retry_after)})
+
+
+@app.route("/api/admission", methods=["GET"])
+def get_admission():
+    """This worker's chat admission counters: queue depth, in-flight, rejections."""
+    return jsonify(admission.stats())
+
+
+# State owned by other modules, read when /metrics is scraped
+def _admission_rejections() -> dict:
+    stats = admission.stats()
+    return {("rate",):    stats["rejected_rate"],
+            ("queue",):   stats["rejected_queue"],
+            ("timeout",): stats["rejected_timeout"],
+            ("intent",):  sum(stats["rejected_intent"].values())}
+
+
+metrics.Gauge("assistant_admission_in_flight", "Chat requests doing work.",
+              lambda: admission.stats()["in_flight"])
+metrics.Gauge("assistant_admission_queued", "Chat requests waiting for a work slot.",
+              lambda: admission.stats()["queued"])
+metrics.Gauge("assistant_admission_rejected_total", "Chat requests refused, by reason.",
+              _admission_rejections, labelnames=("reason",), kind="counter")
+metrics.Gauge("assistant_event_streams", "Open /api/events streams.", events.subscriber_count)
+
+
+def _running_apps() -> int:
+    from modules import process_manager
+    return len(process_manager.running())
+
+
+metrics.Gauge("assistant_running_apps", "Launched apps still running.", _running_apps)
+
+
+ADMIN_TOKEN = os.environ.get("ASSISTANT_ADMIN_TOKEN", "")
+
+
+def _admin_denied():
+    """
+    None when the caller may use admin endpoints: with ASSISTANT_ADMIN_TOKEN
+    set it must be sent as X-Admin-Token, otherwise only local callers may.
+    """
+    if ADMIN_TOKEN:
+        if request.headers.get("X-Admin-Token") == ADMIN_TOKEN:
+            return None
+    elif request.remote_addr in ("127.0.0.1", "::1"):
+        return None
+    return jsonify({"success": False, "error": "admin access required"}), 403
+
+
+@app.route("/api/admin/profiling", methods=["GET", "POST"])
+def admin_profiling():
+    """
+    Profiling status and recent files; POST {"enabled": true, "sample_rate": 0.2,
+    "slow_query_ms": 20, "sample_stacks": true} to switch it (this worker only).
+    """
+    denied = _admin_denied()
+    if denied is not None:
+        return denied
+    if request.method == "POST":
+        data = request.json or {}
+        if data.get("enabled", True):
+            profiling.enable(data.get("sample_rate"), data.get("slow_query_ms"),
+                             bool(data.get("sample_stacks", True)))
+        else:
+            profiling.disable()
+    return jsonify(profiling.status())
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """This worker's counters and latency histograms (Prometheus text format)."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 @app.route("/api/set-name", methods=["POST"])
 def set_name():
     """Set user name."""
@@ -220,28 +253,245 @@ def set_name():
 @app.route("/api/get-name", methods=["GET"])
 def get_name():
     """Get stored user name."""
-    global user_name
-    if not user_name:
-        user_name = db.get_user_name()
-    return jsonify({"name": user_name})
+    return jsonify({"name": _current_user_name()})
+
+
+# ── Conditional GET ────────────────────────────────────────────────────────────
+# Read-only listings carry a weak ETag built from the change counters of the
+# tables they read (see db.table_versions()), so a client revalidating an
+# unchanged panel gets a 304 without any table being queried.
+
+def _validators(tables: tuple, daily: bool) -> tuple[str, float]:
+    """(ETag, last-modified epoch) for the current request over `tables`."""
+    versions = db.table_versions()
+    parts    = [versions[db._DB_ID_ROW][0]] + [versions[t][0] for t in tables]
+    if request.query_string:
+        parts.append(format(zlib.crc32(request.query_string), "x"))
+    if daily:
+        # "today" in the SQL is DATE('now') – the UTC date – so it moves at UTC midnight
+        parts.append(datetime.now(timezone.utc).strftime("%Y%m%d"))
+    return "-".join(map(str, parts)), max(versions[t][1] for t in tables)
+
+
+def conditional(*tables: str, daily: bool = False):
+    """Answer If-None-Match / If-Modified-Since with 304 while `tables` are unchanged."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            etag, modified = _validators(tables, daily)
+            last_modified  = datetime.fromtimestamp(int(modified), timezone.utc)
+            # Within the current second a later write could share the
+            # timestamp, so Last-Modified is only sent once it is in the past
+            stable = int(modified) < int(datetime.now().timestamp()) and not daily
+            if request.if_none_match:
+                fresh = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                fresh = stable and since is not None and last_modified <= since
+            response = Response(status=304) if fresh else app.make_response(view(*args, **kwargs))
+            if response.status_code in (200, 304):
+                response.set_etag(etag, weak=True)
+                if stable:
+                    response.last_modified = last_modified
+                response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
 
 
 @app.route("/api/reminders", methods=["GET"])
+@conditional("reminders")
 def get_reminders():
     """Get today's reminders."""
     reminders = db.get_todays_reminders()
     return jsonify({"reminders": reminders})
 
 
+DEFAULT_RANGE_DAYS = 30
+
+
+def _range_args() -> tuple[str, str]:
+    """?start=YYYY-MM-DD&end=YYYY-MM-DD (inclusive), defaulting to the last 30 days."""
+    # created_at is DATETIME('now') – UTC – so "today" is the UTC date too
+    today = datetime.now(timezone.utc).date()
+    start = request.args.get("start") or (today - timedelta(days=DEFAULT_RANGE_DAYS - 1)).isoformat()
+    end   = request.args.get("end") or today.isoformat()
+    for value in (start, end):
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise BadRequest(f"{value!r} is not a YYYY-MM-DD date") from None
+    return start, end
+
+
+def _positive_amount(data: dict) -> float:
+    """data["amount"] as a positive float, or a 400."""
+    try:
+        amount = float(data.get("amount", 0))
+    except (TypeError, ValueError):
+        raise BadRequest("amount must be a number") from None
+    if amount <= 0:
+        raise BadRequest("amount must be positive")
+    return amount
+
+
+@app.errorhandler(BadRequest)
+def bad_request(error):
+    return jsonify({"success": False, "error": error.description}), 400
+
+
 @app.route("/api/expenses", methods=["GET"])
+@conditional("expenses", daily=True)
 def get_expenses():
-    """Get today's expenses."""
+    """Get today's expenses, or those in ?start=&end= when given."""
+    if "start" in request.args or "end" in request.args:
+        start, end = _range_args()
+        return jsonify({"expenses": db.get_expenses_between(start, end),
+                        "start": start, "end": end})
     expenses = db.get_todays_expenses()
     total = db.get_total_expenses_today()
     return jsonify({"expenses": expenses, "total": total})
 
 
+@app.route("/api/expenses", methods=["POST"])
+def add_expense():
+    """
+    Log an expense without going through the chat parser.
+    Expects: {"amount": 120, "category": "food" (optional), "note": "..." (optional),
+              "merchant": "..." (optional)}
+    Returns the stored id, today's total, today's total for the category
+    and any budget alerts – all from one database transaction.
+    """
+    from modules import expense_tracker
+    data   = request.json or {}
+    amount = _positive_amount(data)
+    note     = (data.get("note") or "").strip()
+    category = (data.get("category") or "").strip().lower() or \
+        expense_tracker._detect_category(note)
+    merchant = data.get("merchant")
+    if merchant is None:
+        merchant = expense_tracker._extract_merchant(note)
+    result = db.add_expense_with_totals(amount, category, note, merchant.strip().lower())
+    return jsonify({
+        "success":        True,
+        "id":             result["id"],
+        "category":       category,
+        "daily_total":    result["daily_total"],
+        "category_total": result["category_total"],
+        "alerts":         expense_tracker._budget_messages(result["budgets"]),
+    }), 201
+
+
+@app.route("/api/expenses/breakdown", methods=["GET"])
+def get_expense_breakdown():
+    """Per-category totals for ?start=&end=."""
+    start, end = _range_args()
+    return jsonify({"start": start, "end": end,
+                    "categories": db.get_category_breakdown(start, end)})
+
+
+@app.route("/api/expenses/trend", methods=["GET"])
+def get_expense_trend():
+    """Spending per ?period=day|week|month|year (optionally one ?category=)."""
+    start, end = _range_args()
+    period = request.args.get("period", "day")
+    if period not in db._PERIOD_KEYS:
+        raise BadRequest(f"period must be one of {', '.join(db._PERIOD_KEYS)}")
+    return jsonify({"start": start, "end": end, "period": period,
+                    "trend": db.get_expense_trend(start, end, period,
+                                                  request.args.get("category"))})
+
+
+@app.route("/api/expenses/merchants", methods=["GET"])
+def get_top_merchants():
+    """Merchants with the highest spend in ?start=&end= (?limit=, default 10)."""
+    start, end = _range_args()
+    try:
+        limit = min(int(request.args.get("limit", 10)), 100)
+    except ValueError:
+        raise BadRequest("limit must be an integer") from None
+    return jsonify({"start": start, "end": end,
+                    "merchants": db.get_top_merchants(start, end, limit)})
+
+
+@app.route("/api/budgets", methods=["GET"])
+def get_budgets():
+    """Budgets with spend in the current period, plus any alerts."""
+    from modules import expense_tracker
+    return jsonify({"budgets": db.get_budget_status(),
+                    "alerts":  expense_tracker.budget_alerts()})
+
+
+@app.route("/api/budgets", methods=["POST"])
+def set_budget():
+    """
+    Create or replace a budget.
+    Expects: {"category": "food" | "all", "period": "day" | "week" | "month", "amount": 5000}
+    """
+    data     = request.json or {}
+    category = (data.get("category") or "all").strip().lower()
+    period   = data.get("period", "month")
+    amount   = _positive_amount(data)
+    if period not in db._PERIOD_STARTS:
+        raise BadRequest(f"period must be one of {', '.join(db._PERIOD_STARTS)}")
+    db.set_budget(category, period, amount)
+    return jsonify({"success": True, "budgets": db.get_budget_status()})
+
+
+@app.route("/api/budgets/<category>/<period>", methods=["DELETE"])
+def delete_budget(category, period):
+    """Remove a budget."""
+    return jsonify({"success": db.delete_budget(category, period)})
+
+
+@app.route("/api/categories", methods=["GET"])
+def get_categories():
+    """Built-in expense categories plus user-added keywords."""
+    from modules import expense_tracker
+    return jsonify({"categories": sorted(expense_tracker.CATEGORY_KEYWORDS),
+                    "keywords":   db.get_category_keywords()})
+
+
+@app.route("/api/categories", methods=["POST"])
+def add_category_keyword():
+    """
+    Teach a keyword → category mapping.
+    Expects: {"keyword": "swiggy", "category": "food", "weight": 1.0 (optional)}
+    """
+    from modules import expense_tracker
+    data     = request.json or {}
+    keyword  = data.get("keyword", "").strip()
+    category = data.get("category", "").strip()
+    if not keyword or not category:
+        return jsonify({"success": False, "error": "keyword and category are required"}), 400
+    try:
+        weight = float(data.get("weight", 1.0))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "weight must be a number"}), 400
+    expense_tracker.add_category_keyword(keyword, category, weight)
+    return jsonify({"success": True})
+
+
+@app.route("/api/categories/<path:keyword>", methods=["DELETE"])
+def delete_category_keyword(keyword):
+    """Forget a user-added keyword."""
+    from modules import expense_tracker
+    return jsonify({"success": expense_tracker.remove_category_keyword(keyword)})
+
+
+@app.route("/api/search", methods=["GET"])
+def web_search_route():
+    """Search results (cached) plus the spoken answer for ?q=."""
+    from modules import web_search
+    query = request.args.get("q", "").strip()
+    if not query:
+        raise BadRequest("q is required")
+    found = web_search.search(query)
+    return jsonify({**found, "reply": web_search.format_answer(found)})
+
+
 @app.route("/api/memories", methods=["GET"])
+@conditional("memories")
 def get_memories():
     """Get all stored memories."""
     memories = db.get_all_memories()
@@ -249,25 +499,191 @@ def get_memories():
 
 
 @app.route("/api/contacts", methods=["GET"])
+@conditional("contacts")
 def get_contacts():
-    """Get all contacts."""
+    """Get all contacts, or ?q=name for fuzzy matches ranked by score."""
+    from modules import contact_index
+    query = request.args.get("q", "").strip()
+    if query:
+        limit   = min(max(request.args.get("limit", 5, type=int), 1), 50)
+        matches = contact_index.search(query, limit=limit)
+        return jsonify({"contacts": [{**contact, "score": score} for contact, score in matches]})
     contacts = db.get_all_contacts()
     return jsonify({"contacts": contacts})
 
 
+@app.route("/api/apps", methods=["GET"])
+def get_running_apps():
+    """Apps the assistant launched that are still running."""
+    from modules import process_manager
+    return jsonify({"apps": [a.as_dict() for a in process_manager.running()],
+                    "limit": process_manager.MAX_RUNNING_APPS})
+
+
+@app.route("/api/apps/<int:pid>", methods=["DELETE"])
+def close_running_app(pid):
+    """Close one launched app (and its process group)."""
+    from modules import process_manager
+    closed = process_manager.close(pid=pid)
+    return jsonify({"success": bool(closed)}), (200 if closed else 404)
+
+
+@app.route("/api/study", methods=["GET"])
+def get_study():
+    """Status of the active Pomodoro sessions."""
+    from modules import study_mode
+    return jsonify({"sessions": study_mode.get_status()})
+
+
+@app.route("/api/study", methods=["POST"])
+def control_study():
+    """
+    Control a Pomodoro session.
+    Expects: {"action": "start" | "pause" | "resume" | "cancel",
+              "work_minutes", "break_minutes", "cycles" (start only),
+              "id" (optional – defaults to the newest active session)}
+    """
+    from modules import study_mode
+    data   = request.json or {}
+    action = data.get("action", "start")
+
+    if action == "start":
+        session = study_mode.start_session(data.get("work_minutes"),
+                                           data.get("break_minutes"),
+                                           data.get("cycles"))
+        if session is None:
+            return jsonify({"success": False, "error": "A study session is already active",
+                            "sessions": study_mode.get_status()}), 409
+    elif action in ("pause", "resume", "cancel"):
+        control = {"pause":  study_mode.pause_session,
+                   "resume": study_mode.resume_session,
+                   "cancel": study_mode.cancel_session}[action]
+        session = control(data.get("id"))
+        if session is None:
+            return jsonify({"success": False, "error": f"No session to {action}"}), 404
+    else:
+        return jsonify({"success": False, "error": f"Unknown action: {action}"}), 400
+
+    return jsonify({"success": True, "session": study_mode.session_status(session)})
+
+
+@app.route("/api/events", methods=["GET"])
+def event_stream():
+    """
+    Server-Sent Events: "reminder" and "study" notifications as they happen.
+    ?topics=reminder,study filters; Last-Event-ID (sent by EventSource on
+    reconnect) replays what was missed.
+    """
+    topics  = [t for t in request.args.get("topics", "").split(",") if t] or None
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_id")
+    sub     = events.subscribe(topics, int(last_id) if last_id and last_id.isdigit() else None)
+    if sub is None:
+        return jsonify({"error": "Too many event streams"}), 503, {"Retry-After": "10"}
+    return Response(events.stream(sub), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.route("/api/reset-all", methods=["POST"])
 def reset_all():
     """Reset all data (reminders, expenses, memories, contacts)."""
+    from modules import contact_index
     db.clear_all_data()
+    contact_index.invalidate()
     return jsonify({"status": "success", "message": "All data has been cleared."})
 
 
-if __name__ == "__main__":
-    # Initialize database
+# ── Start-up ───────────────────────────────────────────────────────────────────
+
+def init_app():
+    """
+    One-time set-up: database, user name, and every lazily built cache
+    (intent model, app index, category matcher, contact index).  Starts no
+    threads, so it is safe to run in a pre-forking master; workers then
+    share the loaded model copy-on-write instead of each loading it.
+    """
+    global _initialised, user_name
+    if _initialised:
+        return
+    from modules import contact_index, expense_tracker
+    from modules.app_launcher import build_index
     db.init_db()
-    
+
     # Load user name if exists
     user_name = db.get_user_name()
+
+    # Index installed apps once so "open X" is a dict lookup
+    build_index()
+
+    # Parse merchants of expenses logged by older versions
+    expense_tracker.backfill_merchants()
+
+    # Load the intent model and every intent handler / slot extractor
+    nlu.parse("hello")
+    intents.preload()
+    expense_tracker._get_matcher()
+    contact_index.get_index()
+    _initialised = True
+
+
+def _claim_scheduler() -> bool:
+    """
+    True if this process may run the persisted timers: with several workers
+    exactly one holds an exclusive lock on SCHEDULER_LOCK (released when it
+    exits, so a replacement worker can take over).
+    """
+    global _scheduler_lock
+    if _scheduler_lock is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:               # Windows: single process
+        return True
+    fh = open(SCHEDULER_LOCK, "a")
+    try:
+        fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        fh.close()
+        return False
+    _scheduler_lock = fh
+    return True
+
+
+def start_worker(shared: bool = False):
+    """
+    Per-process start-up, run after the fork (gunicorn post_fork) or by
+    `python app.py`: every worker relays events and fires reminders (claims
+    are atomic, so each fires once); the worker owning the scheduler lock
+    re-arms Pomodoro sessions persisted by a previous run.  Sessions
+    started later are timed by whichever worker handled the request.
+    `shared` – sibling workers write the same database, so watch it for
+    their reminders.
+    """
+    global _worker_started
+    init_app()
+    if _worker_started:
+        return
+    _worker_started = True
+    from modules import study_mode
+    from modules.reminder import start_reminder_thread
+    events.enable_relay()
+    start_reminder_thread(watch=shared)
+    if _claim_scheduler():
+        study_mode.restore_sessions()
+
+
+def _after_fork_in_child():
+    global _worker_started, _scheduler_lock
+    _worker_started = False
+    _scheduler_lock = None          # the lock belongs to the parent's open file
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+if __name__ == "__main__":
+    init_app()
+    start_worker()
     
     print("\n" + "="*50)
     print("  Smart Assistant Web UI")
@@ -276,4 +692,6 @@ if __name__ == "__main__":
     print("📱 Open your browser: http://localhost:5000")
     print("\nPress Ctrl+C to stop\n")
     
-    app.run(debug=True, host="localhost", port=5000)
+    # No reloader: it would run this block in a watcher parent too, which
+    # would then hold the scheduler lock and start a second worker
+    app.run(debug=True, use_reloader=False, host="localhost", port=5000)
@@ -0,0 +1,334 @@
+"""
+asgi.py
+=======
+Async (ASGI) variant of the web server, for many concurrent connections on
+one process:
+
+    pip install quart uvicorn
+    uvicorn asgi:app --host 127.0.0.1 --port 5000      (or: python asgi.py)
+
+The two endpoints that hold connections are served natively on the event
+loop (Quart):
+
+    POST /api/chat     process_command() is a coroutine: the message is
+                       classified on NLU_POOL (slot extractors read the
+                       database, contacts and PATH index), cheap intents
+                       (the time – no I/O) are answered back on the loop,
+                       and everything else runs on the bounded executor its
+                       intent's `pool` names (modules/intents.py) – app
+                       launches / closes on SPAWN_POOL, web searches on
+                       IO_POOL, database work on DB_POOL.  A full executor
+                       (or an admission limit) answers 429 at once.
+    GET /api/events    Server-Sent Events without a thread per stream: an
+                       open stream is a suspended coroutine, so thousands of
+                       idle browsers cost memory, not threads.  Subscribing
+                       (and the Last-Event-ID replay query) runs on DB_POOL.
+
+Every other route is the Flask app from app.py, called on WSGI_POOL – one
+implementation of the JSON API for both servers.
+"""
+
+import asyncio
+import contextvars
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault("ASSISTANT_HEADLESS", "1")
+
+from quart import Quart, Response, jsonify, request
+
+import app as web
+from modules import admission
+from modules import events
+from modules import intents
+from modules import metrics
+from modules import nlu
+from modules import profiling
+
+MAX_STREAMS = int(os.environ.get("ASSISTANT_MAX_STREAMS", 10_000))    # SSE clients per process
+events.MAX_SUBSCRIBERS = MAX_STREAMS
+
+
+class Overloaded(Exception):
+    """A request was refused by admission control or a full executor."""
+
+    def __init__(self, message: str, retry_after: float = admission.BUSY_RETRY_AFTER,
+                 intent: str | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.intent      = intent
+
+
+class BoundedExecutor:
+    """
+    Thread pool that refuses work (Overloaded) once `max_pending` jobs are
+    queued or running, instead of queueing without limit.  Only used from
+    the event loop thread, so the counters need no lock.
+    """
+
+    def __init__(self, name: str, workers: int, max_pending: int):
+        self.name        = name
+        self.max_pending = max_pending
+        self.pending     = 0
+        self.peak        = 0
+        self.rejected    = 0
+        self.workers     = workers
+        self._pool       = ThreadPoolExecutor(workers, thread_name_prefix=f"asgi-{name}")
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise Overloaded("I'm busy with other requests right now – try again in a moment.")
+        self.pending += 1
+        self.peak = max(self.peak, self.pending)
+        try:
+            # Run in a copy of the caller's context so the request's metrics
+            # trace (Server-Timing) sees time spent on the worker thread
+            context = contextvars.copy_context()
+            return await asyncio.wrap_future(self._pool.submit(context.run, fn, *args))
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "pending": self.pending, "peak": self.peak,
+                "max_pending": self.max_pending, "rejected": self.rejected}
+
+
+# ── Executors ──────────────────────────────────────────────────────────────────
+SPAWN_POOL = BoundedExecutor("spawn", workers=2, max_pending=16)    # open / close apps
+NLU_POOL   = BoundedExecutor("nlu",   workers=4, max_pending=256)   # classification + slots
+IO_POOL    = BoundedExecutor("io",    workers=8, max_pending=64)    # network search
+DB_POOL    = BoundedExecutor("db",    workers=4, max_pending=64)    # SQLite reads / writes
+WSGI_POOL  = BoundedExecutor("wsgi",  workers=8, max_pending=256)   # Flask routes
+
+# Intent registry `pool` name → executor
+_POOLS = {"spawn": SPAWN_POOL, "io": IO_POOL, "db": DB_POOL}
+_ALL_POOLS = (SPAWN_POOL, NLU_POOL, IO_POOL, DB_POOL, WSGI_POOL)
+
+quart_app = Quart(__name__)
+quart_app.json.sort_keys = False
+
+
+@quart_app.before_serving
+async def _startup():
+    # Database, model and caches, then the reminder / relay threads
+    await asyncio.get_running_loop().run_in_executor(None, web.start_worker)
+
+
+# ── Chat ───────────────────────────────────────────────────────────────────────
+
+async def handle_message(user_text: str) -> tuple[str, str | None]:
+    """
+    Coroutine version of app.handle_message(): returns (response, intent),
+    raises Overloaded when the request can't be admitted.
+    """
+    if not user_text or not user_text.strip():
+        return "Please say something.", None
+
+    # Slot extraction can touch SQLite, the contact index and the PATH index,
+    # so classification leaves the loop too
+    result = await NLU_POOL.run(nlu.parse, user_text)
+    intent = result["intent"]
+    spec   = intents.get(intent)
+    if spec is None or spec.cheap or result["confidence"] < web.CONFIDENCE_THRESHOLD:
+        admission.note_cheap()
+        return web.handle_message(user_text, result)
+
+    slot = admission.acquire(intent, shared=False)
+    if slot is None:
+        raise Overloaded("I'm busy with other requests right now – try again in a moment.",
+                         intent=intent)
+    try:
+        return await _POOLS.get(spec.pool, DB_POOL).run(_handle_profiled, user_text, result)
+    finally:
+        slot.release()
+
+
+def _handle_profiled(user_text: str, result: dict) -> tuple[str, str | None]:
+    # On the executor thread, where cProfile sees the work
+    with profiling.profile(f"chat-{result['intent']}"):
+        return web.handle_message(user_text, result)
+
+
+async def process_command(user_text: str) -> str:
+    """Process user input and return the response."""
+    return (await handle_message(user_text))[0]
+
+
+@quart_app.route("/api/chat", methods=["POST"])
+async def chat():
+    """Same contract as app.chat(): {"message": …} → {"response", "intent"}."""
+    trace = metrics.start_trace()
+    start = time.perf_counter()
+    data  = await request.get_json(silent=True) or {}
+    user_message = (data.get("message") or "").strip()
+    if not user_message:
+        return jsonify({"response": "Please type something.", "intent": None})
+
+    wait = admission.take_token(request.remote_addr or "-")
+    try:
+        if wait:
+            raise Overloaded("Too many messages – slow down a little.", wait)
+        reply, intent = await handle_message(user_message)
+        response = jsonify({"response": reply, "intent": intent})
+    except Overloaded as e:
+        intent   = e.intent
+        response = jsonify({"response": str(e), "intent": intent, "error": "rate_limited"})
+        response.status_code = 429
+        response.headers["Retry-After"] = admission.retry_after(e.retry_after)
+
+    elapsed = time.perf_counter() - start
+    metrics.end_trace()
+    metrics.CHAT_SECONDS.observe(elapsed)
+    metrics.CHAT_REQUESTS.inc(intent or "none", str(response.status_code))
+    response.headers["Server-Timing"] = metrics.server_timing({**trace, "total": elapsed})
+    return response
+
+
+@quart_app.route("/api/admission", methods=["GET"])
+async def get_admission():
+    """Admission counters plus the executors' queue depths."""
+    return jsonify({**admission.stats(),
+                    "executors": {pool.name: pool.stats() for pool in _ALL_POOLS}})
+
+
+# ── Server-Sent Events ─────────────────────────────────────────────────────────
+
+async def stream(sub: events.Subscriber, heartbeat: float = events.HEARTBEAT_SECONDS):
+    """events.stream() for the event loop: waits on an asyncio.Event, not a thread."""
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    sub.on_offer = lambda: loop.call_soon_threadsafe(wake.set)
+    try:
+        yield f"retry: {events.RETRY_MS}\n\n".encode()
+        while not sub.closed:
+            batch = sub.get(0)
+            if batch:
+                yield "".join(events.format_sse(e) for e in batch).encode()
+                continue
+            try:
+                await asyncio.wait_for(wake.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+            wake.clear()
+    finally:
+        events.unsubscribe(sub)
+
+
+@quart_app.route("/api/events", methods=["GET"])
+async def event_stream():
+    """Same contract as app.event_stream()."""
+    topics  = [t for t in request.args.get("topics", "").split(",") if t] or None
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_id")
+    # subscribe() replays missed events from SQLite under events._lock
+    try:
+        sub = await DB_POOL.run(events.subscribe, topics,
+                                int(last_id) if last_id and last_id.isdigit() else None)
+    except Overloaded:
+        sub = None
+    if sub is None:
+        return jsonify({"error": "Too many event streams"}), 503, {"Retry-After": "10"}
+    response = Response(stream(sub), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.timeout = None          # streams stay open indefinitely
+    return response
+
+
+NATIVE_PATHS = {"/api/chat", "/api/admission", "/api/events"}
+
+metrics.Gauge("assistant_executor_pending", "Jobs queued or running per executor.",
+              lambda: {(pool.name,): pool.pending
+                       for pool in _ALL_POOLS},
+              labelnames=("executor",))
+
+
+# ── Everything else: the Flask app on a thread ─────────────────────────────────
+
+def _wsgi_environ(scope: dict, body: bytes) -> dict:
+    """WSGI environ for an ASGI http scope (PEP 3333: str values, latin-1 bytes)."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD":    scope["method"],
+        "SCRIPT_NAME":       scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO":         scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING":      scope["query_string"].decode("latin-1"),
+        "SERVER_NAME":       server[0],
+        "SERVER_PORT":       str(server[1]),
+        "SERVER_PROTOCOL":   f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR":       client[0],
+        "wsgi.version":      (1, 0),
+        "wsgi.url_scheme":   scope.get("scheme", "http"),
+        "wsgi.input":        io.BytesIO(body),
+        "wsgi.errors":       sys.stderr,
+        "wsgi.multithread":  True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once":     False,
+    }
+    for name, value in scope["headers"]:
+        name, value = name.decode("latin-1").upper().replace("-", "_"), value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+        else:
+            key = "HTTP_" + name
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _call_flask(environ: dict) -> tuple[int, list, bytes]:
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"], started["headers"] = status, headers
+
+    chunks = web.app(environ, start_response)
+    try:
+        body = b"".join(chunks)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return int(started["status"].split(" ", 1)[0]), started["headers"], body
+
+
+async def _flask_bridge(scope, receive, send):
+    body, more = b"", True
+    while more:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        body += message.get("body", b"")
+        more  = message.get("more_body", False)
+    try:
+        status, headers, payload = await WSGI_POOL.run(_call_flask, _wsgi_environ(scope, body))
+    except Overloaded as e:
+        status, payload = 503, str(e).encode("utf-8")
+        headers = [("Content-Type", "text/plain; charset=utf-8"),
+                   ("Retry-After", admission.retry_after(e.retry_after))]
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(k.lower().encode("latin-1"), v.encode("latin-1"))
+                            for k, v in headers]})
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def app(scope, receive, send):
+    """The ASGI application: native async routes, the rest via Flask."""
+    if scope["type"] == "http" and scope["path"] not in NATIVE_PATHS:
+        await _flask_bridge(scope, receive, send)
+    else:
+        await quart_app(scope, receive, send)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    host, _, port = os.environ.get("ASSISTANT_BIND", "127.0.0.1:5000").rpartition(":")
+    print("\n🌐 Starting ASGI server (uvicorn)...")
+    print(f"📱 Open your browser: http://{host}:{port}\n")
+    uvicorn.run(app, host=host, port=int(port), log_level="warning")
@@ -0,0 +1,62 @@
+"""
+benchmark.py
+============
+Performance checks for the assistant.  Each sub-command prints its
+measurements and exits non-zero when a budget is exceeded, so it can be
+used as a gate in CI.  The checks live in benchmarks/, one module per
+area:
+
+    python benchmark.py import-time        # cold import of main.py / app.py
+    python benchmark.py listener           # VAD + recogniser pipeline on WAV fixtures
+    python benchmark.py category           # compiled category matcher vs keyword loop
+    python benchmark.py expenses           # analytics queries over 1M expenses / 5 years
+    python benchmark.py expense-insert     # insert + totals in one transaction
+    python benchmark.py contacts           # fuzzy contact lookup over 50k contacts
+    python benchmark.py app-launcher       # executable index vs trial spawns, big PATH
+    python benchmark.py app-processes      # launch limit, reaping and close of launched apps
+    python benchmark.py web-search         # pooled HTTP search + result cache, local stub server
+    python benchmark.py prefork            # warm-before-fork workers (what gunicorn preload does)
+    python benchmark.py events             # event fan-out, slow clients, cross-worker relay, SSE
+    python benchmark.py conditional-get    # full listing vs ETag revalidation (304)
+    python benchmark.py admission          # /api/chat overload: 429s, bounded work, cheap latency
+    python benchmark.py asgi               # async server: thousands of idle SSE streams, chat latency
+    python benchmark.py metrics            # cost of instrumentation: per observation, per chat
+    python benchmark.py profiling          # profiler off-cost, per-request profiles, stacks, slow log
+    python benchmark.py intents            # registry: lazy handler imports, coverage, lookup cost
+"""
+
+import argparse
+import sys
+
+from benchmarks import apps, contacts, expenses, intents, observability
+from benchmarks import serving, startup, voice, web_search
+
+BENCHMARKS = {
+    "import-time": startup.bench_import_time,
+    "listener":    voice.bench_listener,
+    "category":    expenses.bench_category,
+    "expenses":    expenses.bench_expenses,
+    "expense-insert": expenses.bench_expense_insert,
+    "contacts":    contacts.bench_contacts,
+    "app-launcher": apps.bench_app_launcher,
+    "app-processes": apps.bench_app_processes,
+    "web-search":  web_search.bench_web_search,
+    "prefork":     serving.bench_prefork,
+    "events":      serving.bench_events,
+    "conditional-get": serving.bench_conditional_get,
+    "admission":   serving.bench_admission,
+    "asgi":        serving.bench_asgi,
+    "metrics":     observability.bench_metrics,
+    "profiling":   observability.bench_profiling,
+    "intents":     intents.bench_intents,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Smart Assistant benchmarks.")
+    parser.add_argument("name", choices=sorted(BENCHMARKS) + ["all"])
+    args = parser.parse_args()
+
+    names = sorted(BENCHMARKS) if args.name == "all" else [args.name]
+    results = [BENCHMARKS[name]() for name in names]
+    sys.exit(0 if all(results) else 1)
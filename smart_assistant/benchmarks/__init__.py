@@ -0,0 +1,13 @@
+"""
+benchmarks
+==========
+The checks behind benchmark.py, one module per area.  Each bench_*()
+prints its measurements and returns False when a budget is exceeded.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,172 @@
+"""
+benchmarks/apps.py
+==================
+Apps: the PATH / desktop-entry index and supervised launches.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _make_fake_path(root: str, n_dirs: int, per_dir: int) -> str:
+    """n_dirs directories of dummy executables; the real apps sit in the last one."""
+    dirs = []
+    for i in range(n_dirs):
+        d = os.path.join(root, f"bin{i:04d}")
+        os.makedirs(d)
+        for j in range(per_dir):
+            exe = os.path.join(d, f"tool{i}-{j}")
+            with open(exe, "w") as fh:
+                fh.write("#!/bin/sh\n")
+            os.chmod(exe, 0o755)
+        dirs.append(d)
+    for app in ["gedit", "chromium", "firefox", "kcalc", "vlc", "gimp", "xterm", "dolphin"]:
+        exe = os.path.join(dirs[-1], app)
+        with open(exe, "w") as fh:
+            fh.write("#!/bin/sh\n")
+        os.chmod(exe, 0o755)
+    return os.pathsep.join(dirs)
+
+
+def bench_app_launcher(n_dirs: int = 400, per_dir: int = 50) -> bool:
+    from modules import app_launcher as al
+
+    if sys.platform == "win32":
+        print("App launcher benchmark needs a POSIX system – skipped.")
+        return True
+
+    apps = ["notepad", "chrome", "firefox", "calculator", "vlc", "paint", "terminal", "explorer"]
+    with tempfile.TemporaryDirectory() as tmp:
+        fake_path = _make_fake_path(tmp, n_dirs, per_dir)
+        desktop   = os.path.join(tmp, "applications")
+        os.makedirs(desktop)
+        for i in range(300):
+            with open(os.path.join(desktop, f"app{i}.desktop"), "w") as fh:
+                fh.write(f"[Desktop Entry]\nName=Fake App {i}\nExec=tool0-0 %U\n")
+
+        # Old behaviour: spawn each candidate until one doesn't raise.  Only
+        # the failing spawns are timed – both paths pay for the real one.
+        app_dir = fake_path.rsplit(os.pathsep, 1)[-1]
+        failed, start = 0, time.perf_counter()
+        for app in apps:
+            for cmd in al.APP_COMMANDS[app]:
+                if os.path.exists(os.path.join(app_dir, cmd.split()[0])):
+                    break
+                try:
+                    subprocess.Popen(cmd.split(), env={"PATH": fake_path},
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                except FileNotFoundError:
+                    failed += 1
+        old = (time.perf_counter() - start) / len(apps)
+
+        index = al.AppIndex(fake_path, [desktop], allowlist={"newly-installed"})
+        start = time.perf_counter()
+        index.refresh(force=True)
+        build = time.perf_counter() - start
+
+        resolved, start = {}, time.perf_counter()
+        for _ in range(100):
+            for app in apps:
+                resolved[app] = index.resolve(app)
+        new = (time.perf_counter() - start) / (100 * len(apps))
+
+        # Every app resolves, and to the first installed candidate
+        ok = all(resolved[a] is not None for a in apps) and \
+            resolved["notepad"][1][0].endswith("gedit")
+
+        # Only programs with a desktop entry / allowlisted ones are launchable
+        # from PATH, and those by their exact name
+        safe = index.resolve("tool0-0") is not None and index.resolve("tool0-0 now") is None \
+            and index.resolve("tool1-1") is None
+        ok  &= safe
+
+        # A new executable appears → directory mtime changes → index rebuilt
+        builds = index.builds
+        later  = os.path.join(fake_path.split(os.pathsep)[0], "newly-installed")
+        with open(later, "w") as fh:
+            fh.write("#!/bin/sh\n")
+        os.chmod(later, 0o755)
+        os.utime(os.path.dirname(later), ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        index._checked_at = 0.0
+        invalidated = index.resolve("newly-installed") is not None and index.builds == builds + 1
+        ok &= invalidated
+
+    print(f"App launcher: {n_dirs} PATH dirs × {per_dir} executables, 300 desktop entries")
+    print(f"  trial spawns  {old * 1000:8.2f} ms/app ({failed} failed spawns for {len(apps)} apps)")
+    print(f"  index lookup  {new * 1e6:8.2f} µs/app (index built once in {build * 1000:.0f} ms)  "
+          f"{'✔' if ok else '✘ wrong resolution'}")
+    print(f"  rebuilt after a PATH directory changed  {'✔' if invalidated else '✘'}")
+    print(f"  other PATH programs not launchable, PATH-only names exact  {'✔' if safe else '✘'}")
+    return ok
+
+
+def _proc_alive(pid: int) -> bool:
+    """True if `pid` exists and isn't a zombie (Linux /proc)."""
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            return fh.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except (OSError, IndexError):
+        return False
+
+
+def bench_app_processes(limit: int = 3) -> bool:
+    from modules import app_launcher as al
+    from modules import process_manager as pm
+
+    if not sys.platform.startswith("linux"):
+        print("App process benchmark needs Linux (/proc) – skipped.")
+        return True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Dummy apps: one exits on its own, one keeps a helper child alive
+        scripts = {
+            "quickapp":  "#!/bin/sh\nsleep 0.2\n",
+            "daemonapp": f"#!/bin/sh\nsleep 60 &\necho $! >> {tmp}/helpers\nsleep 60\n",
+        }
+        for name, body in scripts.items():
+            path = os.path.join(tmp, name)
+            with open(path, "w") as fh:
+                fh.write(body)
+            os.chmod(path, 0o755)
+        saved_index, saved_limit = al._index, pm.MAX_RUNNING_APPS
+        al._index = al.AppIndex(tmp, [], allowlist={"quickapp", "daemonapp"})
+        pm.MAX_RUNNING_APPS = limit
+        try:
+            # Apps that exit by themselves are reaped without anyone asking
+            al.open_app("open quickapp")
+            quick = next(a for a in pm.running() if a.name == "quickapp")
+            start = time.perf_counter()
+            while quick.pid in pm._apps and time.perf_counter() - start < 5:
+                time.sleep(0.005)
+            reap_ms = (time.perf_counter() - start) * 1000
+            reaped  = quick.pid not in pm._apps and quick.popen.returncode == 0 \
+                and not os.path.exists(f"/proc/{quick.pid}")
+
+            # Concurrent-launch limit
+            replies = [al.open_app("open daemonapp") for _ in range(limit + 1)]
+            limited = len(pm.running()) == limit and "Close one first" in replies[-1]
+
+            # "close daemonapp" stops every instance and the helpers they spawned
+            time.sleep(0.2)
+            with open(os.path.join(tmp, "helpers")) as fh:
+                helpers = [int(line) for line in fh if line.strip()]
+            launched = [a.pid for a in pm.running()]
+            start    = time.perf_counter()
+            reply    = al.close_app("close daemonapp")
+            close_ms = (time.perf_counter() - start) * 1000
+            time.sleep(0.1)
+            closed = not pm.running() and len(helpers) == limit and \
+                not any(_proc_alive(pid) for pid in launched + helpers)
+        finally:
+            pm.close(timeout=1.0)
+            al._index, pm.MAX_RUNNING_APPS = saved_index, saved_limit
+
+    reaper = "pidfd" if pm._HAS_PIDFD else f"poll every {pm.REAP_INTERVAL}s"
+    print(f"App processes: dummy executables, limit {limit}, reaper {reaper}")
+    print(f"  exited app reaped after   {reap_ms:7.1f} ms (0.2 s run)  {'✔' if reaped else '✘'}")
+    print(f"  launch #{limit + 1} refused            {'✔' if limited else '✘'}")
+    print(f"  '{reply}' in {close_ms:.1f} ms, helpers gone  {'✔' if closed else '✘'}")
+    return reaped and limited and closed
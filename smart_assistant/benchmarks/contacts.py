@@ -0,0 +1,69 @@
+"""
+benchmarks/contacts.py
+======================
+Contacts: fuzzy / phonetic lookup over a large address book.
+"""
+
+import random
+import time
+
+
+# (spoken query, contact that must be among the top 3 offered)
+CONTACT_CASES = [
+    ("jon smith", "John Smith"),
+    ("jhon smth", "John Smith"),
+    ("mum", "Mom"),
+    ("mary jane watson", "Mary Jane Watson"),
+    ("marry jane", "Mary Jane Watson"),
+]
+CONTACT_LOOKUP_BUDGET = 0.002     # seconds, 99th percentile
+
+
+def bench_contacts(n_contacts: int = 50_000, lookups: int = 2_000) -> bool:
+    from modules.contact_index import ContactIndex
+
+    rng    = random.Random(5)
+    first  = ["aarav", "aditi", "alex", "amit", "anita", "arjun", "bella", "carlos", "chen",
+              "david", "deepa", "elena", "farah", "george", "hana", "ivan", "jatin", "julia",
+              "karan", "lena", "li", "maria", "mohan", "nadia", "neha", "omar", "priya",
+              "rahul", "ravi", "sara", "sanjay", "tara", "uma", "victor", "wei", "yusuf"]
+    syllable = lambda: rng.choice("bdgklmnprstvz") + rng.choice("aeiou")
+    names  = {f"{rng.choice(first)} {''.join(syllable() for _ in range(rng.randint(3, 4)))}"
+              for _ in range(n_contacts)}
+    names  = sorted(names | {expected.lower() for _, expected in CONTACT_CASES})
+
+    start = time.perf_counter()
+    index = ContactIndex({"id": i, "name": name.title()} for i, name in enumerate(names))
+    build = time.perf_counter() - start
+
+    ok = True
+    for query, expected in CONTACT_CASES:
+        ranked = [contact["name"] for contact, _ in index.search(query, limit=3)]
+        found  = expected in ranked
+        ok    &= found
+        print(f"  {query!r:20} → {', '.join(ranked) or '-':<40} "
+              f"{'✔' if found else '✘ expected ' + expected}")
+
+    # Misspelled queries: drop / swap one character of a random name
+    queries = []
+    for _ in range(lookups):
+        name = list(rng.choice(names))
+        i    = rng.randrange(1, len(name) - 1)
+        if rng.random() < 0.5:
+            del name[i]
+        else:
+            name[i - 1], name[i] = name[i], name[i - 1]
+        queries.append("".join(name))
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50, p99 = timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+    within   = p99 <= CONTACT_LOOKUP_BUDGET
+    ok      &= within
+    print(f"Contact index: {len(index):,} contacts (built in {build:.2f}s)")
+    print(f"  lookup p50 {p50 * 1e6:6.0f} µs   p99 {p99 * 1e6:6.0f} µs  "
+          f"(budget {CONTACT_LOOKUP_BUDGET * 1e6:.0f} µs)  {'✔' if within else '✘ over budget'}")
+    return ok
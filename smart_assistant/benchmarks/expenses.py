@@ -0,0 +1,211 @@
+"""
+benchmarks/expenses.py
+======================
+Expenses: category matching, analytics queries and the insert path.
+"""
+
+import os
+import random
+import tempfile
+import time
+
+
+# (sentence, expected category) – cases the old first-substring loop got wrong
+CATEGORY_CASES = [
+    ("paid 900 for the gas bill", "utilities"),
+    ("went to the theatre for 300", "miscellaneous"),
+    ("spent 40 on pizzas", "food"),
+    ("2 movie tickets and popcorn 450", "entertainment"),
+    ("taxi and metro today 220", "transport"),
+]
+CATEGORY_SPEEDUP = 10.0     # compiled matcher vs loop on the large keyword list
+
+
+def _naive_detect(text: str, keywords: dict[str, list[str]]) -> str:
+    """The original implementation: first substring hit in dict order."""
+    text_lower = text.lower()
+    for category, words in keywords.items():
+        for kw in words:
+            if kw in text_lower:
+                return category
+    return "miscellaneous"
+
+
+def bench_category(n_keywords: int = 20_000, n_sentences: int = 2_000) -> bool:
+    from modules import expense_tracker as et
+
+    ok = True
+    matcher = et.build_category_matcher(
+        {kw: (cat, 1.0) for cat, kws in et.CATEGORY_KEYWORDS.items() for kw in kws})
+    for text, expected in CATEGORY_CASES:
+        got = et._detect_category(text, matcher)
+        ok &= got == expected
+        print(f"  {text!r:42} → {got:<14} {'✔' if got == expected else '✘ expected ' + expected}")
+
+    # Synthetic vocabulary: pronounceable pseudo-words spread over 100 categories
+    rng      = random.Random(3)
+    syllable = lambda: rng.choice("bcdfghklmnprstvz") + rng.choice("aeiou")
+    words    = sorted({"".join(syllable() for _ in range(rng.randint(2, 4)))
+                       for _ in range(n_keywords)})
+    big      = {}
+    for i, word in enumerate(words):
+        big.setdefault(f"cat{i % 100}", []).append(word)
+    sentences = [f"spent {rng.randint(10, 999)} on " +
+                 " ".join(rng.choice(words) if rng.random() < 0.3 else "the" for _ in range(8))
+                 for _ in range(n_sentences)]
+
+    start   = time.perf_counter()
+    matcher = et.build_category_matcher({w: (c, 1.0) for c, ws in big.items() for w in ws})
+    build   = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in sentences:
+        _naive_detect(text, big)
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in sentences:
+        et._detect_category(text, matcher)
+    compiled = time.perf_counter() - start
+
+    speedup = naive / compiled
+    within  = speedup >= CATEGORY_SPEEDUP
+    ok     &= within
+    print(f"Category matcher: {len(words)} keywords, {n_sentences} sentences "
+          f"(build {build * 1000:.0f} ms)")
+    print(f"  keyword loop {naive / n_sentences * 1e6:8.1f} µs/sentence")
+    print(f"  compiled     {compiled / n_sentences * 1e6:8.1f} µs/sentence  "
+          f"({speedup:.0f}x, need {CATEGORY_SPEEDUP:.0f}x)  {'✔' if within else '✘ too slow'}")
+    return ok
+
+
+# Seconds allowed per analytics query over the synthetic history
+EXPENSE_QUERY_BUDGET = 1.0
+
+
+def _seed_expenses(path: str, rows: int, years: int):
+    """Fill a fresh database at `path` with `rows` random expenses."""
+    import sqlite3
+    from modules import database as db
+
+    db.DB_PATH = path
+    db.init_db()
+    rng        = random.Random(11)
+    categories = ["food", "transport", "groceries", "utilities", "entertainment",
+                  "health", "shopping", "miscellaneous"]
+    merchants  = [f"shop {i}" for i in range(300)] + [""] * 300
+    now        = time.time()
+    span       = years * 365 * 86400
+
+    def generate():
+        for _ in range(rows):
+            ts = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(now - rng.random() * span))
+            yield (round(rng.uniform(5, 2000), 2), rng.choice(categories), "", ts,
+                   rng.choice(merchants))
+
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO expenses (amount, category, note, created_at, merchant) "
+                     "VALUES (?, ?, ?, ?, ?)", generate())
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    db.set_budget("all", "month", 50_000)
+    db.set_budget("food", "week", 5_000)
+
+
+def bench_expenses(rows: int = 1_000_000, years: int = 5) -> bool:
+    from datetime import date, timedelta
+    from modules import database as db
+
+    today = date.today()
+    first = (today - timedelta(days=365 * years)).isoformat()
+    last_year = (today - timedelta(days=365)).isoformat()
+    queries = {
+        "breakdown, 5 years":   lambda: db.get_category_breakdown(first, today.isoformat()),
+        "breakdown, 1 year":    lambda: db.get_category_breakdown(last_year, today.isoformat()),
+        "trend by day, 1 year": lambda: db.get_expense_trend(last_year, today.isoformat(), "day"),
+        "trend by month, 5y":   lambda: db.get_expense_trend(first, today.isoformat(), "month"),
+        "food by week, 1 year": lambda: db.get_expense_trend(last_year, today.isoformat(),
+                                                             "week", "food"),
+        "top merchants, 1 year": lambda: db.get_top_merchants(last_year, today.isoformat()),
+        "budget status":        lambda: db.get_budget_status(),
+        "today's total":        db.get_total_expenses_today,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        _seed_expenses(os.path.join(tmp, "bench.db"), rows, years)
+        print(f"Expense analytics: {rows:,} rows over {years} years "
+              f"(seeded in {time.perf_counter() - start:.1f}s)")
+        ok = True
+        for name, query in queries.items():
+            start   = time.perf_counter()
+            result  = query()
+            elapsed = time.perf_counter() - start
+            within  = elapsed <= EXPENSE_QUERY_BUDGET
+            ok     &= within
+            size    = f"{len(result)} rows" if isinstance(result, list) else f"= {result:.2f}"
+            print(f"  {name:<22} {elapsed * 1000:7.1f} ms  ({size})  "
+                  f"{'✔' if within else '✘ over budget'}")
+
+        # Top merchants must seek the date range, not scan by merchant
+        conn = db.get_connection()
+        plan = " ".join(row["detail"] for row in conn.execute(
+            "EXPLAIN QUERY PLAN " + db._TOP_MERCHANTS_SQL,
+            (*db._date_range(last_year, today.isoformat()), 10)))
+        conn.close()
+        seeks = "idx_expenses_created_merchant (created_at>? AND created_at<?)" in plan
+        ok   &= seeks
+        print(f"  top merchants plan: {plan}  {'✔' if seeks else '✘ not a date-range seek'}")
+    return ok
+
+
+def bench_expense_insert(inserts: int = 500, threads: int = 8) -> bool:
+    """
+    log_expense's old path (insert, total, budgets: three connections) vs
+    add_expense_with_totals, plus a race check.
+    """
+    import threading
+    from modules import database as db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        db.init_db()
+
+        start = time.perf_counter()
+        for _ in range(inserts):
+            db.add_expense(10.0, "food", "lunch")
+            db.get_total_expenses_today()
+            db.get_budget_status("food")
+        old = (time.perf_counter() - start) / inserts
+
+        start = time.perf_counter()
+        for _ in range(inserts):
+            db.add_expense_with_totals(10.0, "food", "lunch")
+        new = (time.perf_counter() - start) / inserts
+
+        # Concurrent inserts: each reported total must include exactly the
+        # inserts committed before it, so all totals are distinct steps of 1
+        db.clear_all_data()
+        totals, lock = [], threading.Lock()
+
+        def worker():
+            for _ in range(inserts // threads):
+                total = db.add_expense_with_totals(1.0, "misc")["daily_total"]
+                with lock:
+                    totals.append(total)
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        expected   = [float(i) for i in range(1, len(totals) + 1)]
+        consistent = sorted(totals) == expected
+
+    print(f"Expense insert: {inserts} inserts")
+    print(f"  three connections    {old * 1000:6.2f} ms/expense")
+    print(f"  one transaction      {new * 1000:6.2f} ms/expense  ({old / new:.1f}x)")
+    print(f"  {threads} threads × {inserts // threads}: totals consistent "
+          f"{'✔' if consistent else '✘'}")
+    return consistent
@@ -0,0 +1,58 @@
+"""
+benchmarks/intents.py
+=====================
+The intent registry: lazy handler imports, coverage and lookup cost.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks import ROOT
+
+
+def bench_intents(lookups: int = 200_000) -> bool:
+    from modules import intent_classifier
+    from modules import intents
+
+    # What `import main` loads, and what one message adds
+    probe = ("import sys, main; before = set(sys.modules); main.nlu.parse('{}'); "
+             "print(','.join(sorted(m for m in sys.modules if m.startswith('modules.')))); "
+             "print(','.join(sorted(m for m in set(sys.modules) - before "
+             "if m.startswith('modules.'))))")
+    lines  = subprocess.run([sys.executable, "-c", probe.format("search for python tutorials")],
+                            cwd=ROOT, check=True, capture_output=True, text=True,
+                            env={**os.environ, "ASSISTANT_HEADLESS": "1"}).stdout.splitlines()
+    added   = set(filter(None, lines[-1].split(",")))
+    eager   = set(lines[-2].split(",")) - added
+    lazy    = {"modules.web_search", "modules.contacts", "modules.handlers",
+               "modules.reminder", "modules.study_mode", "modules.expense_tracker",
+               "modules.app_launcher", "modules.process_manager", "modules.contact_index"}
+    lazy_ok = not lazy & eager and "modules.web_search" in added
+
+    # Every label the classifier can predict has a handler
+    intent_classifier._load_models()
+    labels  = [str(c) for c in intent_classifier._model.classes_]
+    missing = [label for label in labels if intents.get(label) is None]
+
+    # Lookup cost is one dict access whichever intent it is
+    costs = {}
+    for name in (labels[0], labels[-1]):
+        start = time.perf_counter()
+        for _ in range(lookups):
+            intents.get(name)
+        costs[name] = (time.perf_counter() - start) / lookups * 1e9
+    flat = max(costs.values()) < 2 * min(costs.values()) + 50
+
+    print("Intent registry")
+    print(f"  import main             {len(eager)} modules, none of "
+          f"{', '.join(sorted(m.split('.')[1] for m in lazy))}  {'✔' if not lazy & eager else '✘'}")
+    print(f"  first search message    imports {', '.join(sorted(added)) or 'nothing'}  "
+          f"{'✔' if 'modules.web_search' in added else '✘'}")
+    print(f"  classifier labels       {len(labels)}, without a handler: "
+          f"{', '.join(missing) or 'none'}  {'✔' if not missing else '✘'}")
+    print("  lookup                  " + ", ".join(f"{name} {ns:.0f} ns"
+                                                   for name, ns in costs.items())
+          + f"  {'✔' if flat else '✘'}")
+    return lazy_ok and not missing and flat
@@ -0,0 +1,150 @@
+"""
+benchmarks/observability.py
+===========================
+Observability: the cost of metrics and of the profiler.
+"""
+
+import os
+import tempfile
+import time
+
+
+def bench_metrics(observations: int = 200_000, chats: int = 500, rounds: int = 5) -> bool:
+    os.environ["ASSISTANT_HEADLESS"] = "1"
+    from modules import database as db
+    from modules import metrics
+
+    histogram = metrics.Histogram("benchmark_seconds", "Benchmark only.", ("label",))
+    start = time.perf_counter()
+    for i in range(observations):
+        histogram.observe(0.003, "x")
+    observe_us = (time.perf_counter() - start) / observations * 1e6
+    start = time.perf_counter()
+    for i in range(observations):
+        with histogram.time("x"):
+            pass
+    timer_us = (time.perf_counter() - start) / observations * 1e6
+
+    def best_of(fn) -> dict:
+        """Best-of-`rounds` seconds per call, metrics on and off (interleaved)."""
+        best = {True: float("inf"), False: float("inf")}
+        for _ in range(rounds):
+            for enabled in (True, False):
+                metrics.ENABLED = enabled
+                start = time.perf_counter()
+                fn()
+                best[enabled] = min(best[enabled], time.perf_counter() - start)
+        metrics.ENABLED = True
+        return best
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "metrics.db")
+        db.init_db()
+        import app as web
+        web.SCHEDULER_LOCK = os.path.join(tmp, "scheduler.lock")
+        web.admission.CHAT_BURST = web.admission.CHAT_RATE = 10 ** 6
+        client = web.app.test_client()
+        client.post("/api/chat", json={"message": "what time is it"})
+
+        def run_chats():
+            for i in range(chats // 2):
+                client.post("/api/chat", json={"message": "what time is it"})
+                client.post("/api/chat", json={"message": f"spent {i + 1} rupees on tea"})
+        chat = best_of(run_chats)
+
+        def run_db():
+            for _ in range(chats):
+                db.get_user_name()
+        query = best_of(run_db)
+
+        timing = client.post("/api/chat", json={"message": "spent 50 on tea"}) \
+            .headers.get("Server-Timing", "")
+        exposition = client.get("/metrics").get_data(as_text=True)
+
+    chat_overhead  = chat[True] / chat[False] - 1
+    query_overhead = (query[True] - query[False]) / chats * 1e6
+    ok = observe_us < 5 and chat_overhead < 0.05 and "db;dur=" in timing \
+        and "assistant_db_seconds_count{helper=\"add_expense_with_totals\"}" in exposition
+    print("Metrics: instrumentation overhead")
+    print(f"  Histogram.observe        {observe_us:6.2f} µs   (timer block {timer_us:.2f} µs)")
+    print(f"  per DB helper call       {query_overhead:+6.2f} µs")
+    print(f"  /api/chat                {chat[False] / chats * 1000:6.3f} ms off, "
+          f"{chat[True] / chats * 1000:.3f} ms on  ({chat_overhead:+.1%})  "
+          f"{'✔' if chat_overhead < 0.05 else '✘'}")
+    print(f"  Server-Timing            {timing}")
+    print(f"  /metrics                 {len(exposition.splitlines())} lines  {'✔' if ok else '✘'}")
+    return ok
+
+
+def bench_profiling(calls: int = 200_000, chats: int = 30) -> bool:
+    import pstats
+    import sqlite3
+    os.environ["ASSISTANT_HEADLESS"] = "1"
+    from modules import database as db
+    from modules import profiling
+    from modules import scheduler
+
+    # Off: profile() is a flag check, connections are plain sqlite3 ones
+    start = time.perf_counter()
+    for _ in range(calls):
+        with profiling.profile("x"):
+            pass
+    off_ns = (time.perf_counter() - start) / calls * 1e9
+    plain_off = profiling.connection_factory is sqlite3.Connection
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "profiling.db")
+        db.init_db()
+        profiling.PROFILE_DIR   = os.path.join(tmp, "profiles")
+        profiling.MAX_FILES     = 20
+        profiling.FLUSH_SECONDS = 0.5
+        import app as web
+        web.SCHEDULER_LOCK = os.path.join(tmp, "scheduler.lock")
+        web.admission.CHAT_BURST = web.admission.CHAT_RATE = 10 ** 6
+        client = web.app.test_client()
+
+        status = client.post("/api/admin/profiling", environ_base={"REMOTE_ADDR": "127.0.0.1"},
+                             json={"enabled": True, "sample_rate": 1.0, "slow_query_ms": 0})
+        remote = client.post("/api/admin/profiling", environ_base={"REMOTE_ADDR": "10.0.0.9"},
+                             json={"enabled": False}).status_code
+        for i in range(chats):
+            client.post("/api/chat", json={"message": f"spent {i + 1} rupees on tea"})
+        fired = []
+        scheduler.start()
+        scheduler.call_later(0.05, lambda: fired.append(db.get_todays_expenses()),
+                             name="benchmark")
+        time.sleep(1.2)                                    # timer fires, sampler flushes
+        client.post("/api/admin/profiling", environ_base={"REMOTE_ADDR": "127.0.0.1"},
+                    json={"enabled": False})
+
+        files   = os.listdir(profiling.PROFILE_DIR)
+        chat    = sorted(f for f in files if "-chat-" in f)
+        timer   = [f for f in files if "timer-benchmark" in f]
+        folded  = [f for f in files if f.endswith(".folded")]
+        stats   = pstats.Stats(os.path.join(profiling.PROFILE_DIR, chat[-1])) if chat else None
+        handled = stats is not None and any(func[2] == "log_expense" for func in stats.stats)
+        stacks  = ""
+        for name in folded:
+            with open(os.path.join(profiling.PROFILE_DIR, name), encoding="utf-8") as f:
+                stacks += f.read()
+        with open(os.path.join(profiling.PROFILE_DIR, "slow-queries.log"), encoding="utf-8") as f:
+            slow = f.read().splitlines()
+        bounded = len([f for f in files if f.endswith((".prof", ".folded"))]) <= profiling.MAX_FILES
+        plain_again = profiling.connection_factory is sqlite3.Connection
+
+    ok = (off_ns < 500 and plain_off and status.status_code == 200 and remote == 403
+          and handled and timer and "Scheduler;" in stacks and bounded and plain_again
+          and any("INSERT INTO expenses" in line for line in slow))
+    print("Profiling")
+    print(f"  off: profile() block     {off_ns:6.0f} ns, plain sqlite3 connections  "
+          f"{'✔' if off_ns < 500 and plain_off else '✘'}")
+    print(f"  admin endpoint           local 200, remote {remote}  "
+          f"{'✔' if remote == 403 else '✘'}")
+    print(f"  per-request profiles     {len(chat)} kept of {chats} (cap {profiling.MAX_FILES}), "
+          f"handler visible  {'✔' if handled and bounded else '✘'}")
+    print(f"  timer callback profile   {'✔' if timer else '✘'}")
+    print(f"  stack samples            {len(folded)} .folded file(s), scheduler thread "
+          f"{'✔' if 'Scheduler;' in stacks else '✘'}")
+    print(f"  slow-query log           {len(slow)} statements  "
+          f"{'✔' if any('INSERT INTO expenses' in line for line in slow) else '✘'}")
+    return bool(ok)
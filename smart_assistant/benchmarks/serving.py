@@ -0,0 +1,435 @@
+"""
+benchmarks/serving.py
+=====================
+Serving: pre-forked workers, events / SSE, conditional GETs, admission
+control and the async server.
+"""
+
+import os
+import tempfile
+import time
+
+
+def bench_prefork(n_workers: int = 4, requests_per_worker: int = 20) -> bool:
+    import json
+    if not hasattr(os, "fork"):
+        print("Pre-fork benchmark needs os.fork – skipped.")
+        return True
+    os.environ["ASSISTANT_HEADLESS"] = "1"
+    import app as web
+    from modules import database as db
+    from modules import scheduler
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH, web.SCHEDULER_LOCK = os.path.join(tmp, "a.db"), os.path.join(tmp, "s.lock")
+        db.init_db()
+        db.add_study_session(25, 5, 1, int(time.time()) + 1500)   # restored by one worker
+
+        start = time.perf_counter()
+        web.init_app()                        # what wsgi.py does in the gunicorn master
+        warm  = time.perf_counter() - start
+
+        children = []
+        for _ in range(n_workers):
+            r, w = os.pipe()
+            pid  = os.fork()
+            if pid == 0:                      # worker: gunicorn's post_fork, then requests
+                os.close(r)
+                web.start_worker(shared=True)
+                client = web.app.test_client()
+                times  = []
+                for i in range(requests_per_worker):
+                    t = time.perf_counter()
+                    client.post("/api/chat", json={"message": f"what time is it {i}"})
+                    times.append(time.perf_counter() - t)
+                report = {"first": times[0], "median": sorted(times)[len(times) // 2],
+                          "owner": web._scheduler_lock is not None,
+                          "timers": scheduler.pending()}
+                os.write(w, json.dumps(report).encode())
+                os._exit(0)
+            os.close(w)
+            children.append((pid, r))
+
+        reports = []
+        for pid, r in children:
+            with os.fdopen(r) as fh:
+                data = fh.read()
+            os.waitpid(pid, 0)
+            reports.append(json.loads(data) if data else None)
+
+        conn = db.get_connection()
+        wal  = conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    ok     = all(reports)
+    owners = [r for r in reports if r and r["owner"]]
+    first  = max(r["first"] for r in reports if r) if ok else float("inf")
+    ok    &= len(owners) == 1 and owners[0]["timers"] == 1 and first < warm and wal
+    print(f"Pre-fork serving: {n_workers} forked workers × {requests_per_worker} chat requests")
+    print(f"  init_app() before fork      {warm * 1000:7.1f} ms (model + caches, paid once)")
+    print(f"  slowest first request       {first * 1000:7.1f} ms  {'✔ warm' if first < warm else '✘ cold'}")
+    medians = sorted(r["median"] for r in reports if r)
+    if medians:
+        print(f"  median request (worst)      {medians[-1] * 1000:7.1f} ms")
+    print(f"  workers running the timers  {len(owners)} of {n_workers}  "
+          f"{'✔' if len(owners) == 1 else '✘'}")
+    print(f"  database journal mode WAL   {'✔' if wal else '✘'}")
+    return ok
+
+
+def bench_events(n_clients: int = 100, n_events: int = 500) -> bool:
+    import json
+    import threading
+    os.environ["ASSISTANT_HEADLESS"] = "1"
+    from modules import database as db
+    from modules import events
+
+    # Fan-out: every client thread blocks on its queue, as an SSE stream does
+    events.MAX_SUBSCRIBERS = max(events.MAX_SUBSCRIBERS, n_clients + 2)
+    subs      = [events.subscribe() for _ in range(n_clients)]
+    latencies = []
+    received  = [0] * n_clients
+    lat_lock  = threading.Lock()
+
+    def client(i, sub):
+        while received[i] < n_events:
+            batch = sub.get(1.0)
+            now   = time.perf_counter()
+            received[i] += len(batch)
+            with lat_lock:
+                latencies.extend(now - e["data"]["sent"] for e in batch)
+
+    threads = [threading.Thread(target=client, args=(i, sub)) for i, sub in enumerate(subs)]
+    for t in threads:
+        t.start()
+    start = time.perf_counter()
+    for i in range(n_events):
+        events.publish("study", {"sent": time.perf_counter(), "n": i})
+        if i % 50 == 49:
+            time.sleep(0.005)                 # let clients drain, as real events are sparse
+    publish_us = (time.perf_counter() - start) / n_events * 1e6
+    for t in threads:
+        t.join(10)
+    for sub in subs:
+        events.unsubscribe(sub)
+    latencies.sort()
+    delivered = sum(received) == n_clients * n_events
+
+    # A client that never reads keeps at most MAX_QUEUED events
+    slow = events.subscribe()
+    for i in range(events.MAX_QUEUED * 3):
+        events.publish("study", {"n": i})
+    bounded = len(slow.queue) == events.MAX_QUEUED and slow.dropped == events.MAX_QUEUED * 2 \
+        and slow.queue[-1]["data"]["n"] == events.MAX_QUEUED * 3 - 1
+    events.unsubscribe(slow)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "events.db")
+        db.init_db()
+
+        # Cross-worker relay: a forked "worker" fires a reminder, we receive it
+        relayed, relay_ms = False, float("nan")
+        if hasattr(os, "fork"):
+            events.enable_relay()
+            sub = events.subscribe(["reminder"])
+            pid = os.fork()
+            if pid == 0:
+                events.enable_relay()
+                events.publish("reminder", {"message": "drink water", "sent": time.time()})
+                os._exit(0)
+            os.waitpid(pid, 0)
+            deadline = time.time() + 5
+            while time.time() < deadline and not relayed:
+                for e in sub.get(0.1):
+                    relayed  = e["data"]["message"] == "drink water"
+                    relay_ms = (time.time() - e["data"]["sent"]) * 1000
+            events.unsubscribe(sub)
+
+        # SSE endpoint end to end: reconnect with Last-Event-ID replays the gap
+        import app as web
+        web.SCHEDULER_LOCK = os.path.join(tmp, "scheduler.lock")
+        first = events.publish("reminder", {"message": "first"})
+        events.publish("reminder", {"message": "missed"})
+        client = web.app.test_client()
+        resp   = client.get("/api/events?topics=reminder",
+                            headers={"Last-Event-ID": str(first["id"])}, buffered=False)
+        chunks = resp.response
+        body   = next(chunks) + next(chunks)
+        resp.close()
+        sse_ok = resp.mimetype == "text/event-stream" and b'"missed"' in body \
+            and b'"first"' not in body and events.subscriber_count() == 0
+
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else float("nan")
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan")
+    print(f"Events: {n_clients} subscribers × {n_events} events")
+    print(f"  publish                 {publish_us:8.1f} µs/event (fan-out to {n_clients})")
+    print(f"  delivery latency        p50 {p50:.2f} ms  p99 {p99:.2f} ms  "
+          f"{'✔' if delivered else '✘ events lost'}")
+    print(f"  slow client queue       {events.MAX_QUEUED} kept, oldest dropped  "
+          f"{'✔' if bounded else '✘'}")
+    print(f"  relayed from a worker   {relay_ms:8.0f} ms  {'✔' if relayed else '✘'}")
+    print(f"  SSE replay after reconnect  {'✔' if sse_ok else '✘'}")
+    return delivered and bounded and relayed and sse_ok
+
+
+def bench_conditional_get(n_contacts: int = 5_000, n_memories: int = 2_000,
+                          requests: int = 300) -> bool:
+    os.environ["ASSISTANT_HEADLESS"] = "1"
+    from modules import database as db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "conditional.db")
+        db.init_db()
+        conn = db.get_connection()
+        conn.executemany("INSERT INTO contacts (name, phone) VALUES (?, ?)",
+                         [(f"contact {i}", f"+91 98{i:08d}") for i in range(n_contacts)])
+        conn.executemany("INSERT INTO memories (content) VALUES (?)",
+                         [(f"memory number {i} about something",) for i in range(n_memories)])
+        conn.commit()
+        conn.close()
+
+        import app as web
+        web.SCHEDULER_LOCK = os.path.join(tmp, "scheduler.lock")
+        client = web.app.test_client()
+        ok = True
+        print("Conditional GET: full response vs If-None-Match revalidation")
+        for path in ("/api/contacts", "/api/memories"):
+            etag = client.get(path).headers["ETag"]
+            start = time.perf_counter()
+            for _ in range(requests):
+                client.get(path, headers={"If-None-Match": "0"})
+            full = (time.perf_counter() - start) / requests
+            start = time.perf_counter()
+            for _ in range(requests):
+                status = client.get(path, headers={"If-None-Match": etag}).status_code
+            revalidate = (time.perf_counter() - start) / requests
+            fast = status == 304 and revalidate * 5 < full
+            ok &= fast
+            print(f"  {path:15s} 200 {full * 1000:7.2f} ms   304 {revalidate * 1000:6.2f} ms  "
+                  f"({full / revalidate:.0f}×)  {'✔' if fast else '✘'}")
+
+        # A write from another process (a second worker) invalidates the tag
+        stale = True
+        if hasattr(os, "fork"):
+            etag = client.get("/api/contacts").headers["ETag"]
+            pid = os.fork()
+            if pid == 0:
+                db.add_contact("someone new", "+91 9000000000")
+                os._exit(0)
+            os.waitpid(pid, 0)
+            stale = client.get("/api/contacts", headers={"If-None-Match": etag}).status_code == 200
+        print(f"  write in another worker → 200  {'✔' if stale else '✘'}")
+    return ok and stale
+
+
+def bench_admission(n_slow: int = 60, slow_seconds: float = 0.3, n_cheap: int = 40) -> bool:
+    import http.client
+    import json
+    import threading
+    os.environ["ASSISTANT_HEADLESS"] = "1"
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from modules import admission
+    from modules import database as db
+    from modules import intents
+    from modules import web_search as ws
+
+    active, peak, peak_lock = [0], [0], threading.Lock()
+
+    class SlowProvider(ws.SearchProvider):
+        """A search backend that takes `slow_seconds` per query."""
+        name, cacheable = "slow", False
+
+        def search(self, query, limit=ws.MAX_RESULTS):
+            with peak_lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(slow_seconds)
+            with peak_lock:
+                active[0] -= 1
+            return {"answer": "an answer", "results": []}
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args):
+            pass
+
+    def chat(message: str) -> tuple[int, float, str | None]:
+        conn  = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        start = time.perf_counter()
+        conn.request("POST", "/api/chat", json.dumps({"message": message}),
+                     {"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        resp.read()
+        conn.close()
+        return resp.status, time.perf_counter() - start, resp.getheader("Retry-After")
+
+    def flood(with_cheap: bool) -> tuple[list, list]:
+        """n_slow concurrent searches; tell_time latencies measured meanwhile."""
+        peak[0], results = 0, []
+        threads = [threading.Thread(target=lambda i=i: results.append(
+            chat(f"search for topic number {i}"))) for i in range(n_slow)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        cheap = sorted(chat("what time is it")[1] for _ in range(n_cheap)) if with_cheap else []
+        for t in threads:
+            t.join()
+        return results, cheap
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "admission.db")
+        db.init_db()
+        import app as web
+        web.SCHEDULER_LOCK = os.path.join(tmp, "scheduler.lock")
+        ws.set_provider(SlowProvider())
+        server = make_server("127.0.0.1", 0, web.app, threaded=True,
+                             request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_port
+
+        # All load comes from one address here, so lift the per-client rate
+        # limit while measuring the other gates
+        admission.CHAT_BURST, admission.CHAT_RATE = 10 ** 6, 10 ** 6
+        idle = sorted(chat("what time is it")[1] for _ in range(n_cheap))
+
+        # Per-intent cap: at most search_google's registry limit of searches run
+        capped, _ = flood(False)
+        intent_peak = peak[0]
+
+        # Work queue: with the cap lifted, MAX_IN_FLIGHT run, MAX_WAITING queue
+        search = intents.get("search_google")
+        cap, search.limit = search.limit, None
+        queued, loaded = flood(True)
+        queue_peak = peak[0]
+        search.limit = cap
+
+        # Rate limit: a client bursting past CHAT_BURST is refused at once
+        admission.CHAT_BURST, admission.CHAT_RATE = 20, 5.0
+        admission._buckets.clear()
+        burst = [chat("hello") for _ in range(30)]
+        server.shutdown()
+        ws.set_provider(None)
+
+    stats = admission.stats()
+    p50   = lambda times: times[len(times) // 2] * 1000
+    p95   = lambda times: times[int(len(times) * 0.95)] * 1000
+
+    def refused_fast(results) -> bool:
+        refused = [r for r in results if r[0] == 429]
+        return bool(refused) and all(r[2] for r in refused) \
+            and max(r[1] for r in refused) < admission.QUEUE_TIMEOUT + 0.5
+
+    ok_cap   = intent_peak <= cap and refused_fast(capped)
+    ok_queue = queue_peak <= admission.MAX_IN_FLIGHT and refused_fast(queued)
+    flat     = p95(loaded) < 50
+    allowed  = sum(1 for r in burst if r[0] == 200)
+    limited  = allowed == 20 and burst[-1][0] == 429 and burst[-1][2] is not None
+    served   = lambda results: sum(1 for r in results if r[0] == 200)
+
+    print(f"Admission: {n_slow} concurrent slow searches ({slow_seconds * 1000:.0f} ms each)")
+    print(f"  intent cap {cap}            served {served(capped):2d}, refused {n_slow - served(capped)}, "
+          f"peak work {intent_peak}  {'✔' if ok_cap else '✘'}")
+    print(f"  work queue {admission.MAX_IN_FLIGHT}+{admission.MAX_WAITING}          "
+          f"served {served(queued):2d}, refused {n_slow - served(queued)}, "
+          f"peak work {queue_peak}  {'✔' if ok_queue else '✘'}")
+    print(f"  tell_time idle          p50 {p50(idle):6.2f} ms  p95 {p95(idle):6.2f} ms")
+    print(f"  tell_time under load    p50 {p50(loaded):6.2f} ms  p95 {p95(loaded):6.2f} ms  "
+          f"{'✔' if flat else '✘'}")
+    print(f"  per-client burst        {allowed} of 30 allowed, then 429 "
+          f"Retry-After {burst[-1][2]}s  {'✔' if limited else '✘'}")
+    print(f"  counters: queue peak {stats['queue_peak']}, avg wait {stats['avg_wait_ms']} ms, "
+          f"rejected intent {sum(stats['rejected_intent'].values())} / "
+          f"queue {stats['rejected_queue']} / timeout {stats['rejected_timeout']} / "
+          f"rate {stats['rejected_rate']}")
+    return ok_cap and ok_queue and flat and limited
+
+
+def bench_asgi(n_streams: int = 2_000, n_chats: int = 200) -> bool:
+    import asyncio
+    import json
+    import resource
+    import threading
+    os.environ["ASSISTANT_HEADLESS"] = "1"
+    try:
+        import uvicorn
+        import asgi
+    except ImportError as e:
+        print(f"ASGI benchmark skipped: {e.name} is not installed (pip install quart uvicorn)")
+        return True
+    from modules import admission
+    from modules import database as db
+    from modules import events
+
+    admission.CHAT_BURST, admission.CHAT_RATE = 10 ** 6, 10 ** 6     # one client address here
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < 2 * n_streams + 256:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, 2 * n_streams + 256), hard))
+
+    async def open_stream(port: int):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /api/events?topics=reminder HTTP/1.1\r\nHost: x\r\n\r\n")
+        await reader.readuntil(b"retry:")
+        return reader, writer
+
+    async def chat(port: int, message: str) -> float:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body  = json.dumps({"message": message}).encode()
+        start = time.perf_counter()
+        writer.write(b"POST /api/chat HTTP/1.1\r\nHost: x\r\nContent-Type: application/json\r\n"
+                     b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body))
+        reply   = await reader.read()
+        elapsed = time.perf_counter() - start
+        writer.close()
+        if not reply.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(f"chat failed: {reply[:80]!r}")
+        return elapsed
+
+    async def client(port: int) -> dict:
+        idle = sorted([await chat(port, "what time is it") for _ in range(n_chats)])
+        start   = time.perf_counter()
+        streams = await asyncio.gather(*(open_stream(port) for _ in range(n_streams)))
+        connect = time.perf_counter() - start
+        threads = threading.active_count()
+        loaded  = sorted([await chat(port, "what time is it") for _ in range(n_chats)])
+        logged  = await chat(port, "remember that the spare key is under the mat")
+
+        # One reminder reaches every open stream
+        start = time.perf_counter()
+        events.publish("reminder", {"message": "stand up"})
+        received = await asyncio.gather(*(reader.readuntil(b"stand up") for reader, _ in streams))
+        fan_out  = time.perf_counter() - start
+        for _, writer in streams:
+            writer.close()
+        await asyncio.sleep(0.5)
+        return {"idle": idle, "loaded": loaded, "connect": connect, "threads": threads,
+                "delivered": len(received), "fan_out": fan_out, "logged": logged,
+                "left": events.subscriber_count()}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "asgi.db")
+        asgi.web.SCHEDULER_LOCK = os.path.join(tmp, "scheduler.lock")
+        server = uvicorn.Server(uvicorn.Config(asgi.app, host="127.0.0.1", port=0,
+                                               log_level="warning", backlog=4096))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        result = asyncio.run(client(port))
+        memories = len(db.get_all_memories())
+        server.should_exit = True
+
+    p50 = lambda times: times[len(times) // 2] * 1000
+    p95 = lambda times: times[int(len(times) * 0.95)] * 1000
+    cheap    = p95(result["loaded"]) < 20
+    streams  = result["delivered"] == n_streams and result["left"] == 0
+    few      = result["threads"] < 40
+    print(f"ASGI: {n_streams} idle SSE streams on one process")
+    print(f"  streams opened          {result['connect'] * 1000:8.0f} ms, "
+          f"{result['threads']} threads in the process  {'✔' if few else '✘'}")
+    print(f"  reminder fan-out        {result['fan_out'] * 1000:8.0f} ms to {result['delivered']} "
+          f"streams, {result['left']} left after close  {'✔' if streams else '✘'}")
+    print(f"  tell_time idle          p50 {p50(result['idle']):6.2f} ms  p95 {p95(result['idle']):6.2f} ms")
+    print(f"  tell_time, streams open p50 {p50(result['loaded']):6.2f} ms  "
+          f"p95 {p95(result['loaded']):6.2f} ms  {'✔' if cheap else '✘'}")
+    print(f"  store_memory (DB pool)  {result['logged'] * 1000:8.2f} ms  "
+          f"{'✔' if memories == 1 else '✘'}")
+    return cheap and streams and few and memories == 1
@@ -0,0 +1,44 @@
+"""
+benchmarks/startup.py
+=====================
+Start-up cost: cold import of the entry points against IMPORT_BUDGETS.
+"""
+
+import subprocess
+import sys
+import time
+
+from benchmarks import ROOT
+
+
+# Seconds of cold-import time allowed per entry point (on top of bare
+# interpreter start-up).  app.py pays for Flask; neither may touch audio
+# drivers, numpy or scikit-learn at import.
+IMPORT_BUDGETS = {
+    "main": 0.15,
+    "app":  0.40,
+}
+
+
+def _cold_import_seconds(module: str, runs: int) -> float:
+    """Best-of-N wall time of `python -c "import module"` in a fresh process."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}" if module else "pass"],
+                       cwd=ROOT, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_import_time(runs: int = 5) -> bool:
+    baseline = _cold_import_seconds("", runs)
+    print(f"Interpreter start-up: {baseline * 1000:.0f} ms")
+    ok = True
+    for module, budget in IMPORT_BUDGETS.items():
+        cost   = _cold_import_seconds(module, runs) - baseline
+        within = cost <= budget
+        ok    &= within
+        print(f"  import {module:<5} {cost * 1000:6.0f} ms  "
+              f"(budget {budget * 1000:.0f} ms)  {'✔' if within else '✘ over budget'}")
+    return ok
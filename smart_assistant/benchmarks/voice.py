@@ -0,0 +1,45 @@
+"""
+benchmarks/voice.py
+===================
+Voice input: the continuous listener on synthetic WAV recordings.
+"""
+
+import os
+import tempfile
+import time
+import wave
+
+from tests.audio_fixtures import write_wav
+
+
+def bench_listener() -> bool:
+    """Every phrase in a recorded file must come out as exactly one utterance."""
+    from modules import listener
+
+    transcripts = ["what time is it", "open chrome", "remind me to stretch in 5 minutes"]
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "commands.wav")
+        write_wav(wav_path, [0.6, 0.4, 1.5])
+        with open(os.path.join(tmp, "commands.txt"), "w", encoding="utf-8") as fh:
+            fh.write("\n".join(transcripts))
+
+        recognizer = listener.FixtureRecognizer.from_wav(wav_path)
+        source     = listener.WavFileSource(wav_path)
+        start      = time.perf_counter()
+        lst        = listener.Listener(source, recognizer).start()
+        lst.finished.wait(timeout=30)
+        elapsed    = time.perf_counter() - start
+
+        got = []
+        while (text := lst.get(timeout=0)) is not None:
+            got.append(text)
+        with wave.open(wav_path, "rb") as wav:
+            audio_seconds = wav.getnframes() / wav.getframerate()
+
+    ok = got == transcripts
+    print(f"Listener: {len(recognizer.segments)} segment(s) from {audio_seconds:.1f}s of audio "
+          f"in {elapsed * 1000:.0f} ms ({audio_seconds / elapsed:.0f}x real time)")
+    for seg in recognizer.segments:
+        print(f"  {seg.started:5.2f}s  +{seg.duration:.2f}s")
+    print(f"  utterances {got}  {'✔' if ok else '✘ expected ' + repr(transcripts)}")
+    return ok
@@ -0,0 +1,111 @@
+"""
+benchmarks/web_search.py
+========================
+Web search: pooled HTTP requests and the result cache, against a local stub.
+"""
+
+import tempfile
+import time
+
+
+def _start_search_stub(delay: float):
+    """Local SearxNG-like JSON endpoint; counts connections and requests."""
+    import json
+    import threading
+    import urllib.parse
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    stats = {"connections": 0, "requests": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"          # keep-alive
+        disable_nagle_algorithm = True         # headers + body are separate writes
+
+        def setup(self):
+            stats["connections"] += 1
+            super().setup()
+
+        def do_GET(self):
+            stats["requests"] += 1
+            time.sleep(delay)
+            query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)["q"][0]
+            body  = json.dumps({"results": [
+                {"title": f"{query} result {i}", "url": f"https://example.org/{i}",
+                 "content": f"{query.capitalize()} is explained here. More detail follows."}
+                for i in range(5)]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def bench_web_search(n_queries: int = 300, delay: float = 0.002) -> bool:
+    import http.client
+    import urllib.parse
+    from modules import web_search as ws
+    from modules.disk_cache import DiskCache
+
+    server, stats = _start_search_stub(delay)
+    endpoint = f"http://127.0.0.1:{server.server_port}/search"
+    queries  = [f"topic number {i}" for i in range(n_queries)]
+    saved    = ws._cache
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            ws._cache = DiskCache(tmp, ws.SEARCH_CACHE_MAX_BYTES, ttl=ws.SEARCH_CACHE_TTL,
+                                  suffix=".json")
+
+            # Old style: a fresh connection per search
+            start = time.perf_counter()
+            for q in queries:
+                conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+                conn.request("GET", "/search?" + urllib.parse.urlencode({"q": q, "format": "json"}),
+                             headers={"Connection": "close"})
+                conn.getresponse().read()
+                conn.close()
+            fresh = (time.perf_counter() - start) / n_queries
+            stats["connections"] = stats["requests"] = 0
+
+            provider = ws.HttpSearchProvider(endpoint)
+            start = time.perf_counter()
+            for q in queries:
+                provider.search(q)
+            pooled = (time.perf_counter() - start) / n_queries
+
+            # Through the cache: first round fills it over the same connection
+            ws.set_provider(provider)
+            start = time.perf_counter()
+            for q in queries:
+                ws.search(q)
+            filled = (time.perf_counter() - start) / n_queries
+            conns, reqs = stats["connections"], stats["requests"]
+
+            # Same queries again, phrased differently: all from the cache
+            start = time.perf_counter()
+            found = [ws.search(q.upper() + "?") for q in queries]
+            cached = (time.perf_counter() - start) / n_queries
+            no_network = stats["requests"] == reqs and all(f["cached"] for f in found)
+            reply = ws.format_answer(found[0])
+            ok = conns == 1 and reqs == 2 * n_queries and no_network and \
+                reply.startswith("Here's what I found") and "https://example.org/0" in reply
+            provider.close()
+    finally:
+        ws.set_provider(None)
+        ws._cache = saved
+        server.shutdown()
+
+    print(f"Web search: {n_queries} queries against a local stub ({delay * 1000:.0f} ms per request)")
+    print(f"  new connection each   {fresh * 1000:7.2f} ms/query")
+    print(f"  pooled keep-alive     {pooled * 1000:7.2f} ms/query  ({conns} connection(s) for "
+          f"{reqs} requests)  {'✔' if conns == 1 else '✘'}")
+    print(f"  first search (cached) {filled * 1000:7.2f} ms/query  (fetch + cache write)")
+    print(f"  repeated (cached)     {cached * 1000:7.2f} ms/query  "
+          f"{'✔ no network' if no_network else '✘ went to the network'}")
+    return ok
@@ -0,0 +1,338 @@
+"""
+data/augment.py
+================
+Templated paraphrase generator for the intent classifier.
+
+Every intent has a handful of sentence templates with slots such as
+{app}, {time}, {amount} or {contact}.  Filling the slots (plus optional
+polite prefixes/suffixes) yields a very large space of distinct examples,
+which are streamed to a JSONL file one {"text": ..., "intent": ...}
+object per line.
+
+Usage:
+    python -m data.augment --count 200000 --out data/generated_training_data.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Iterator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.training_data import TRAINING_DATA
+from modules.app_launcher import APP_COMMANDS
+from modules.expense_tracker import CATEGORY_KEYWORDS
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "generated_training_data.jsonl")
+
+# ── Slot values ────────────────────────────────────────────────────────────────
+APPS = sorted(set(APP_COMMANDS) | {
+    "code", "vs code", "slack", "zoom", "discord", "steam", "telegram",
+    "whatsapp", "outlook", "teams", "music player", "file manager", "settings",
+    "camera", "photos", "calendar", "mail", "browser", "editor",
+})
+
+CONTACTS = [
+    "mom", "mum", "dad", "sister", "brother", "grandma", "grandpa", "uncle",
+    "aunt", "john", "priya", "rahul", "anita", "alex", "sam", "maria", "david",
+    "sarah", "arjun", "neha", "best friend", "my boss", "the doctor", "jon",
+    "vikram", "meera", "chris", "emma", "liam", "olivia",
+]
+
+TASKS = [
+    "drink water", "call mom", "take medicine", "go to the gym", "pay rent",
+    "submit the assignment", "feed the cat", "water the plants", "buy milk",
+    "join the meeting", "check email", "stretch", "walk the dog", "pick up kids",
+    "book tickets", "study for the exam", "send the report", "charge my phone",
+    "take a break", "call the bank", "renew insurance", "pay the electricity bill",
+    "clean the room", "attend the lecture", "start cooking", "meditate",
+    "review the notes", "backup my laptop", "order groceries", "call dad",
+]
+
+QUERIES = [
+    "python tutorials", "machine learning", "weather today", "black holes",
+    "how to cook pasta", "artificial intelligence news", "best laptops 2024",
+    "cricket score", "stock market today", "nearest hospital", "flight status",
+    "quantum computing", "healthy breakfast ideas", "how to tie a tie",
+    "history of rome", "learn guitar", "data structures", "movie reviews",
+    "electric cars", "yoga for beginners", "javascript closures", "sql joins",
+    "train timings", "exchange rate", "recipe for biryani", "space exploration",
+    "photosynthesis", "world cup results", "how to sleep better", "budget travel tips",
+]
+
+FACTS = [
+    "my dog's name is max", "my anniversary is on june 10", "i prefer dark mode",
+    "my locker code is 4521", "i am allergic to nuts", "my gym is at 7 am",
+    "the wifi password is on the fridge", "my car is parked on level 2",
+    "i parked near gate 4", "my passport expires in march", "i like green tea",
+    "the meeting room is on floor 3", "my bike lock code is 908",
+    "mom's birthday is on may 5", "the spare key is under the mat",
+    "i lent my book to rahul", "my blood group is o positive",
+    "the plumber's name is ravi", "i take vitamins after lunch",
+]
+
+CATEGORY_WORDS = sorted({kw for kws in CATEGORY_KEYWORDS.values() for kw in kws})
+CURRENCIES = ["", " rupees", " rs", " dollars", " bucks", " inr"]
+
+_PREFIXES = ["", "", "", "please ", "can you ", "could you ", "hey assistant ",
+             "hey ", "ok ", "i want you to "]
+_SUFFIXES = ["", "", "", " please", " now", " for me", " thanks"]
+
+# ── Templates per intent ───────────────────────────────────────────────────────
+# Intents whose phrasing doesn't take polite prefixes (e.g. "please hello")
+_NO_PREFIX = {"greeting", "exit"}
+
+TEMPLATES: dict[str, list[str]] = {
+    "greeting": [
+        "hello", "hi", "hey", "hi there", "hello there", "hey assistant",
+        "good morning", "good afternoon", "good evening", "howdy", "what's up",
+        "greetings", "yo", "hello assistant", "hi {contact_word}",
+    ],
+    "open_app": [
+        "open {app}", "launch {app}", "start {app}", "run {app}",
+        "open the {app} app", "launch the {app} application",
+        "fire up {app}", "bring up {app}", "i need {app} open",
+    ],
+    "list_apps": [
+        "what apps are running", "list running apps", "show open applications",
+        "which apps did you open", "what programs are open", "list open apps",
+        "show running programs", "what have you opened", "is {app} still running",
+        "which apps are still open",
+    ],
+    "close_app": [
+        "close {app}", "quit {app}", "kill {app}", "exit {app}", "stop {app}",
+        "close the {app} app", "shut down {app}", "terminate {app}",
+        "close the {app} window", "close all apps", "close everything you opened",
+        "quit all the apps",
+    ],
+    "search_google": [
+        "search for {query}", "google {query}", "look up {query}",
+        "search {query}", "find information about {query}",
+        "search the web for {query}", "look for {query} online",
+        "what does google say about {query}",
+    ],
+    "tell_time": [
+        "what time is it", "tell me the current time", "what's the time now",
+        "current time", "what is today's date", "tell me today's date",
+        "what day is it", "what's the date today", "time check", "do you know the time",
+    ],
+    "set_reminder": [
+        "remind me to {task} at {time}", "set a reminder for {task} at {time}",
+        "remind me about {task} at {time}", "set reminder {task} at {time}",
+        "at {time} remind me to {task}", "set a reminder to {task} at {time}",
+        "remind me at {time} to {task}", "don't let me forget to {task} at {time}",
+        "remind me to {task} {when}", "set a reminder to {task} {when}",
+        "{when} remind me to {task}",
+    ],
+    "daily_summary": [
+        "give me my daily summary", "what do i have today",
+        "show my reminders and expenses", "summary for today",
+        "daily briefing", "brief me on today", "what's on my plate today",
+        "how does my day look", "today's overview",
+    ],
+    "study_mode": [
+        "start study mode", "begin pomodoro timer", "start a focus session",
+        "i want to study now", "activate study mode", "start pomodoro",
+        "start a pomodoro", "focus mode on", "begin a study session",
+        "help me focus", "start a {minutes} minute pomodoro",
+        "study for {minutes} minutes", "start a pomodoro with {minutes} minute breaks",
+        "start study mode for {minutes} cycles", "pause study mode",
+        "pause my pomodoro", "hold the focus session", "resume study mode",
+        "continue my pomodoro", "unpause study mode", "stop study mode",
+        "cancel the pomodoro", "end my study session", "study session status",
+        "how much time is left in my pomodoro", "how long until my break",
+    ],
+    "log_expense": [
+        "i spent {amount} on {category}", "log expense {amount} for {category}",
+        "add expense {amount} for {category}", "i paid {amount} for {category}",
+        "spent {amount} on {category} today", "record expense {amount} {category}",
+        "i bought {category} for {amount}", "{category} cost me {amount}",
+        "log {amount} for {category}",
+    ],
+    "store_memory": [
+        "remember that {fact}", "save this {fact}", "note that {fact}",
+        "remember {fact}", "store {fact}", "keep in mind that {fact}",
+        "make a note that {fact}", "don't forget that {fact}",
+    ],
+    "add_contact": [
+        "add contact {contact} {phone}", "save contact {contact} {phone}",
+        "remember contact {contact} {phone}", "add my contact {contact} {phone}",
+        "save {contact}'s number {phone}", "add {contact} to contacts {phone}",
+    ],
+    "view_contact": [
+        "what's {contact}'s number", "call {contact}", "show me {contact}'s contact",
+        "what's the number for {contact}", "get {contact}'s phone number",
+        "dial {contact}", "phone {contact}", "how do i reach {contact}",
+    ],
+    "list_contacts": [
+        "show my contacts", "who do i have in contacts", "list all contacts",
+        "show contacts", "list my contacts", "display my phone book",
+        "who is in my contact list",
+    ],
+    "delete_contact": [
+        "delete contact {contact}", "remove {contact} from contacts",
+        "forget contact {contact}", "delete {contact} from contacts",
+        "remove contact {contact}", "erase {contact}'s number",
+    ],
+    "exit": [
+        "exit", "quit", "bye", "goodbye", "stop the assistant", "shut down",
+        "see you later", "bye bye", "that's all", "close the assistant",
+        "good night", "i'm done",
+    ],
+}
+
+
+# ── Slot fillers ───────────────────────────────────────────────────────────────
+
+def _random_time(rng: random.Random) -> str:
+    hour = rng.randint(1, 12)
+    style = rng.randrange(4)
+    if style == 0:
+        return f"{hour} {rng.choice(['am', 'pm'])}"
+    if style == 1:
+        return f"{hour}:{rng.choice(['00', '15', '30', '45'])} {rng.choice(['am', 'pm'])}"
+    if style == 2:
+        return f"{rng.randint(0, 23):02d}:{rng.choice(['00', '10', '20', '30', '40', '50'])}"
+    return str(hour)
+
+
+def _random_when(rng: random.Random) -> str:
+    """Dates, relative times and recurrence phrases for reminders."""
+    style = rng.randrange(6)
+    if style == 0:
+        return f"{rng.choice(['today', 'tomorrow', 'day after tomorrow'])} at {_random_time(rng)}"
+    if style == 1:
+        day = rng.choice(["monday", "tuesday", "wednesday", "thursday", "friday",
+                          "saturday", "sunday"])
+        return f"{rng.choice(['on', 'next'])} {day} at {_random_time(rng)}"
+    if style == 2:
+        month = rng.choice(["january", "march", "june", "august", "october", "december"])
+        return f"on {rng.randint(1, 28)} {month}"
+    if style == 3:
+        return f"in {rng.randint(2, 59)} {rng.choice(['minutes', 'hours'])}"
+    if style == 4:
+        return f"{rng.choice(['every day', 'daily', 'every weekday'])} at {_random_time(rng)}"
+    return f"every {rng.randint(2, 6)} hours"
+
+
+def _random_amount(rng: random.Random) -> str:
+    if rng.random() < 0.2:
+        value = f"{rng.randint(1, 2000)}.{rng.randint(0, 99):02d}"
+    else:
+        value = str(rng.choice([rng.randint(10, 500), rng.randint(100, 20000)]))
+    return value + rng.choice(CURRENCIES)
+
+
+def _random_phone(rng: random.Random) -> str:
+    digits = "".join(str(rng.randint(0, 9)) for _ in range(9))
+    return str(rng.randint(6, 9)) + digits
+
+
+_SLOT_FILLERS = {
+    "app":          lambda rng: rng.choice(APPS),
+    "time":         _random_time,
+    "when":         _random_when,
+    "amount":       _random_amount,
+    "contact":      lambda rng: rng.choice(CONTACTS),
+    "contact_word": lambda rng: rng.choice(["there", "buddy", "friend", "assistant"]),
+    "phone":        _random_phone,
+    "task":         lambda rng: rng.choice(TASKS),
+    "query":        lambda rng: rng.choice(QUERIES),
+    "fact":         lambda rng: rng.choice(FACTS),
+    "category":     lambda rng: rng.choice(CATEGORY_WORDS),
+    "minutes":      lambda rng: str(rng.choice([2, 3, 4, 5, 10, 15, 20, 25, 30, 45, 50, 60])),
+}
+
+
+def _render(template: str, rng: random.Random) -> str:
+    """Fill every {slot} in the template with a random value."""
+    slots = {name: filler(rng) for name, filler in _SLOT_FILLERS.items()
+             if "{" + name + "}" in template}
+    return template.format(**slots)
+
+
+# ── Public API ─────────────────────────────────────────────────────────────────
+
+def generate_examples(count: int, seed: int = 42,
+                      include_seed_data: bool = True) -> Iterator[tuple[str, str]]:
+    """
+    Yield up to `count` unique (sentence, intent) pairs.
+
+    Intents are visited round-robin so the output stays balanced.  An intent
+    whose template space is exhausted (too many duplicate draws in a row) is
+    dropped from the rotation; generation stops early if every intent is
+    exhausted.  Only a 64-bit hash of each emitted pair is kept for
+    de-duplication, so memory grows slowly with `count`.
+    """
+    rng      = random.Random(seed)
+    seen     = set()
+    produced = 0
+
+    if include_seed_data:
+        for text, intent in TRAINING_DATA:
+            key = hash((text.lower(), intent))
+            if key not in seen and produced < count:
+                seen.add(key)
+                produced += 1
+                yield text.lower(), intent
+
+    misses  = {intent: 0 for intent in TEMPLATES}
+    active  = list(TEMPLATES)
+    max_misses = 200
+
+    while produced < count and active:
+        for intent in list(active):
+            template = rng.choice(TEMPLATES[intent])
+            text     = _render(template, rng)
+            if intent not in _NO_PREFIX:
+                text = rng.choice(_PREFIXES) + text + rng.choice(_SUFFIXES)
+
+            key = hash((text, intent))
+            if key in seen:
+                misses[intent] += 1
+                if misses[intent] >= max_misses:
+                    active.remove(intent)
+                continue
+
+            misses[intent] = 0
+            seen.add(key)
+            produced += 1
+            yield text, intent
+            if produced >= count:
+                break
+
+
+def write_jsonl(path: str, count: int, seed: int = 42) -> int:
+    """Stream generated examples to a JSONL file; returns the number written."""
+    written = 0
+    with open(path, "w", encoding="utf-8") as fh:
+        for text, intent in generate_examples(count, seed=seed):
+            fh.write(json.dumps({"text": text, "intent": intent}) + "\n")
+            written += 1
+    return written
+
+
+def iter_jsonl(path: str) -> Iterator[tuple[str, str]]:
+    """Yield (text, intent) pairs from a JSONL file without loading it whole."""
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                row = json.loads(line)
+                yield row["text"], row["intent"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate augmented training data.")
+    parser.add_argument("--count", type=int, default=200_000,
+                        help="maximum number of unique examples to emit")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="output JSONL path")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    n = write_jsonl(args.out, args.count, seed=args.seed)
+    print(f"✔  Wrote {n} unique examples → {args.out}")
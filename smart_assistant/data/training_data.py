@@ -25,6 +25,21 @@ TRAINING_DATA = [
     ("run paint", "open_app"),
     ("open terminal", "open_app"),
 
+    # --- list_apps ---
+    ("what apps are running", "list_apps"),
+    ("list running apps", "list_apps"),
+    ("show open applications", "list_apps"),
+    ("which apps did you open", "list_apps"),
+    ("what programs are open", "list_apps"),
+
+    # --- close_app ---
+    ("close chrome", "close_app"),
+    ("quit spotify", "close_app"),
+    ("kill vlc", "close_app"),
+    ("close the calculator app", "close_app"),
+    ("shut down firefox", "close_app"),
+    ("close all apps", "close_app"),
+
     # --- search_google ---
     ("search for python tutorials", "search_google"),
     ("google machine learning", "search_google"),
@@ -49,6 +64,10 @@ TRAINING_DATA = [
     ("set reminder exercise at 6 am", "set_reminder"),
     ("remind me about dentist appointment at 10 am", "set_reminder"),
     ("set a reminder to take medicine at 8 pm", "set_reminder"),
+    ("remind me to pay rent tomorrow at 9 am", "set_reminder"),
+    ("remind me to take vitamins every day at 8 am", "set_reminder"),
+    ("remind me to stand up every 2 hours", "set_reminder"),
+    ("remind me about the exam on 25 december", "set_reminder"),
 
     # --- daily_summary ---
     ("give me my daily summary", "daily_summary"),
@@ -64,6 +83,16 @@ TRAINING_DATA = [
     ("I want to study now", "study_mode"),
     ("activate study mode", "study_mode"),
     ("start pomodoro", "study_mode"),
+    ("start a 50 minute pomodoro with 10 minute breaks", "study_mode"),
+    ("study for 4 cycles", "study_mode"),
+    ("pause study mode", "study_mode"),
+    ("pause my pomodoro", "study_mode"),
+    ("resume study mode", "study_mode"),
+    ("continue the pomodoro", "study_mode"),
+    ("stop study mode", "study_mode"),
+    ("cancel the pomodoro", "study_mode"),
+    ("how much time is left in my study session", "study_mode"),
+    ("pomodoro status", "study_mode"),
 
     # --- log_expense ---
     ("I spent 50 dollars on food", "log_expense"),
@@ -114,6 +143,8 @@ TRAINING_DATA = [
     ("bye", "exit"),
     ("goodbye", "exit"),
     ("stop the assistant", "exit"),
+    ("close the assistant", "exit"),
+    ("quit the assistant", "exit"),
     ("shut down", "exit"),
     ("see you later", "exit"),
 ]
@@ -0,0 +1,30 @@
+"""
+gunicorn.conf.py
+================
+Production serving config for the web UI.  Run from this directory:
+
+    gunicorn
+
+The app is preloaded in the master (intent model, caches – see wsgi.py) and
+forked into one worker per CPU core; post_fork() then starts each worker's
+background work (scheduler).  Override with ASSISTANT_BIND,
+ASSISTANT_WORKERS and ASSISTANT_THREADS.
+"""
+
+import multiprocessing
+import os
+
+wsgi_app     = "wsgi:app"
+bind         = os.environ.get("ASSISTANT_BIND", "127.0.0.1:5000")
+workers      = int(os.environ.get("ASSISTANT_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads      = int(os.environ.get("ASSISTANT_THREADS", 16))  # a quarter may hold /api/events streams
+preload_app  = True
+timeout      = 30
+keepalive    = 5
+accesslog    = "-"
+
+
+def post_fork(server, worker):
+    from app import start_worker
+    start_worker(shared=server.cfg.workers > 1)
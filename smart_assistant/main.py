@@ -9,11 +9,12 @@ Flow
 2. Start the background reminder thread.
 3. Greet the user and ask for their name (if unknown).
 4. Loop: get input → classify intent → call handler → speak response.
+   Handlers come from the intent registry (modules/intents.py), shared
+   with the web server, and are imported the first time they are needed.
 """
 
 import sys
 import os
-from datetime import datetime
 
 # ── make sure the project root is on sys.path ─────────────────────────────────
 ROOT = os.path.dirname(os.path.abspath(__file__))
@@ -22,93 +23,25 @@ if ROOT not in sys.path:
 
 # ── imports ────────────────────────────────────────────────────────────────────
 from modules import database as db
+from modules                 import speech
 from modules.speech          import speak, get_input
-from modules.intent_classifier import predict, predict_with_confidence
-from modules.reminder        import set_reminder, start_reminder_thread
-from modules.study_mode      import start_study_mode
-from modules.expense_tracker import log_expense
-from modules.app_launcher    import open_app
-from modules.web_search      import search_google
+from modules                 import listener
+from modules                 import nlu
+from modules                 import intents
 
 
 # ── Confidence threshold ───────────────────────────────────────────────────────
 # If the classifier is less confident than this, we ask for clarification
 CONFIDENCE_THRESHOLD = 0.35
 
+# ── Fixed phrases ──────────────────────────────────────────────────────────────
+CLARIFY_MESSAGE  = "I'm not sure I understood that. Could you rephrase?"
+UNKNOWN_MESSAGE  = "I don't know how to handle that yet. Could you try rephrasing?"
+HELP_MESSAGE     = "Type (or say) 'help' for usage tips, or just tell me what you need!"
 
-# ── Intent handlers ────────────────────────────────────────────────────────────
-
-def handle_greeting(user_name: str | None) -> str:
-    hour = datetime.now().hour
-    if hour < 12:
-        time_greeting = "Good morning"
-    elif hour < 17:
-        time_greeting = "Good afternoon"
-    else:
-        time_greeting = "Good evening"
-
-    if user_name:
-        return f"{time_greeting}, {user_name}! How can I help you today?"
-    return f"{time_greeting}! How can I assist you?"
-
-
-def handle_tell_time() -> str:
-    now  = datetime.now()
-    time = now.strftime("%I:%M %p")
-    date = now.strftime("%A, %d %B %Y")
-    return f"The current time is {time} and today is {date}."
-
-
-def handle_daily_summary(user_name: str | None) -> str:
-    lines = []
-    if user_name:
-        lines.append(f"Here is your daily summary, {user_name}.")
-
-    # Reminders
-    reminders = db.get_todays_reminders()
-    if reminders:
-        lines.append(f"You have {len(reminders)} reminder(s):")
-        for r in reminders:
-            status = "✔ done" if r["notified"] else "⏳ pending"
-            lines.append(f"  • {r['message']} at {r['remind_at']} ({status})")
-    else:
-        lines.append("No reminders set for today.")
-
-    # Expenses
-    expenses = db.get_todays_expenses()
-    total    = db.get_total_expenses_today()
-    if expenses:
-        lines.append(f"Today's expenses total ₹{total:.2f} across "
-                     f"{len(expenses)} transaction(s).")
-    else:
-        lines.append("No expenses logged today.")
-
-    # Memories
-    memories = db.get_all_memories()
-    lines.append(f"You have {len(memories)} stored memory/memories.")
-
-    return "  ".join(lines)
-
-
-def handle_store_memory(user_text: str) -> str:
-    # Strip common leading phrases
-    for phrase in ["remember that", "save this", "note that", "store", "remember", "save"]:
-        if user_text.lower().startswith(phrase):
-            content = user_text[len(phrase):].strip(" :.")
-            break
-    else:
-        content = user_text
-
-    if content:
-        db.add_memory(content)
-        return f"Memory saved: \"{content}\"."
-    return "I didn't catch what to remember. Could you repeat that?"
-
-
-def handle_exit(user_name: str | None) -> str:
-    if user_name:
-        return f"Goodbye, {user_name}! Have a great day!"
-    return "Goodbye! Have a great day!"
+# Rendered into the TTS audio cache at start-up so they play instantly
+PREWARM_PHRASES = [CLARIFY_MESSAGE, UNKNOWN_MESSAGE, HELP_MESSAGE,
+                   "Goodbye! Have a great day!"]
 
 
 # ── Onboarding ─────────────────────────────────────────────────────────────────
@@ -147,69 +80,73 @@ def main():
     # Initialise database tables
     db.init_db()
 
+    # Handler modules are otherwise imported by the intent registry on first use
+    from modules.reminder        import start_reminder_thread
+    from modules.study_mode      import restore_sessions
+    from modules.expense_tracker import backfill_merchants
+    from modules.app_launcher    import build_index
+
     # Start background reminder checker
     start_reminder_thread()
 
+    # Index installed apps once so "open X" is a dict lookup
+    build_index()
+
+    # Parse merchants of expenses logged by older versions
+    backfill_merchants()
+
+    # Pick up Pomodoro sessions that were running before a restart
+    restore_sessions()
+
+    # Keep the microphone open instead of re-opening it every turn, deaf
+    # to the assistant's own voice
+    if use_voice and speech.voice_available():
+        listener.start_listening(muted=speech.is_speaking)
+
     # Onboard / greet
-    user_name = onboard(use_voice)
+    onboard(use_voice)
+
+    # Render fixed phrases in the background while the user types
+    speech.prewarm(PREWARM_PHRASES)
 
-    speak(f"Type (or say) 'help' for usage tips, or just tell me what you need!")
+    speak(HELP_MESSAGE)
 
     # ── Conversation loop ──────────────────────────────────────────────────────
     while True:
         try:
             user_text = get_input(use_voice)
         except KeyboardInterrupt:
-            speak(handle_exit(user_name))
+            speak(intents.dispatch("exit", "", {}), wait=True)
             break
 
         if not user_text:
             continue
 
-        # Classify intent
-        intent, confidence = predict_with_confidence(user_text)
+        # Single NLU pass: intent + slots
+        result = nlu.parse(user_text)
+        intent, confidence, slots = result["intent"], result["confidence"], result["slots"]
 
         if confidence < CONFIDENCE_THRESHOLD:
-            speak("I'm not sure I understood that. Could you rephrase?")
+            speak(CLARIFY_MESSAGE)
             continue
 
         # ── Route to handler ───────────────────────────────────────────────────
-        if intent == "greeting":
-            response = handle_greeting(user_name)
-
-        elif intent == "tell_time":
-            response = handle_tell_time()
-
-        elif intent == "open_app":
-            response = open_app(user_text)
-
-        elif intent == "search_google":
-            response = search_google(user_text)
-
-        elif intent == "set_reminder":
-            response = set_reminder(user_text)
-
-        elif intent == "daily_summary":
-            response = handle_daily_summary(user_name)
-
-        elif intent == "study_mode":
-            response = start_study_mode()
-
-        elif intent == "log_expense":
-            response = log_expense(user_text)
-
-        elif intent == "store_memory":
-            response = handle_store_memory(user_text)
+        spec = intents.get(intent)
+        if spec is None:
+            speak(UNKNOWN_MESSAGE)
+            continue
 
-        elif intent == "exit":
-            speak(handle_exit(user_name))
+        response = spec.handler(user_text, slots)
+        if spec.ends_session:
+            speak(response, wait=True)
             break
 
-        else:
-            response = "I don't know how to handle that yet. Could you try rephrasing?"
-
         speak(response)
 
+    stats = speech.cache_stats()
+    if stats["hits"] or stats["misses"]:
+        print(f"✔ TTS cache: {stats['hit_rate']:.0%} hit rate, "
+              f"{stats['saved_seconds']:.1f}s of synthesis saved.")
     print("\n✔ Assistant exited. Goodbye!\n")
 
 
@@ -0,0 +1,195 @@
+"""
+modules/admission.py
+=====================
+Admission control for /api/chat, so a burst of requests can't start an
+unbounded number of app launches, Pomodoro timers or SQLite writers.
+
+A chat request passes three gates, cheapest first:
+
+    1. rate      – a token bucket per client (CHAT_RATE requests/second,
+                   bursts of CHAT_BURST); an empty bucket is rejected at once
+    2. intent    – at most `limit` requests of one kind in flight
+                   (launching apps, starting timers, … – the limits live in
+                   the intent registry, modules/intents.py); at the cap the
+                   request is rejected at once
+    3. work slot – at most MAX_IN_FLIGHT requests do work at the same time;
+                   up to MAX_WAITING more wait for a slot (QUEUE_TIMEOUT
+                   seconds at most), anything beyond is rejected.  Both are
+                   shares of the threads not reserved for event streams
+                   (events.MAX_SUBSCRIBERS)
+
+Rejections become 429 responses with a Retry-After header.  Cheap intents
+(answered from memory without I/O – the time) skip gates 2 and 3, and the
+slot counts leave some of the server's threads free, so those answers stay
+fast while the queue is full.
+
+Every counter is per process (one gunicorn worker); stats() reports them.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from modules import events
+from modules import intents
+
+# Threads of a worker left once every allowed event stream holds one
+_WORK_THREADS = max(2, events.THREADS - events.MAX_SUBSCRIBERS)
+
+CHAT_RATE     = float(os.environ.get("ASSISTANT_CHAT_RATE", 5))    # requests/second per client
+CHAT_BURST    = int(os.environ.get("ASSISTANT_CHAT_BURST", 20))    # bucket size
+MAX_CLIENTS   = 4096                       # buckets kept, least recently seen evicted
+MAX_IN_FLIGHT = max(1, _WORK_THREADS // 2)   # requests doing work at once
+MAX_WAITING   = max(1, _WORK_THREADS // 4)   # requests queued for a work slot
+QUEUE_TIMEOUT = 2.0                        # seconds a queued request waits before a 429
+BUSY_RETRY_AFTER = 1                       # Retry-After (seconds) when saturated
+
+
+class Slot:
+    """A granted work slot; release() it when the request is done."""
+
+    __slots__ = ("intent", "released")
+
+    def __init__(self, intent: str):
+        self.intent   = intent
+        self.released = False
+
+    def release(self):
+        global _in_flight
+        with _cond:
+            if self.released:
+                return
+            self.released = True
+            _in_flight -= 1
+            _intent_in_flight[self.intent] -= 1
+            _cond.notify()
+
+
+_buckets: OrderedDict = OrderedDict()    # client → [tokens, last refill]
+_bucket_lock      = threading.Lock()
+_cond             = threading.Condition()
+_in_flight        = 0
+_waiting          = 0
+_intent_in_flight = Counter()
+_stats            = Counter()            # admitted, cheap, rejected_*, wait_seconds, queue_peak
+_rejected_intents = Counter()
+
+
+# ── Gate 1: per-client token bucket ────────────────────────────────────────────
+
+def take_token(client: str) -> float:
+    """
+    Spend one of `client`'s tokens.  Returns 0.0 when the request may
+    proceed, else the seconds until a token will be available.
+    """
+    now = time.monotonic()
+    with _bucket_lock:
+        bucket = _buckets.get(client)
+        if bucket is None:
+            bucket = _buckets[client] = [float(CHAT_BURST), now]
+            if len(_buckets) > MAX_CLIENTS:
+                _buckets.popitem(last=False)
+        else:
+            _buckets.move_to_end(client)
+            bucket[0] = min(CHAT_BURST, bucket[0] + (now - bucket[1]) * CHAT_RATE)
+            bucket[1] = now
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return 0.0
+        wait = (1.0 - bucket[0]) / CHAT_RATE
+    with _cond:
+        _stats["rejected_rate"] += 1
+    return wait
+
+
+def retry_after(seconds: float) -> str:
+    """Retry-After header value (whole seconds, at least 1)."""
+    return str(max(1, math.ceil(seconds)))
+
+
+# ── Gates 2 + 3: per-intent cap and bounded work queue ─────────────────────────
+
+def acquire(intent: str, timeout: float = QUEUE_TIMEOUT, shared: bool = True) -> Slot | None:
+    """
+    A work slot for a request of `intent`, waiting up to `timeout` seconds
+    in the queue.  None when the intent is at its cap, the queue is full
+    or the wait timed out.  With shared=False only the intent cap applies
+    (for callers that bound their work themselves, e.g. asgi.py's executors).
+    """
+    global _in_flight, _waiting
+    spec  = intents.get(intent)
+    limit = spec.limit if spec is not None else None
+    with _cond:
+        if limit is not None and _intent_in_flight[intent] >= limit:
+            _stats["rejected_intent"] += 1
+            _rejected_intents[intent] += 1
+            return None
+        if shared and _in_flight >= MAX_IN_FLIGHT:
+            if _waiting >= MAX_WAITING:
+                _stats["rejected_queue"] += 1
+                return None
+            _waiting += 1
+            _stats["queue_peak"] = max(_stats["queue_peak"], _waiting)
+            start = time.monotonic()
+            try:
+                admitted = _cond.wait_for(lambda: _in_flight < MAX_IN_FLIGHT, timeout)
+            finally:
+                _waiting -= 1
+                _stats["wait_seconds"] += time.monotonic() - start
+            if not admitted:
+                _stats["rejected_timeout"] += 1
+                return None
+            # The intent cap may have filled while we queued
+            if limit is not None and _intent_in_flight[intent] >= limit:
+                _stats["rejected_intent"] += 1
+                _rejected_intents[intent] += 1
+                _cond.notify()
+                return None
+        _in_flight += 1
+        _intent_in_flight[intent] += 1
+        _stats["admitted"] += 1
+        return Slot(intent)
+
+
+def note_cheap():
+    """Count a request answered without a slot."""
+    with _cond:
+        _stats["cheap"] += 1
+
+
+def stats() -> dict:
+    """This process's admission counters and current queue state."""
+    with _cond:
+        return {
+            "in_flight":        _in_flight,
+            "queued":           _waiting,
+            "queue_peak":       _stats["queue_peak"],
+            "admitted":         _stats["admitted"],
+            "cheap":            _stats["cheap"],
+            "rejected_rate":    _stats["rejected_rate"],
+            "rejected_queue":   _stats["rejected_queue"],
+            "rejected_timeout": _stats["rejected_timeout"],
+            "rejected_intent":  dict(_rejected_intents),
+            "avg_wait_ms":      round(_stats["wait_seconds"] * 1000 / _stats["admitted"], 2)
+                                if _stats["admitted"] else 0.0,
+            "intent_in_flight": {k: v for k, v in _intent_in_flight.items() if v},
+            "limits":           {"rate": CHAT_RATE, "burst": CHAT_BURST,
+                                 "in_flight": MAX_IN_FLIGHT, "waiting": MAX_WAITING,
+                                 "intents": {name: spec.limit
+                                             for name, spec in intents.all_intents().items()
+                                             if spec.limit is not None}},
+        }
+
+
+def _reset_after_fork():
+    global _buckets, _bucket_lock, _cond, _in_flight, _waiting
+    global _intent_in_flight, _stats, _rejected_intents
+    _buckets, _bucket_lock, _cond = OrderedDict(), threading.Lock(), threading.Condition()
+    _in_flight, _waiting          = 0, 0
+    _intent_in_flight, _stats, _rejected_intents = Counter(), Counter(), Counter()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -2,15 +2,33 @@
 modules/app_launcher.py
 ========================
 Attempts to open a desktop application whose name is mentioned in the
-user's command.  Works on Windows, macOS, and Linux by trying common
-command-line invocations.
+user's command.  Works on Windows, macOS, and Linux.
+
+Instead of trying each candidate command until one spawns, the launcher
+keeps an index of what is actually installed – Linux desktop entries,
+macOS .app bundles and the PATH executables they (or APP_COMMANDS /
+PATH_ALLOWLIST) name – and resolves the friendly name (or an alias) to a
+single command with dict lookups, so exactly one process spawn is
+attempted.  Other programs on PATH (reboot, shutdown, …) are never
+started, and PATH-only entries must be named exactly.  The index is built once (build_index() at
+start-up, or on first use) and rebuilt when PATH or the modification time
+of any scanned directory changes.
+
+Launched apps are supervised by modules/process_manager.py, which also
+backs the "list running apps" / "close <app>" commands.
 """
 
-import subprocess
-import sys
+import glob
+import os
 import re
+import shlex
+import sys
+import threading
+import time
 
-# Map of friendly names → OS commands (tried in order)
+from modules import process_manager
+
+# Map of friendly names → OS commands (first installed one wins)
 APP_COMMANDS: dict[str, list[str]] = {
     "notepad":    ["notepad.exe", "notepad", "gedit", "kate"],
     "chrome":     ["chrome.exe", "google-chrome", "chromium"],
@@ -25,6 +43,243 @@ APP_COMMANDS: dict[str, list[str]] = {
     "excel":      ["excel.exe", "libreoffice --calc"],
 }
 
+# Other ways people say the same app → key of APP_COMMANDS
+APP_ALIASES: dict[str, str] = {
+    "google chrome":   "chrome",
+    "chromium":        "chrome",
+    "browser":         "chrome",
+    "mozilla firefox": "firefox",
+    "text editor":     "notepad",
+    "editor":          "notepad",
+    "calc":            "calculator",
+    "cmd":             "terminal",
+    "command prompt":  "terminal",
+    "console":         "terminal",
+    "shell":           "terminal",
+    "file manager":    "explorer",
+    "files":           "explorer",
+    "file explorer":   "explorer",
+    "ms word":         "word",
+    "microsoft word":  "word",
+    "spreadsheet":     "excel",
+    "microsoft excel": "excel",
+    "vlc player":      "vlc",
+    "media player":    "vlc",
+}
+
+# Programs with no desktop entry that "open <name>" may start when found
+# on PATH – only by their exact name.  Extend with ASSISTANT_APP_ALLOWLIST
+# (comma-separated executable names).
+PATH_ALLOWLIST = {
+    "code", "codium", "gimp", "inkscape", "krita", "blender", "audacity", "obs",
+    "libreoffice", "thunderbird", "evince", "okular", "slack", "discord", "zoom",
+    "steam", "signal-desktop", "telegram-desktop",
+}
+
+INDEX_RECHECK_SECONDS = 5.0   # how often directory mtimes are re-checked
+MAX_NAME_WORDS        = 3     # longest word run tried as an app name
+
+_FIELD_CODE = re.compile(r"\s%[a-zA-Z]")    # %U, %f … in desktop Exec= lines
+
+
+def _desktop_dirs() -> list[str]:
+    """Where .desktop entries / .app bundles live on this OS."""
+    if sys.platform == "darwin":
+        return ["/Applications", "/System/Applications", os.path.expanduser("~/Applications")]
+    if sys.platform == "win32":
+        return []
+    data_dirs = os.environ.get("XDG_DATA_DIRS", "/usr/local/share:/usr/share").split(os.pathsep)
+    data_dirs.insert(0, os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share")))
+    return [os.path.join(d, "applications") for d in data_dirs if d]
+
+
+def _normalise(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def _default_allowlist() -> set[str]:
+    extra = os.environ.get("ASSISTANT_APP_ALLOWLIST", "")
+    return PATH_ALLOWLIST | {name.strip().lower() for name in extra.split(",") if name.strip()}
+
+
+class AppIndex:
+    """Installed executables + desktop apps, resolved to one command each."""
+
+    def __init__(self, path: str | None = None, desktop_dirs: list[str] | None = None,
+                 allowlist: set[str] | None = None):
+        self._path_override    = path
+        self._desktop_override = desktop_dirs
+        self._allowlist   = allowlist if allowlist is not None else _default_allowlist()
+        self._lock        = threading.Lock()
+        self._signature   = None
+        self._checked_at  = 0.0
+        self._commands    = {}     # friendly / desktop name → argv (word runs match)
+        self._exact       = {}     # launchable PATH executable → argv (exact name only)
+        self.builds       = 0
+
+    # ── scanning ───────────────────────────────────────────────────────────────
+
+    def _path(self) -> str:
+        return self._path_override if self._path_override is not None \
+            else os.environ.get("PATH", "")
+
+    def _dirs(self) -> tuple[list[str], list[str]]:
+        path_dirs    = [d for d in dict.fromkeys(self._path().split(os.pathsep)) if d]
+        desktop_dirs = self._desktop_override if self._desktop_override is not None \
+            else _desktop_dirs()
+        return path_dirs, desktop_dirs
+
+    def _compute_signature(self) -> tuple:
+        path_dirs, desktop_dirs = self._dirs()
+        mtimes = []
+        for d in path_dirs + desktop_dirs:
+            try:
+                mtimes.append(os.stat(d).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return (self._path(), tuple(desktop_dirs), tuple(mtimes))
+
+    @staticmethod
+    def _scan_executables(path_dirs: list[str]) -> dict[str, str]:
+        """Executable name → full path; earlier PATH entries win."""
+        found    = {}
+        win      = sys.platform == "win32"
+        exts     = [e.lower() for e in os.environ.get("PATHEXT", ".EXE;.BAT;.CMD").split(";")]
+        for d in path_dirs:
+            try:
+                entries = os.scandir(d)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    name = entry.name.lower() if win else entry.name
+                    if name in found:
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        if win:
+                            stem, ext = os.path.splitext(name)
+                            if ext not in exts:
+                                continue
+                            found.setdefault(stem, entry.path)
+                        elif not entry.stat().st_mode & 0o111:
+                            continue
+                    except OSError:
+                        continue
+                    found[name] = entry.path
+        return found
+
+    @staticmethod
+    def _scan_desktop(desktop_dirs: list[str]) -> dict[str, list[str]]:
+        """Display name → argv from .desktop files (Linux) or .app bundles (macOS)."""
+        apps = {}
+        for d in desktop_dirs:
+            for bundle in glob.glob(os.path.join(glob.escape(d), "*.app")):
+                name = os.path.splitext(os.path.basename(bundle))[0]
+                apps.setdefault(_normalise(name), ["open", "-a", bundle])
+            for entry in glob.glob(os.path.join(glob.escape(d), "*.desktop")):
+                name = command = None
+                try:
+                    with open(entry, encoding="utf-8", errors="replace") as fh:
+                        in_main = False
+                        for line in fh:
+                            line = line.strip()
+                            if line.startswith("["):
+                                in_main = line == "[Desktop Entry]"
+                            elif in_main and line.startswith("Name=") and name is None:
+                                name = line[5:]
+                            elif in_main and line.startswith("Exec=") and command is None:
+                                command = _FIELD_CODE.sub("", line[5:])
+                except OSError:
+                    continue
+                if not name or not command:
+                    continue
+                try:
+                    argv = shlex.split(command)
+                except ValueError:
+                    continue
+                file_id = os.path.splitext(os.path.basename(entry))[0].lower()
+                apps.setdefault(_normalise(name), argv)
+                apps.setdefault(file_id, argv)
+        return apps
+
+    def _build(self, signature: tuple):
+        path_dirs, desktop_dirs = self._dirs()
+        executables = self._scan_executables(path_dirs)
+        commands    = dict(self._scan_desktop(desktop_dirs))
+        # PATH executables: only those a desktop entry starts, or allowlisted
+        launchable  = set(self._allowlist)
+        launchable.update(os.path.basename(argv[0]).lower() for argv in commands.values()
+                          if argv[0] not in ("open", "env"))
+        exact = {}
+        for exe, full in executables.items():
+            if exe.lower() in launchable:
+                exact[_normalise(exe)] = [full]
+        # Friendly names: the first APP_COMMANDS candidate that is installed
+        for key, candidates in APP_COMMANDS.items():
+            for cmd in candidates:
+                argv = cmd.split()
+                exe  = argv[0].lower() if sys.platform == "win32" else argv[0]
+                if exe in executables:
+                    commands[key] = [executables[exe]] + argv[1:]
+                    break
+        for alias, key in APP_ALIASES.items():
+            if key in commands:
+                commands.setdefault(alias, commands[key])
+        self._commands  = commands
+        self._exact     = exact
+        self._signature = signature
+        self.builds    += 1
+
+    def refresh(self, force: bool = False):
+        """Rebuild if PATH or a directory changed (checked at most every few seconds)."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._signature is not None \
+                    and self._signature[0] == self._path() \
+                    and now - self._checked_at < INDEX_RECHECK_SECONDS:
+                return
+            self._checked_at = now
+            signature = self._compute_signature()
+            if force or signature != self._signature:
+                self._build(signature)
+
+    # ── lookup ─────────────────────────────────────────────────────────────────
+
+    def resolve(self, app_name: str) -> tuple[str, list[str]] | None:
+        """
+        (matched name, argv) for the app named in `app_name`, or None.
+        Tries the whole phrase, then shorter word runs ("google chrome
+        please" → "google chrome"), each as one dict lookup.  Executables
+        known only from PATH match the whole phrase exactly, never a run.
+        """
+        self.refresh()
+        commands = self._commands
+        words    = _normalise(app_name).split()
+        phrase   = " ".join(words)
+        if phrase not in commands and phrase in self._exact:
+            return phrase, self._exact[phrase]
+        for size in range(min(len(words), MAX_NAME_WORDS), 0, -1):
+            for start in range(len(words) - size + 1):
+                name = " ".join(words[start:start + size])
+                argv = commands.get(name)
+                if argv is not None:
+                    return name, argv
+        return None
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._commands) + len(self._exact)
+
+
+_index = AppIndex()
+
+
+def build_index():
+    """Scan PATH / desktop entries now (call once at start-up)."""
+    _index.refresh(force=True)
+
 
 def _extract_app_name(text: str) -> str:
     """Pull the app name from commands like 'open chrome' or 'launch spotify'."""
@@ -37,45 +292,107 @@ def _extract_app_name(text: str) -> str:
     return text.strip()
 
 
-def open_app(user_text: str) -> str:
+def open_app_slots(text: str) -> dict:
+    """Slots for the open_app intent."""
+    return {"app": _extract_app_name(text)}
+
+
+def open_app(user_text: str, slots: dict | None = None) -> str:
     """
     Try to launch the application mentioned in user_text.
     Returns a status message.
     """
-    app_name = _extract_app_name(user_text)
+    app_name = slots["app"] if slots is not None else _extract_app_name(user_text)
 
-    # Find matching entry in our map (partial match)
-    matched_commands: list[str] = []
-    for key, commands in APP_COMMANDS.items():
-        if key in app_name or app_name in key:
-            matched_commands = commands
-            break
+    match = _index.resolve(app_name)
+    known = APP_ALIASES.get(_normalise(app_name), _normalise(app_name))
+    if match is not None:
+        name, argv = APP_ALIASES.get(match[0], match[0]), match[1]
+    elif sys.platform == "win32" and known in APP_COMMANDS:
+        # Not on PATH: CreateProcess still finds system programs (calc.exe, …)
+        name, argv = known, APP_COMMANDS[known][0].split()
+    else:
+        return (f"I couldn't find '{app_name}' on this system. "
+                "Make sure it's installed and in your PATH.")
+
+    # Never through a shell: the name comes from chat / voice text
+    try:
+        app = process_manager.launch(name, argv)
+    except OSError as e:
+        return f"I found '{app_name}' but couldn't start it: {e}"
+    if app is None:
+        return (f"You already have {process_manager.MAX_RUNNING_APPS} apps running that I "
+                "opened. Close one first, e.g. 'close chrome'.")
+    return f"Opening {app_name}…"
+
+
+# ── Running apps ───────────────────────────────────────────────────────────────
+
+_CLOSE_TRIGGERS = ["close", "quit", "kill", "stop", "exit", "terminate", "shut down", "end"]
+_CLOSE_FILLERS  = {"the", "my", "app", "apps", "application", "applications", "window",
+                   "program", "please", "now", "running"}
 
-    # If no map entry, just try the raw app name as a command
-    if not matched_commands:
-        matched_commands = [app_name]
-
-    for cmd in matched_commands:
-        try:
-            # On Windows, use shell=True for better app launching
-            if sys.platform == "win32":
-                subprocess.Popen(
-                    cmd,
-                    shell=True,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                )
-            else:
-                subprocess.Popen(
-                    cmd.split(),
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                )
-            return f"Opening {app_name}…"
-        except FileNotFoundError:
-            continue
-        except Exception as e:
-            continue
-
-    return (f"I couldn't find '{app_name}' on this system. "
-            "Make sure it's installed and in your PATH.")
+
+def _extract_close_name(text: str) -> str | None:
+    """
+    App to close in phrases like "close chrome", "quit the calculator app";
+    "all" for "close all apps" / "close everything"; None if not found.
+    """
+    text = text.lower()
+    for trigger in _CLOSE_TRIGGERS:
+        match = re.search(rf"\b{trigger}\b", text)
+        if match:
+            words = [w for w in text[match.end():].split() if w not in _CLOSE_FILLERS]
+            if not words:
+                return None
+            if words[0] in ("all", "everything"):
+                return "all"
+            return " ".join(words)
+    return None
+
+
+def close_app_slots(text: str) -> dict:
+    """Slots for the close_app intent."""
+    return {"app": _extract_close_name(text)}
+
+
+def list_apps(user_text: str = "", slots: dict | None = None) -> str:
+    """Say which launched apps are still running."""
+    apps = process_manager.running()
+    if not apps:
+        return "I haven't opened any apps that are still running."
+    lines = [f"{len(apps)} app(s) I opened are running:"]
+    for app in apps:
+        minutes = int(time.time() - app.started) // 60
+        lines.append(f"  • {app.name} (pid {app.pid}, {minutes} min)")
+    return "\n".join(lines)
+
+
+def close_app(user_text: str, slots: dict | None = None) -> str:
+    """Close apps the assistant launched (only those – never arbitrary processes)."""
+    name = slots["app"] if slots is not None else _extract_close_name(user_text)
+    if not name:
+        return "Which app should I close? Say 'list running apps' to see them."
+
+    if name == "all":
+        closed = process_manager.close()
+        return (f"Closed {len(closed)} app(s)." if closed
+                else "I haven't opened any apps that are still running.")
+
+    # Match what was said against the names apps were launched under
+    words   = _normalise(name).split()
+    names   = {app.name for app in process_manager.running()}
+    target  = None
+    for size in range(min(len(words), MAX_NAME_WORDS), 0, -1):
+        for start in range(len(words) - size + 1):
+            phrase = " ".join(words[start:start + size])
+            phrase = APP_ALIASES.get(phrase, phrase)
+            if phrase in names:
+                target = phrase
+                break
+        if target:
+            break
+    if target is None:
+        return f"I didn't open '{name}', so I can't close it."
+    closed = process_manager.close(name=target)
+    return f"Closed {target}." if len(closed) == 1 else f"Closed {len(closed)} {target} windows."
@@ -0,0 +1,256 @@
+"""
+modules/contact_index.py
+=========================
+In-memory fuzzy index over the `contacts` table, so spoken names that the
+recogniser spells differently still find the contact:
+
+    "jon"        → John        (same Soundex code)
+    "mum"        → Mom         (same Soundex code)
+    "jhon smth"  → John Smith  (shared trigrams)
+
+Every contact is indexed under the character trigrams of its normalised
+name, the Soundex code of each name word and of the whole name.  A lookup gathers candidates
+from those posting lists (skipping keys so common they would touch a large
+part of the index), then scores only the best few:
+
+    score = 0.5 × trigram Dice similarity
+          + 0.4 × word match  (exact word 1.0, same Soundex 0.8, averaged
+                               over the query words)
+          + 0.1 × share of the name's words that were matched
+    (an exact full-name match scores 1.0)
+
+The index is built from the database on first use and kept in sync by the
+contact handlers (add / delete).  It remembers the contacts table's change
+counter (db.table_version) it reflects and is rebuilt when the counter
+moved for any other reason – a write by another web worker, or a bulk
+change such as /api/reset-all.
+"""
+
+import re
+import threading
+from collections import Counter
+
+from modules import database as db
+
+MIN_SCORE       = 0.45    # below this a candidate is not offered at all
+MAX_CANDIDATES  = 50      # candidates scored in full per lookup
+COMMON_POSTING  = 0.02    # skip trigrams shared by more than 2% of contacts…
+MIN_POSTING_CAP = 200     # …but never skip one with fewer entries than this
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+_SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(
+    ["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"]) for c in letters}
+
+
+def normalise(name: str) -> str:
+    """Lower-case, drop punctuation, collapse whitespace."""
+    return " ".join(_NON_WORD.sub(" ", name.lower()).split())
+
+
+def soundex(word: str) -> str:
+    """Classic 4-character American Soundex ("robert" → "r163")."""
+    word = "".join(c for c in word.lower() if c.isalpha())
+    if not word:
+        return ""
+    code, last = word[0], _SOUNDEX_CODES.get(word[0], "")
+    for c in word[1:]:
+        digit = _SOUNDEX_CODES.get(c, "")
+        if digit and digit != "0" and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if c not in "hw":            # h/w don't separate equal codes
+            last = digit
+    return code.ljust(4, "0")
+
+
+def trigrams(text: str) -> set[str]:
+    """Character trigrams of a normalised name, padded at word edges."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _full_key(words: list[tuple[str, str]]) -> str:
+    """Phonetic key of a whole name: its words' Soundex codes joined."""
+    return " ".join(code for _, code in words)
+
+
+class ContactIndex:
+    """Trigram + Soundex index over contact dicts (id, name, phone, email)."""
+
+    def __init__(self, contacts=()):
+        self._lock      = threading.Lock()
+        self._contacts  = {}          # id → contact dict
+        self._grams     = {}          # id → trigram set
+        self._words     = {}          # id → [(word, soundex), …]
+        self._by_name   = {}          # normalised name → id
+        self._gram_post = {}          # trigram → set of ids
+        self._sound_post = {}         # soundex → set of ids
+        self._full_post = {}          # soundex of every word, joined → set of ids
+        for contact in contacts:
+            self.add(contact)
+
+    def __len__(self) -> int:
+        return len(self._contacts)
+
+    # ── maintenance ────────────────────────────────────────────────────────────
+
+    def add(self, contact: dict):
+        """Index (or re-index) one contact; `contact` needs "id" and "name"."""
+        with self._lock:
+            self._remove_id(contact["id"])
+            key   = normalise(contact["name"])
+            grams = trigrams(key)
+            words = [(w, soundex(w)) for w in key.split()]
+            cid   = contact["id"]
+            self._contacts[cid] = dict(contact)
+            self._grams[cid]    = grams
+            self._words[cid]    = words
+            self._by_name[key]  = cid
+            for gram in grams:
+                self._gram_post.setdefault(gram, set()).add(cid)
+            for _, code in words:
+                self._sound_post.setdefault(code, set()).add(cid)
+            self._full_post.setdefault(_full_key(words), set()).add(cid)
+
+    def remove(self, name: str) -> bool:
+        """Drop the contact with this (case-insensitive) name."""
+        with self._lock:
+            cid = self._by_name.get(normalise(name))
+            return cid is not None and self._remove_id(cid)
+
+    def _remove_id(self, cid) -> bool:
+        contact = self._contacts.pop(cid, None)
+        if contact is None:
+            return False
+        for gram in self._grams.pop(cid):
+            posting = self._gram_post[gram]
+            posting.discard(cid)
+            if not posting:
+                del self._gram_post[gram]
+        words = self._words.pop(cid)
+        for postings, code in [(self._sound_post, c) for _, c in words] + \
+                              [(self._full_post, _full_key(words))]:
+            posting = postings.get(code)
+            if posting is not None:
+                posting.discard(cid)
+                if not posting:
+                    del postings[code]
+        key = normalise(contact["name"])
+        if self._by_name.get(key) == cid:
+            del self._by_name[key]
+        return True
+
+    # ── lookup ─────────────────────────────────────────────────────────────────
+
+    def _score(self, cid, grams: set, words: list) -> float:
+        name_grams = self._grams[cid]
+        dice = 2 * len(grams & name_grams) / (len(grams) + len(name_grams))
+        name_words = self._words[cid]
+        word_match = 0.0
+        covered    = set()
+        for word, code in words:
+            best, hit = 0.0, None
+            for i, (name_word, name_code) in enumerate(name_words):
+                if word == name_word:
+                    best, hit = 1.0, i
+                    break
+                if code == name_code and best < 0.8:
+                    best, hit = 0.8, i
+            word_match += best
+            if hit is not None:
+                covered.add(hit)
+        return (0.5 * dice + 0.4 * word_match / len(words)
+                + 0.1 * len(covered) / len(name_words))
+
+    def search(self, query: str, limit: int = 5, min_score: float = MIN_SCORE) -> list[tuple[dict, float]]:
+        """Best matching contacts as [(contact, score)], highest score first."""
+        key = normalise(query)
+        if not key:
+            return []
+        with self._lock:
+            exact = self._by_name.get(key)
+            grams = trigrams(key)
+            words = [(w, soundex(w)) for w in key.split()]
+
+            # Candidate generation: overlap counts over selective postings
+            # (a phonetic hit is worth a few trigrams).  Postings shared by a
+            # large part of the index are skipped unless nothing else is left.
+            postings = [(self._gram_post.get(gram), 1) for gram in grams]
+            postings += [(self._sound_post.get(code), 3) for _, code in words]
+            postings.append((self._full_post.get(_full_key(words)), 5))
+            postings = [(p, w) for p, w in postings if p]
+            cap      = max(MIN_POSTING_CAP, int(len(self._contacts) * COMMON_POSTING))
+            selective = [(p, w) for p, w in postings if len(p) <= cap]
+            if not selective and postings:
+                selective = [min(postings, key=lambda pw: len(pw[0]))]
+            counts = Counter()
+            for posting, weight in selective:
+                if weight == 1:
+                    counts.update(posting)
+                else:
+                    for cid in posting:
+                        counts[cid] += weight
+            candidates = [cid for cid, _ in counts.most_common(MAX_CANDIDATES)]
+            if exact is not None and exact not in candidates:
+                candidates.append(exact)
+
+            scored = []
+            for cid in candidates:
+                score = 1.0 if cid == exact else self._score(cid, grams, words)
+                if score >= min_score:
+                    scored.append((self._contacts[cid], round(score, 3)))
+        scored.sort(key=lambda item: -item[1])
+        return [(dict(contact), score) for contact, score in scored[:limit]]
+
+
+# ── Shared index, synced with the contacts table ──────────────────────────────
+_index         = None
+_index_version = None      # db.table_version("contacts") the index reflects
+_index_lock    = threading.Lock()
+
+
+def get_index() -> ContactIndex:
+    """The shared index, (re)built from the database when the table changed."""
+    global _index, _index_version
+    version = db.table_version("contacts")
+    if _index is None or version != _index_version:
+        with _index_lock:
+            if _index is None or version != _index_version:
+                _index, _index_version = ContactIndex(db.get_all_contacts()), version
+    return _index
+
+
+def invalidate():
+    """Forget the index (rebuilt on next use)."""
+    global _index
+    _index = None
+
+
+def _note_own_write():
+    # One write of ours moves the counter by one and the index was updated
+    # in place; any other jump means another process wrote too – rebuild
+    global _index_version
+    version = db.table_version("contacts")
+    if (version is not None and _index_version is not None
+            and version == (_index_version[0], _index_version[1] + 1)):
+        _index_version = version
+
+
+def on_contact_saved(contact: dict):
+    """Call after db.add_contact() stored `contact`."""
+    if _index is not None:
+        _index.add(contact)
+        _note_own_write()
+
+
+def on_contact_deleted(name: str):
+    """Call after db.delete_contact() removed `name`."""
+    if _index is not None:
+        _index.remove(name)
+        _note_own_write()
+
+
+def search(query: str, limit: int = 5, min_score: float = MIN_SCORE) -> list[tuple[dict, float]]:
+    return get_index().search(query, limit, min_score)
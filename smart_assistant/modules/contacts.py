@@ -2,74 +2,153 @@
 modules/contacts.py
 ====================
 Handle contact-related commands:
-  • "add contact dad 9876543210"
-  • "call dad" / "what's dad's number"
+  • "add contact dad 9876543210" / "add contact john smith 9876543210"
+  • "call dad" / "what's dad's number" (fuzzy: "call jon" finds John)
   • "show my contacts"
   • "delete contact dad"
 """
 
+import re
+
 from modules import database as db
+from modules import contact_index
 
+# A contact is answered directly only if it scores this well, or clearly
+# beats the runner-up; deleting needs a stronger match
+ACCEPT_SCORE     = 0.5
+AMBIGUOUS_GAP    = 0.05
+DELETE_MIN_SCORE = 0.75
 
-def add_contact_handler(user_text: str) -> str:
-    """Parse and add a contact from user text."""
-    text = user_text.lower()
-    
-    # Extract name and phone from phrases like:
-    # "add contact dad 9876543210"
-    # "save contact mom 555-1234"
-    # "remember contact john's number is 1234567890"
-    
+_PHONE_RE       = re.compile(r"\+?\d[\d\s().-]{5,}\d")
+_NAME_FILLERS   = {"number", "phone", "is", "as", "with", "mobile", "contact", "named",
+                   "called", "at", "on", "and", "his", "her", "their"}
+_LOOKUP_FILLERS = {"what's", "whats", "what", "call", "show", "me", "contact", "contacts",
+                   "number", "phone", "for", "of", "is", "the", "my", "get", "give",
+                   "find", "dial", "ring", "please", "details", "info", "mobile", "to"}
+
+
+def _parse_new_contact(text: str) -> tuple[str | None, str | None]:
+    """
+    Pull (name, phone) out of phrases like:
+        "add contact dad 9876543210"
+        "save contact mom 555-1234"
+        "remember contact john's number is 1234567890"
+    Either part is None if it couldn't be found.
+    """
+    text = text.lower()
     for trigger in ["add contact", "save contact", "remember contact", "add my contact"]:
         if trigger in text:
             remainder = text.split(trigger, 1)[1].strip()
             break
     else:
+        return None, None
+
+    # Phone = the last digit run; name = the words before it minus fillers
+    phones = list(_PHONE_RE.finditer(remainder))
+    if phones:
+        phone     = phones[-1].group(0).strip()
+        remainder = remainder[:phones[-1].start()]
+    else:
+        phone = None
+    words = []
+    for word in remainder.replace("'s ", " ").split():
+        word = word.strip(".,:;")
+        if word.endswith("'s"):
+            word = word[:-2]
+        if word in _NAME_FILLERS:
+            if words:
+                break            # "john's number is …" – the name is done
+            continue
+        words.append(word)
+    name = " ".join(w.capitalize() for w in words)
+    return name, phone
+
+
+def add_contact_slots(text: str) -> dict:
+    """Slots for the add_contact intent."""
+    name, phone = _parse_new_contact(text)
+    return {"contact": name, "phone": phone}
+
+
+def add_contact_handler(user_text: str, slots: dict | None = None) -> str:
+    """Parse and add a contact from user text."""
+    if slots is None:
+        slots = add_contact_slots(user_text)
+    name, phone = slots["contact"], slots["phone"]
+
+    if name is None and phone is None:
         return "Could you say 'add contact' followed by name and number?"
-    
-    # Simple parsing: split by space/number patterns
-    parts = remainder.split()
-    if len(parts) < 2:
+    if not name or not phone:
         return "Please provide both a name and phone number. Example: 'add contact dad 9876543210'"
-    
-    name = parts[0].capitalize()
-    phone = parts[-1]  # Last part should be phone number
-    
+
     # Validate phone (should be mostly digits)
     phone_digits = ''.join(c for c in phone if c.isdigit() or c in '- ()')
     if len(phone_digits) < 7:
         return f"That doesn't look like a valid phone number: {phone}"
     
-    db.add_contact(name, phone_digits)
+    contact = db.add_contact(name, phone_digits)
+    contact_index.on_contact_saved(contact)
     return f"✓ Saved {name}'s contact: {phone_digits}"
 
 
-def get_contact_handler(user_text: str) -> str:
-    """Get a contact's number from user text."""
-    text = user_text.lower()
-    
-    # Phrases like:
-    # "what's dad's number"
-    # "call dad"
-    # "show me mom's contact"
-    
+def _extract_contact_name(text: str) -> str | None:
+    """
+    Find the contact name in phrases like:
+        "what's dad's number"
+        "call dad"
+        "show me mom's contact"
+    """
+    text = text.lower()
     for trigger in ["what's", "call", "show me", "number", "contact", "phone"]:
         if trigger in text:
-            # Extract name (usually the word after trigger or last word)
-            parts = text.split()
-            # Try to find the contact name (usually last significant word)
-            for part in reversed(parts):
-                if part not in ["what's", "call", "show", "me", "contact", "number", "phone", "for", "of", "is", "the"]:
-                    name = part.rstrip("'s").rstrip("?")
-                    break
-            break
-    else:
+            # The name is whatever is left once the command words are removed
+            words = []
+            for part in text.replace("?", " ").split():
+                part = part.strip(".,!")
+                if part.endswith("'s") and part not in _LOOKUP_FILLERS:
+                    part = part[:-2]
+                if part and part not in _LOOKUP_FILLERS:
+                    words.append(part)
+            return " ".join(words) or None
+    return None
+
+
+def view_contact_slots(text: str) -> dict:
+    """Slots for the view_contact intent."""
+    return {"contact": _extract_contact_name(text)}
+
+
+def find_contact(name: str, min_score: float = ACCEPT_SCORE) -> tuple[dict | None, list[dict]]:
+    """
+    Resolve a spoken name: (contact, []) when one contact matches well and
+    clearly, otherwise (None, [close candidates]).
+    """
+    matches = contact_index.search(name)
+    if not matches:
+        return None, []
+    best, score = matches[0]
+    runner_up   = matches[1][1] if len(matches) > 1 else 0.0
+    if score >= 1.0 or (score >= min_score and score - runner_up > AMBIGUOUS_GAP):
+        return best, []
+    return None, [contact for contact, _ in matches[:3]]
+
+
+def get_contact_handler(user_text: str, slots: dict | None = None) -> str:
+    """Get a contact's number from user text."""
+    if slots is None:
+        slots = view_contact_slots(user_text)
+    name = slots["contact"]
+    if not name:
         return "Please specify which contact you'd like to call."
     
-    contact = db.get_contact(name)
+    contact, candidates = find_contact(name)
     if not contact:
+        if candidates:
+            names = " or ".join(c["name"] for c in candidates)
+            return f"Did you mean {names}?"
         return f"I don't have {name} in contacts. Say 'add contact {name} <number>' first."
-    
+
+    name  = contact["name"]
     phone = contact.get("phone")
     if not phone:
         return f"{name}'s contact has no phone number saved."
@@ -77,7 +156,7 @@ def get_contact_handler(user_text: str) -> str:
     return f"📞 {name}'s number: {phone}"
 
 
-def list_contacts_handler() -> str:
+def list_contacts_handler(user_text: str = "", slots: dict | None = None) -> str:
     """Show all saved contacts."""
     contacts = db.get_all_contacts()
     
@@ -101,44 +180,64 @@ def list_contacts_handler() -> str:
     return "\n".join(lines)
 
 
-def delete_contact_handler(user_text: str) -> str:
-    """Delete a contact."""
-    text = user_text.lower()
-    
-    # Phrases like:
-    # "delete contact dad"
-    # "remove dad from contacts"
-    
+def _extract_delete_name(text: str) -> str | None:
+    """
+    Find the contact to delete in phrases like:
+        "delete contact dad"
+        "remove dad from contacts"
+    """
+    text = text.lower()
     for trigger in ["delete", "remove", "remove contact"]:
         if trigger in text:
             remainder = text.split(trigger, 1)[1].strip()
             # Remove common suffixes
             for suffix in [" from contacts", " contact", "contact ", "from contacts"]:
                 remainder = remainder.replace(suffix, "").strip()
-            name = remainder.capitalize()
-            break
-    else:
+            return remainder.capitalize()
+    return None
+
+
+def delete_contact_slots(text: str) -> dict:
+    """Slots for the delete_contact intent."""
+    return {"contact": _extract_delete_name(text)}
+
+
+def delete_contact_handler(user_text: str, slots: dict | None = None) -> str:
+    """Delete a contact."""
+    if slots is None:
+        slots = delete_contact_slots(user_text)
+    name = slots["contact"]
+
+    if name is None:
         return "Which contact would you like to delete?"
-    
     if not name or name in ["", "Contact"]:
         return "Please specify which contact to delete."
     
-    deleted = db.delete_contact(name)
+    # Only an exact or very close, unambiguous match is deleted
+    contact, candidates = find_contact(name, DELETE_MIN_SCORE)
+    if contact is None:
+        if candidates:
+            names = " or ".join(c["name"] for c in candidates)
+            return f"Did you mean {names}? Please say the full name to delete."
+        return f"I don't have {name} in contacts."
+
+    deleted = db.delete_contact(contact["name"])
     if deleted:
-        return f"✓ Deleted {name} from contacts."
+        contact_index.on_contact_deleted(contact["name"])
+        return f"✓ Deleted {contact['name']} from contacts."
     else:
         return f"I don't have {name} in contacts."
 
 
-def handle_contact_intent(intent: str, user_text: str) -> str:
+def handle_contact_intent(intent: str, user_text: str, slots: dict | None = None) -> str:
     """Route contact-related intents."""
     if intent == "add_contact":
-        return add_contact_handler(user_text)
+        return add_contact_handler(user_text, slots)
     elif intent == "view_contact":
-        return get_contact_handler(user_text)
+        return get_contact_handler(user_text, slots)
     elif intent == "list_contacts":
         return list_contacts_handler()
     elif intent == "delete_contact":
-        return delete_contact_handler(user_text)
+        return delete_contact_handler(user_text, slots)
     else:
         return "Contact command not recognized."
@@ -4,14 +4,24 @@ modules/database.py
 Manages the SQLite database for:
   • user profile  (name, preferences)
   • reminders     (message + due time)
-  • expenses       (amount, category, note)
+  • expenses       (amount, category, note, merchant) + analytics / budgets
   • memories       (arbitrary key-value facts)
+
+Query helpers are timed in assistant_db_seconds{helper=<function name>}
+with @metrics.timed; one that only delegates to another (table_version) is
+left bare so a call is counted once.
 """
 
+import random
 import sqlite3
 import os
+import threading
+import time
 from datetime import datetime
 
+from modules import metrics
+from modules import profiling
+
 # ── path ───────────────────────────────────────────────────────────────────────
 DB_DIR  = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database")
 DB_PATH = os.path.join(DB_DIR, "assistant.db")
@@ -20,16 +30,105 @@ os.makedirs(DB_DIR, exist_ok=True)
 
 def get_connection():
     """Return a new SQLite connection with row_factory set."""
-    conn = sqlite3.connect(DB_PATH)
+    # profiling swaps in a slow-query-logging connection class while it is on
+    conn = sqlite3.connect(DB_PATH, factory=profiling.connection_factory)
     conn.row_factory = sqlite3.Row   # lets us access columns by name
     return conn
 
 
+# ── Change tracking ────────────────────────────────────────────────────────────
+# Every write helper bumps its table's row in `table_versions` inside the
+# same transaction, so the counters are shared by every process using the
+# database.  table_versions() serves them from memory and only re-reads
+# them when `PRAGMA data_version` on a long-lived connection says another
+# connection has committed since – a check that doesn't read any table.
+
+TRACKED_TABLES = ("user_profile", "reminders", "expenses", "budgets", "category_keywords",
+                  "memories", "contacts", "study_sessions")
+_DB_ID_ROW     = "*"          # version = random id of this database file
+
+_watch_lock    = threading.Lock()
+_watch_conn    = None
+_watch_path    = None
+_watch_version = None
+_versions      = {}
+
+
+def _touch(cur, *tables: str):
+    """Bump the change counters of `tables` (inside the caller's transaction)."""
+    cur.execute(
+        f"UPDATE table_versions SET version = version + 1, modified_at = ? "
+        f"WHERE name IN ({', '.join('?' * len(tables))})",
+        (time.time(), *tables),
+    )
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def table_versions() -> dict[str, tuple[int, float]]:
+    """
+    {table: (change counter, last-modified epoch)} for TRACKED_TABLES, plus
+    "*": (database id, creation time) – distinguishes a re-created database.
+    """
+    global _watch_conn, _watch_path, _watch_version, _versions
+    with _watch_lock:
+        if _watch_conn is None or _watch_path != DB_PATH:
+            if _watch_conn is not None:
+                _watch_conn.close()
+            _watch_conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            _watch_path, _watch_version = DB_PATH, None
+        data_version = _watch_conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != _watch_version:
+            _versions = {name: (version, modified_at) for name, version, modified_at
+                         in _watch_conn.execute("SELECT * FROM table_versions")}
+            _watch_version = data_version
+        return _versions
+
+
+def table_version(table: str) -> tuple[int, int] | None:
+    """
+    (database id, change counter of `table`): a key for caches built from the
+    table, which changes whenever any process writes it.  None before
+    init_db().
+    """
+    try:
+        versions = table_versions()
+    except sqlite3.OperationalError:
+        return None
+    return versions[_DB_ID_ROW][0], versions[table][0]
+
+
+def _forget_watch_connection():
+    # A connection must not be used (or closed) across fork: keep the
+    # parent's object alive, untouched, and open a fresh one when needed
+    global _watch_conn, _watch_lock, _watch_version
+    if _watch_conn is not None:
+        _inherited_connections.append(_watch_conn)
+    _watch_conn, _watch_lock, _watch_version = None, threading.Lock(), None
+
+
+_inherited_connections = []
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_watch_connection)
+
+
+def _add_missing_columns(cur, table: str, columns: dict[str, str]):
+    """Migrate databases created by older versions (ALTER TABLE ADD COLUMN)."""
+    existing = {row["name"] for row in cur.execute(f"PRAGMA table_info({table})")}
+    for name, decl in columns.items():
+        if name not in existing:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
 def init_db():
     """Create all tables if they do not already exist."""
     conn = get_connection()
     cur  = conn.cursor()
 
+    # Write-ahead logging: readers in other processes (web workers) aren't
+    # blocked by a writer.  Persistent – stored in the database file.
+    cur.execute("PRAGMA journal_mode=WAL")
+
     # User profile – one row, keyed by name
     cur.execute("""
         CREATE TABLE IF NOT EXISTS user_profile (
@@ -41,13 +140,23 @@ def init_db():
     # Reminders
     cur.execute("""
         CREATE TABLE IF NOT EXISTS reminders (
-            id         INTEGER PRIMARY KEY AUTOINCREMENT,
-            message    TEXT NOT NULL,
-            remind_at  TEXT NOT NULL,        -- ISO-format: HH:MM
-            notified   INTEGER DEFAULT 0,    -- 0 = pending, 1 = done
-            created_at TEXT DEFAULT (datetime('now'))
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            message      TEXT NOT NULL,
+            remind_at    TEXT NOT NULL,        -- display label, e.g. 2026-01-31 15:00
+            notified     INTEGER DEFAULT 0,    -- 0 = pending, 1 = done
+            created_at   TEXT DEFAULT (datetime('now')),
+            next_fire_at INTEGER,              -- epoch seconds of next firing
+            recurrence   TEXT                  -- NULL, 'daily', 'weekdays', 'hourly:N'
         )
     """)
+    _add_missing_columns(cur, "reminders", {
+        "next_fire_at": "INTEGER",
+        "recurrence":   "TEXT",
+    })
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_reminders_due
+        ON reminders (notified, next_fire_at)
+    """)
 
     # Expenses
     cur.execute("""
@@ -56,6 +165,53 @@ def init_db():
             amount     REAL    NOT NULL,
             category   TEXT    NOT NULL,
             note       TEXT,
+            created_at TEXT DEFAULT (datetime('now')),
+            merchant   TEXT                   -- '' = none found, NULL = not parsed yet
+        )
+    """)
+    _add_missing_columns(cur, "expenses", {"merchant": "TEXT"})
+    # Analytics filter on created_at ranges (compared as ISO strings, never
+    # wrapped in a function, so these indexes are usable); amount/category
+    # are included so the aggregates are answered from the index alone.
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_expenses_created
+        ON expenses (created_at, category, amount)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_expenses_category_created
+        ON expenses (category, created_at, amount)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_expenses_created_merchant
+        ON expenses (created_at, merchant, amount)
+    """)
+    # Rows whose merchant hasn't been parsed yet.  Partial, so merchant is
+    # only ever reachable through the created_at-led index above: a
+    # merchant-led one made SQLite walk every merchant's rows (skip-scan)
+    # instead of seeking the date range for top merchants.
+    cur.execute("DROP INDEX IF EXISTS idx_expenses_merchant")
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_expenses_unparsed
+        ON expenses (id) WHERE merchant IS NULL
+    """)
+
+    # Spending limits per category ('all' = overall) and period
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS budgets (
+            category TEXT NOT NULL,                 -- expense category or 'all'
+            period   TEXT NOT NULL,                 -- day, week, month
+            amount   REAL NOT NULL,
+            PRIMARY KEY (category, period)
+        )
+    """)
+
+    # User-added expense category keywords (merged with the built-in map)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS category_keywords (
+            id         INTEGER PRIMARY KEY AUTOINCREMENT,
+            keyword    TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            category   TEXT NOT NULL,
+            weight     REAL NOT NULL DEFAULT 1.0,
             created_at TEXT DEFAULT (datetime('now'))
         )
     """)
@@ -80,21 +236,71 @@ def init_db():
         )
     """)
 
+    # Pomodoro study sessions (timers live on the shared scheduler)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS study_sessions (
+            id                INTEGER PRIMARY KEY AUTOINCREMENT,
+            status            TEXT    NOT NULL,    -- running, paused, done, cancelled
+            phase             TEXT    NOT NULL,    -- work, break
+            cycle             INTEGER NOT NULL,    -- current cycle, 1-based
+            cycles            INTEGER NOT NULL,
+            work_minutes      INTEGER NOT NULL,
+            break_minutes     INTEGER NOT NULL,
+            phase_ends_at     INTEGER,             -- epoch seconds (NULL while paused)
+            remaining_seconds INTEGER,             -- left in the phase while paused
+            created_at        TEXT DEFAULT (datetime('now')),
+            generation        INTEGER NOT NULL DEFAULT 0   -- bumped by start/pause/resume/cancel
+        )
+    """)
+    _add_missing_columns(cur, "study_sessions", {"generation": "INTEGER NOT NULL DEFAULT 0"})
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_study_sessions_status
+        ON study_sessions (status)
+    """)
+
+    # Recent server events (reminders, study updates) relayed between web
+    # worker processes; trimmed to EVENT_LOG_SIZE rows
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            id         INTEGER PRIMARY KEY AUTOINCREMENT,
+            topic      TEXT NOT NULL,
+            payload    TEXT NOT NULL,             -- JSON
+            origin     INTEGER NOT NULL,          -- pid of the publishing process
+            created_at REAL NOT NULL              -- epoch seconds
+        )
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name        TEXT PRIMARY KEY,
+            version     INTEGER NOT NULL DEFAULT 0,
+            modified_at REAL NOT NULL
+        )
+    """)
+    now = time.time()
+    cur.executemany("INSERT OR IGNORE INTO table_versions (name, version, modified_at) "
+                    "VALUES (?, 0, ?)", [(name, now) for name in TRACKED_TABLES])
+    cur.execute("INSERT OR IGNORE INTO table_versions (name, version, modified_at) "
+                "VALUES (?, ?, ?)", (_DB_ID_ROW, random.getrandbits(31), now))
+
     conn.commit()
     conn.close()
 
 
 # ── User profile ───────────────────────────────────────────────────────────────
 
+@metrics.timed(metrics.DB_SECONDS)
 def save_user_name(name: str):
     conn = get_connection()
     cur  = conn.cursor()
     cur.execute("DELETE FROM user_profile")          # keep only one row
     cur.execute("INSERT INTO user_profile (name) VALUES (?)", (name,))
+    _touch(cur, "user_profile")
     conn.commit()
     conn.close()
 
 
+@metrics.timed(metrics.DB_SECONDS)
 def get_user_name() -> str | None:
     conn = get_connection()
     cur  = conn.cursor()
@@ -106,20 +312,29 @@ def get_user_name() -> str | None:
 
 # ── Reminders ──────────────────────────────────────────────────────────────────
 
-def add_reminder(message: str, remind_at: str):
+@metrics.timed(metrics.DB_SECONDS)
+def add_reminder(message: str, remind_at: str, next_fire_at: int | None = None,
+                 recurrence: str | None = None) -> int:
     """
-    remind_at should be a time string like '15:30' (24-hour HH:MM).
+    remind_at is the display label (e.g. '2026-01-31 15:30' or 'daily 07:00');
+    next_fire_at is the epoch second of the first firing.
+    Returns the new reminder's id.
     """
     conn = get_connection()
     cur  = conn.cursor()
     cur.execute(
-        "INSERT INTO reminders (message, remind_at) VALUES (?, ?)",
-        (message, remind_at),
+        "INSERT INTO reminders (message, remind_at, next_fire_at, recurrence) "
+        "VALUES (?, ?, ?, ?)",
+        (message, remind_at, next_fire_at, recurrence),
     )
+    reminder_id = cur.lastrowid
+    _touch(cur, "reminders")
     conn.commit()
     conn.close()
+    return reminder_id
 
 
+@metrics.timed(metrics.DB_SECONDS)
 def get_pending_reminders() -> list[dict]:
     """Return all reminders that haven't been notified yet."""
     conn = get_connection()
@@ -130,19 +345,111 @@ def get_pending_reminders() -> list[dict]:
     return rows
 
 
+@metrics.timed(metrics.DB_SECONDS)
+def claim_due_reminders(now: float, next_fire_for, limit: int = 100) -> list[dict]:
+    """
+    Atomically claim up to `limit` pending reminders with next_fire_at <= now.
+
+    Runs inside one BEGIN IMMEDIATE transaction, so when several processes
+    (e.g. web workers) run a reminder checker each, every due reminder is
+    handed to exactly one of them.  `next_fire_for(row)` returns the next
+    epoch for recurring reminders, or None to close a one-shot reminder.
+    The UPDATEs are guarded on the state that was read (notified = 0 and the
+    same next_fire_at) and only rows whose UPDATE took effect are returned.
+    """
+    conn = get_connection()
+    conn.isolation_level = None          # manual transaction control
+    cur  = conn.cursor()
+    claimed = []
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute("""
+            SELECT * FROM reminders
+            WHERE notified = 0 AND next_fire_at <= ?
+            ORDER BY next_fire_at
+            LIMIT ?
+        """, (int(now), limit))
+        for row in [dict(r) for r in cur.fetchall()]:
+            nxt = next_fire_for(row)
+            if nxt is None:
+                cur.execute(
+                    "UPDATE reminders SET notified = 1 WHERE id = ? AND notified = 0",
+                    (row["id"],),
+                )
+            else:
+                cur.execute(
+                    "UPDATE reminders SET next_fire_at = ? "
+                    "WHERE id = ? AND notified = 0 AND next_fire_at = ?",
+                    (nxt, row["id"], row["next_fire_at"]),
+                )
+            if cur.rowcount == 1:
+                claimed.append(row)
+        if claimed:
+            _touch(cur, "reminders")
+        cur.execute("COMMIT")
+    except Exception:
+        cur.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return claimed
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_next_reminder_time() -> int | None:
+    """Epoch second of the earliest pending reminder, or None."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("""
+        SELECT next_fire_at FROM reminders
+        WHERE notified = 0 AND next_fire_at IS NOT NULL
+        ORDER BY next_fire_at
+        LIMIT 1
+    """)
+    row  = cur.fetchone()
+    conn.close()
+    return row["next_fire_at"] if row else None
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_unscheduled_reminders() -> list[dict]:
+    """Pending rows from older versions that have no next_fire_at yet."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("SELECT * FROM reminders WHERE notified = 0 AND next_fire_at IS NULL")
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def reschedule_reminder(reminder_id: int, next_fire_at: int):
+    """Move a reminder's next firing (recurring reminders, legacy backfill)."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("UPDATE reminders SET next_fire_at = ? WHERE id = ?",
+                (next_fire_at, reminder_id))
+    _touch(cur, "reminders")
+    conn.commit()
+    conn.close()
+
+
+@metrics.timed(metrics.DB_SECONDS)
 def mark_reminder_notified(reminder_id: int):
     conn = get_connection()
     cur  = conn.cursor()
     cur.execute("UPDATE reminders SET notified = 1 WHERE id = ?", (reminder_id,))
+    _touch(cur, "reminders")
     conn.commit()
     conn.close()
 
 
+@metrics.timed(metrics.DB_SECONDS)
 def get_todays_reminders() -> list[dict]:
     """Return ALL reminders (for the daily summary)."""
     conn = get_connection()
     cur  = conn.cursor()
-    cur.execute("SELECT * FROM reminders ORDER BY remind_at")
+    cur.execute("SELECT * FROM reminders ORDER BY next_fire_at")
     rows = [dict(r) for r in cur.fetchall()]
     conn.close()
     return rows
@@ -150,23 +457,66 @@ def get_todays_reminders() -> list[dict]:
 
 # ── Expenses ───────────────────────────────────────────────────────────────────
 
-def add_expense(amount: float, category: str, note: str = ""):
+@metrics.timed(metrics.DB_SECONDS)
+def add_expense(amount: float, category: str, note: str = "", merchant: str | None = None):
     conn = get_connection()
     cur  = conn.cursor()
     cur.execute(
-        "INSERT INTO expenses (amount, category, note) VALUES (?, ?, ?)",
-        (amount, category, note),
+        "INSERT INTO expenses (amount, category, note, merchant) VALUES (?, ?, ?, ?)",
+        (amount, category, note, merchant),
     )
+    _touch(cur, "expenses")
     conn.commit()
     conn.close()
 
 
+@metrics.timed(metrics.DB_SECONDS)
+def add_expense_with_totals(amount: float, category: str, note: str = "",
+                            merchant: str | None = None) -> dict:
+    """
+    Insert an expense and read back the totals it affects, in one
+    connection and one BEGIN IMMEDIATE transaction – so the totals include
+    this expense and no concurrent insert can land in between.
+
+    Returns {"id", "daily_total", "category_total", "budgets"} where
+    category_total is today's spend in `category` and budgets is the
+    get_budget_status(category) view.
+    """
+    conn = get_connection()
+    conn.isolation_level = None          # manual transaction control
+    cur  = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute(
+            "INSERT INTO expenses (amount, category, note, merchant) VALUES (?, ?, ?, ?)",
+            (amount, category, note, merchant),
+        )
+        expense_id = cur.lastrowid
+        cur.execute("""
+            SELECT COALESCE(SUM(amount), 0)                               AS daily_total,
+                   COALESCE(SUM(CASE WHEN category = ? THEN amount END), 0) AS category_total
+            FROM expenses
+            WHERE created_at >= DATE('now') AND created_at < DATE('now', '+1 day')
+        """, (category,))
+        totals  = dict(cur.fetchone())
+        budgets = _budget_status(cur, category)
+        _touch(cur, "expenses")
+        cur.execute("COMMIT")
+    except Exception:
+        cur.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return {"id": expense_id, **totals, "budgets": budgets}
+
+
+@metrics.timed(metrics.DB_SECONDS)
 def get_todays_expenses() -> list[dict]:
     conn = get_connection()
     cur  = conn.cursor()
     cur.execute("""
         SELECT * FROM expenses
-        WHERE DATE(created_at) = DATE('now')
+        WHERE created_at >= DATE('now') AND created_at < DATE('now', '+1 day')
         ORDER BY created_at DESC
     """)
     rows = [dict(r) for r in cur.fetchall()]
@@ -174,28 +524,283 @@ def get_todays_expenses() -> list[dict]:
     return rows
 
 
+@metrics.timed(metrics.DB_SECONDS)
 def get_total_expenses_today() -> float:
     conn = get_connection()
     cur  = conn.cursor()
     cur.execute("""
         SELECT COALESCE(SUM(amount), 0) as total FROM expenses
-        WHERE DATE(created_at) = DATE('now')
+        WHERE created_at >= DATE('now') AND created_at < DATE('now', '+1 day')
     """)
     total = cur.fetchone()["total"]
     conn.close()
     return total
 
 
+# ── Expense analytics ──────────────────────────────────────────────────────────
+# Date ranges are inclusive 'YYYY-MM-DD' days.  Every query filters with
+# `created_at >= start AND created_at < day-after-end` so SQLite can range-
+# scan the covering indexes created in init_db() instead of the table.
+
+# SQL expression turning created_at into a period key
+_PERIOD_KEYS = {
+    "day":   "substr(created_at, 1, 10)",
+    "week":  "strftime('%Y-W%W', created_at)",
+    "month": "substr(created_at, 1, 7)",
+    "year":  "substr(created_at, 1, 4)",
+}
+
+# Start of the current budget period (matches budgets.period)
+_PERIOD_STARTS = {
+    "day":   "DATE('now')",
+    "week":  "DATE('now', '-6 days', 'weekday 1')",
+    "month": "DATE('now', 'start of month')",
+}
+
+
+def _date_range(start: str, end: str) -> tuple[str, str]:
+    """Inclusive day range → (lower bound, exclusive upper bound) for created_at."""
+    lower = datetime.strptime(start, "%Y-%m-%d").strftime("%Y-%m-%d")
+    upper = datetime.strptime(end, "%Y-%m-%d").toordinal() + 1
+    return lower, datetime.fromordinal(upper).strftime("%Y-%m-%d")
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_expenses_between(start: str, end: str, limit: int = 500) -> list[dict]:
+    """Newest-first expenses in the range (at most `limit`)."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("""
+        SELECT * FROM expenses
+        WHERE created_at >= ? AND created_at < ?
+        ORDER BY created_at DESC
+        LIMIT ?
+    """, (*_date_range(start, end), limit))
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_category_breakdown(start: str, end: str) -> list[dict]:
+    """Total, count and share of the range per category, largest first."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("""
+        SELECT category,
+               SUM(amount)                                 AS total,
+               COUNT(*)                                    AS count,
+               ROUND(SUM(amount) * 100.0 / SUM(SUM(amount)) OVER (), 2) AS percent
+        FROM expenses
+        WHERE created_at >= ? AND created_at < ?
+        GROUP BY category
+        ORDER BY total DESC
+    """, _date_range(start, end))
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_expense_trend(start: str, end: str, period: str = "day",
+                      category: str | None = None) -> list[dict]:
+    """
+    Spending per day/week/month/year in the range, with a running total and
+    a moving average over the last 7 periods (window functions).
+    """
+    key = _PERIOD_KEYS[period]
+    where, params = "created_at >= ? AND created_at < ?", list(_date_range(start, end))
+    if category:
+        where += " AND category = ?"
+        params.append(category)
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute(f"""
+        SELECT period, total, count,
+               SUM(total) OVER (ORDER BY period)                        AS running_total,
+               ROUND(AVG(total) OVER (ORDER BY period
+                                      ROWS BETWEEN 6 PRECEDING AND CURRENT ROW), 2)
+                                                                        AS moving_average
+        FROM (
+            SELECT {key} AS period, SUM(amount) AS total, COUNT(*) AS count
+            FROM expenses
+            WHERE {where}
+            GROUP BY period
+        )
+        ORDER BY period
+    """, params)
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+# Seeks the date range in idx_expenses_created_merchant (checked by
+# `benchmark.py expenses`)
+_TOP_MERCHANTS_SQL = """
+    SELECT merchant, SUM(amount) AS total, COUNT(*) AS count
+    FROM expenses
+    WHERE merchant > '' AND created_at >= ? AND created_at < ?
+    GROUP BY merchant
+    ORDER BY total DESC
+    LIMIT ?
+"""
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_top_merchants(start: str, end: str, limit: int = 10) -> list[dict]:
+    """Merchants with the highest spend in the range."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute(_TOP_MERCHANTS_SQL, (*_date_range(start, end), limit))
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_unparsed_expenses(limit: int = 1000) -> list[dict]:
+    """Expenses whose merchant has not been extracted yet (legacy rows)."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("SELECT id, note FROM expenses WHERE merchant IS NULL LIMIT ?", (limit,))
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def set_expense_merchants(merchants: list[tuple[str, int]]):
+    """Bulk-set merchant for [(merchant, expense_id), …]."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.executemany("UPDATE expenses SET merchant = ? WHERE id = ?", merchants)
+    _touch(cur, "expenses")
+    conn.commit()
+    conn.close()
+
+
+# ── Budgets ────────────────────────────────────────────────────────────────────
+
+@metrics.timed(metrics.DB_SECONDS)
+def set_budget(category: str, period: str, amount: float):
+    """Create or replace the budget for (category, period)."""
+    if period not in _PERIOD_STARTS:
+        raise ValueError(f"period must be one of {', '.join(_PERIOD_STARTS)}")
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("INSERT OR REPLACE INTO budgets (category, period, amount) VALUES (?, ?, ?)",
+                (category, period, amount))
+    _touch(cur, "budgets")
+    conn.commit()
+    conn.close()
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def delete_budget(category: str, period: str) -> bool:
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("DELETE FROM budgets WHERE category = ? AND period = ?", (category, period))
+    deleted = cur.rowcount > 0
+    if deleted:
+        _touch(cur, "budgets")
+    conn.commit()
+    conn.close()
+    return deleted
+
+
+def _budget_status(cur, category: str | None = None) -> list[dict]:
+    """Budget usage query, run on an existing cursor (see get_budget_status)."""
+    period_start = "CASE b.period " + " ".join(
+        f"WHEN '{name}' THEN {expr}" for name, expr in _PERIOD_STARTS.items()) + " END"
+    where, params = "", []
+    if category is not None:
+        where, params = "WHERE b.category IN (?, 'all')", [category]
+    cur.execute(f"""
+        SELECT category, period, amount, spent,
+               ROUND(spent * 100.0 / amount, 1) AS percent
+        FROM (
+            SELECT b.category, b.period, b.amount,
+                   CASE WHEN b.category = 'all'
+                        THEN (SELECT COALESCE(SUM(e.amount), 0) FROM expenses e
+                              WHERE e.created_at >= {period_start})
+                        ELSE (SELECT COALESCE(SUM(e.amount), 0) FROM expenses e
+                              WHERE e.category = b.category
+                                AND e.created_at >= {period_start})
+                   END AS spent
+            FROM budgets b
+            {where}
+        )
+        ORDER BY percent DESC
+    """, params)
+    return [dict(r) for r in cur.fetchall()]
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_budget_status(category: str | None = None) -> list[dict]:
+    """
+    Every budget (or those for `category` and 'all') with the amount spent
+    in its current period and the percentage used.
+    """
+    conn = get_connection()
+    rows = _budget_status(conn.cursor(), category)
+    conn.close()
+    return rows
+
+
+# ── Category keywords ──────────────────────────────────────────────────────────
+
+@metrics.timed(metrics.DB_SECONDS)
+def add_category_keyword(keyword: str, category: str, weight: float = 1.0):
+    """Add or update a user keyword → category mapping."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute(
+        """INSERT INTO category_keywords (keyword, category, weight) VALUES (?, ?, ?)
+           ON CONFLICT(keyword) DO UPDATE SET category = excluded.category,
+                                              weight   = excluded.weight""",
+        (keyword, category, weight),
+    )
+    _touch(cur, "category_keywords")
+    conn.commit()
+    conn.close()
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_category_keywords() -> list[dict]:
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("SELECT keyword, category, weight FROM category_keywords ORDER BY category, keyword")
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def delete_category_keyword(keyword: str) -> bool:
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("DELETE FROM category_keywords WHERE keyword = ?", (keyword,))
+    deleted = cur.rowcount > 0
+    if deleted:
+        _touch(cur, "category_keywords")
+    conn.commit()
+    conn.close()
+    return deleted
+
+
 # ── Memories ───────────────────────────────────────────────────────────────────
 
+@metrics.timed(metrics.DB_SECONDS)
 def add_memory(content: str):
     conn = get_connection()
     cur  = conn.cursor()
     cur.execute("INSERT INTO memories (content) VALUES (?)", (content,))
+    _touch(cur, "memories")
     conn.commit()
     conn.close()
 
 
+@metrics.timed(metrics.DB_SECONDS)
 def get_all_memories() -> list[dict]:
     conn = get_connection()
     cur  = conn.cursor()
@@ -207,8 +812,9 @@ def get_all_memories() -> list[dict]:
 
 # ── Contacts ───────────────────────────────────────────────────────────────────
 
-def add_contact(name: str, phone: str = None, email: str = None):
-    """Add or update a contact."""
+@metrics.timed(metrics.DB_SECONDS)
+def add_contact(name: str, phone: str = None, email: str = None) -> dict:
+    """Add or update a contact; returns the stored row."""
     conn = get_connection()
     cur  = conn.cursor()
     try:
@@ -216,6 +822,7 @@ def add_contact(name: str, phone: str = None, email: str = None):
             "INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)",
             (name, phone, email)
         )
+        _touch(cur, "contacts")
         conn.commit()
     except sqlite3.IntegrityError:
         # Contact already exists, update it
@@ -223,11 +830,16 @@ def add_contact(name: str, phone: str = None, email: str = None):
             "UPDATE contacts SET phone = ?, email = ? WHERE name = ?",
             (phone, email, name)
         )
+        _touch(cur, "contacts")
         conn.commit()
+    try:
+        cur.execute("SELECT * FROM contacts WHERE name = ?", (name,))
+        return dict(cur.fetchone())
     finally:
         conn.close()
 
 
+@metrics.timed(metrics.DB_SECONDS)
 def get_contact(name: str) -> dict | None:
     """Get a specific contact by name."""
     conn = get_connection()
@@ -238,6 +850,7 @@ def get_contact(name: str) -> dict | None:
     return dict(row) if row else None
 
 
+@metrics.timed(metrics.DB_SECONDS)
 def get_all_contacts() -> list[dict]:
     """Get all contacts."""
     conn = get_connection()
@@ -248,27 +861,155 @@ def get_all_contacts() -> list[dict]:
     return rows
 
 
+@metrics.timed(metrics.DB_SECONDS)
 def delete_contact(name: str) -> bool:
     """Delete a contact by name."""
     conn = get_connection()
     cur  = conn.cursor()
     cur.execute("DELETE FROM contacts WHERE name = ? COLLATE NOCASE", (name,))
-    conn.commit()
     deleted = cur.rowcount > 0
+    if deleted:
+        _touch(cur, "contacts")
+    conn.commit()
     conn.close()
     return deleted
 
 
+# ── Study sessions ─────────────────────────────────────────────────────────────
+
+@metrics.timed(metrics.DB_SECONDS)
+def add_study_session(work_minutes: int, break_minutes: int, cycles: int,
+                      phase_ends_at: int) -> int:
+    """Store a new running session (first work phase) and return its id."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute(
+        """INSERT INTO study_sessions
+               (status, phase, cycle, cycles, work_minutes, break_minutes, phase_ends_at)
+           VALUES ('running', 'work', 1, ?, ?, ?, ?)""",
+        (cycles, work_minutes, break_minutes, phase_ends_at),
+    )
+    session_id = cur.lastrowid
+    _touch(cur, "study_sessions")
+    conn.commit()
+    conn.close()
+    return session_id
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def update_study_session(session_id: int, expect_generation: int | None = None,
+                         **fields) -> bool:
+    """
+    Set the given columns (status, phase, cycle, phase_ends_at,
+    remaining_seconds, generation).  With `expect_generation` the row is
+    only changed if its generation still has that value – a compare-and-set
+    in one UPDATE.  Returns whether the row was changed.
+    """
+    allowed = {"status", "phase", "cycle", "phase_ends_at", "remaining_seconds", "generation"}
+    unknown = set(fields) - allowed
+    if unknown:
+        raise ValueError(f"unknown study_sessions column(s): {', '.join(sorted(unknown))}")
+    if not fields:
+        return False
+    conn = get_connection()
+    cur  = conn.cursor()
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    if expect_generation is None:
+        cur.execute(f"UPDATE study_sessions SET {assignments} WHERE id = ?",
+                    (*fields.values(), session_id))
+    else:
+        cur.execute(f"UPDATE study_sessions SET {assignments} WHERE id = ? AND generation = ?",
+                    (*fields.values(), session_id, expect_generation))
+    changed = cur.rowcount == 1
+    if changed:
+        _touch(cur, "study_sessions")
+    conn.commit()
+    conn.close()
+    return changed
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_study_session(session_id: int) -> dict | None:
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("SELECT * FROM study_sessions WHERE id = ?", (session_id,))
+    row = cur.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_active_study_sessions() -> list[dict]:
+    """Running and paused sessions, oldest first."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("""
+        SELECT * FROM study_sessions
+        WHERE status IN ('running', 'paused')
+        ORDER BY id
+    """)
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+# ── Events ─────────────────────────────────────────────────────────────────────
+
+EVENT_LOG_SIZE = 1000     # most recent events kept for relay / replay
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def add_event(topic: str, payload: str, origin: int, created_at: float) -> int:
+    """Append an event (payload is JSON text); trims old rows.  Returns its id."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute(
+        "INSERT INTO events (topic, payload, origin, created_at) VALUES (?, ?, ?, ?)",
+        (topic, payload, origin, created_at),
+    )
+    event_id = cur.lastrowid
+    if event_id % 100 == 0:
+        cur.execute("DELETE FROM events WHERE id <= ?", (event_id - EVENT_LOG_SIZE,))
+    conn.commit()
+    conn.close()
+    return event_id
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_events_after(after_id: int, limit: int = 500) -> list[dict]:
+    """Events with id > after_id, oldest first."""
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("SELECT * FROM events WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+@metrics.timed(metrics.DB_SECONDS)
+def get_last_event_id() -> int:
+    conn = get_connection()
+    cur  = conn.cursor()
+    cur.execute("SELECT COALESCE(MAX(id), 0) FROM events")
+    last = cur.fetchone()[0]
+    conn.close()
+    return last
+
+
+@metrics.timed(metrics.DB_SECONDS)
 def clear_all_data():
-    """Clear all data: reminders, expenses, memories, and contacts."""
+    """Clear all data: reminders, expenses, memories, contacts and study sessions."""
     conn = get_connection()
     cur  = conn.cursor()
     
     # Delete all records from tables
     cur.execute("DELETE FROM reminders")
     cur.execute("DELETE FROM expenses")
+    cur.execute("DELETE FROM budgets")
     cur.execute("DELETE FROM memories")
     cur.execute("DELETE FROM contacts")
+    cur.execute("DELETE FROM study_sessions")
+    _touch(cur, "reminders", "expenses", "budgets", "memories", "contacts", "study_sessions")
     
     conn.commit()
     conn.close()
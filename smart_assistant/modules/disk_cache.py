@@ -0,0 +1,202 @@
+"""
+modules/disk_cache.py
+======================
+A small size-bounded, least-recently-used cache of files on disk.
+
+Each entry is one file named after a hash of its key, with a JSON sidecar
+(`<name>.meta`) holding its creation time plus whatever the caller stores
+(e.g. how long the entry took to produce).  Recency is tracked with the
+file mtime, so the LRU order survives restarts.  An optional `ttl` expires
+entries by age regardless of use; an entry without a sidecar counts as
+expired then.
+
+The directory itself is the index – nothing about the entries is kept in
+memory – so several processes (gunicorn workers) can share one cache:
+an entry written by one is a hit in the others.  After every put the
+directory is scanned and, while the files add up to more than
+`max_bytes`, the least recently used are deleted.  Hit / miss / eviction
+counters are per process.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+_META_SUFFIX = ".meta"
+ORPHAN_SECONDS = 60       # a sidecar without its file this old is left over
+
+
+class DiskCache:
+    """Thread- and process-safe on-disk LRU.  Keys are any JSON-serialisable value."""
+
+    def __init__(self, directory: str, max_bytes: int, ttl: float | None = None,
+                 suffix: str = ""):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl       = ttl
+        self.suffix    = suffix
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self._lock     = threading.Lock()      # guards the counters
+        self._file_re  = re.compile(r"[0-9a-f]{40}" + re.escape(suffix))
+
+    # ── internals ──────────────────────────────────────────────────────────────
+
+    def _name(self, key) -> str:
+        raw = json.dumps(key, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest() + self.suffix
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_meta(self, name: str) -> dict | None:
+        try:
+            with open(self._path(name) + _META_SUFFIX, encoding="utf-8") as fh:
+                meta = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        return meta if isinstance(meta, dict) else None
+
+    def _write_meta(self, name: str, meta: dict):
+        tmp = self.temp_path() + _META_SUFFIX
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, self._path(name) + _META_SUFFIX)
+
+    def _remove(self, name: str):
+        # File first: a file without a sidecar is treated as expired, never
+        # as fresh; a sidecar without a file is a miss
+        for path in (self._path(name), self._path(name) + _META_SUFFIX):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _scan(self) -> tuple[list, int]:
+        """[(mtime, name, size)] of the cached files, LRU first, and their total size."""
+        files, orphans, now = [], [], time.time()
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return [], 0
+        names = {entry.name for entry in entries}
+        for entry in entries:
+            try:
+                if self._file_re.fullmatch(entry.name):
+                    st = entry.stat()
+                    files.append((st.st_mtime, entry.name, st.st_size))
+                elif entry.name.endswith(_META_SUFFIX) \
+                        and entry.name[:-len(_META_SUFFIX)] not in names \
+                        and now - entry.stat().st_mtime > ORPHAN_SECONDS:
+                    orphans.append(entry.path)
+            except OSError:          # removed by another process meanwhile
+                continue
+        for path in orphans:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        files.sort()
+        return files, sum(size for _, _, size in files)
+
+    def _evict(self):
+        files, total = self._scan()
+        evicted = 0
+        for _, name, size in files:
+            if total <= self.max_bytes:
+                break
+            self._remove(name)
+            total   -= size
+            evicted += 1
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+
+    def _expired(self, meta: dict | None) -> bool:
+        if self.ttl is None:
+            return False
+        return meta is None or time.time() - meta.get("created", 0) > self.ttl
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # ── public API ─────────────────────────────────────────────────────────────
+
+    def get(self, key) -> str | None:
+        """Path of the cached file for `key` (marked most recently used), or None."""
+        name = self._name(key)
+        path = self._path(name)
+        if not os.path.exists(path):
+            self._count(False)
+            return None
+        if self._expired(self._read_meta(name) if self.ttl is not None else None):
+            self._remove(name)
+            self._count(False)
+            return None
+        try:
+            os.utime(path)
+        except OSError:              # evicted by another process just now
+            self._count(False)
+            return None
+        self._count(True)
+        return path
+
+    def meta(self, key) -> dict:
+        """Metadata stored with `key` ({} if absent)."""
+        return self._read_meta(self._name(key)) or {}
+
+    def put_file(self, key, src_path: str, meta: dict | None = None) -> str:
+        """Move `src_path` into the cache under `key`; returns the cached path."""
+        name = self._name(key)
+        path = self._path(name)
+        self._write_meta(name, {"created": time.time(), **(meta or {})})
+        os.replace(src_path, path)
+        self._evict()
+        return path
+
+    def get_bytes(self, key) -> bytes | None:
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+    def put_bytes(self, key, data: bytes, meta: dict | None = None) -> str:
+        tmp = self.temp_path()
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        return self.put_file(key, tmp, meta)
+
+    def temp_path(self) -> str:
+        """A scratch path inside the cache directory (same filesystem → atomic move)."""
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory,
+                            f".tmp-{os.getpid()}-{threading.get_ident()}-{time.time_ns()}{self.suffix}")
+
+    def clear(self):
+        for _, name, _ in self._scan()[0]:
+            self._remove(name)
+
+    def stats(self) -> dict:
+        files, total = self._scan()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries":   len(files),
+                "bytes":     total,
+                "hits":      self.hits,
+                "misses":    self.misses,
+                "evictions": self.evictions,
+                "hit_rate":  self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,224 @@
+"""
+modules/events.py
+==================
+Publish / subscribe for server-side notifications – reminders firing,
+Pomodoro phase changes and progress – streamed to the web UI as
+Server-Sent Events by GET /api/events.
+
+publish(topic, data) hands an event to every subscriber.  Each subscriber
+(one per connected browser) has its own bounded queue: a client that falls
+MAX_QUEUED events behind loses the oldest ones (counted in `dropped`)
+instead of growing memory or blocking the publisher.  Threaded servers
+block in Subscriber.get(); the async server (asgi.py) sets `on_offer` to
+wake its event loop instead of parking a thread per stream.
+
+With several web worker processes an event is often published in a
+different process from the one holding a browser's connection.
+enable_relay() makes publish() also append events to the `events` table,
+and a relay thread forwards rows written by other processes to local
+subscribers every RELAY_INTERVAL seconds – only while somebody is
+subscribed.  The table doubles as the replay log for clients that
+reconnect with Last-Event-ID.
+"""
+
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from modules import database as db
+
+# Under the threaded server (gunicorn gthread) every open stream holds one
+# of the worker's ASSISTANT_THREADS threads, so only a quarter of them may
+# stream; the rest stay free for /api/chat (admission.py) and the other
+# routes.  asgi.py, where a stream is a parked coroutine, raises the cap.
+THREADS           = int(os.environ.get("ASSISTANT_THREADS", 16))   # per worker, see gunicorn.conf.py
+
+MAX_QUEUED        = 100     # events buffered per client before the oldest is dropped
+MAX_SUBSCRIBERS   = int(os.environ.get("ASSISTANT_SSE_STREAMS", max(1, THREADS // 4)))
+REPLAY_SIZE       = 100     # recent events kept in memory for reconnects (no relay)
+HEARTBEAT_SECONDS = 15.0    # comment line sent on idle streams so proxies keep them open
+RELAY_INTERVAL    = 0.5     # seconds between relay reads of the events table
+RETRY_MS          = 3000    # browser reconnect delay
+
+
+class Subscriber:
+    """One client's bounded event queue, optionally filtered by topic."""
+
+    def __init__(self, topics=None, max_queued: int = MAX_QUEUED):
+        self.topics  = set(topics) if topics else None
+        self.queue   = deque(maxlen=max_queued)
+        self.dropped = 0
+        self.closed  = False
+        self.on_offer = None        # called (from any thread) after an event is queued
+        self._cond   = threading.Condition()
+
+    def wants(self, event: dict) -> bool:
+        return self.topics is None or event["topic"] in self.topics
+
+    def offer(self, event: dict):
+        with self._cond:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(event)
+            self._cond.notify()
+        if self.on_offer is not None:
+            self.on_offer()
+
+    def get(self, timeout: float | None = None) -> list[dict]:
+        """Wait up to `timeout` seconds for events; returns everything queued."""
+        with self._cond:
+            if not self.queue and not self.closed:
+                self._cond.wait(timeout)
+            events = list(self.queue)
+            self.queue.clear()
+            return events
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        if self.on_offer is not None:
+            self.on_offer()
+
+
+_subscribers: set = set()
+_lock        = threading.Condition()
+_ids         = itertools.count(1)
+_recent      = deque(maxlen=REPLAY_SIZE)    # replay buffer without the relay
+_relay       = None                         # relay thread once enabled
+_relay_last  = 0                            # last events-table id seen by the relay
+
+
+def _event(event_id: int, topic: str, data, created: float) -> dict:
+    return {"id": event_id, "topic": topic, "data": data, "time": created}
+
+
+def _deliver(event: dict):
+    with _lock:
+        targets = [sub for sub in _subscribers if sub.wants(event)]
+    for sub in targets:
+        sub.offer(event)
+
+
+def publish(topic: str, data) -> dict:
+    """Send `data` (JSON-serialisable) to every subscriber of `topic`."""
+    created = time.time()
+    event_id = None
+    if _relay is not None:
+        try:
+            event_id = db.add_event(topic, json.dumps(data), os.getpid(), created)
+        except sqlite3.Error as e:
+            print(f"   [Events: could not log {topic} event for other workers: {e}]")
+    if event_id is None:
+        event_id = next(_ids)
+    event = _event(event_id, topic, data, created)
+    if _relay is None:
+        _recent.append(event)
+    _deliver(event)
+    return event
+
+
+def subscribe(topics=None, last_id: int | None = None) -> Subscriber | None:
+    """
+    New subscriber (None when MAX_SUBSCRIBERS are connected).  With
+    `last_id`, events after it that are still in the log are queued first.
+    """
+    global _relay_last
+    sub = Subscriber(topics)
+    with _lock:
+        if len(_subscribers) >= MAX_SUBSCRIBERS:
+            return None
+        if _relay is not None and not _subscribers:
+            # The relay idles without subscribers; start it from "now"
+            _relay_last = db.get_last_event_id()
+        if last_id is not None:
+            if _relay is not None:
+                missed = [_event(r["id"], r["topic"], json.loads(r["payload"]), r["created_at"])
+                          for r in db.get_events_after(last_id, limit=MAX_QUEUED)
+                          if r["id"] <= _relay_last]
+            else:
+                missed = [e for e in _recent if e["id"] > last_id]
+            for event in missed:
+                if sub.wants(event):
+                    sub.offer(event)
+        _subscribers.add(sub)
+        _lock.notify_all()
+    return sub
+
+
+def unsubscribe(sub: Subscriber):
+    sub.close()
+    with _lock:
+        _subscribers.discard(sub)
+
+
+def subscriber_count() -> int:
+    with _lock:
+        return len(_subscribers)
+
+
+# ── Cross-process relay ────────────────────────────────────────────────────────
+
+def _relay_once():
+    """Deliver events other processes logged since the last pass."""
+    global _relay_last
+    pid = os.getpid()
+    for row in db.get_events_after(_relay_last):
+        _relay_last = row["id"]
+        if row["origin"] != pid:
+            _deliver(_event(row["id"], row["topic"], json.loads(row["payload"]),
+                            row["created_at"]))
+
+
+def _relay_loop():
+    while True:
+        with _lock:
+            while not _subscribers:
+                _lock.wait()
+        time.sleep(RELAY_INTERVAL)
+        try:
+            _relay_once()
+        except Exception as e:
+            print(f"   [Events: relay read failed: {e}]")
+
+
+def enable_relay():
+    """Share events with other processes through the events table (idempotent)."""
+    global _relay, _relay_last
+    with _lock:
+        if _relay is not None:
+            return
+        _relay_last = db.get_last_event_id()
+        _relay = threading.Thread(target=_relay_loop, daemon=True, name="EventRelay")
+        _relay.start()
+
+
+def _reset_after_fork():
+    global _subscribers, _lock, _recent, _relay
+    _subscribers, _lock = set(), threading.Condition()
+    _recent, _relay     = deque(maxlen=REPLAY_SIZE), None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# ── Server-Sent Events ─────────────────────────────────────────────────────────
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['topic']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+def stream(sub: Subscriber, heartbeat: float = HEARTBEAT_SECONDS):
+    """SSE text for one subscriber until it is closed (or the client goes away)."""
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while not sub.closed:
+            events = sub.get(heartbeat)
+            yield "".join(format_sse(e) for e in events) if events else ": keep-alive\n\n"
+    finally:
+        unsubscribe(sub)
@@ -1,11 +1,14 @@
 """
 modules/expense_tracker.py
 ===========================
-Extracts the monetary amount and detects the category from a user
-sentence, then stores the expense in the SQLite database.
+Extracts the monetary amount, category and merchant from a user
+sentence, stores the expense in the SQLite database and warns when a
+budget is nearly used up.
 """
 
 import re
+import sqlite3
+import threading
 
 from modules import database as db
 
@@ -45,31 +48,201 @@ def _extract_amount(text: str) -> float | None:
     return float(match.group(1)) if match else None
 
 
-def _detect_category(text: str) -> str:
+# ── Category matcher ───────────────────────────────────────────────────────────
+# All keywords (built-in + user-added from the DB) are compiled once into a
+# single regex shaped like a trie, so one left-to-right scan finds every
+# keyword regardless of how many there are.  Matches are whole words (an
+# optional plural "s"/"es" is allowed), the longest keyword wins at each
+# position ("gas bill" over "gas"), and every match adds its weight × word
+# count to its category's score.
+
+_matcher = None          # (compiled regex, {keyword: (category, weight)})
+_matcher_version = None  # db.table_version("category_keywords") it was built from
+_matcher_lock = threading.Lock()
+
+
+def _normalise_keyword(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+
+def _trie_regex(node: dict) -> str:
+    """Regex for the keywords stored in a character trie ("" marks a word end)."""
+    branches = []
+    for ch in sorted(k for k in node if k):
+        atom = r"\s+" if ch == " " else re.escape(ch)
+        branches.append(atom + _trie_regex(node[ch]))
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        # Keyword may end here – the greedy "?" still tries the longer one first
+        body = (f"(?:{body})" if len(branches) == 1 else body) + "?"
+    return body
+
+
+def build_category_matcher(keywords: dict[str, tuple[str, float]]):
+    """Compile {keyword: (category, weight)} into a (regex, lookup) matcher."""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    pattern = re.compile(r"\b(?P<kw>" + _trie_regex(trie) + r")(?:e?s)?\b")
+    return pattern, keywords
+
+
+def _load_keywords() -> dict[str, tuple[str, float]]:
+    """Built-in keywords plus the user's (which override on conflict)."""
+    keywords = {}
+    for category, words in CATEGORY_KEYWORDS.items():
+        for word in words:
+            keywords.setdefault(_normalise_keyword(word), (category, 1.0))
+    try:
+        for row in db.get_category_keywords():
+            keywords[_normalise_keyword(row["keyword"])] = (row["category"], row["weight"])
+    except sqlite3.OperationalError:
+        pass     # database not initialised yet – built-ins only
+    return keywords
+
+
+def _get_matcher():
+    """The compiled matcher, rebuilt when any process changed the user's keywords."""
+    global _matcher, _matcher_version
+    version = db.table_version("category_keywords")
+    if _matcher is None or version != _matcher_version:
+        with _matcher_lock:
+            if _matcher is None or version != _matcher_version:
+                _matcher, _matcher_version = build_category_matcher(_load_keywords()), version
+    return _matcher
+
+
+def reload_keywords():
+    """Drop the compiled matcher; it is rebuilt (with DB keywords) on next use."""
+    global _matcher
+    _matcher = None
+
+
+def score_categories(text: str, matcher=None) -> dict[str, float]:
+    """Weighted keyword score per category for `text` (only categories that matched)."""
+    pattern, keywords = matcher or _get_matcher()
+    scores: dict[str, float] = {}
+    for m in pattern.finditer(text.lower()):
+        keyword = _normalise_keyword(m.group("kw"))
+        category, weight = keywords[keyword]
+        scores[category] = scores.get(category, 0.0) + weight * (keyword.count(" ") + 1)
+    return scores
+
+
+def _detect_category(text: str, matcher=None) -> str:
     """
-    Return the most likely expense category based on keyword matching.
+    Return the highest-scoring expense category (first match wins ties).
     Falls back to DEFAULT_CATEGORY if no keywords match.
     """
-    text_lower = text.lower()
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for kw in keywords:
-            if kw in text_lower:
-                return category
-    return DEFAULT_CATEGORY
+    scores = score_categories(text, matcher)
+    if not scores:
+        return DEFAULT_CATEGORY
+    # dicts keep insertion order = order of first match, and max() keeps the first
+    return max(scores, key=scores.get)
+
+
+def add_category_keyword(keyword: str, category: str, weight: float = 1.0):
+    """Teach a new keyword (stored in the DB) and rebuild the matcher."""
+    db.add_category_keyword(_normalise_keyword(keyword), category.strip().lower(), weight)
+    reload_keywords()
+
+
+def remove_category_keyword(keyword: str) -> bool:
+    deleted = db.delete_category_keyword(_normalise_keyword(keyword))
+    reload_keywords()
+    return deleted
+
+
+# ── Merchants ──────────────────────────────────────────────────────────────────
+
+_MERCHANT_RE   = re.compile(r"\b(?:at|from)\s+(?:the\s+)?([a-z][\w&'.-]*(?:\s+[a-z][\w&'.-]*){0,2})")
+_MERCHANT_STOP = {"for", "on", "to", "and", "with", "today", "yesterday", "tonight",
+                  "this", "last", "in", "of", "by", "rupees", "rs", "dollars", "bucks"}
+_NOT_MERCHANTS = {"home", "work", "night", "morning", "noon", "evening", "office", "all"}
+
+
+def _extract_merchant(text: str) -> str:
+    """
+    Merchant named after "at"/"from" ("coffee at starbucks" → "starbucks"),
+    or "" when there is none.
+    """
+    match = _MERCHANT_RE.search(text.lower())
+    if not match:
+        return ""
+    words = []
+    for word in match.group(1).split():
+        if word in _MERCHANT_STOP:
+            break
+        words.append(word.strip(".'"))
+    merchant = " ".join(w for w in words if w)
+    return "" if merchant in _NOT_MERCHANTS else merchant
+
+
+def log_expense_slots(text: str) -> dict:
+    """Slots for the log_expense intent."""
+    return {"amount": _extract_amount(text), "category": _detect_category(text),
+            "merchant": _extract_merchant(text)}
+
+
+def backfill_merchants(batch_size: int = 1000):
+    """Extract merchants for expenses logged before the merchant column existed."""
+    while True:
+        rows = db.get_unparsed_expenses(batch_size)
+        if not rows:
+            return
+        db.set_expense_merchants([(_extract_merchant(r["note"] or ""), r["id"]) for r in rows])
+
+
+# ── Budgets ────────────────────────────────────────────────────────────────────
+BUDGET_WARNING_PERCENT = 80
+
+
+def _budget_messages(budgets: list[dict]) -> list[str]:
+    """Warnings for the budgets (get_budget_status rows) near or over their limit."""
+    alerts = []
+    for b in budgets:
+        what = "overall" if b["category"] == "all" else f"'{b['category']}'"
+        period = {"day": "daily", "week": "weekly", "month": "monthly"}[b["period"]]
+        if b["percent"] >= 100:
+            alerts.append(f"You're over your {period} {what} budget: "
+                          f"₹{b['spent']:.2f} of ₹{b['amount']:.2f}.")
+        elif b["percent"] >= BUDGET_WARNING_PERCENT:
+            alerts.append(f"Heads up: you've used {b['percent']:.0f}% of your "
+                          f"{period} {what} budget.")
+    return alerts
+
+
+def budget_alerts(category: str | None = None) -> list[str]:
+    """Warnings for budgets (optionally only `category` + overall) near or over their limit."""
+    return _budget_messages(db.get_budget_status(category))
 
 
-def log_expense(user_text: str) -> str:
+def log_expense(user_text: str, slots: dict | None = None) -> str:
     """
     Parse the sentence, detect amount + category, save to DB.
+    `slots` (from modules.nlu) skips re-parsing when already extracted.
     Returns a user-facing confirmation string.
     """
-    amount   = _extract_amount(user_text)
-    category = _detect_category(user_text)
+    if slots is None:
+        slots = log_expense_slots(user_text)
+    amount   = slots["amount"]
+    category = slots["category"]
+    merchant = slots.get("merchant")
+    if merchant is None:
+        merchant = _extract_merchant(user_text)
 
     if amount is None:
         return ("I couldn't find an amount in your message. "
                 "Try saying something like 'I spent 150 on food'.")
 
-    db.add_expense(amount=amount, category=category, note=user_text)
-    return (f"Logged expense: ₹{amount:.2f} under '{category}'. "
-            f"Your total spending today is ₹{db.get_total_expenses_today():.2f}.")
+    # Insert + today's totals + budget usage in one transaction
+    result   = db.add_expense_with_totals(amount=amount, category=category,
+                                          note=user_text, merchant=merchant)
+    response = (f"Logged expense: ₹{amount:.2f} under '{category}'. "
+                f"Your total spending today is ₹{result['daily_total']:.2f}.")
+    return "  ".join([response] + _budget_messages(result["budgets"]))
@@ -0,0 +1,92 @@
+"""
+modules/handlers.py
+====================
+Handlers for the intents that have no feature module of their own:
+greetings, the time, the daily summary, memories and goodbye.  Like every
+handler in the intent registry (modules/intents.py) they take
+(user_text, slots) and return the reply.
+"""
+
+from datetime import datetime
+
+from modules import database as db
+
+
+def greeting(user_text: str = "", slots: dict | None = None) -> str:
+    """Return a time-based greeting."""
+    hour = datetime.now().hour
+    if hour < 12:
+        greeting = "Good morning"
+    elif hour < 17:
+        greeting = "Good afternoon"
+    else:
+        greeting = "Good evening"
+
+    name = db.get_user_name()
+    if name:
+        return f"{greeting}, {name}! How can I help you today?"
+    return f"{greeting}! How can I assist you?"
+
+
+def tell_time(user_text: str = "", slots: dict | None = None) -> str:
+    """Return current time and date."""
+    now = datetime.now()
+    time_str = now.strftime("%I:%M %p")
+    date_str = now.strftime("%A, %d %B %Y")
+    return f"The current time is {time_str} and today is {date_str}."
+
+
+def daily_summary(user_text: str = "", slots: dict | None = None) -> str:
+    """Return a summary of reminders, expenses, and memories."""
+    lines = []
+    name = db.get_user_name()
+    if name:
+        lines.append(f"Here is your daily summary, {name}.")
+
+    # Reminders
+    reminders = db.get_todays_reminders()
+    if reminders:
+        lines.append(f"You have {len(reminders)} reminder(s):")
+        for r in reminders:
+            status = "✔ done" if r["notified"] else "⏳ pending"
+            lines.append(f"  • {r['message']} at {r['remind_at']} ({status})")
+    else:
+        lines.append("No reminders set for today.")
+
+    # Expenses
+    expenses = db.get_todays_expenses()
+    total = db.get_total_expenses_today()
+    if expenses:
+        lines.append(f"Today's expenses total ₹{total:.2f} across {len(expenses)} transaction(s).")
+    else:
+        lines.append("No expenses logged today.")
+
+    # Memories
+    memories = db.get_all_memories()
+    if memories:
+        lines.append(f"You have {len(memories)} stored memory/memories.")
+
+    return "  ".join(lines)
+
+
+def store_memory(user_text: str, slots: dict | None = None) -> str:
+    """Store user memory."""
+    for phrase in ["remember that", "save this", "note that", "store", "remember", "save"]:
+        if user_text.lower().startswith(phrase):
+            content = user_text[len(phrase):].strip(" :.")
+            break
+    else:
+        content = user_text
+
+    if content:
+        db.add_memory(content)
+        return f"Memory saved: \"{content}\"."
+    return "I didn't catch what to remember. Could you repeat that?"
+
+
+def goodbye(user_text: str = "", slots: dict | None = None) -> str:
+    """Return exit message."""
+    name = db.get_user_name()
+    if name:
+        return f"Goodbye, {name}! Have a great day!"
+    return "Goodbye! Have a great day!"
@@ -3,32 +3,54 @@ modules/intent_classifier.py
 ==============================
 Loads the saved TF-IDF vectorizer and Logistic Regression model,
 then exposes a single predict() function used by main.py.
+
+If train_model.py also saved a calibration file, probabilities are
+temperature-scaled (softmax of decision scores / T) so that the
+confidence values track how often the classifier is actually right.
 """
 
 import os
-import joblib
+
+# joblib / numpy / scikit-learn are imported on first prediction, not at
+# import time, so entry points start quickly.
 
 # ── paths ──────────────────────────────────────────────────────────────────────
 BASE_DIR        = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 VECTORIZER_PATH = os.path.join(BASE_DIR, "model", "vectorizer.joblib")
 MODEL_PATH      = os.path.join(BASE_DIR, "model", "intent_model.joblib")
+CALIBRATION_PATH = os.path.join(BASE_DIR, "model", "calibration.joblib")
 
 # Module-level cache so we only load the model once
-_vectorizer = None
-_model      = None
+_vectorizer  = None
+_model       = None
+_temperature = None   # None → use the model's own predict_proba
 
 
 def _load_models():
     """Load models from disk (only once per session)."""
-    global _vectorizer, _model
+    global _vectorizer, _model, _temperature
 
     if _vectorizer is None or _model is None:
+        import joblib
         if not os.path.exists(MODEL_PATH):
             raise FileNotFoundError(
                 "Model not found. Please run  python train_model.py  first."
             )
         _vectorizer = joblib.load(VECTORIZER_PATH)
         _model      = joblib.load(MODEL_PATH)
+        if os.path.exists(CALIBRATION_PATH):
+            _temperature = float(joblib.load(CALIBRATION_PATH)["temperature"])
+
+
+def _proba(vec):
+    """Return calibrated class probabilities for a single vectorised row."""
+    import numpy as np
+    if _temperature is None:
+        return _model.predict_proba(vec)[0]
+    logits = np.atleast_1d(_model.decision_function(vec)[0]) / _temperature
+    logits = logits - logits.max()
+    exp    = np.exp(logits)
+    return exp / exp.sum()
 
 
 def predict(text: str) -> str:
@@ -56,8 +78,17 @@ def predict_with_confidence(text: str) -> tuple[str, float]:
     Same as predict() but also returns the confidence score (0–1).
     Useful for debugging / fallback logic.
     """
+    return predict_top_k(text, k=1)[0]
+
+
+def predict_top_k(text: str, k: int = 3) -> list[tuple[str, float]]:
+    """
+    Return the k most likely intents with their calibrated probabilities,
+    best first, e.g. [('set_reminder', 0.81), ('store_memory', 0.09), …].
+    """
+    import numpy as np
     _load_models()
-    vec         = _vectorizer.transform([text.lower()])
-    intent      = _model.predict(vec)[0]
-    proba       = _model.predict_proba(vec).max()
-    return intent, float(proba)
+    vec   = _vectorizer.transform([text.lower()])
+    proba = _proba(vec)
+    order = np.argsort(proba)[::-1][:k]
+    return [(str(_model.classes_[i]), float(proba[i])) for i in order]
@@ -0,0 +1,188 @@
+"""
+modules/intents.py
+===================
+The intent registry: one table from intent name to its handler, its slot
+extractor and how it should be scheduled, shared by main.py, app.py and
+asgi.py – a message is routed with one dict lookup instead of an if/elif
+chain per front end.
+
+    register("open_app", "modules.app_launcher:open_app",
+             slots="modules.app_launcher:open_app_slots", required_slot="app",
+             limit=2, pool="spawn")
+
+Handlers and extractors are named as "module:function" and imported on
+first use, so start-up only loads the modules a message actually needs
+(app.init_app() calls preload() so pre-forked workers share them).
+Handlers take (user_text, slots) and return the reply; extractors take the
+normalised text and return the slot dict.
+
+Metadata
+    cheap          answered from memory, no I/O at all – skips the admission
+                   queue and runs on asgi.py's event loop
+    limit          requests of this intent in flight at once (None: no cap)
+    pool           asgi.py executor for the handler: "spawn", "io" or "db"
+    ends_session   the CLI says the reply and exits
+
+Plugins
+    Every module in plugins/, and every module named in ASSISTANT_PLUGINS
+    (comma-separated), is imported the first time the registry is used.  A
+    plugin calls register() for its intents and may define TRAINING_DATA
+    [(sentence, intent), …], which train_model.py adds to the corpus – the
+    classifier has to be retrained before it predicts a new intent.
+"""
+
+import importlib
+import os
+import pkgutil
+
+
+class Intent:
+    """One registered intent: handler and slot extractor (lazy) plus metadata."""
+
+    __slots__ = ("name", "handler_path", "slots_path", "required_slot",
+                 "cheap", "limit", "pool", "ends_session", "_handler", "_slots")
+
+    def __init__(self, name: str, handler: str, slots: str | None = None,
+                 required_slot: str | None = None, cheap: bool = False,
+                 limit: int | None = None, pool: str = "db", ends_session: bool = False):
+        self.name          = name
+        self.handler_path  = handler
+        self.slots_path    = slots
+        self.required_slot = required_slot
+        self.cheap         = cheap
+        self.limit         = limit
+        self.pool          = pool
+        self.ends_session  = ends_session
+        self._handler      = None
+        self._slots        = None
+
+    @property
+    def handler(self):
+        if self._handler is None:
+            self._handler = _resolve(self.handler_path)
+        return self._handler
+
+    @property
+    def extractor(self):
+        if self._slots is None and self.slots_path is not None:
+            self._slots = _resolve(self.slots_path)
+        return self._slots
+
+
+_registry: dict = {}
+_plugins_loaded = False
+_plugin_examples = []       # TRAINING_DATA of loaded plugins
+
+
+def _resolve(path: str):
+    """The function named by "package.module:function" (imports the module)."""
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def register(name: str, handler: str, **meta) -> Intent:
+    """Add (or replace) an intent; see the module docstring for `meta`."""
+    intent = _registry[name] = Intent(name, handler, **meta)
+    return intent
+
+
+def get(name: str) -> Intent | None:
+    """The registered intent, or None."""
+    if not _plugins_loaded:
+        load_plugins()
+    return _registry.get(name)
+
+
+def all_intents() -> dict:
+    if not _plugins_loaded:
+        load_plugins()
+    return dict(_registry)
+
+
+def dispatch(name: str, user_text: str, slots: dict) -> str | None:
+    """Run the intent's handler; None when no handler is registered for it."""
+    intent = get(name)
+    if intent is None:
+        return None
+    return intent.handler(user_text, slots)
+
+
+def extract_slots(name: str, text: str) -> dict:
+    """Slots for `name` (empty for slot-free or unknown intents)."""
+    intent = get(name)
+    extractor = intent.extractor if intent is not None else None
+    return extractor(text) if extractor else {}
+
+
+def is_cheap(name: str) -> bool:
+    intent = get(name)
+    return intent is not None and intent.cheap
+
+
+def preload():
+    """Import every handler and extractor now (before forking workers)."""
+    for intent in all_intents().values():
+        _ = intent.handler
+        _ = intent.extractor
+
+
+# ── Plugins ────────────────────────────────────────────────────────────────────
+
+def load_plugins():
+    """Import plugins/ and ASSISTANT_PLUGINS modules once; they register themselves."""
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    names = []
+    try:
+        import plugins
+        names += [f"plugins.{m.name}" for m in pkgutil.iter_modules(plugins.__path__)]
+    except ImportError:
+        pass
+    names += [n.strip() for n in os.environ.get("ASSISTANT_PLUGINS", "").split(",") if n.strip()]
+    for name in names:
+        try:
+            module = importlib.import_module(name)
+        except Exception as e:
+            print(f"   [Intents: could not load plugin {name}: {e}]")
+            continue
+        _plugin_examples.extend(getattr(module, "TRAINING_DATA", []))
+
+
+def plugin_training_data() -> list[tuple[str, str]]:
+    """(sentence, intent) examples contributed by plugins."""
+    load_plugins()
+    return list(_plugin_examples)
+
+
+# ── Built-in intents ───────────────────────────────────────────────────────────
+
+register("greeting",       "modules.handlers:greeting")        # reads the user name
+register("tell_time",      "modules.handlers:tell_time", cheap=True)
+register("exit",           "modules.handlers:goodbye", ends_session=True)
+register("daily_summary",  "modules.handlers:daily_summary", limit=4)
+register("store_memory",   "modules.handlers:store_memory")
+register("list_apps",      "modules.app_launcher:list_apps")   # polls launched processes
+register("open_app",       "modules.app_launcher:open_app",
+         slots="modules.app_launcher:open_app_slots", required_slot="app",
+         limit=2, pool="spawn")
+register("close_app",      "modules.app_launcher:close_app",     # may wait CLOSE_TIMEOUT
+         slots="modules.app_launcher:close_app_slots", required_slot="app",
+         limit=1, pool="spawn")
+register("search_google",  "modules.web_search:search_google",
+         slots="modules.web_search:search_google_slots", required_slot="query",
+         limit=4, pool="io")
+register("set_reminder",   "modules.reminder:set_reminder",
+         slots="modules.reminder:set_reminder_slots", required_slot="time")
+register("study_mode",     "modules.study_mode:start_study_mode",
+         slots="modules.study_mode:_parse_study_command", limit=1)
+register("log_expense",    "modules.expense_tracker:log_expense",
+         slots="modules.expense_tracker:log_expense_slots", required_slot="amount")
+register("add_contact",    "modules.contacts:add_contact_handler",
+         slots="modules.contacts:add_contact_slots", required_slot="phone")
+register("view_contact",   "modules.contacts:get_contact_handler",
+         slots="modules.contacts:view_contact_slots", required_slot="contact")
+register("list_contacts",  "modules.contacts:list_contacts_handler")
+register("delete_contact", "modules.contacts:delete_contact_handler",
+         slots="modules.contacts:delete_contact_slots", required_slot="contact")
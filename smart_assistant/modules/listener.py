@@ -0,0 +1,424 @@
+"""
+modules/listener.py
+====================
+Continuous voice capture.
+
+Instead of opening the microphone, calibrating and blocking on every turn,
+a background capture thread reads fixed-size frames from an audio source
+for as long as the assistant runs:
+
+    source ──frames──▶ capture thread (VAD) ──segments──▶ recogniser thread
+                                                               │
+                                          next_utterance() ◀───┘  (queue of text)
+
+* **Noise calibration** – the first CALIBRATION_SECONDS of audio set the
+  noise floor; afterwards the floor keeps following the energy of frames
+  classified as silence, refreshed every NOISE_REFRESH_SECONDS.
+* **Voice activity detection** – a frame is speech when its RMS energy is
+  SPEECH_RATIO × the noise floor.  A phrase starts after MIN_SPEECH_SECONDS
+  of speech (with PRE_ROLL_SECONDS of audio kept before it) and ends after
+  PAUSE_SECONDS of silence or PHRASE_LIMIT_SECONDS in total.
+* **Muting** – while `muted()` is true (the assistant is speaking, see
+  speech.is_speaking) and for ECHO_TAIL_SECONDS after, audio is discarded
+  so the assistant's own voice is never transcribed as a command.
+* **Pluggable recognisers** – anything with `recognize(segment) -> str | None`.
+  GoogleRecognizer / SphinxRecognizer wrap SpeechRecognition; FixtureRecognizer
+  returns canned transcripts so recorded WAV files can drive the pipeline
+  without a network or microphone.
+
+Audio is 16-bit (or 32-bit) signed mono PCM.  Energy is computed with
+`array` + `math` (the stdlib `audioop` module is deprecated).
+"""
+
+import array
+import math
+import os
+import queue
+import sys
+import threading
+import time
+import wave
+
+# ── Tunables ───────────────────────────────────────────────────────────────────
+FRAME_SECONDS         = 0.03    # analysis frame length
+CALIBRATION_SECONDS   = 0.5     # initial noise-floor measurement
+NOISE_REFRESH_SECONDS = 10.0    # how often the floor follows ambient noise
+SPEECH_RATIO          = 3.0     # speech energy ÷ noise floor
+MIN_ENERGY            = 100.0   # floor never drops below this (16-bit RMS)
+MIN_SPEECH_SECONDS    = 0.09    # speech needed before a phrase starts
+PRE_ROLL_SECONDS      = 0.3     # audio kept from before the phrase started
+PAUSE_SECONDS         = 0.6     # silence that ends a phrase
+PHRASE_LIMIT_SECONDS  = 10.0    # hard cap on one phrase
+QUEUE_SIZE            = 8       # recognised utterances waiting to be consumed
+ECHO_TAIL_SECONDS     = 0.3     # audio still discarded after muting ends
+
+_TYPECODES = {2: "h", 4: "i"}   # sample width → array typecode
+
+
+def rms(frame: bytes, sample_width: int = 2) -> float:
+    """Root-mean-square energy of a PCM frame (in 16-bit units)."""
+    samples = array.array(_TYPECODES[sample_width])
+    samples.frombytes(frame[: len(frame) - len(frame) % sample_width])
+    if not samples:
+        return 0.0
+    if sys.byteorder == "big":
+        samples.byteswap()       # WAV / PyAudio data is little-endian
+    value = math.sqrt(math.fsum(s * s for s in samples) / len(samples))
+    return value / (1 << (8 * (sample_width - 2)))
+
+
+class AudioSegment:
+    """One detected phrase: raw mono PCM plus its format."""
+
+    __slots__ = ("pcm", "sample_rate", "sample_width", "started")
+
+    def __init__(self, pcm: bytes, sample_rate: int, sample_width: int, started: float):
+        self.pcm          = pcm
+        self.sample_rate  = sample_rate
+        self.sample_width = sample_width
+        self.started      = started     # seconds into the stream
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / (self.sample_rate * self.sample_width)
+
+    def __repr__(self) -> str:
+        return f"<AudioSegment {self.started:.2f}s +{self.duration:.2f}s>"
+
+
+# ── Audio sources ──────────────────────────────────────────────────────────────
+# A source is a context manager with `sample_rate`, `sample_width` and
+# `read(n_frames) -> bytes` returning b"" at end of stream.
+
+class MicrophoneSource:
+    """The default microphone, via SpeechRecognition / PyAudio."""
+
+    def __init__(self, device_index: int | None = None, sample_rate: int = 16000):
+        self.device_index = device_index
+        self.sample_rate  = sample_rate
+        self.sample_width = 2
+        self._mic         = None
+
+    def __enter__(self):
+        import speech_recognition as sr
+        self._mic = sr.Microphone(device_index=self.device_index,
+                                  sample_rate=self.sample_rate)
+        self._mic.__enter__()
+        self.sample_rate  = self._mic.SAMPLE_RATE
+        self.sample_width = self._mic.SAMPLE_WIDTH
+        return self
+
+    def __exit__(self, *exc):
+        if self._mic is not None:
+            self._mic.__exit__(*exc)
+            self._mic = None
+
+    def read(self, n_frames: int) -> bytes:
+        return self._mic.stream.read(n_frames)
+
+
+class WavFileSource:
+    """
+    A recorded WAV file (16/32-bit PCM; only the first channel is used).
+    With `realtime=True` reads are paced like a live microphone.
+    """
+
+    def __init__(self, path: str, realtime: bool = False):
+        self.path         = path
+        self.realtime     = realtime
+        self._wav         = None
+        self._t0          = 0.0
+        self._read_frames = 0
+
+    def __enter__(self):
+        self._wav = wave.open(self.path, "rb")
+        self.sample_rate  = self._wav.getframerate()
+        self.sample_width = self._wav.getsampwidth()
+        self._channels    = self._wav.getnchannels()
+        if self.sample_width not in _TYPECODES:
+            raise ValueError(f"{self.path}: unsupported sample width {self.sample_width}")
+        self._t0 = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+    def read(self, n_frames: int) -> bytes:
+        data = self._wav.readframes(n_frames)
+        if self._channels > 1 and data:
+            samples = array.array(_TYPECODES[self.sample_width])
+            samples.frombytes(data)
+            data = samples[:: self._channels].tobytes()
+        if self.realtime and data:
+            self._read_frames += len(data) // self.sample_width
+            ahead = self._read_frames / self.sample_rate - (time.monotonic() - self._t0)
+            if ahead > 0:
+                time.sleep(ahead)
+        return data
+
+
+# ── Recognisers ────────────────────────────────────────────────────────────────
+
+class _SRRecognizer:
+    """Base for engines provided by the SpeechRecognition package."""
+
+    method = ""
+
+    def __init__(self):
+        import speech_recognition as sr
+        self._sr = sr
+        self._r  = sr.Recognizer()
+
+    def recognize(self, segment: AudioSegment) -> str | None:
+        audio = self._sr.AudioData(segment.pcm, segment.sample_rate, segment.sample_width)
+        try:
+            return getattr(self._r, self.method)(audio)
+        except self._sr.UnknownValueError:
+            return None
+        except self._sr.RequestError as e:
+            print(f"   [Speech recognition service error: {e}]")
+            return None
+
+
+class GoogleRecognizer(_SRRecognizer):
+    """Google Web Speech API (needs network)."""
+    method = "recognize_google"
+
+
+class SphinxRecognizer(_SRRecognizer):
+    """CMU Sphinx, fully offline (needs `pocketsphinx`)."""
+    method = "recognize_sphinx"
+
+
+class FixtureRecognizer:
+    """
+    Returns canned transcripts in order, one per segment – for driving the
+    listener from recorded WAV files.  `from_wav("x.wav")` reads them from
+    the sidecar file "x.txt" (one transcript per line).
+    """
+
+    def __init__(self, transcripts):
+        self._transcripts = list(transcripts)
+        self.segments     = []          # every segment it was handed
+
+    @classmethod
+    def from_wav(cls, wav_path: str) -> "FixtureRecognizer":
+        with open(os.path.splitext(wav_path)[0] + ".txt", encoding="utf-8") as fh:
+            return cls(line.strip() for line in fh if line.strip())
+
+    def recognize(self, segment: AudioSegment) -> str | None:
+        self.segments.append(segment)
+        return self._transcripts.pop(0) if self._transcripts else None
+
+
+RECOGNIZERS = {
+    "google": GoogleRecognizer,
+    "sphinx": SphinxRecognizer,
+}
+
+
+def default_recognizer():
+    """Engine named by ASSISTANT_RECOGNIZER (google | sphinx), Google by default."""
+    name = os.environ.get("ASSISTANT_RECOGNIZER", "google").lower()
+    return RECOGNIZERS.get(name, GoogleRecognizer)()
+
+
+# ── Voice activity detection ───────────────────────────────────────────────────
+
+def segment_stream(source, frame_seconds: float = FRAME_SECONDS, stop: threading.Event | None = None,
+                   muted=None):
+    """
+    Yield an AudioSegment for every phrase detected in `source` (which must
+    already be entered).  Runs until the source is exhausted or `stop` is set.
+    Frames read while `muted()` is true (and for ECHO_TAIL_SECONDS after)
+    are dropped, along with any phrase they interrupt.
+    """
+    rate, width  = source.sample_rate, source.sample_width
+    n            = max(1, int(rate * frame_seconds))
+    frame_dur    = n / rate
+    calib_frames = max(1, int(CALIBRATION_SECONDS / frame_dur))
+    start_frames = max(1, round(MIN_SPEECH_SECONDS / frame_dur))
+    pause_frames = max(1, round(PAUSE_SECONDS / frame_dur))
+    preroll_max  = max(1, round(PRE_ROLL_SECONDS / frame_dur))
+    limit_frames = max(1, int(PHRASE_LIMIT_SECONDS / frame_dur))
+
+    noise_floor  = None
+    calib        = []          # energies seen during (re)calibration
+    last_refresh = 0.0
+    preroll      = []          # recent frames before speech
+    phrase       = []          # frames of the current phrase
+    voiced_run   = 0
+    silent_run   = 0
+    clock        = 0.0         # seconds into the stream
+    started      = 0.0
+    unmute_at    = 0.0         # stream time until which audio is discarded
+
+    while stop is None or not stop.is_set():
+        frame = source.read(n)
+        if not frame:
+            break
+        clock += frame_dur
+
+        # The assistant is talking: neither a phrase nor room noise
+        if muted is not None and muted():
+            preroll, phrase, voiced_run = [], [], 0
+            unmute_at = clock + ECHO_TAIL_SECONDS
+            continue
+        if clock < unmute_at:
+            continue
+        energy = rms(frame, width)
+
+        # Initial calibration: the first frames only measure the room
+        if noise_floor is None:
+            calib.append(energy)
+            if len(calib) >= calib_frames:
+                noise_floor  = max(MIN_ENERGY, math.fsum(calib) / len(calib))
+                calib        = []
+                last_refresh = clock
+            continue
+
+        is_speech = energy > noise_floor * SPEECH_RATIO
+
+        if not phrase:
+            if is_speech:
+                voiced_run += 1
+                preroll.append(frame)
+                if voiced_run >= start_frames:
+                    phrase     = preroll
+                    preroll    = []
+                    started    = clock - len(phrase) * frame_dur
+                    silent_run = 0
+            else:
+                voiced_run = 0
+                preroll.append(frame)
+                # Follow the ambient level using silence only
+                calib.append(energy)
+                if clock - last_refresh >= NOISE_REFRESH_SECONDS:
+                    noise_floor  = max(MIN_ENERGY, math.fsum(calib) / len(calib))
+                    calib        = []
+                    last_refresh = clock
+            if len(preroll) > preroll_max:
+                del preroll[: len(preroll) - preroll_max]
+            continue
+
+        phrase.append(frame)
+        silent_run = 0 if is_speech else silent_run + 1
+        if silent_run >= pause_frames or len(phrase) >= limit_frames:
+            yield AudioSegment(b"".join(phrase), rate, width, started)
+            phrase, voiced_run = [], 0
+
+    if phrase:
+        yield AudioSegment(b"".join(phrase), rate, width, started)
+
+
+# ── Listener ───────────────────────────────────────────────────────────────────
+
+class Listener:
+    """
+    Background capture + recognition.  `start()` spawns two threads
+    ("ListenerCapture" and "ListenerRecognizer"); recognised text is read
+    with `get()`.  Capture never waits on recognition, so no audio is lost
+    while a slow recogniser is busy.  `muted` (callable → bool) gates capture
+    while the assistant itself is speaking.
+    """
+
+    def __init__(self, source=None, recognizer=None, queue_size: int = QUEUE_SIZE,
+                 muted=None):
+        self.source      = source
+        self.recognizer  = recognizer
+        self.muted       = muted
+        self.utterances  = queue.Queue(maxsize=queue_size)
+        self._segments   = queue.Queue()
+        self._stop       = threading.Event()
+        self._threads    = []
+        self.finished    = threading.Event()   # source exhausted and all recognised
+
+    def start(self) -> "Listener":
+        if self.source is None:
+            self.source = MicrophoneSource()
+        if self.recognizer is None:
+            self.recognizer = default_recognizer()
+        for target, name in ((self._capture, "ListenerCapture"),
+                             (self._recognise, "ListenerRecognizer")):
+            t = threading.Thread(target=target, daemon=True, name=name)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def get(self, timeout: float | None = None) -> str | None:
+        """Next recognised utterance (lowercase), or None on timeout/end."""
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _capture(self):
+        try:
+            with self.source as src:
+                for segment in segment_stream(src, stop=self._stop, muted=self.muted):
+                    self._segments.put(segment)
+        except Exception as e:
+            print(f"   [Microphone error: {e}]")
+        finally:
+            self._segments.put(None)
+
+    def _recognise(self):
+        while True:
+            segment = self._segments.get()
+            if segment is None:
+                break
+            try:
+                text = self.recognizer.recognize(segment)
+            except Exception as e:
+                print(f"   [Recognizer error: {e}]")
+                continue
+            if not text:
+                continue
+            try:
+                self.utterances.put_nowait(text.lower())
+            except queue.Full:
+                # Nobody is consuming – keep the newest command
+                self.utterances.get_nowait()
+                self.utterances.put_nowait(text.lower())
+        self.finished.set()
+
+
+# ── Module-level listener used by speech.get_input() ──────────────────────────
+_listener = None
+
+
+def start_listening(source=None, recognizer=None, muted=None) -> Listener:
+    """
+    Start the shared background listener (idempotent).  Pass
+    muted=speech.is_speaking so replies and reminders aren't heard as input.
+    """
+    global _listener
+    if _listener is None:
+        _listener = Listener(source, recognizer, muted=muted).start()
+        print("✔  Continuous listening started.")
+    return _listener
+
+
+def stop_listening():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def is_listening() -> bool:
+    return _listener is not None
+
+
+def next_utterance(timeout: float | None = None) -> str | None:
+    """Next utterance from the shared listener (None if not running / timed out)."""
+    if _listener is None:
+        return None
+    return _listener.get(timeout)
@@ -0,0 +1,272 @@
+"""
+modules/metrics.py
+===================
+In-process counters and latency histograms, rendered in the Prometheus
+text format by GET /metrics.
+
+    assistant_chat_seconds                  whole /api/chat request
+    assistant_classify_seconds              intent classification + slots
+    assistant_handler_seconds{intent}       intent handlers
+    assistant_db_seconds{helper}            every public modules/database.py helper
+    assistant_tts_queue_wait_seconds        time an utterance waited to be spoken
+    assistant_reminder_lag_seconds          how late reminders fired
+    assistant_chat_requests_total{intent, status}
+
+Recording an observation costs a bisect and a short lock (about a
+microsecond – `python benchmark.py metrics` measures it); set
+ASSISTANT_METRICS=0 to turn recording off.  Histograms created with a
+`timing` name also add their time to the current request's trace, which
+/api/chat returns as a Server-Timing header.
+
+Values are per process: under gunicorn each worker reports its own.
+"""
+
+import contextvars
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+
+ENABLED = os.environ.get("ASSISTANT_METRICS", "1").lower() not in ("0", "false", "no")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS     = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0, 3600.0)
+
+_registry = []                  # metrics in registration order
+_trace    = contextvars.ContextVar("metrics_trace", default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(value) -> str:
+    """Sample value at full precision (":g" would round 1234567 to 1.23457e+06)."""
+    value = float(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name       = name
+        self.help       = help_text
+        self.labelnames = tuple(labelnames)
+        self._values    = {}
+        self._lock      = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *labels, amount: float = 1.0):
+        if not ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_sample(value)}"
+                for labels, value in items]
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram, self.labels = histogram, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Histogram:
+    """Bucketed distribution of observed values per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS, timing: str | None = None):
+        self.name       = name
+        self.help       = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets    = tuple(buckets)
+        self.timing     = timing        # Server-Timing entry this time adds to
+        self._children  = {}            # labels → [per-bucket counts (+Inf last), sum]
+        self._lock      = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, *labels):
+        if not ENABLED:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            child = self._children.get(labels)
+            if child is None:
+                child = self._children[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            child[0][index] += 1
+            child[1] += value
+        if self.timing is not None:
+            trace = _trace.get()
+            if trace is not None:
+                trace[self.timing] = trace.get(self.timing, 0.0) + value
+
+    def time(self, *labels) -> _Timer:
+        """Context manager observing the duration of its block."""
+        return _Timer(self, labels)
+
+    def count(self, *labels) -> int:
+        child = self._children.get(labels)
+        return sum(child[0]) if child else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((labels, list(counts), total)
+                           for labels, (counts, total) in self._children.items())
+        lines = []
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} "
+                         f"{_sample(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} "
+                         f"{cumulative}")
+        return lines
+
+
+class Gauge:
+    """
+    A value read when /metrics is scraped: fn() → number or {labels tuple:
+    number}.  kind="counter" for totals kept elsewhere (e.g. admission).
+    """
+
+    def __init__(self, name: str, help_text: str, fn, labelnames: tuple = (),
+                 kind: str = "gauge"):
+        self.name       = name
+        self.help       = help_text
+        self.labelnames = tuple(labelnames)
+        self.fn         = fn
+        self.kind       = kind
+        _registry.append(self)
+
+    def render(self) -> list[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        values = value.items() if isinstance(value, dict) else [((), value)]
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_sample(v)}"
+                for labels, v in sorted(values)]
+
+
+def timed(histogram: Histogram, *labels):
+    """
+    Decorator: observe each call's duration in `histogram`.  A labelled
+    histogram given no labels is labelled with the function's name.
+    """
+    def decorator(fn):
+        values = labels or ((fn.__name__,) if histogram.labelnames else ())
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, *values)
+        return wrapper
+    return decorator
+
+
+# ── Request traces (Server-Timing) ─────────────────────────────────────────────
+
+def start_trace() -> dict:
+    """Collect `timing` histograms observed by this request (thread / task)."""
+    trace = {}
+    _trace.set(trace)
+    return trace
+
+
+def end_trace() -> dict | None:
+    trace = _trace.get()
+    _trace.set(None)
+    return trace
+
+
+def server_timing(trace: dict) -> str:
+    """Server-Timing header value, durations in milliseconds."""
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in trace.items())
+
+
+# ── Exposition ─────────────────────────────────────────────────────────────────
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _reset_after_fork():
+    # Start each worker from zero; the master's counts are not the worker's
+    for metric in _registry:
+        if isinstance(metric, Counter):
+            metric._lock, metric._values = threading.Lock(), {}
+        elif isinstance(metric, Histogram):
+            metric._lock, metric._children = threading.Lock(), {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# ── The assistant's metrics ────────────────────────────────────────────────────
+
+CHAT_SECONDS    = Histogram("assistant_chat_seconds",
+                            "Whole /api/chat request, admission included.")
+CLASSIFY_SECONDS = Histogram("assistant_classify_seconds",
+                             "Intent classification + slot extraction per message.",
+                             timing="classify")
+HANDLER_SECONDS = Histogram("assistant_handler_seconds",
+                            "Intent handler run time.", ("intent",), timing="handler")
+DB_SECONDS      = Histogram("assistant_db_seconds",
+                            "Database helper run time.", ("helper",), timing="db")
+TTS_QUEUE_WAIT  = Histogram("assistant_tts_queue_wait_seconds",
+                            "Time an utterance waited in the speech queue.")
+REMINDER_LAG    = Histogram("assistant_reminder_lag_seconds",
+                            "Delay between a reminder's due time and it firing.",
+                            buckets=LAG_BUCKETS)
+CHAT_REQUESTS   = Counter("assistant_chat_requests_total",
+                          "Chat messages by intent and HTTP status.", ("intent", "status"))
@@ -0,0 +1,88 @@
+"""
+modules/nlu.py
+===============
+One natural-language-understanding pass per message:
+
+  • normalise + tokenise the text once
+  • top-k intents with calibrated probabilities (intent_classifier)
+  • slot extraction (time, amount, category, app, contact, query, study
+    action) for the candidate intents, so handlers receive ready-made
+    slots instead of re-scanning the raw text – the extractors come from
+    the intent registry (modules/intents.py) and are imported on first use
+
+When the top two intents are a near-tie, the one whose required slot was
+actually found in the text wins (e.g. "remind me … at 5 pm" has a time).
+"""
+
+import re
+
+from modules import intents
+from modules import metrics
+from modules.intent_classifier import predict_top_k
+
+TOP_K = 3
+
+# If the runner-up is within this margin of the best intent, slots decide
+NEAR_TIE_MARGIN = 0.10
+
+_TOKEN_RE = re.compile(r"[\w']+|[^\w\s]")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case word/punctuation tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def extract_slots(intent: str, text: str) -> dict:
+    """Return the slot dict for `intent` (empty for slot-free intents)."""
+    return intents.extract_slots(intent, text)
+
+
+def _required_slot(intent: str) -> str | None:
+    """Slot that must be present for `intent` to win a near-tie."""
+    spec = intents.get(intent)
+    return spec.required_slot if spec is not None else None
+
+
+def _has_required_slot(intent: str, slots: dict) -> bool:
+    required = _required_slot(intent)
+    return required is None or bool(slots.get(required))
+
+
+@metrics.timed(metrics.CLASSIFY_SECONDS)
+def parse(text: str, top_k: int = TOP_K) -> dict:
+    """
+    Run the full NLU pass over one message.
+
+    Returns
+    -------
+    dict with keys
+        text        normalised (stripped, lower-case) input
+        tokens      list of tokens
+        intents     [(intent, probability), …] best first, length ≤ top_k
+        intent      chosen intent
+        confidence  probability of the chosen intent
+        slots       slot dict for the chosen intent
+    """
+    normalised = " ".join(text.strip().lower().split())
+    tokens     = tokenize(normalised)
+    ranked     = predict_top_k(normalised, k=max(top_k, 2))
+
+    intent, confidence = ranked[0]
+    slots = extract_slots(intent, normalised)
+
+    runner_up, runner_conf = ranked[1]
+    if (confidence - runner_conf < NEAR_TIE_MARGIN
+            and not _has_required_slot(intent, slots)):
+        alt_slots = extract_slots(runner_up, normalised)
+        if _required_slot(runner_up) and _has_required_slot(runner_up, alt_slots):
+            intent, confidence, slots = runner_up, runner_conf, alt_slots
+
+    return {
+        "text":       normalised,
+        "tokens":     tokens,
+        "intents":    ranked[:top_k],
+        "intent":     intent,
+        "confidence": confidence,
+        "slots":      slots,
+    }
@@ -0,0 +1,194 @@
+"""
+modules/process_manager.py
+===========================
+Keeps track of the applications the assistant launched.
+
+Every spawn goes through launch(), which records the child, refuses new
+launches beyond MAX_RUNNING_APPS, and hands the child to one reaper thread
+("AppReaper").  On Linux the reaper waits on pidfds (os.pidfd_open) with a
+selector, so an exiting app is reaped the moment it exits; elsewhere it
+polls the children every REAP_INTERVAL seconds.  Only our own children are
+waited on – never os.waitpid(-1) – so other subprocess users are unaffected.
+
+Apps are started in their own session / process group so close() can stop
+an app together with any helpers it spawned.
+"""
+
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+MAX_RUNNING_APPS = 8       # concurrent launched apps
+REAP_INTERVAL    = 1.0     # seconds between polls when pidfds aren't available
+CLOSE_TIMEOUT    = 3.0     # grace period after SIGTERM before SIGKILL
+
+_HAS_PIDFD = hasattr(os, "pidfd_open")
+
+
+class LaunchedApp:
+    """One running child started by launch()."""
+
+    __slots__ = ("name", "argv", "popen", "started", "pidfd")
+
+    def __init__(self, name: str, argv: list[str], popen: subprocess.Popen):
+        self.name    = name
+        self.argv    = argv
+        self.popen   = popen
+        self.started = time.time()
+        self.pidfd   = None
+
+    @property
+    def pid(self) -> int:
+        return self.popen.pid
+
+    def as_dict(self) -> dict:
+        return {"pid": self.pid, "name": self.name, "command": " ".join(self.argv),
+                "uptime_seconds": int(time.time() - self.started)}
+
+
+_apps: dict[int, LaunchedApp] = {}     # pid → app
+_lock      = threading.Lock()
+_reaper    = None
+_selector  = None
+_wake_r, _wake_w = None, None          # self-pipe to wake the selector
+
+
+def _close_pidfd(app: LaunchedApp):
+    if app.pidfd is not None:
+        try:
+            _selector.unregister(app.pidfd)
+        except (KeyError, ValueError):
+            pass
+        os.close(app.pidfd)
+        app.pidfd = None
+
+
+def _reap() -> int:
+    """Collect every finished child (caller holds _lock).  Returns how many."""
+    done = [app for app in _apps.values() if app.popen.poll() is not None]
+    for app in done:
+        _close_pidfd(app)
+        del _apps[app.pid]
+    return len(done)
+
+
+def _reaper_loop():
+    while True:
+        if _selector is not None:
+            # Block until a child's pidfd becomes readable (it exited) or a
+            # new child is registered through the wake pipe
+            for key, _ in _selector.select():
+                if key.fileobj == _wake_r:
+                    os.read(_wake_r, 512)
+        else:
+            time.sleep(REAP_INTERVAL)
+        with _lock:
+            _reap()
+
+
+def _start_reaper():
+    """Start the reaper thread once (caller holds _lock)."""
+    global _reaper, _selector, _wake_r, _wake_w
+    if _reaper is not None:
+        return
+    if _HAS_PIDFD:
+        _selector = selectors.DefaultSelector()
+        _wake_r, _wake_w = os.pipe()
+        os.set_blocking(_wake_r, False)
+        _selector.register(_wake_r, selectors.EVENT_READ)
+    _reaper = threading.Thread(target=_reaper_loop, daemon=True, name="AppReaper")
+    _reaper.start()
+
+
+def _reset_after_fork():
+    """Children of the parent aren't ours to reap or close in a forked child."""
+    global _apps, _lock, _reaper, _selector, _wake_r, _wake_w
+    for fd in [app.pidfd for app in _apps.values()] + [_wake_r, _wake_w]:
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+    if _selector is not None:
+        _selector.close()
+    _apps, _lock = {}, threading.Lock()
+    _reaper, _selector, _wake_r, _wake_w = None, None, None, None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def launch(name: str, argv: list[str]) -> LaunchedApp | None:
+    """
+    Spawn an app (argv list, never through a shell) and supervise it.
+    Returns None when MAX_RUNNING_APPS are already running; spawn errors
+    (OSError) propagate to the caller.
+    """
+    with _lock:
+        _reap()
+        if len(_apps) >= MAX_RUNNING_APPS:
+            return None
+        kwargs = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL,
+                  "stdin": subprocess.DEVNULL}
+        if sys.platform == "win32":
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs["start_new_session"] = True
+        popen = subprocess.Popen(list(argv), shell=False, **kwargs)
+        app   = LaunchedApp(name, list(argv), popen)
+        _apps[popen.pid] = app
+        _start_reaper()
+        if _selector is not None:
+            try:
+                app.pidfd = os.pidfd_open(popen.pid)
+                _selector.register(app.pidfd, selectors.EVENT_READ)
+            except OSError:
+                app.pidfd = None          # already gone – the next _reap() gets it
+            os.write(_wake_w, b"\0")
+        return app
+
+
+def running() -> list[LaunchedApp]:
+    """Launched apps that are still running, oldest first."""
+    with _lock:
+        _reap()
+        return sorted(_apps.values(), key=lambda app: app.started)
+
+
+def _stop(app: LaunchedApp, timeout: float):
+    """SIGTERM the app's process group, SIGKILL it if it hasn't exited in time."""
+    popen = app.popen
+    try:
+        if sys.platform == "win32":
+            popen.terminate()
+        else:
+            os.killpg(popen.pid, signal.SIGTERM)
+        popen.wait(timeout)
+    except subprocess.TimeoutExpired:
+        if sys.platform == "win32":
+            popen.kill()
+        else:
+            os.killpg(popen.pid, signal.SIGKILL)
+        popen.wait()
+    except ProcessLookupError:
+        popen.poll()
+
+
+def close(name: str | None = None, pid: int | None = None,
+          timeout: float = CLOSE_TIMEOUT) -> list[LaunchedApp]:
+    """
+    Stop launched apps matching `pid`, or `name` (every instance), or all
+    of them when neither is given.  Returns the apps that were stopped.
+    """
+    targets = [app for app in running()
+               if (pid is None or app.pid == pid) and (name is None or app.name == name)]
+    for app in targets:
+        _stop(app, timeout)
+    with _lock:
+        _reap()
+    return targets
@@ -0,0 +1,304 @@
+"""
+modules/profiling.py
+=====================
+On-demand profiling for a running assistant.  Off by default; turn it on
+with ASSISTANT_PROFILE=1 or POST /api/admin/profiling, and it
+
+  • runs cProfile over a sample (SAMPLE_RATE) of /api/chat requests and of
+    the scheduler's timer callbacks (reminders, Pomodoro phases), writing
+    one .prof file each – `python -m pstats` or snakeviz reads them;
+  • samples every thread's stack SAMPLE_HZ times a second and writes the
+    counts as collapsed stacks (.folded – flamegraph.pl / speedscope) every
+    FLUSH_SECONDS, so background threads show up too;
+  • logs SQLite statements slower than SLOW_QUERY_MS to slow-queries.log,
+    through a timing connection factory used by database.get_connection().
+
+Everything lands in PROFILE_DIR, pruned to MAX_FILES / MAX_BYTES (oldest
+first).  While off, profile() hands back a shared no-op context manager
+and connections are plain sqlite3 ones – nothing else runs.
+"""
+
+import itertools
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILE_DIR   = os.environ.get("ASSISTANT_PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+MAX_FILES     = 200                     # profiles + stack dumps kept
+MAX_BYTES     = 50 * 1024 * 1024
+SAMPLE_RATE   = float(os.environ.get("ASSISTANT_PROFILE_SAMPLE", 0.1))    # share of requests profiled
+SLOW_QUERY_MS = float(os.environ.get("ASSISTANT_SLOW_QUERY_MS", 50))
+SAMPLE_HZ     = 100                     # stack samples per second
+FLUSH_SECONDS = 30.0                    # one .folded file per interval
+SLOW_LOG_MAX_BYTES = 5 * 1024 * 1024    # slow-queries.log rotates to .1 beyond this
+
+_enabled   = False
+_lock      = threading.Lock()
+_cprofile  = threading.Lock()           # one cProfile at a time (sys.monitoring allows one)
+_sampler   = None
+_seq       = itertools.count(1)
+_log_lock  = threading.Lock()
+
+
+# ── Per-call cProfile ──────────────────────────────────────────────────────────
+
+class _NoProfile:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PROFILE = _NoProfile()
+
+
+class _Profile:
+    __slots__ = ("name", "profiler", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        import cProfile
+        self.profiler = cProfile.Profile()
+        self.start    = time.perf_counter()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        elapsed = time.perf_counter() - self.start
+        _cprofile.release()
+        try:
+            self.profiler.dump_stats(_new_path(f"{self.name}-{elapsed * 1000:.0f}ms", ".prof"))
+            _prune()
+        except OSError as e:
+            print(f"   [Profiling: could not write profile: {e}]")
+        return False
+
+
+def profile(name: str):
+    """
+    Context manager that cProfiles its block for a SAMPLE_RATE share of
+    calls while profiling is on (and no other profile is running).
+    """
+    if not _enabled or random.random() >= SAMPLE_RATE or not _cprofile.acquire(blocking=False):
+        return _NO_PROFILE
+    return _Profile(name)
+
+
+def _safe(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in name)[:60]
+
+
+def _new_path(name: str, suffix: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(PROFILE_DIR,
+                        f"{stamp}-{os.getpid()}-{next(_seq):05d}-{_safe(name)}{suffix}")
+
+
+def _prune():
+    """Delete the oldest profiles beyond MAX_FILES / MAX_BYTES."""
+    try:
+        entries = [e for e in os.scandir(PROFILE_DIR)
+                   if e.is_file() and e.name.endswith((".prof", ".folded"))]
+    except FileNotFoundError:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    total = 0
+    for i, entry in enumerate(entries):
+        total += entry.stat().st_size
+        if i >= MAX_FILES or total > MAX_BYTES:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def recent_files(limit: int = 20) -> list[dict]:
+    """Newest files in PROFILE_DIR."""
+    try:
+        entries = [e for e in os.scandir(PROFILE_DIR) if e.is_file()]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    return [{"name": e.name, "bytes": e.stat().st_size} for e in entries[:limit]]
+
+
+# ── Stack sampler (flame graphs) ───────────────────────────────────────────────
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})" \
+        .replace(";", ":")
+
+
+class StackSampler(threading.Thread):
+    """Samples all threads' stacks; writes collapsed-stack counts periodically."""
+
+    def __init__(self, hz: int | None = None, flush_seconds: float | None = None):
+        super().__init__(daemon=True, name="StackSampler")
+        self.interval      = 1.0 / (hz or SAMPLE_HZ)
+        self.flush_seconds = flush_seconds or FLUSH_SECONDS
+        self.counts        = Counter()
+        self.samples       = 0
+        self._stop_event   = threading.Event()
+
+    def sample(self):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == self.ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            thread = names.get(ident, str(ident)).replace(";", ":").replace(" ", "_")
+            self.counts[";".join([thread] + stack[::-1])] += 1
+        self.samples += 1
+
+    def flush(self):
+        if not self.counts:
+            return
+        counts, self.counts = self.counts, Counter()
+        try:
+            with open(_new_path("stacks", ".folded"), "w", encoding="utf-8") as f:
+                for stack, n in counts.most_common():
+                    f.write(f"{stack} {n}\n")
+            _prune()
+        except OSError as e:
+            print(f"   [Profiling: could not write stack samples: {e}]")
+
+    def run(self):
+        next_flush = time.monotonic() + self.flush_seconds
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+            if time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + self.flush_seconds
+        self.flush()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# ── Slow-query log ─────────────────────────────────────────────────────────────
+
+def _log_slow(sql: str, params, elapsed: float):
+    path = os.path.join(PROFILE_DIR, "slow-queries.log")
+    line = (f"{time.strftime('%Y-%m-%d %H:%M:%S')} pid={os.getpid()} "
+            f"thread={threading.current_thread().name} {elapsed * 1000:.1f}ms "
+            f"{' '.join(sql.split())} {params!r}"[:2000] + "\n")
+    with _log_lock:
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) > SLOW_LOG_MAX_BYTES:
+                os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that logs statements slower than SLOW_QUERY_MS."""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            if elapsed * 1000 >= SLOW_QUERY_MS:
+                _log_slow(sql, parameters, elapsed)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            if elapsed * 1000 >= SLOW_QUERY_MS:
+                _log_slow(sql, "(executemany)", elapsed)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors (and execute() shortcuts) are TimedCursors."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    # The C shortcuts run the statement without calling Cursor.execute()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# Passed as sqlite3.connect(factory=…) by database.get_connection()
+connection_factory = sqlite3.Connection
+
+
+# ── Switch ─────────────────────────────────────────────────────────────────────
+
+def enable(sample_rate: float | None = None, slow_query_ms: float | None = None,
+           sample_stacks: bool = True):
+    """Turn profiling on in this process (idempotent; updates the settings)."""
+    global _enabled, _sampler, connection_factory, SAMPLE_RATE, SLOW_QUERY_MS
+    with _lock:
+        if sample_rate is not None:
+            SAMPLE_RATE = min(max(float(sample_rate), 0.0), 1.0)
+        if slow_query_ms is not None:
+            SLOW_QUERY_MS = max(float(slow_query_ms), 0.0)
+        _enabled           = True
+        connection_factory = TimedConnection
+        if sample_stacks and _sampler is None:
+            _sampler = StackSampler()
+            _sampler.start()
+        elif not sample_stacks and _sampler is not None:
+            _sampler.stop()
+            _sampler = None
+
+
+def disable():
+    """Turn profiling off; the stack sampler flushes what it has."""
+    global _enabled, _sampler, connection_factory
+    with _lock:
+        _enabled           = False
+        connection_factory = sqlite3.Connection
+        if _sampler is not None:
+            _sampler.stop()
+            _sampler = None
+
+
+def status() -> dict:
+    return {"enabled": _enabled, "sample_rate": SAMPLE_RATE, "slow_query_ms": SLOW_QUERY_MS,
+            "stack_sampler": _sampler is not None, "directory": PROFILE_DIR,
+            "files": recent_files()}
+
+
+def _reset_after_fork():
+    # The sampler thread isn't copied into a forked child; restart it there
+    global _lock, _cprofile, _log_lock, _sampler
+    _lock, _cprofile, _log_lock = threading.Lock(), threading.Lock(), threading.Lock()
+    if _sampler is not None:
+        _sampler = StackSampler()
+        _sampler.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+if os.environ.get("ASSISTANT_PROFILE", "").lower() in ("1", "true", "yes"):
+    enable()
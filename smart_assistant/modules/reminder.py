@@ -1,49 +1,64 @@
 """
 modules/reminder.py
 ====================
-Parses reminder text, stores reminders in the DB, and runs a
-background thread that checks every 30 seconds and fires notifications.
+Parses reminder text, stores reminders in the DB, and fires them from the
+shared timer thread (modules/scheduler.py).
+
+Every reminder row carries `next_fire_at` (epoch seconds, indexed) and an
+optional recurrence rule ("daily", "weekdays", "hourly:N").  Only one
+wakeup is kept on the scheduler – for the earliest `next_fire_at` – and on
+wakeup every overdue row is claimed atomically (db.claim_due_reminders), so
+reminders missed while the process was down are delivered on startup and
+each reminder is delivered once even when several processes run a checker.
+Recurring reminders are advanced to their next occurrence instead of being
+closed.  Fired reminders are spoken and published as "reminder" events
+(modules/events.py) for the web UI.
 """
 
 import re
 import threading
 import time
-from datetime import datetime
+from datetime import date, datetime, time as dt_time, timedelta
 
 from modules import database as db
-from modules.speech import speak
+from modules import events
+from modules import metrics
+from modules import scheduler
+from modules.speech import speak, PRIORITY_HIGH
 
 
 # ── Time parsing ───────────────────────────────────────────────────────────────
 
-# Maps common 12-hour labels to 24-hour hour integers
-_HOUR_MAP = {
-    "1": 1, "2": 2, "3": 3, "4": 4, "5": 5, "6": 6,
-    "7": 7, "8": 8, "9": 9, "10": 10, "11": 11, "12": 12,
-}
+DEFAULT_HOUR = 9          # used when a date is given without a time ("tomorrow")
 
-def _parse_time(text: str) -> str | None:
-    """
-    Extract a time string (HH:MM in 24-hour format) from natural language.
+_WEEKDAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday",
+                  "saturday", "sunday"]
+_MONTHS = {name: i for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"],
+    start=1)}
+_MONTH = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*"
 
-    Handles patterns like:
-        "at 3 pm"  →  "15:00"
-        "at 10:30 am" → "10:30"
-        "at 7" → "07:00"  (assumes AM for < 8, PM for >= 1)
-    """
-    text = text.lower()
+_AT_RE        = re.compile(r"\bat\s+(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\b")
+_AMPM_RE      = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b")
+_24H_RE       = re.compile(r"\b(\d{1,2}):(\d{2})\b")
+_IN_RE        = re.compile(r"\bin\s+(an?|\d+)\s+(minute|min|hour|hr|day)s?\b")
+_HOURLY_RE    = re.compile(r"\bevery\s+(?:(\d+)\s+)?(?:hours?|hrs?)\b")
+_DAILY_RE     = re.compile(r"\b(?:every\s*day|daily|each\s+day)\b")
+_WORKDAYS_RE  = re.compile(r"\b(?:(?:every|on)\s+)?weekdays?\b")
+_REL_DAY_RE   = re.compile(r"\b(?:on\s+)?(day after tomorrow|tomorrow|today|tonight)\b")
+_WEEKDAY_RE   = re.compile(r"\b(?:(on|next|this)\s+)?(" + "|".join(_WEEKDAY_NAMES) + r")\b")
+_ISO_DATE_RE  = re.compile(r"\b(?:on\s+)?(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_DAY_MONTH_RE = re.compile(r"\b(?:on\s+)?(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?" + _MONTH + r"\b")
+_MONTH_DAY_RE = re.compile(r"\b(?:on\s+)?" + _MONTH + r"\s+(\d{1,2})(?:st|nd|rd|th)?\b")
+_SLASH_RE     = re.compile(r"\b(?:on\s+)?(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\b")   # DD/MM[/YY]
 
-    # Pattern: "at HH:MM am/pm" or "at HH am/pm"
-    pattern = r"at\s+(\d{1,2})(?::(\d{2}))?\s*(am|pm)?"
-    match   = re.search(pattern, text)
+# Everything that describes *when*, stripped out by _extract_message()
+_SCHEDULE_PATTERNS = [_IN_RE, _HOURLY_RE, _DAILY_RE, _WORKDAYS_RE, _REL_DAY_RE,
+                      _WEEKDAY_RE, _ISO_DATE_RE, _DAY_MONTH_RE, _MONTH_DAY_RE,
+                      _SLASH_RE, _AT_RE, _AMPM_RE, _24H_RE]
 
-    if not match:
-        return None
-
-    hour   = int(match.group(1))
-    minute = int(match.group(2)) if match.group(2) else 0
-    ampm   = match.group(3)
 
+def _to_24h(hour: int, minute: int, ampm: str | None) -> tuple[int, int]:
     if ampm == "pm" and hour != 12:
         hour += 12
     elif ampm == "am" and hour == 12:
@@ -52,75 +67,405 @@ def _parse_time(text: str) -> str | None:
         # Heuristic: hour < 8 → assume PM (afternoon), else AM
         if 1 <= hour < 8:
             hour += 12
+    return hour, minute
+
+
+def _find_clock_time(text: str) -> tuple[int, int] | None:
+    """'at 3 pm' / '10:30 am' / 'at 7' / '18:45' → (hour, minute) in 24h."""
+    match = _AT_RE.search(text) or _AMPM_RE.search(text)
+    if match:
+        hour, minute = _to_24h(int(match.group(1)),
+                               int(match.group(2)) if match.group(2) else 0,
+                               match.group(3))
+    else:
+        match = _24H_RE.search(text)
+        if not match:
+            return None
+        hour, minute = int(match.group(1)), int(match.group(2))
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def _find_date(text: str, today: date) -> tuple[date, bool] | None:
+    """
+    Return (date, explicit_weekday) for 'tomorrow', 'on friday', '25 dec',
+    'dec 25', '2026-12-25' or '25/12'.  Dates without a year roll over to
+    next year once they have passed.
+    """
+    match = _REL_DAY_RE.search(text)
+    if match:
+        offset = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2}
+        return today + timedelta(days=offset[match.group(1)]), False
+
+    match = _WEEKDAY_RE.search(text)
+    if match:
+        ahead = (_WEEKDAY_NAMES.index(match.group(2)) - today.weekday()) % 7
+        if ahead == 0 and match.group(1) == "next":
+            ahead = 7
+        return today + timedelta(days=ahead), True
+
+    try:
+        match = _ISO_DATE_RE.search(text)
+        if match:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3))), False
+
+        day = month = year = None
+        match = _DAY_MONTH_RE.search(text)
+        if match:
+            day, month = int(match.group(1)), _MONTHS[match.group(2)]
+        elif (match := _MONTH_DAY_RE.search(text)):
+            month, day = _MONTHS[match.group(1)], int(match.group(2))
+        elif (match := _SLASH_RE.search(text)):
+            day, month = int(match.group(1)), int(match.group(2))
+            if match.group(3):
+                year = int(match.group(3))
+                year += 2000 if year < 100 else 0
+        if day is None:
+            return None
+
+        if year is not None:
+            return date(year, month, day), False
+        candidate = date(today.year, month, day)
+        if candidate < today:
+            candidate = date(today.year + 1, month, day)
+        return candidate, False
+    except ValueError:          # e.g. 31/02
+        return None
+
+
+def _next_occurrence(remind_at: str, now: datetime | None = None) -> datetime:
+    """
+    Next wall-clock time matching HH:MM: later today (or right now, if we
+    are still inside that minute), otherwise tomorrow.
+    """
+    now    = now or datetime.now()
+    hour, minute = map(int, remind_at.split(":"))
+    due    = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if due + timedelta(minutes=1) <= now:     # that minute is already over
+        due += timedelta(days=1)
+    return due
+
+
+def _advance(recurrence: str, fired_at: datetime, now: datetime) -> datetime:
+    """Next occurrence of a recurring reminder strictly after `now`."""
+    due = fired_at
+    while True:
+        if recurrence.startswith("hourly:"):
+            due += timedelta(hours=int(recurrence.split(":", 1)[1]))
+        else:
+            due += timedelta(days=1)
+        if recurrence == "weekdays" and due.weekday() >= 5:
+            continue
+        if due > now:
+            return due
+
+
+def _parse_time(text: str, now: datetime | None = None) -> dict | None:
+    """
+    Extract when a reminder should fire from natural language.
+
+    Returns {"at": datetime of the first firing, "recurrence": rule or None}
+    or None if no time could be found.  Handles patterns like:
+        "at 3 pm"                   → today/tomorrow 15:00
+        "at 7"                      → 19:00  (assumes PM for 1–7)
+        "tomorrow at 10:30 am"      → tomorrow 10:30
+        "on friday at 5 pm"         → coming Friday 17:00
+        "on 25 december" / "25/12"  → that date, 09:00
+        "in 20 minutes"             → now + 20 min
+        "in 2 days at 5 pm"         → the day after tomorrow, 17:00
+        "every day at 7 am"         → daily 07:00
+        "every weekday at 9"        → Mon–Fri 09:00
+        "every 3 hours"             → now + 3 h, then every 3 h
+        "in 2 hours every day"      → now + 2 h, then daily at that time
+    """
+    text = text.lower()
+    now  = now or datetime.now()
+
+    # Relative: "in 20 minutes", "in an hour" – also the first firing of a
+    # recurring reminder ("in 2 hours every day")
+    start = None
+    match = _IN_RE.search(text)
+    if match:
+        count = 1 if match.group(1) in ("a", "an") else int(match.group(1))
+        unit  = {"minute": "minutes", "min": "minutes", "hour": "hours",
+                 "hr": "hours", "day": "days"}[match.group(2)]
+        start = now + timedelta(**{unit: count})
+
+    clock  = _find_clock_time(text)
+    found  = _find_date(text, now.date())
+
+    # "in 2 days at 5 pm": the offset picks the day, the clock the time
+    if start is not None and unit == "days" and clock is not None:
+        start = datetime.combine(start.date(), dt_time(*clock))
+
+    # Every N hours – starts at the given time, otherwise N hours from now
+    match = _HOURLY_RE.search(text)
+    if match:
+        hours = int(match.group(1) or 1)
+        if hours < 1:
+            return None
+        if start is not None:
+            first = start
+        elif clock:
+            first = _next_occurrence(f"{clock[0]:02d}:{clock[1]:02d}", now)
+        else:
+            first = now.replace(microsecond=0) + timedelta(hours=hours)
+        return {"at": first, "recurrence": f"hourly:{hours}"}
+
+    if _DAILY_RE.search(text) or _WORKDAYS_RE.search(text):
+        recurrence = "daily" if _DAILY_RE.search(text) else "weekdays"
+        if start is not None and clock is None:
+            first = start
+        else:
+            hour, minute = clock or (DEFAULT_HOUR, 0)
+            first = _next_occurrence(f"{hour:02d}:{minute:02d}", start or now)
+        if recurrence == "weekdays" and first.weekday() >= 5:
+            first = _advance("weekdays", first, now)
+        return {"at": first, "recurrence": recurrence}
 
-    return f"{hour:02d}:{minute:02d}"
+    if start is not None:
+        return {"at": start, "recurrence": None}
+
+    if found is None:
+        if clock is None:
+            return None
+        return {"at": _next_occurrence(f"{clock[0]:02d}:{clock[1]:02d}", now),
+                "recurrence": None}
+
+    day, is_weekday = found
+    if clock is None:
+        clock = (20, 0) if "tonight" in text else (DEFAULT_HOUR, 0)
+    at = datetime.combine(day, datetime.min.time()).replace(hour=clock[0], minute=clock[1])
+    if at + timedelta(minutes=1) <= now:
+        if not is_weekday:
+            return None          # explicit date/time already in the past
+        at += timedelta(days=7)  # "on monday at 9" said on Monday at 10
+    return {"at": at, "recurrence": None}
+
+
+def _describe(schedule: dict, now: datetime | None = None) -> str:
+    """Human-readable 'when' for confirmations, e.g. 'tomorrow at 09:00'."""
+    now        = now or datetime.now()
+    at         = schedule["at"]
+    recurrence = schedule["recurrence"]
+    clock      = at.strftime("%H:%M")
+
+    if recurrence == "daily":
+        return f"every day at {clock}"
+    if recurrence == "weekdays":
+        return f"every weekday at {clock}"
+    if recurrence:
+        hours = int(recurrence.split(":", 1)[1])
+        every = "every hour" if hours == 1 else f"every {hours} hours"
+        return f"{every} starting at {clock}"
+
+    days = (at.date() - now.date()).days
+    if days == 0:
+        return f"at {clock}"
+    if days == 1:
+        return f"tomorrow at {clock}"
+    return f"on {at.strftime('%a %d %b %Y')} at {clock}"
+
+
+def _remind_at_label(schedule: dict) -> str:
+    """Value stored in the legacy `remind_at` column (shown in the UI)."""
+    at         = schedule["at"]
+    recurrence = schedule["recurrence"]
+    if recurrence == "daily":
+        return f"daily {at:%H:%M}"
+    if recurrence == "weekdays":
+        return f"weekdays {at:%H:%M}"
+    if recurrence:
+        return f"every {recurrence.split(':', 1)[1]}h from {at:%H:%M}"
+    return at.strftime("%Y-%m-%d %H:%M")
+
+
+DEFAULT_MESSAGE = "your reminder"     # when the sentence only says when
+
+_LEADING_TO_RE = re.compile(r"^(?:to|about)\b\s*")
 
 
 def _extract_message(text: str) -> str:
     """
     Extract the reminder subject from a sentence like:
-    "remind me to drink water at 3 pm"  →  "drink water"
+    "remind me to drink water tomorrow at 3 pm"  →  "drink water"
     """
-    # Remove the time part
-    cleaned = re.sub(r"at\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?", "", text, flags=re.I)
+    # Remove every date / time / recurrence phrase
+    cleaned = text
+    for pattern in _SCHEDULE_PATTERNS:
+        cleaned = pattern.sub("", cleaned)
+    cleaned = " ".join(cleaned.split())
     # Remove common filler words
     for filler in ["remind me to", "set a reminder for", "remind me about",
                    "set reminder", "remind me"]:
         cleaned = cleaned.replace(filler, "")
-    return cleaned.strip(" ,.") or text
+    # "remind me every day at 7 am to take pills" leaves "to take pills"
+    cleaned = _LEADING_TO_RE.sub("", cleaned.strip(" ,."))
+    return cleaned.strip(" ,.") or DEFAULT_MESSAGE
+
+
+def set_reminder_slots(text: str) -> dict:
+    """Slots for the set_reminder intent."""
+    return {"time": _parse_time(text), "message": _extract_message(text)}
 
 
 # ── Public API ─────────────────────────────────────────────────────────────────
 
-def set_reminder(user_text: str) -> str:
+def set_reminder(user_text: str, slots: dict | None = None) -> str:
     """
     Parse the user's sentence and save a reminder to the database.
+    `slots` (from modules.nlu) skips re-parsing when already extracted.
     Returns a confirmation message.
     """
-    time_str = _parse_time(user_text)
-    message  = _extract_message(user_text)
+    if slots is None:
+        slots = set_reminder_slots(user_text)
+    schedule = slots["time"]
+    message  = slots["message"]
 
-    if not time_str:
+    if not schedule:
         return ("I couldn't figure out the time for the reminder. "
                 "Please say something like 'remind me to drink water at 3 pm'.")
 
-    db.add_reminder(message, time_str)
-    return f"Got it! I'll remind you to {message} at {time_str}."
+    next_fire_at = int(schedule["at"].timestamp())
+    db.add_reminder(message, _remind_at_label(schedule),
+                    next_fire_at=next_fire_at, recurrence=schedule["recurrence"])
+    if _started:
+        _arm(next_fire_at)
+        _note_own_write()
+    if message == DEFAULT_MESSAGE:
+        return f"Got it! I'll remind you {_describe(schedule)}."
+    return f"Got it! I'll remind you to {message} {_describe(schedule)}."
+
 
+# ── Reminder scheduling ────────────────────────────────────────────────────────
 
-# ── Background reminder checker ────────────────────────────────────────────────
+# Reminders added in this process re-arm the wakeup directly; reminders
+# written by *other* processes don't.  When siblings may write (several web
+# workers – start_reminder_thread(watch=True)) a watch job checks
+# db.table_version("reminders") every WATCH_SECONDS – served from PRAGMA
+# data_version, so no table is read while nothing is written – and only
+# looks up the earliest reminder again when the counter has moved.  A
+# single process schedules nothing while idle.
+WATCH_SECONDS = 5
 
-_last_checked_minute = None  # Track last checked minute to avoid repeats
+CLAIM_BATCH = 100       # max reminders claimed per transaction
 
-def _check_reminders():
+# Overdue by more than this → announced as a missed reminder
+MISSED_AFTER_SECONDS = 60
+
+_started = False        # True once start_reminder_thread() has run
+_wakeup  = None         # scheduler.Job for the earliest pending reminder
+_seen    = None         # db.table_version("reminders") the wakeup reflects
+_lock    = threading.Lock()
+
+
+def _arm(due: float | None = None):
     """
-    Runs in a background daemon thread.
-    Checks every 5 seconds whether any pending reminder is due.
-    Uses a flag to prevent checking the same minute twice.
+    Make sure a scheduler wakeup exists no later than `due` (or the earliest
+    pending reminder in the DB when `due` is None).
     """
-    global _last_checked_minute
-    
-    while True:
-        now     = datetime.now()
-        current_minute = now.strftime("%H:%M")
-        
-        # Only check if we haven't already checked this minute
-        if current_minute != _last_checked_minute:
-            pending = db.get_pending_reminders()
-
-            for reminder in pending:
-                if reminder["remind_at"] == current_minute:
-                    speak(f"⏰ Reminder: {reminder['message']}")
-                    db.mark_reminder_notified(reminder["id"])
-            
-            _last_checked_minute = current_minute
-
-        time.sleep(5)   # check every 5 seconds instead of 30
-
-
-def start_reminder_thread():
-    """Start the background reminder-checking thread (daemon so it exits with main)."""
-    thread        = threading.Thread(target=_check_reminders, daemon=True)
-    thread.name   = "ReminderChecker"
-    thread.start()
-    print("✔  Reminder background thread started.")
+    global _wakeup, _seen
+    with _lock:
+        if due is None:
+            _seen = db.table_version("reminders")
+            due   = db.get_next_reminder_time()
+            if due is None:
+                return
+        if _wakeup is not None and not _wakeup.cancelled and _wakeup.due <= due:
+            return
+        scheduler.cancel(_wakeup)
+        _wakeup = scheduler.call_at(due, _on_wakeup, name="reminders")
+
+
+def _note_own_write():
+    # One insert of ours moves the counter by one and _arm() already knows
+    # its time; any other jump means another process wrote too – leave
+    # _seen behind so the watch job looks again
+    global _seen
+    version = db.table_version("reminders")
+    with _lock:
+        if (version is not None and _seen is not None
+                and version == (_seen[0], _seen[1] + 1)):
+            _seen = version
+
+
+def _next_fire_for(reminder: dict, now: float) -> int | None:
+    """Next epoch for a recurring reminder, None for a one-shot one."""
+    if not reminder["recurrence"]:
+        return None
+    fired_at = datetime.fromtimestamp(reminder["next_fire_at"])
+    nxt      = _advance(reminder["recurrence"], fired_at, datetime.fromtimestamp(now))
+    return int(nxt.timestamp())
+
+
+def _announce(reminder: dict, now: float):
+    late = now - reminder["next_fire_at"]
+    metrics.REMINDER_LAG.observe(max(late, 0.0))
+    if late > MISSED_AFTER_SECONDS:
+        due  = datetime.fromtimestamp(reminder["next_fire_at"]).strftime("%d %b %H:%M")
+        text = f"⏰ Missed reminder (due {due}): {reminder['message']}"
+    else:
+        text = f"⏰ Reminder: {reminder['message']}"
+    speak(text, priority=PRIORITY_HIGH)
+    events.publish("reminder", {"id": reminder["id"], "message": reminder["message"],
+                                "due": reminder["next_fire_at"], "text": text,
+                                "missed": late > MISSED_AFTER_SECONDS})
+
+
+def _on_wakeup():
+    """Scheduler callback: claim and fire everything that is due, then re-arm."""
+    global _wakeup
+    with _lock:
+        _wakeup = None
+
+    try:
+        while True:
+            now     = time.time()
+            claimed = db.claim_due_reminders(
+                now, lambda r: _next_fire_for(r, now), limit=CLAIM_BATCH)
+            for reminder in claimed:
+                _announce(reminder, now)
+            if len(claimed) < CLAIM_BATCH:
+                break
+    finally:
+        _arm()
+
+
+def _watch():
+    """Scheduler callback: re-arm when another process changed the reminders."""
+    try:
+        if db.table_version("reminders") != _seen:
+            _arm()
+    finally:
+        scheduler.call_later(WATCH_SECONDS, _watch, name="reminders-watch")
+
+
+def _backfill_legacy_reminders():
+    """Give pre-existing HH:MM rows (no next_fire_at yet) a fire time."""
+    for reminder in db.get_unscheduled_reminders():
+        try:
+            due = _next_occurrence(reminder["remind_at"])
+        except ValueError:
+            continue
+        db.reschedule_reminder(reminder["id"], int(due.timestamp()))
+
+
+def start_reminder_thread(watch: bool = False):
+    """
+    Start the shared scheduler thread and arm it for the earliest pending
+    reminder.  Anything already overdue (missed while the assistant was not
+    running) is caught up immediately.  New reminders re-arm it from
+    set_reminder().  Pass watch=True when other processes may add
+    reminders too.
+    """
+    global _started
+    if _started:
+        return
+    scheduler.start()
+    _backfill_legacy_reminders()
+    _started = True
+    _arm()
+    if watch:
+        scheduler.call_later(WATCH_SECONDS, _watch, name="reminders-watch")
+    print("✔  Reminder scheduler started.")
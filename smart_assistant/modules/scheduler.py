@@ -0,0 +1,122 @@
+"""
+modules/scheduler.py
+=====================
+One shared background timer thread for everything that has to happen
+"later" (reminders, study sessions, …).
+
+Jobs sit in a min-heap keyed by their due time.  The thread sleeps on a
+condition variable until the earliest job is due; adding a job that is
+earlier than the current head wakes it up so it can re-arm.  With nothing
+scheduled the thread simply waits – no polling, no CPU.
+
+After os.fork() the child gets an empty scheduler (jobs belong to the
+parent's thread); start() it again there.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from modules import profiling
+
+_heap: list  = []                    # (due_epoch, seq, Job)
+_cond        = threading.Condition()
+_seq         = itertools.count()     # tie-breaker so Jobs are never compared
+_thread      = None
+
+
+class Job:
+    """Handle returned by call_at()/call_later(); pass it to cancel()."""
+
+    __slots__ = ("due", "func", "args", "name", "cancelled")
+
+    def __init__(self, due: float, func, args: tuple, name: str):
+        self.due       = due
+        self.func      = func
+        self.args      = args
+        self.name      = name
+        self.cancelled = False
+
+    def __repr__(self) -> str:
+        return f"<Job {self.name} due={self.due:.0f}{' cancelled' if self.cancelled else ''}>"
+
+
+def call_at(due: float, func, *args, name: str = "job") -> Job:
+    """Run func(*args) on the scheduler thread at epoch time `due`."""
+    job = Job(due, func, args, name)
+    with _cond:
+        heapq.heappush(_heap, (due, next(_seq), job))
+        # Only the head matters to the sleeping thread
+        if _heap[0][2] is job:
+            _cond.notify()
+    return job
+
+
+def call_later(delay: float, func, *args, name: str = "job") -> Job:
+    """Run func(*args) on the scheduler thread after `delay` seconds."""
+    return call_at(time.time() + delay, func, *args, name=name)
+
+
+def cancel(job: Job | None):
+    """Cancel a pending job (no-op if it already ran or job is None)."""
+    if job is None:
+        return
+    with _cond:
+        job.cancelled = True
+        # Lazy deletion: cancelled entries are skipped when they reach the head,
+        # but wake the thread so it doesn't sleep until a dead deadline
+        _cond.notify()
+
+
+def pending() -> int:
+    """Number of scheduled (not cancelled) jobs."""
+    with _cond:
+        return sum(1 for _, _, job in _heap if not job.cancelled)
+
+
+def _next_job() -> Job:
+    """Block until the earliest live job is due, pop and return it."""
+    with _cond:
+        while True:
+            while _heap and _heap[0][2].cancelled:
+                heapq.heappop(_heap)
+            if not _heap:
+                _cond.wait()
+                continue
+            delay = _heap[0][0] - time.time()
+            if delay <= 0:
+                return heapq.heappop(_heap)[2]
+            _cond.wait(timeout=delay)
+
+
+def _run():
+    while True:
+        job = _next_job()
+        try:
+            with profiling.profile(f"timer-{job.name}"):
+                job.func(*job.args)
+        except Exception as e:
+            print(f"   [Scheduler: job {job.name} failed: {e}]")
+
+
+def _reset_after_fork():
+    """A forked child inherits the heap but not the thread – start afresh."""
+    global _heap, _cond, _thread
+    _heap, _cond, _thread = [], threading.Condition(), None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def start():
+    """Start the scheduler thread (idempotent)."""
+    global _thread
+    with _cond:
+        if _thread is not None and _thread.is_alive():
+            return
+        _thread      = threading.Thread(target=_run, daemon=True)
+        _thread.name = "Scheduler"
+        _thread.start()
@@ -4,44 +4,356 @@ modules/speech.py
 Handles:
   • Text-to-speech (TTS) output via pyttsx3
   • Voice input via SpeechRecognition (with text fallback)
+
+Speech output goes through a single worker thread fed by a priority queue,
+so callers (conversation loop, reminders, study timer) never block on the
+audio device and the non-thread-safe pyttsx3 engine is only ever driven
+from one thread.  Identical pending utterances are coalesced and the
+backlog is bounded – when it is full the least important utterance is
+dropped, and a newcomer that doesn't outrank it is refused.
+
+Rendered audio is kept in an on-disk LRU cache keyed by (text, voice,
+rate, volume): a repeated phrase is played straight from its file instead
+of being synthesised again.  prewarm() renders known fixed phrases in the
+background at idle priority.
+
+Audio backends are initialised lazily: pyttsx3 on the first utterance (on
+the worker thread), SpeechRecognition on the first listen().  Importing
+this module costs nothing.  With ASSISTANT_HEADLESS=1 (or set_headless())
+no audio backend is ever probed and speak() only prints.
 """
 
+import heapq
+import itertools
+import os
+import shutil
+import subprocess
 import sys
+import threading
+import time
 
-# ── TTS setup ──────────────────────────────────────────────────────────────────
-try:
-    import pyttsx3
-    _engine = pyttsx3.init()
-    _engine.setProperty("rate", 165)    # words per minute
-    _engine.setProperty("volume", 0.9)
-    TTS_AVAILABLE = True
-except Exception:
-    TTS_AVAILABLE = False
-
-# ── Speech Recognition setup ──────────────────────────────────────────────────
-try:
-    import speech_recognition as sr
-    _recognizer   = sr.Recognizer()
-    _recognizer.pause_threshold = 1.0   # seconds of silence before considering phrase done
-    SR_AVAILABLE  = True
-except Exception:
-    SR_AVAILABLE = False
+from modules.disk_cache import DiskCache
+from modules import listener
+from modules import metrics
 
+# ── Engine setup (lazy) ────────────────────────────────────────────────────────
+HEADLESS = os.environ.get("ASSISTANT_HEADLESS", "").lower() in ("1", "true", "yes")
 
-def speak(text: str):
-    """
-    Speak the given text aloud AND print it to the console.
+TTS_RATE   = 165    # words per minute
+TTS_VOLUME = 0.9
+
+_engine         = None    # pyttsx3 engine (or a stub from set_engine())
+_tts_failed     = False   # pyttsx3 missing / no audio device
+_recognizer     = None    # speech_recognition.Recognizer
+_sr_failed      = False
+
+LISTEN_TIMEOUT  = 8.0     # seconds get_input() waits on the background listener
+
+# ── Rendered-audio cache ───────────────────────────────────────────────────────
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TTS_CACHE_DIR       = os.path.join(BASE_DIR, "cache", "tts")
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024
+TTS_CACHE_ENABLED   = os.environ.get("ASSISTANT_TTS_CACHE", "1").lower() not in ("0", "false", "no")
+
+_audio_cache = DiskCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, suffix=".wav")
+_cache_stats = {"hits": 0, "misses": 0, "prewarmed": 0,
+                "synth_seconds": 0.0, "saved_seconds": 0.0}
+_player      = None       # callable(path) that plays an audio file, or None
+_player_probed = False
+
+
+def set_headless(headless: bool = True):
+    """Skip (or re-allow) audio backends at runtime; speak() then only prints."""
+    global HEADLESS
+    HEADLESS = headless
+
+
+def _tts_enabled() -> bool:
+    """True if an utterance might actually be spoken."""
+    return _engine is not None or not (HEADLESS or _tts_failed)
+
+
+def _get_engine():
+    """Create the pyttsx3 engine on first use (called on the worker thread)."""
+    global _engine, _tts_failed
+    if _engine is None and not (HEADLESS or _tts_failed):
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+            engine.setProperty("rate", TTS_RATE)
+            engine.setProperty("volume", TTS_VOLUME)
+            _engine = engine
+        except Exception as e:
+            _tts_failed = True
+            print(f"   [TTS unavailable: {e}]")
+    return _engine
+
+
+def _default_player():
+    """Pick a way to play an audio file on this OS (None if there is none)."""
+    if sys.platform == "win32":
+        import winsound
+        return lambda path: winsound.PlaySound(path, winsound.SND_FILENAME)
+    for cmd in (["afplay"], ["paplay"], ["aplay", "-q"]):
+        if shutil.which(cmd[0]):
+            return lambda path, cmd=cmd: subprocess.run(
+                cmd + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return None
+
+
+def _get_player():
+    global _player, _player_probed
+    if _player is None and not _player_probed:
+        _player_probed = True
+        _player = _default_player()
+    return _player
 
-    If pyttsx3 is unavailable (e.g. no audio device), it falls back
-    to printing only.
+
+def set_player(player):
+    """Replace the audio-file player – callable(path); None disables the cache."""
+    global _player, _player_probed
+    _player, _player_probed = player, True
+
+
+def _get_recognizer():
+    """Import SpeechRecognition and build the recogniser on first use."""
+    global _recognizer, _sr_failed
+    if _recognizer is None and not (HEADLESS or _sr_failed):
+        try:
+            import speech_recognition as sr
+            recognizer = sr.Recognizer()
+            recognizer.pause_threshold = 1.0   # seconds of silence before considering phrase done
+            _recognizer = recognizer
+        except Exception:
+            _sr_failed = True
+    return _recognizer
+
+
+# ── Speech output queue ────────────────────────────────────────────────────────
+
+PRIORITY_HIGH   = 0     # reminders – jump ahead of everything else
+PRIORITY_NORMAL = 1     # replies to the user
+PRIORITY_LOW    = 2     # progress chatter (study timer updates, …)
+
+MAX_BACKLOG = 16        # pending utterances kept before dropping
+
+_queue: list   = []                  # heap of (priority, seq, _Utterance)
+_pending: dict = {}                  # text → queued _Utterance (coalescing)
+_cond          = threading.Condition()
+_seq           = itertools.count()
+_worker        = None
+_busy          = False               # worker is currently speaking
+_current       = None                # _Utterance the worker is on, if any
+
+
+PRIORITY_IDLE   = 3     # cache pre-warming, never spoken
+
+
+class _Utterance:
+    __slots__ = ("text", "priority", "done", "render_only", "queued_at")
+
+    def __init__(self, text: str, priority: int, render_only: bool = False):
+        self.text        = text
+        self.priority    = priority
+        self.render_only = render_only      # only fill the audio cache
+        self.done        = threading.Event()   # set once spoken (or dropped)
+        self.queued_at   = time.perf_counter()
+
+
+def set_engine(engine):
     """
-    print(f"\n🤖 Assistant: {text}")
-    if TTS_AVAILABLE:
+    Replace the TTS engine – anything with say() and runAndWait().  Used by
+    tests and headless boxes to plug in a stub instead of pyttsx3.
+    """
+    global _engine
+    with _cond:
+        _engine = engine
+
+
+def _enqueue(text: str, priority: int, render_only: bool = False) -> _Utterance:
+    """Queue an utterance (caller holds no lock).  Starts the worker lazily."""
+    global _worker
+    with _cond:
+        existing = _pending.get(text)
+        if existing is not None:
+            # Coalesce: say it once, at the more urgent of the two priorities
+            existing.render_only = existing.render_only and render_only
+            if priority < existing.priority:
+                existing.priority = priority
+                heapq.heappush(_queue, (priority, next(_seq), existing))
+            return existing
+
+        item = _Utterance(text, priority, render_only)
+        if len(_pending) >= MAX_BACKLOG:
+            # Make room by dropping the least important (then newest) pending
+            # utterance – unless the new one is no more important than it
+            worst = max(reversed(list(_pending.values())), key=lambda u: u.priority)
+            if worst.priority <= priority:
+                item.done.set()              # refused: keep what is already queued
+                return item
+            del _pending[worst.text]
+            worst.done.set()
+
+        _pending[text] = item
+        heapq.heappush(_queue, (priority, next(_seq), item))
+        _cond.notify()
+
+        if _worker is None or not _worker.is_alive():
+            _worker      = threading.Thread(target=_speech_worker, daemon=True)
+            _worker.name = "SpeechWorker"
+            _worker.start()
+    return item
+
+
+def _next_utterance() -> _Utterance:
+    global _busy, _current
+    with _cond:
+        _current = None
+        _cond.notify_all()                   # wake wait_until_quiet() waiters
+        while True:
+            while _queue:
+                priority, _, item = heapq.heappop(_queue)
+                # Skip stale heap entries (re-prioritised, dropped or spoken)
+                if _pending.get(item.text) is item and item.priority == priority:
+                    del _pending[item.text]
+                    _busy, _current = True, item
+                    if not item.render_only:
+                        metrics.TTS_QUEUE_WAIT.observe(time.perf_counter() - item.queued_at)
+                    return item
+            _busy = False
+            _cond.notify_all()               # wake flush() waiters
+            _cond.wait()
+
+
+def _cache_key(engine, text: str) -> list:
+    try:
+        voice = engine.getProperty("voice")
+    except Exception:
+        voice = None
+    return [text, str(voice), TTS_RATE, TTS_VOLUME]
+
+
+def _render(engine, text: str) -> str | None:
+    """Synthesise `text` into the audio cache; returns the file path or None."""
+    tmp   = _audio_cache.temp_path()
+    start = time.perf_counter()
+    engine.save_to_file(text, tmp)
+    engine.runAndWait()
+    elapsed = time.perf_counter() - start
+    if not os.path.exists(tmp) or os.path.getsize(tmp) == 0:
+        return None
+    _cache_stats["synth_seconds"] += elapsed
+    return _audio_cache.put_file(_cache_key(engine, text), tmp,
+                                 meta={"synth_seconds": elapsed})
+
+
+def _say(engine, item: _Utterance):
+    """Speak one utterance, going through the audio cache when possible."""
+    player = _get_player()
+    if not TTS_CACHE_ENABLED or player is None or not hasattr(engine, "save_to_file"):
+        if not item.render_only:
+            engine.say(item.text)
+            engine.runAndWait()
+        return
+
+    key  = _cache_key(engine, item.text)
+    path = _audio_cache.get(key)
+    if path is not None:
+        if item.render_only:
+            return
+        _cache_stats["hits"] += 1
+        _cache_stats["saved_seconds"] += _audio_cache.meta(key).get("synth_seconds", 0.0)
+    else:
+        path = _render(engine, item.text)
+        if item.render_only:
+            _cache_stats["prewarmed"] += 1
+            return
+        _cache_stats["misses"] += 1
+        if path is None:                      # driver can't render to file
+            engine.say(item.text)
+            engine.runAndWait()
+            return
+    player(path)
+
+
+def _speech_worker():
+    while True:
+        item = _next_utterance()
         try:
-            _engine.say(text)
-            _engine.runAndWait()
+            engine = _get_engine()
+            if engine is not None:
+                _say(engine, item)
         except Exception as e:
             print(f"   [TTS error: {e}]")
+        finally:
+            item.done.set()
+
+
+def prewarm(phrases):
+    """
+    Render fixed phrases into the audio cache in the background (idle
+    priority, nothing is spoken).  No-op when TTS or the cache is off.
+    """
+    if not (TTS_CACHE_ENABLED and _tts_enabled()):
+        return
+    for text in phrases:
+        _enqueue(text, PRIORITY_IDLE, render_only=True)
+
+
+def cache_stats() -> dict:
+    """Audio-cache hit rate and synthesis time saved, for reporting."""
+    spoken = _cache_stats["hits"] + _cache_stats["misses"]
+    return {
+        **_cache_stats,
+        "hit_rate": _cache_stats["hits"] / spoken if spoken else 0.0,
+        "entries":  _audio_cache.stats()["entries"],
+    }
+
+
+def speak(text: str, priority: int = PRIORITY_NORMAL, wait: bool = False):
+    """
+    Print the given text to the console and queue it to be spoken aloud.
+
+    Returns immediately unless wait=True, in which case it blocks until the
+    utterance has been spoken (or dropped from a full backlog).  If pyttsx3
+    is unavailable (e.g. no audio device), it falls back to printing only.
+    """
+    print(f"\n🤖 Assistant: {text}")
+    if not _tts_enabled():
+        return
+    item = _enqueue(text, priority)
+    if wait:
+        item.done.wait()
+
+
+def flush(timeout: float | None = None) -> bool:
+    """Block until everything queued has been spoken; False on timeout."""
+    with _cond:
+        return _cond.wait_for(lambda: not _pending and not _busy, timeout=timeout)
+
+
+def _audible() -> bool:
+    """Something is being (or waiting to be) spoken – caller holds _cond."""
+    if _current is not None and not _current.render_only:
+        return True
+    return any(not item.render_only for item in _pending.values())
+
+
+def is_speaking() -> bool:
+    """True while an utterance is playing or queued (pre-warming doesn't count)."""
+    with _cond:
+        return _audible()
+
+
+def wait_until_quiet(timeout: float | None = None) -> bool:
+    """Block until nothing is being or waiting to be spoken; False on timeout."""
+    with _cond:
+        return _cond.wait_for(lambda: not _audible(), timeout=timeout)
+
+
+def voice_available() -> bool:
+    """True when speech recognition can be used (not headless, package installed)."""
+    return _get_recognizer() is not None
 
 
 def listen() -> str | None:
@@ -51,16 +363,18 @@ def listen() -> str | None:
     Returns the recognised text (lowercase) or None if nothing was
     understood / microphone is unavailable.
     """
-    if not SR_AVAILABLE:
+    recognizer = _get_recognizer()
+    if recognizer is None:
         return None
+    import speech_recognition as sr
 
     try:
         with sr.Microphone() as source:
             print("\n🎤 Listening… (speak now)")
-            _recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            audio = _recognizer.listen(source, timeout=5, phrase_time_limit=10)
+            recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
 
-        text = _recognizer.recognize_google(audio)
+        text = recognizer.recognize_google(audio)
         print(f"   You said: {text}")
         return text.lower()
 
@@ -83,10 +397,17 @@ def get_input(use_voice: bool = True) -> str:
     Get user input either via voice or keyboard.
 
     If voice recognition fails or is disabled, falls back to keyboard input.
-    Always returns a non-empty lowercase string.
+    Always returns a non-empty lowercase string.  In voice mode it first
+    waits for queued speech to finish, so the microphone doesn't pick up
+    the assistant's own reply as the next command.
     """
     if use_voice:
-        text = listen()
+        wait_until_quiet()
+        if listener.is_listening():
+            print("\n🎤 Listening… (speak now)")
+            text = listener.next_utterance(timeout=LISTEN_TIMEOUT)
+        else:
+            text = listen()
         if text:
             return text
         # Fallback if voice failed
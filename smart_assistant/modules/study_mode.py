@@ -1,60 +1,374 @@
 """
 modules/study_mode.py
 ======================
-Implements a 25-minute Pomodoro timer that runs in a background thread
-so it doesn't block the rest of the assistant.
+Pomodoro study sessions: work / break phases for a configurable number of
+cycles, with spoken progress updates.
+
+Sessions are rows in the `study_sessions` table and their timers are jobs
+on the shared scheduler thread (modules/scheduler.py) – one job per
+active session for its next event (progress update or phase change), so
+the thread count stays the same however many sessions exist.  Phase
+boundaries are computed from the stored `phase_ends_at`, which lets
+restore_sessions() pick sessions back up after a restart.
+
+With several web workers, a pause or resume may be handled by a different
+process from the one whose scheduler holds the session's job.  Every change
+bumps the row's `generation` in a compare-and-set UPDATE (_update()); a job
+carries the generation it was armed for, and _on_timer() does nothing once
+the row has moved on, so only the most recently armed job (in whichever
+process) ever fires, and a pause that lands mid-callback is never
+overwritten.  Every change
+and announcement is also published as a "study" event (modules/events.py)
+for the web UI.
+
+Voice commands (all routed through the study_mode intent):
+    "start study mode", "start a 50 minute pomodoro with 10 minute breaks
+    for 3 cycles", "pause study mode", "resume", "how much time is left",
+    "stop study mode"
 """
 
+import re
 import threading
 import time
 
-from modules.speech import speak
+from modules import database as db
+from modules import events
+from modules import scheduler
+from modules.speech import speak, PRIORITY_LOW, PRIORITY_NORMAL
 
-POMODORO_MINUTES = 25
+POMODORO_MINUTES    = 25
 SHORT_BREAK_MINUTES = 5
+DEFAULT_CYCLES      = 1
+PROGRESS_MINUTES    = 5      # spoken update interval during work phases
+MAX_ACTIVE_SESSIONS = 1      # "start study mode" while one runs reports its status
+
+# Accepted ranges for user-supplied lengths
+WORK_RANGE   = (1, 180)
+BREAK_RANGE  = (1, 60)
+CYCLES_RANGE = (1, 12)
+
+_lock = threading.RLock()     # serialises API calls and scheduler callbacks
+_jobs: dict = {}              # session id → pending scheduler.Job
+
+
+# ── Command parsing ────────────────────────────────────────────────────────────
+
+_ACTION_PATTERNS = [
+    ("pause",  re.compile(r"\b(pause|hold)\b")),
+    ("resume", re.compile(r"\b(resume|continue|unpause)\b")),
+    ("cancel", re.compile(r"\b(stop|cancel|end|quit|abort)\b")),
+    ("status", re.compile(r"\b(status|left|remaining|how (much|long))\b")),
+]
+_BREAK_RE  = re.compile(r"(\d+)[\s-]*min(?:ute)?s?\s+breaks?")
+_WORK_RE   = re.compile(r"(\d+)[\s-]*min(?:ute)?s?")
+_CYCLES_RE = re.compile(r"(\d+)\s+(?:cycles?|rounds?|pomodoros?|sessions?)")
 
 
-def _run_pomodoro():
+def _parse_study_command(text: str) -> dict:
     """
-    The actual Pomodoro session – runs in a background thread.
-    1. Work for 25 minutes.
-    2. Announce break.
-    3. Break for 5 minutes.
-    4. Announce session end.
+    Slots for the study_mode intent:
+    {"action": start|pause|resume|cancel|status,
+     "work_minutes", "break_minutes", "cycles"}  (lengths None if not given)
     """
-    speak(f"Study mode activated! Starting a {POMODORO_MINUTES}-minute focus session. "
-          "Stay focused and avoid distractions. Good luck!")
+    lower  = text.lower()
+    action = next((name for name, pattern in _ACTION_PATTERNS if pattern.search(lower)),
+                  "start")
+
+    break_m = _BREAK_RE.search(lower)
+    if break_m:
+        lower = lower[:break_m.start()] + lower[break_m.end():]
+    cycles_m = _CYCLES_RE.search(lower)
+    if cycles_m:
+        lower = lower[:cycles_m.start()] + lower[cycles_m.end():]
+    work_m = _WORK_RE.search(lower)
+
+    return {
+        "action":        action,
+        "work_minutes":  int(work_m.group(1)) if work_m else None,
+        "break_minutes": int(break_m.group(1)) if break_m else None,
+        "cycles":        int(cycles_m.group(1)) if cycles_m else None,
+    }
+
+
+def _clamp(value, bounds: tuple) -> int:
+    low, high = bounds
+    return max(low, min(high, int(value)))
+
+
+# ── Timing ─────────────────────────────────────────────────────────────────────
+
+def _phase_seconds(session: dict) -> int:
+    minutes = session["work_minutes"] if session["phase"] == "work" else session["break_minutes"]
+    return minutes * 60
 
-    # ── Work phase ────────────────────────────────────────────────────────────
-    work_seconds = POMODORO_MINUTES * 60
-    print(f"   ⏱  Pomodoro running … ({POMODORO_MINUTES} min)")
 
-    # Give progress updates every 5 minutes so the user isn't completely in the dark
-    for elapsed_min in range(5, POMODORO_MINUTES, 5):
-        time.sleep(5 * 60)
-        remaining = POMODORO_MINUTES - elapsed_min
-        speak(f"{elapsed_min} minutes done. {remaining} minutes remaining.")
+def _remaining_seconds(session: dict, now: float | None = None) -> int:
+    if session["status"] == "paused":
+        return session["remaining_seconds"] or 0
+    now = time.time() if now is None else now
+    return max(0, int(round(session["phase_ends_at"] - now)))
 
-    # Sleep the remaining time after the last progress update
-    remainder = work_seconds % (5 * 60) or 5 * 60
-    time.sleep(remainder)
 
-    # ── Break phase ───────────────────────────────────────────────────────────
-    speak(f"Great work! Your {POMODORO_MINUTES}-minute session is complete. "
-          f"Take a {SHORT_BREAK_MINUTES}-minute break. Stretch, hydrate, relax!")
+def _next_event(session: dict, now: float) -> float:
+    """Epoch time of the next progress update or phase change."""
+    end = session["phase_ends_at"]
+    if session["phase"] != "work":
+        return end
+    start = end - _phase_seconds(session)
+    step  = PROGRESS_MINUTES * 60
+    tick  = start + (int((now - start) // step) + 1) * step
+    return min(tick, end)
 
-    time.sleep(SHORT_BREAK_MINUTES * 60)
 
-    speak("Break time is over! Ready for another Pomodoro? Just say 'start study mode'.")
+def _arm(session: dict):
+    """(Re)schedule the session's next event (caller holds _lock)."""
+    scheduler.cancel(_jobs.pop(session["id"], None))
+    if session["status"] != "running":
+        return
+    scheduler.start()
+    due = _next_event(session, time.time())
+    _jobs[session["id"]] = scheduler.call_at(due, _on_timer, session["id"],
+                                             session["generation"],
+                                             name=f"study-{session['id']}")
 
 
-def start_study_mode() -> str:
+def _advance(session: dict) -> tuple[dict, str]:
     """
-    Launch the Pomodoro timer in a background thread.
+    Move a session to its next phase, based on the stored phase end (not the
+    wall clock) so catching up after downtime keeps the original schedule.
+    Returns the changed fields and the announcement for the transition.
+    """
+    end = session["phase_ends_at"]
+    if session["phase"] == "work":
+        changes = {"phase": "break", "phase_ends_at": end + session["break_minutes"] * 60}
+        if session["cycle"] < session["cycles"]:
+            msg = (f"Great work! Cycle {session['cycle']} of {session['cycles']} is complete. "
+                   f"Take a {session['break_minutes']}-minute break.")
+        else:
+            msg = (f"Great work! Your {session['work_minutes']}-minute session is complete. "
+                   f"Take a {session['break_minutes']}-minute break. Stretch, hydrate, relax!")
+    elif session["cycle"] < session["cycles"]:
+        changes = {"phase": "work", "cycle": session["cycle"] + 1,
+                   "phase_ends_at": end + session["work_minutes"] * 60}
+        msg = (f"Break's over! Starting cycle {session['cycle'] + 1} of {session['cycles']}: "
+               f"{session['work_minutes']} minutes of focus.")
+    else:
+        changes = {"status": "done", "phase_ends_at": None}
+        msg = "Break time is over! Ready for another Pomodoro? Just say 'start study mode'."
+    return changes, msg
+
+
+def _publish(session: dict, message: str | None = None):
+    """Tell web clients about a session change ("study" event)."""
+    events.publish("study", {"session": session_status(session), "message": message})
+
+
+def _announce(session: dict, message: str, priority: int = PRIORITY_NORMAL):
+    speak(message, priority=priority)
+    _publish(session, message)
+
+
+def _update(session: dict, changes: dict) -> bool:
+    """
+    Store `changes` plus the next generation, only if the row is still at
+    the generation `session` was read with; updates `session` on success.
+    """
+    changes = {**changes, "generation": session["generation"] + 1}
+    if not db.update_study_session(session["id"], expect_generation=session["generation"],
+                                   **changes):
+        return False
+    session.update(changes)
+    return True
+
+
+def _on_timer(session_id: int, generation: int):
+    """Scheduler callback: progress update or phase change."""
+    with _lock:
+        _jobs.pop(session_id, None)
+        session = db.get_study_session(session_id)
+        if (session is None or session["status"] != "running"
+                or session["generation"] != generation):
+            return              # stopped, or re-armed since (maybe by another worker)
+        now = time.time()
+        if now + 0.5 < session["phase_ends_at"]:
+            # Progress update inside a work phase
+            remaining = _remaining_seconds(session, now) // 60
+            elapsed   = session["work_minutes"] - remaining
+            _announce(session, f"{elapsed} minutes done. {remaining} minutes remaining.",
+                      PRIORITY_LOW)
+        else:
+            changes, msg = _advance(session)
+            if not _update(session, changes):
+                return          # paused / stopped meanwhile, by another worker
+            _announce(session, msg)
+        _arm(session)
+
+
+# ── Public API ─────────────────────────────────────────────────────────────────
+
+def _find(session_id: int | None, statuses: tuple) -> dict | None:
+    """The given session, or the newest active one, if its status matches."""
+    if session_id is not None:
+        session = db.get_study_session(session_id)
+    else:
+        active  = db.get_active_study_sessions()
+        session = active[-1] if active else None
+    return session if session and session["status"] in statuses else None
+
+
+def start_session(work_minutes: int | None = None, break_minutes: int | None = None,
+                  cycles: int | None = None) -> dict | None:
+    """
+    Start a session and return it, or None if MAX_ACTIVE_SESSIONS are
+    already active.
+    """
+    work_minutes  = _clamp(work_minutes or POMODORO_MINUTES, WORK_RANGE)
+    break_minutes = _clamp(break_minutes or SHORT_BREAK_MINUTES, BREAK_RANGE)
+    cycles        = _clamp(cycles or DEFAULT_CYCLES, CYCLES_RANGE)
+    with _lock:
+        if len(db.get_active_study_sessions()) >= MAX_ACTIVE_SESSIONS:
+            return None
+        ends_at    = int(time.time()) + work_minutes * 60
+        session_id = db.add_study_session(work_minutes, break_minutes, cycles, ends_at)
+        session    = db.get_study_session(session_id)
+        _arm(session)
+        _publish(session)
+    print(f"   ⏱  Pomodoro running … ({work_minutes} min × {cycles})")
+    return session
+
+
+def pause_session(session_id: int | None = None) -> dict | None:
+    """Freeze a running session's clock; returns it (None if nothing to pause)."""
+    with _lock:
+        while True:
+            session = _find(session_id, ("running",))
+            if session is None:
+                return None
+            if _update(session, {"status": "paused", "phase_ends_at": None,
+                                 "remaining_seconds": _remaining_seconds(session)}):
+                break
+        _arm(session)
+        _publish(session)
+        return session
+
+
+def resume_session(session_id: int | None = None) -> dict | None:
+    """Restart a paused session's clock; returns it (None if nothing is paused)."""
+    with _lock:
+        while True:
+            session = _find(session_id, ("paused",))
+            if session is None:
+                return None
+            if _update(session, {"status": "running", "remaining_seconds": None,
+                                 "phase_ends_at": int(time.time()) + session["remaining_seconds"]}):
+                break
+        _arm(session)
+        _publish(session)
+        return session
+
+
+def cancel_session(session_id: int | None = None) -> dict | None:
+    """Stop a session for good; returns it (None if nothing was active)."""
+    with _lock:
+        while True:
+            session = _find(session_id, ("running", "paused"))
+            if session is None:
+                return None
+            if _update(session, {"status": "cancelled", "phase_ends_at": None}):
+                break
+        _arm(session)
+        _publish(session)
+        return session
+
+
+def session_status(session: dict) -> dict:
+    """JSON-friendly view of a session, with the time left in its phase."""
+    return {
+        "id":                session["id"],
+        "status":            session["status"],
+        "phase":             session["phase"],
+        "cycle":             session["cycle"],
+        "cycles":            session["cycles"],
+        "work_minutes":      session["work_minutes"],
+        "break_minutes":     session["break_minutes"],
+        "remaining_seconds": (_remaining_seconds(session)
+                              if session["status"] in ("running", "paused") else 0),
+    }
+
+
+def get_status() -> list[dict]:
+    """Status of every active session."""
+    return [session_status(s) for s in db.get_active_study_sessions()]
+
+
+def describe(session: dict) -> str:
+    """One spoken sentence about a session's state."""
+    minutes = max(1, round(_remaining_seconds(session) / 60))
+    phase   = "focus" if session["phase"] == "work" else "break"
+    where   = (f"cycle {session['cycle']} of {session['cycles']}, "
+               if session["cycles"] > 1 else "")
+    if session["status"] == "paused":
+        return f"Study mode is paused ({where}{phase}) with {minutes} minutes left."
+    return f"Study mode: {where}{phase} time, {minutes} minutes left."
+
+
+def restore_sessions():
+    """
+    Re-arm persisted sessions after a restart.  Phases that ended while the
+    assistant was down are skipped silently; the current phase is announced.
+    """
+    now = time.time()
+    with _lock:
+        for session in db.get_active_study_sessions():
+            caught_up = dict(session)
+            while caught_up["status"] == "running" and caught_up["phase_ends_at"] <= now:
+                changes, _ = _advance(caught_up)
+                caught_up.update(changes)
+            if caught_up["phase_ends_at"] != session["phase_ends_at"]:
+                if not _update(session, {name: caught_up[name] for name in
+                                         ("status", "phase", "cycle", "phase_ends_at")}):
+                    continue    # changed by another worker meanwhile
+                if session["status"] == "running":
+                    _announce(session, f"Resuming your study session. {describe(session)}")
+            _arm(session)
+
+
+# ── Intent handler ─────────────────────────────────────────────────────────────
+
+def start_study_mode(user_text: str = "", slots: dict | None = None) -> str:
+    """
+    Handle a study_mode command (start / pause / resume / cancel / status).
     Returns an immediate confirmation string.
     """
-    thread      = threading.Thread(target=_run_pomodoro, daemon=True)
-    thread.name = "PomodoroTimer"
-    thread.start()
-    return (f"Starting your {POMODORO_MINUTES}-minute Pomodoro session! "
-            "I'll notify you when it's time for a break.")
+    if slots is None:
+        slots = _parse_study_command(user_text)
+    action = slots.get("action", "start")
+
+    if action == "pause":
+        session = pause_session()
+        return (f"Paused. {describe(session)} Say 'resume study mode' to continue."
+                if session else "There's no running study session to pause.")
+
+    if action == "resume":
+        session = resume_session()
+        return f"Resumed. {describe(session)}" if session else "There's no paused study session."
+
+    if action == "cancel":
+        session = cancel_session()
+        return "Study session stopped." if session else "There's no active study session."
+
+    if action == "status":
+        active = db.get_active_study_sessions()
+        return describe(active[-1]) if active else "There's no active study session."
+
+    session = start_session(slots.get("work_minutes"), slots.get("break_minutes"),
+                            slots.get("cycles"))
+    if session is None:
+        active = db.get_active_study_sessions()
+        return f"A study session is already active. {describe(active[-1])}"
+
+    cycles = (f" for {session['cycles']} cycles with {session['break_minutes']}-minute breaks"
+              if session["cycles"] > 1 else "")
+    return (f"Study mode activated! Starting your {session['work_minutes']}-minute "
+            f"Pomodoro session{cycles}. Stay focused – I'll tell you when it's time "
+            "for a break.")
@@ -1,13 +1,58 @@
 """
 modules/web_search.py
 ======================
-Opens a Google search in the default web browser.
-No external API required – 100% offline-friendly (just needs a browser).
+Answers "search for …" requests.
+
+Results come from a search provider.  With ASSISTANT_SEARCH_URL set (e.g.
+a self-hosted SearxNG instance, http://localhost:8888/search), an
+HttpSearchProvider fetches JSON results over a small pool of keep-alive
+connections and the assistant speaks a short answer plus the top links.
+Without it – or when the endpoint fails – the BrowserProvider opens a
+Google search in the default browser as before (only the link is returned
+when running headless, e.g. behind the web UI).
+
+The endpoint is called as  GET <url>?q=<query>&format=json&count=<n>  and
+must return SearxNG-style JSON:
+
+    {"answers": ["…"],                                   (optional)
+     "results": [{"title": "…", "url": "…", "content": "…"}, …]}
+
+Results are cached on disk (cache/search) for SEARCH_CACHE_TTL seconds,
+LRU-evicted beyond SEARCH_CACHE_MAX_BYTES and keyed by the normalised
+query, so a repeated search never touches the network.
 """
 
-import webbrowser
+import http.client
+import json
+import os
 import re
+import threading
 import urllib.parse
+import webbrowser
+
+from modules.disk_cache import DiskCache
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEARCH_URL     = os.environ.get("ASSISTANT_SEARCH_URL", "")
+SEARCH_API_KEY = os.environ.get("ASSISTANT_SEARCH_KEY", "")
+SEARCH_TIMEOUT = 5.0     # seconds per request
+POOL_SIZE      = 4       # idle keep-alive connections kept per provider
+MAX_RESULTS    = 5       # results requested (and cached) per query
+SPOKEN_LINKS   = 3       # links listed in the reply
+ANSWER_CHARS   = 240     # longest snippet read out
+
+SEARCH_CACHE_DIR       = os.path.join(BASE_DIR, "cache", "search")
+SEARCH_CACHE_MAX_BYTES = 5 * 1024 * 1024
+SEARCH_CACHE_TTL       = 6 * 3600
+
+_cache    = DiskCache(SEARCH_CACHE_DIR, SEARCH_CACHE_MAX_BYTES, ttl=SEARCH_CACHE_TTL,
+                      suffix=".json")
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+class SearchError(Exception):
+    """The provider could not produce results (network, HTTP or format error)."""
 
 
 def _extract_query(text: str) -> str:
@@ -20,12 +65,269 @@ def _extract_query(text: str) -> str:
     return text.strip()
 
 
-def search_google(user_text: str) -> str:
-    """Open a Google search for the query extracted from user_text."""
-    query   = _extract_query(user_text)
+def search_google_slots(text: str) -> dict:
+    """Slots for the search_google intent."""
+    return {"query": _extract_query(text)}
+
+
+def normalise_query(query: str) -> str:
+    """Cache key form of a query: lower-case, no punctuation, single spaces."""
+    return " ".join(_NON_WORD.sub(" ", query.lower()).split())
+
+
+# ── Providers ──────────────────────────────────────────────────────────────────
+
+class SearchProvider:
+    """Interface: search(query, limit) → {"answer": str | None, "results": [...]}."""
+
+    name      = "base"
+    cacheable = True       # False for providers that return nothing to cache
+
+    @property
+    def cache_namespace(self) -> str:
+        """Separates cached results of differently configured providers."""
+        return self.name
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> dict:
+        raise NotImplementedError
+
+
+def _json_list(data: dict, key: str) -> list:
+    """data[key] if it is a list, else [] – endpoints vary in what they send."""
+    value = data.get(key)
+    return value if isinstance(value, list) else []
+
+
+class HttpSearchProvider(SearchProvider):
+    """JSON search API over pooled keep-alive HTTP(S) connections."""
+
+    name = "http"
+
+    def __init__(self, endpoint: str, api_key: str = "", timeout: float = SEARCH_TIMEOUT,
+                 pool_size: int = POOL_SIZE):
+        url = urllib.parse.urlsplit(endpoint)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"Search endpoint must be an http(s) URL, got {endpoint!r}")
+        self.endpoint  = endpoint
+        self.api_key   = api_key
+        self.timeout   = timeout
+        self.pool_size = pool_size
+        self._https    = url.scheme == "https"
+        self._host     = url.hostname
+        self._port     = url.port
+        self._path     = url.path or "/"
+        self._params   = urllib.parse.parse_qsl(url.query)
+        self._idle     = []          # idle connections, most recently used last
+        self._lock     = threading.Lock()
+        self.connections_opened = 0
+        self.requests           = 0
+
+    # ── connection pool ────────────────────────────────────────────────────────
+
+    @property
+    def cache_namespace(self) -> str:
+        return f"{self.name}:{self.endpoint}"
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.connections_opened += 1
+        if self._https:
+            import ssl
+            return http.client.HTTPSConnection(self._host, self._port, timeout=self.timeout,
+                                               context=ssl.create_default_context())
+        return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _get(self, target: str) -> bytes:
+        headers = {"Accept": "application/json", "Connection": "keep-alive"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        # A pooled connection may have been closed by the server while idle;
+        # that surfaces on first use, so such a failure is retried once fresh
+        for attempt in range(2):
+            conn  = self._acquire()
+            fresh = conn.sock is None
+            try:
+                conn.request("GET", target, headers=headers)
+                response = conn.getresponse()
+                body     = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError,
+                    BrokenPipeError) as e:
+                conn.close()
+                if fresh or attempt:
+                    raise SearchError(f"search endpoint closed the connection: {e}") from e
+                continue
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise SearchError(f"search request failed: {e}") from e
+            self.requests += 1
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            if response.status != 200:
+                raise SearchError(f"search endpoint returned HTTP {response.status}")
+            return body
+        raise SearchError("search endpoint closed the connection")
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> dict:
+        params = self._params + [("q", query), ("format", "json"), ("count", str(limit))]
+        body   = self._get(self._path + "?" + urllib.parse.urlencode(params))
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            raise SearchError("search endpoint did not return JSON") from e
+        if not isinstance(data, dict):
+            raise SearchError(f"search endpoint returned a JSON {type(data).__name__}, "
+                              "not an object")
+
+        results = []
+        for item in _json_list(data, "results")[:limit]:
+            if not isinstance(item, dict) or not item.get("url"):
+                continue
+            results.append({
+                "title":   item.get("title") or item["url"],
+                "url":     item["url"],
+                "snippet": item.get("content") or item.get("snippet")
+                           or item.get("description") or "",
+            })
+        answer = None
+        for item in _json_list(data, "answers"):
+            text = item.get("answer") if isinstance(item, dict) else item
+            if isinstance(text, str) and text.strip():
+                answer = text.strip()
+                break
+        return {"answer": answer, "results": results}
+
+
+class BrowserProvider(SearchProvider):
+    """Opens a Google search in the default browser; returns no results."""
+
+    name      = "browser"
+    cacheable = False
+
+    def __init__(self, open_browser: bool = True):
+        self.open_browser = open_browser
+
+    @staticmethod
+    def url(query: str) -> str:
+        return "https://www.google.com/search?q=" + urllib.parse.quote_plus(query)
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> dict:
+        if self.open_browser:
+            webbrowser.open(self.url(query))
+        return {"answer": None, "results": []}
+
+
+_provider = None
+_fallback = None
+
+
+def _headless() -> bool:
+    return os.environ.get("ASSISTANT_HEADLESS", "").lower() in ("1", "true", "yes")
+
+
+def get_provider() -> SearchProvider:
+    """The configured provider (HTTP when ASSISTANT_SEARCH_URL is set, else browser)."""
+    global _provider
+    if _provider is None:
+        _provider = HttpSearchProvider(SEARCH_URL, SEARCH_API_KEY) if SEARCH_URL \
+            else _get_fallback()
+    return _provider
+
+
+def _get_fallback() -> BrowserProvider:
+    global _fallback
+    if _fallback is None:
+        _fallback = BrowserProvider(open_browser=not _headless())
+    return _fallback
+
+
+def set_provider(provider: SearchProvider | None):
+    """Replace the search provider (None → back to the configured default)."""
+    global _provider
+    _provider = provider
+
+
+# ── Search + answer ────────────────────────────────────────────────────────────
+
+def search(query: str, use_cache: bool = True) -> dict:
+    """
+    Results for `query` as {"query", "answer", "results", "provider", "cached"}.
+    Served from the disk cache when possible; falls back to the browser
+    provider when the configured one fails.
+    """
+    provider = get_provider()
+    key      = [provider.cache_namespace, normalise_query(query)]
+    if use_cache and provider.cacheable:
+        cached = _cache.get_bytes(key)
+        if cached is not None:
+            try:
+                return {**json.loads(cached), "provider": provider.name, "cached": True}
+            except ValueError:
+                pass
+
+    try:
+        found = provider.search(query)
+    except SearchError as e:
+        print(f"[Search] {provider.name} provider failed ({e}) – falling back to the browser.")
+        provider = _get_fallback()
+        found    = provider.search(query)
+    else:
+        if provider.cacheable:
+            _cache.put_bytes(key, json.dumps({"query": query, **found}).encode("utf-8"))
+    return {"query": query, **found, "provider": provider.name, "cached": False}
+
+
+def _shorten(text: str, limit: int = ANSWER_CHARS) -> str:
+    """First sentence(s) of `text` that fit in `limit` characters."""
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(". ", 0, limit)
+    return text[:cut + 1] if cut > 0 else text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def format_answer(found: dict) -> str:
+    """Spoken reply: the answer (or top snippet) plus the first few links."""
+    query, results = found["query"], found["results"]
+    if found["provider"] == "browser":
+        url = BrowserProvider.url(query)
+        return f"Searching Google for: {query}" if _get_fallback().open_browser \
+            else f"Here's a Google search for {query}: {url}"
+    if not results and not found["answer"]:
+        return f"I couldn't find anything for {query}."
+
+    answer = found["answer"] or next((r["snippet"] for r in results if r["snippet"]), "")
+    lines  = [f"Here's what I found for {query}: {_shorten(answer)}" if answer
+              else f"Here's what I found for {query}:"]
+    for result in results[:SPOKEN_LINKS]:
+        lines.append(f"  • {result['title']} – {result['url']}")
+    return "\n".join(lines)
+
+
+def search_google(user_text: str, slots: dict | None = None) -> str:
+    """Search for the query extracted from user_text and describe the results."""
+    query   = slots["query"] if slots is not None else _extract_query(user_text)
     if not query:
         return "What would you like me to search for?"
+    return format_answer(search(query))
+
 
-    url     = "https://www.google.com/search?q=" + urllib.parse.quote_plus(query)
-    webbrowser.open(url)
-    return f"Searching Google for: {query}"
+def cache_stats() -> dict:
+    return _cache.stats()
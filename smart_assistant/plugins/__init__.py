@@ -0,0 +1,15 @@
+# plugins/__init__.py
+# Intent plugins: every module in this package is imported by
+# modules.intents.load_plugins() and registers its own intents, e.g.
+#
+#   # plugins/weather.py
+#   from modules import intents
+#
+#   intents.register("weather", "plugins.weather:handle", pool="io")
+#
+#   def handle(user_text, slots):
+#       return "It's sunny."
+#
+#   TRAINING_DATA = [("what's the weather like", "weather"), ...]
+#
+# Retrain (python train_model.py) so the classifier learns the new intent.
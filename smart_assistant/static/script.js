@@ -99,6 +99,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     const name = await loadUserName();
     updateGreeting(name);
     refreshSidebar();
+    connectEvents();
     
     // Focus input
     userInput.focus();
@@ -414,6 +415,58 @@ async function refreshContacts() {
     }
 }
 
+// ─── Server Events ──────────────────────────────────────────────
+
+// Reminders and Pomodoro updates are pushed by the server (/api/events).
+// EventSource reconnects by itself and sends Last-Event-ID, so nothing
+// fired during a reconnect is lost.  A server with all its event streams
+// in use answers 503, which closes the EventSource for good – then we
+// open a new one later, passing the last id we saw.
+const EVENTS_RETRY_MS = 30000;
+let lastEventId = null;
+
+function connectEvents() {
+    if (!('EventSource' in window)) return;
+    const url = lastEventId ? `/api/events?last_id=${encodeURIComponent(lastEventId)}` : '/api/events';
+    const source = new EventSource(url);
+    
+    source.addEventListener('reminder', (e) => {
+        lastEventId = e.lastEventId || lastEventId;
+        const data = JSON.parse(e.data);
+        addMessageToChat(data.text, 'assistant');
+        showNotification('Reminder', data.message);
+        refreshReminders();
+    });
+    
+    source.addEventListener('study', (e) => {
+        lastEventId = e.lastEventId || lastEventId;
+        const data = JSON.parse(e.data);
+        if (data.message) {
+            addMessageToChat(data.message, 'assistant');
+            showNotification('Study mode', data.message);
+        }
+    });
+    
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+            console.warn('Event stream refused – retrying in 30 s...');
+            setTimeout(connectEvents, EVENTS_RETRY_MS);
+        } else {
+            console.warn('Event stream interrupted – reconnecting...');
+        }
+    };
+}
+
+function showNotification(title, body) {
+    // Only when the tab is in the background and the user allowed it
+    if (!('Notification' in window) || !document.hidden) return;
+    if (Notification.permission === 'granted') {
+        new Notification(title, { body });
+    } else if (Notification.permission === 'default') {
+        Notification.requestPermission();
+    }
+}
+
 // ─── Input Handling ──────────────────────────────────────────────
 
 // Send message on Enter key
@@ -0,0 +1,34 @@
+"""
+Synthetic WAV recordings for the listener tests (and benchmark.py): room
+tone with tone bursts standing in for spoken phrases.
+"""
+
+import math
+import random
+import struct
+import wave
+
+
+def write_wav(path: str, phrases: list[float], rate: int = 16000,
+              noise: float = 60.0, gap: float = 1.2):
+    """
+    A synthetic recording: background noise with one tone burst per entry
+    of `phrases` (its length in seconds), `gap` seconds apart.
+    """
+    rng     = random.Random(7)
+    samples = []
+
+    def silence(seconds):
+        samples.extend(int(rng.gauss(0, noise)) for _ in range(int(rate * seconds)))
+
+    silence(1.0)                                   # room tone for calibration
+    for length in phrases:
+        for i in range(int(rate * length)):
+            tone = 4000 * math.sin(2 * math.pi * 220 * i / rate)
+            samples.append(int(tone + rng.gauss(0, noise)))
+        silence(gap)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(struct.pack(f"<{len(samples)}h", *samples))
@@ -0,0 +1,24 @@
+"""
+Shared pytest setup: run from the smart_assistant directory's point of view
+(modules are imported as `modules.<name>`) and never touch real audio.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault("ASSISTANT_HEADLESS", "1")
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """A fresh, initialised database in tmp_path for the duration of a test."""
+    from modules import database as db
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "assistant.db"))
+    db.init_db()
+    return db
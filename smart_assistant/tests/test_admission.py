@@ -0,0 +1,116 @@
+"""Admission control for /api/chat: token buckets, intent caps, the work queue."""
+
+import threading
+import time
+import types
+
+import pytest
+
+from modules import admission
+
+
+@pytest.fixture(autouse=True)
+def fresh(monkeypatch):
+    """Empty buckets and counters, a hand-driven clock, small limits."""
+    admission._reset_after_fork()
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(admission, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(admission, "CHAT_RATE", 2.0)
+    monkeypatch.setattr(admission, "CHAT_BURST", 3)
+    monkeypatch.setattr(admission, "MAX_IN_FLIGHT", 2)
+    monkeypatch.setattr(admission, "MAX_WAITING", 1)
+    yield clock
+    admission._reset_after_fork()
+
+
+# ── Token bucket ───────────────────────────────────────────────────────────────
+
+def test_burst_then_refill(fresh):
+    assert [admission.take_token("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert admission.take_token("a") == pytest.approx(0.5)      # one token at 2/s
+    assert admission.take_token("b") == 0.0                     # buckets are per client
+    fresh.now += 0.5
+    assert admission.take_token("a") == 0.0
+    assert admission.stats()["rejected_rate"] == 1
+
+
+def test_bucket_never_holds_more_than_a_burst(fresh):
+    admission.take_token("a")
+    fresh.now += 3600
+    assert [admission.take_token("a") for _ in range(4)][-1] > 0
+
+
+def test_least_recently_seen_client_is_evicted(monkeypatch):
+    monkeypatch.setattr(admission, "MAX_CLIENTS", 2)
+    for client in ("a", "b", "a", "c"):
+        admission.take_token(client)
+    assert list(admission._buckets) == ["a", "c"]
+
+
+@pytest.mark.parametrize("seconds, header", [(0.01, "1"), (1.0, "1"), (1.2, "2")])
+def test_retry_after_rounds_up(seconds, header):
+    assert admission.retry_after(seconds) == header
+
+
+# ── Intent caps and work slots ─────────────────────────────────────────────────
+
+def _queue(intent: str, timeout: float) -> tuple[list, threading.Thread]:
+    """acquire() in a thread, returned once it is waiting for a slot."""
+    results = []
+    waiter  = threading.Thread(target=lambda: results.append(
+        admission.acquire(intent, timeout=timeout)))
+    waiter.start()
+    deadline = time.perf_counter() + 5
+    while admission.stats()["queued"] == 0:
+        assert time.perf_counter() < deadline, "acquire() never queued"
+        time.sleep(0.001)
+    return results, waiter
+
+
+def test_intent_cap():
+    slot = admission.acquire("study_mode")                      # limit=1
+    assert slot is not None
+    assert admission.acquire("study_mode") is None
+    assert admission.acquire("greeting") is not None            # uncapped intent
+    slot.release()
+    slot.release()                                              # idempotent
+    assert admission.acquire("study_mode") is not None
+    assert admission.stats()["rejected_intent"] == {"study_mode": 1}
+
+
+def test_unshared_slots_only_apply_the_intent_cap():
+    slots = [admission.acquire("greeting", shared=False) for _ in range(5)]
+    assert all(slots) and admission.stats()["in_flight"] == 5
+
+
+def test_full_queue_is_rejected_and_a_waiter_times_out():
+    held = [admission.acquire("greeting"), admission.acquire("greeting")]
+    assert all(held)
+    results, waiter = _queue("greeting", timeout=0.3)
+    assert admission.acquire("greeting", timeout=5) is None    # queue (1) is full
+    waiter.join()
+    assert results == [None]
+    stats = admission.stats()
+    assert (stats["rejected_queue"], stats["rejected_timeout"], stats["queued"]) == (1, 1, 0)
+
+
+def test_released_slot_admits_a_waiter():
+    held = [admission.acquire("greeting"), admission.acquire("greeting")]
+    results, waiter = _queue("greeting", timeout=5)
+    held[0].release()
+    waiter.join()
+    assert results[0] is not None
+    assert admission.stats()["in_flight"] == 2 and admission.stats()["queue_peak"] == 1
+
+
+def test_intent_cap_rechecked_after_queueing():
+    held = [admission.acquire("greeting"), admission.acquire("greeting")]
+    results, waiter = _queue("study_mode", timeout=5)
+    # An executor-bounded caller takes study_mode's only place meanwhile
+    assert admission.acquire("study_mode", shared=False) is not None
+    for slot in held:                                           # a slot, but the cap is full
+        slot.release()
+    waiter.join()
+    assert results == [None]
+    stats = admission.stats()
+    assert (stats["rejected_intent"], stats["rejected_timeout"]) == ({"study_mode": 1}, 0)
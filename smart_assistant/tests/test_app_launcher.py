@@ -0,0 +1,46 @@
+"""What "open …" may start: the app index over a fake PATH and desktop dir."""
+
+import os
+import sys
+
+import pytest
+
+from modules import app_launcher as al
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX PATH layout")
+
+
+def _executable(directory, name):
+    path = os.path.join(directory, name)
+    with open(path, "w") as fh:
+        fh.write("#!/bin/sh\n")
+    os.chmod(path, 0o755)
+    return path
+
+
+@pytest.fixture
+def index(tmp_path):
+    bin_dir, desktop = tmp_path / "bin", tmp_path / "applications"
+    bin_dir.mkdir()
+    desktop.mkdir()
+    for name in ("firefox", "reboot", "shutdown", "yes", "gimp", "mytool", "viewer"):
+        _executable(str(bin_dir), name)
+    (desktop / "viewer.desktop").write_text(
+        "[Desktop Entry]\nName=Image Viewer\nExec=viewer %F\n", encoding="utf-8")
+    return al.AppIndex(str(bin_dir), [str(desktop)], allowlist={"gimp"})
+
+
+def test_friendly_names_and_desktop_entries_match_word_runs(index):
+    assert index.resolve("firefox please")[0] == "firefox"
+    assert index.resolve("the image viewer")[1][0].endswith("viewer")
+
+
+def test_unlisted_path_programs_are_never_resolved(index):
+    for phrase in ("reboot", "shutdown now", "yes", "mytool"):
+        assert index.resolve(phrase) is None
+
+
+def test_path_only_programs_need_an_exact_name(index):
+    assert index.resolve("gimp")[1][0].endswith("gimp")
+    assert index.resolve("viewer")[1][0].endswith("viewer")     # started by a desktop entry
+    assert index.resolve("gimp and reboot") is None
@@ -0,0 +1,88 @@
+"""The ASGI server's bounded executors and the 429s / 503s they lead to."""
+
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("quart")
+
+import asgi                                  # noqa: E402
+from modules import admission                # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_admission():
+    admission._reset_after_fork()
+    yield
+    admission._reset_after_fork()
+
+
+def test_executor_refuses_beyond_max_pending():
+    pool    = asgi.BoundedExecutor("test", workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0)                        # both are now pending
+        with pytest.raises(asgi.Overloaded) as refused:
+            await pool.run(lambda: None)
+        assert refused.value.retry_after == admission.BUSY_RETRY_AFTER
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+        assert await pool.run(lambda: "fits again") == "fits again"
+
+    asyncio.run(scenario())
+    assert pool.stats() == {"workers": 1, "pending": 0, "peak": 2,
+                            "max_pending": 2, "rejected": 1}
+
+
+def _post_chat(message: str = "hello"):
+    async def post():
+        response = await asgi.quart_app.test_client().post("/api/chat", json={"message": message})
+        return response.status_code, response.headers, await response.get_json()
+    return asyncio.run(post())
+
+
+def test_full_executor_is_a_429(monkeypatch):
+    monkeypatch.setattr(asgi.NLU_POOL, "max_pending", 0)
+    status, headers, body = _post_chat()
+    assert (status, headers["Retry-After"], body["error"]) == (429, "1", "rate_limited")
+
+
+def test_empty_token_bucket_is_a_429(monkeypatch):
+    monkeypatch.setattr(asgi.NLU_POOL, "max_pending", 0)
+    monkeypatch.setattr(admission, "CHAT_BURST", 1)
+    monkeypatch.setattr(admission, "CHAT_RATE", 0.25)
+    _post_chat()                                       # spends the only token
+    status, headers, body = _post_chat()
+    assert (status, headers["Retry-After"]) == (429, "4")
+    assert body["response"].startswith("Too many messages")
+
+
+def test_intent_at_its_cap_is_a_429(monkeypatch):
+    monkeypatch.setattr(asgi.nlu, "parse", lambda text: {
+        "intent": "study_mode", "confidence": 0.9, "slots": {}})
+    held = admission.acquire("study_mode")             # limit=1
+    status, _, body = _post_chat("start study mode")
+    held.release()
+    assert (status, body["intent"]) == (429, "study_mode")
+    assert admission.stats()["rejected_intent"] == {"study_mode": 1}
+
+
+def test_full_wsgi_pool_is_a_503(monkeypatch):
+    monkeypatch.setattr(asgi.WSGI_POOL, "max_pending", 0)
+    sent  = []
+    scope = {"type": "http", "method": "GET", "path": "/api/memories", "query_string": b"",
+             "headers": [], "http_version": "1.1"}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    assert sent[0]["status"] == 503
+    assert (b"retry-after", b"1") in sent[0]["headers"]
@@ -0,0 +1,46 @@
+"""Templated training data: expansion, de-duplication and the JSONL round trip."""
+
+from data import augment
+
+
+def test_templates_are_fully_expanded():
+    for text, intent in augment.generate_examples(2000, include_seed_data=False):
+        assert "{" not in text and "}" not in text
+        assert intent in augment.TEMPLATES
+
+
+def test_slot_values_come_from_the_filler_lists():
+    opened = [text for text, intent in augment.generate_examples(3000, include_seed_data=False)
+              if intent == "open_app"]
+    assert opened
+    assert all(any(app in text for app in augment.APPS) for text in opened)
+
+
+def test_pairs_are_unique():
+    pairs = list(augment.generate_examples(5000))
+    assert len(pairs) == len(set(pairs)) == 5000
+
+
+def test_seed_data_comes_first_and_lowercased():
+    seed = list(dict.fromkeys((text.lower(), intent) for text, intent in augment.TRAINING_DATA))
+    pairs = list(augment.generate_examples(len(seed)))
+    assert pairs == seed
+
+
+def test_exhausted_intents_stop_generation(monkeypatch):
+    # Two sentences in total: the generator gives up instead of looping forever
+    monkeypatch.setattr(augment, "TEMPLATES", {"greeting": ["hello"], "exit": ["bye"]})
+    pairs = list(augment.generate_examples(100, include_seed_data=False))
+    assert sorted(pairs) == [("bye", "exit"), ("hello", "greeting")]
+
+
+def test_same_seed_same_corpus():
+    first  = list(augment.generate_examples(500, seed=7, include_seed_data=False))
+    second = list(augment.generate_examples(500, seed=7, include_seed_data=False))
+    assert first == second
+
+
+def test_jsonl_round_trip(tmp_path):
+    path = str(tmp_path / "train.jsonl")
+    assert augment.write_jsonl(path, 300) == 300
+    assert list(augment.iter_jsonl(path)) == list(augment.generate_examples(300))
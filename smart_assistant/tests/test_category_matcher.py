@@ -0,0 +1,65 @@
+"""The compiled (trie regex) expense category matcher."""
+
+import pytest
+
+from modules import expense_tracker as et
+
+
+def _matcher(**keywords):
+    """Matcher for keyword="category" or keyword=("category", weight)."""
+    return et.build_category_matcher({
+        et._normalise_keyword(kw.replace("_", " ")): (v, 1.0) if isinstance(v, str) else v
+        for kw, v in keywords.items()
+    })
+
+
+def test_longest_keyword_wins_at_a_position():
+    matcher = _matcher(gas="transport", gas_bill="utilities")
+    assert et.score_categories("paid the gas bill", matcher) == {"utilities": 2.0}
+    assert et.score_categories("filled up gas", matcher) == {"transport": 1.0}
+
+
+def test_prefix_keyword_still_matches_alone():
+    matcher = _matcher(tea="food", team="sports", team_dinner="work")
+    assert et._detect_category("tea break", matcher) == "food"
+    assert et._detect_category("team lunch", matcher) == "sports"
+    assert et._detect_category("team  dinner", matcher) == "work"
+
+
+def test_whole_words_only():
+    matcher = _matcher(eat="food", gas="transport")
+    assert et.score_categories("theatre with vegas friends", matcher) == {}
+
+
+@pytest.mark.parametrize("text", ["two pizzas", "some pizza", "bought glasses"])
+def test_plurals_match(text):
+    matcher = _matcher(pizza="food", glass="home")
+    assert len(et.score_categories(text, matcher)) == 1
+
+
+def test_weights_and_word_counts_add_up():
+    matcher = _matcher(movie="entertainment", snack=("food", 3.0), popcorn="food")
+    scores  = et.score_categories("movie ticket, snack and popcorn", matcher)
+    assert scores == {"entertainment": 1.0, "food": 4.0}
+
+
+def test_first_match_wins_a_tie_and_default_when_nothing_matches():
+    matcher = _matcher(taxi="transport", lunch="food")
+    assert et._detect_category("taxi to lunch", matcher) == "transport"
+    assert et._detect_category("lunch by taxi", matcher) == "food"
+    assert et._detect_category("paid 300", matcher) == et.DEFAULT_CATEGORY
+
+
+def test_built_in_keywords():
+    matcher = et.build_category_matcher(et._load_keywords())
+    assert et._detect_category("paid 900 for the gas bill", matcher) == "utilities"
+    assert et._detect_category("taxi and metro today 220", matcher) == "transport"
+
+
+def test_user_keyword_overrides_and_rebuilds(temp_db):
+    et.reload_keywords()
+    assert et._detect_category("dinner at the club") == "food"
+    et.add_category_keyword("Club", "entertainment", weight=2.0)
+    assert et._detect_category("dinner at the club") == "entertainment"
+    assert et.remove_category_keyword("club")
+    assert et._detect_category("dinner at the club") == "food"
@@ -0,0 +1,82 @@
+"""Table change counters and the ETag / 304 answers built from them."""
+
+import sqlite3
+import time
+
+import pytest
+
+
+def test_writes_bump_only_their_table(temp_db):
+    before = temp_db.table_versions()
+    temp_db.add_memory("likes tea")
+    after = temp_db.table_versions()
+    assert after["memories"][0] == before["memories"][0] + 1
+    assert after["contacts"] == before["contacts"]
+    assert after[temp_db._DB_ID_ROW] == before[temp_db._DB_ID_ROW]
+
+
+def test_write_through_another_connection_is_seen(temp_db):
+    version = temp_db.table_version("contacts")
+    conn = sqlite3.connect(temp_db.DB_PATH)                  # as another process would
+    temp_db._touch(conn.cursor(), "contacts")
+    conn.commit()
+    conn.close()
+    assert temp_db.table_version("contacts") == (version[0], version[1] + 1)
+
+
+def test_recreated_database_has_a_new_id(temp_db, tmp_path, monkeypatch):
+    first = temp_db.table_version("memories")
+    monkeypatch.setattr(temp_db, "DB_PATH", str(tmp_path / "again.db"))
+    temp_db.init_db()
+    assert temp_db.table_version("memories")[0] != first[0]
+
+
+# ── Routes (need Flask) ────────────────────────────────────────────────────────
+
+@pytest.fixture
+def client(temp_db, monkeypatch):
+    pytest.importorskip("flask")
+    import app as web
+    monkeypatch.setattr(web, "_worker_started", True)
+    return web.app.test_client()
+
+
+def test_unchanged_listing_is_a_304(client, temp_db):
+    first = client.get("/api/memories")
+    etag  = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    again = client.get("/api/memories", headers={"If-None-Match": etag})
+    assert (again.status_code, again.data, again.headers["ETag"]) == (304, b"", etag)
+
+    temp_db.add_contact("Mom", "555")                       # another table
+    assert client.get("/api/memories", headers={"If-None-Match": etag}).status_code == 304
+    temp_db.add_memory("likes tea")
+    changed = client.get("/api/memories", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+def test_query_string_is_part_of_the_etag(client):
+    plain  = client.get("/api/contacts").headers["ETag"]
+    search = client.get("/api/contacts?q=mom").headers["ETag"]
+    assert plain != search
+    assert client.get("/api/contacts?q=mom", headers={"If-None-Match": plain}).status_code == 200
+
+
+def test_if_modified_since_once_the_write_is_in_the_past(client, temp_db):
+    conn = temp_db.get_connection()
+    conn.execute("UPDATE table_versions SET modified_at = ? WHERE name = 'memories'",
+                 (time.time() - 10,))
+    conn.commit()
+    conn.close()
+    last_modified = client.get("/api/memories").headers["Last-Modified"]
+    response = client.get("/api/memories", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+
+def test_daily_listing_changes_with_the_utc_date(client):
+    response = client.get("/api/expenses")
+    assert "Last-Modified" not in response.headers
+    assert response.headers["ETag"].rstrip('"').endswith(
+        time.strftime("%Y%m%d", time.gmtime()))
@@ -0,0 +1,102 @@
+"""Fuzzy / phonetic contact lookup and keeping the shared index in sync."""
+
+import pytest
+
+from modules import contact_index
+from modules.contact_index import ContactIndex
+
+NAMES = ["John Smith", "Jane Smith", "Mom", "Dad", "Mary Jane Watson", "Robert Brown",
+         "Priya Sharma", "Johnny Cash"]
+
+
+@pytest.fixture
+def index():
+    return ContactIndex({"id": i, "name": name} for i, name in enumerate(NAMES, 1))
+
+
+def _names(matches):
+    return [contact["name"] for contact, _ in matches]
+
+
+@pytest.mark.parametrize("word, code", [("robert", "r163"), ("rupert", "r163"),
+                                        ("ashcraft", "a261"), ("tymczak", "t522"),
+                                        ("pfister", "p236"), ("mum", "m500"), ("", "")])
+def test_soundex(word, code):
+    assert contact_index.soundex(word) == code
+
+
+def test_exact_name_scores_one(index):
+    (contact, score), *_ = index.search("john smith")
+    assert (contact["name"], score) == ("John Smith", 1.0)
+
+
+@pytest.mark.parametrize("query, expected", [("jhon smth", "John Smith"),
+                                             ("marry jane", "Mary Jane Watson"),
+                                             ("priya sharmaa", "Priya Sharma")])
+def test_typo_finds_the_contact_first(index, query, expected):
+    assert _names(index.search(query))[0] == expected
+
+
+@pytest.mark.parametrize("query, expected", [("mum", "Mom"), ("jon", "John Smith"),
+                                             ("rupert brown", "Robert Brown")])
+def test_phonetic_match(index, query, expected):
+    assert expected in _names(index.search(query, limit=3))
+
+
+def test_unrelated_and_empty_queries_find_nothing(index):
+    assert index.search("zebra") == []
+    assert index.search("  !! ") == []
+
+
+def test_limit_and_order(index):
+    matches = index.search("smith", limit=2)
+    assert len(matches) == 2
+    assert set(_names(matches)) == {"John Smith", "Jane Smith"}
+    assert matches[0][1] >= matches[1][1]
+
+
+def test_remove_and_re_add(index):
+    assert index.remove("MOM")
+    assert "Mom" not in _names(index.search("mom"))
+    assert not index.remove("mom")
+    index.add({"id": 3, "name": "Mom"})
+    assert _names(index.search("mom"))[0] == "Mom"
+
+
+# ── Shared index over the contacts table ──────────────────────────────────────
+
+def test_own_insert_updates_the_index_in_place(temp_db):
+    shared  = contact_index.get_index()
+    contact = temp_db.add_contact("Jonathan Price", "555")
+    contact_index.on_contact_saved(contact)
+    assert contact_index.get_index() is shared
+    assert _names(contact_index.search("jonathon prise"))[0] == "Jonathan Price"
+
+
+def test_insert_by_another_process_rebuilds(temp_db):
+    shared = contact_index.get_index()
+    assert contact_index.search("jonathan") == []
+    temp_db.add_contact("Jonathan Price", "555")          # no on_contact_saved()
+    assert contact_index.get_index() is not shared
+    assert _names(contact_index.search("jonathan"))[0] == "Jonathan Price"
+
+
+def test_delete_drops_the_contact(temp_db):
+    contact_index.on_contact_saved(temp_db.add_contact("Jonathan Price", "555"))
+    temp_db.delete_contact("Jonathan Price")
+    contact_index.on_contact_deleted("Jonathan Price")
+    assert contact_index.search("jonathan price") == []
+
+
+# ── Route (needs Flask) ────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("limit, count", [("abc", 2), ("0", 1), ("1", 1), ("500", 2)])
+def test_contacts_route_limit(temp_db, monkeypatch, limit, count):
+    pytest.importorskip("flask")
+    import app as web
+    monkeypatch.setattr(web, "_worker_started", True)
+    temp_db.add_contact("Jonathan Price", "555")
+    temp_db.add_contact("Jonathan Pryce", "556")
+    response = web.app.test_client().get(f"/api/contacts?q=jonathan&limit={limit}")
+    assert response.status_code == 200
+    assert len(response.get_json()["contacts"]) == count
@@ -0,0 +1,47 @@
+"""DiskCache shared by several processes (simulated by separate instances)."""
+
+import os
+import time
+
+from modules.disk_cache import DiskCache
+
+
+def test_entry_written_by_one_instance_is_a_hit_in_another(tmp_path):
+    writer = DiskCache(str(tmp_path), 1024)
+    reader = DiskCache(str(tmp_path), 1024)
+    writer.put_bytes("key", b"value", meta={"synth_seconds": 1.5})
+    assert reader.get_bytes("key") == b"value"
+    assert reader.meta("key")["synth_seconds"] == 1.5
+
+
+def test_size_limit_covers_the_whole_directory(tmp_path):
+    first, second = DiskCache(str(tmp_path), 250), DiskCache(str(tmp_path), 250)
+    for i in range(2):
+        first.put_bytes(f"a{i}", b"x" * 50)
+        time.sleep(0.01)                        # distinct mtimes for LRU order
+        second.put_bytes(f"b{i}", b"x" * 50)
+        time.sleep(0.01)
+    assert first.get("a0") is not None          # now more recent than b0
+    time.sleep(0.01)
+    first.put_bytes("a2", b"x" * 50)            # 250 bytes: at the limit
+    second.put_bytes("b2", b"x" * 50)           # over it: the LRU entry goes
+    assert second.stats()["bytes"] == 250
+    assert first.get("b0") is None
+    assert first.get("a0") is not None
+
+
+def test_entry_without_metadata_expires(tmp_path):
+    cache = DiskCache(str(tmp_path), 1024, ttl=60)
+    path  = cache.put_bytes("key", b"value")
+    os.remove(path + ".meta")
+    assert cache.get("key") is None
+    assert not os.path.exists(path)
+
+
+def test_hits_do_not_extend_the_ttl(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path), 1024, ttl=60)
+    cache.put_bytes("key", b"value")
+    assert cache.get("key") is not None
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("key") is None
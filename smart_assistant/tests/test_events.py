@@ -0,0 +1,124 @@
+"""Event fan-out, the cross-process relay and Last-Event-ID replay."""
+
+import json
+import os
+
+import pytest
+
+from modules import events
+
+RELAY = object()          # stands in for the relay thread; tests run _relay_once()
+
+
+@pytest.fixture(autouse=True)
+def fresh():
+    events._reset_after_fork()
+    yield
+    events._reset_after_fork()
+
+
+@pytest.fixture
+def relayed(temp_db, monkeypatch):
+    """Events logged to the table, as under several workers."""
+    monkeypatch.setattr(events, "_relay", RELAY)
+    monkeypatch.setattr(events, "_relay_last", temp_db.get_last_event_id())
+    return temp_db
+
+
+def _topics(batch):
+    return [(e["topic"], e["data"]) for e in batch]
+
+
+def _from_other_worker(db, topic, data):
+    return db.add_event(topic, json.dumps(data), os.getpid() + 1, 0.0)
+
+
+# ── In one process ─────────────────────────────────────────────────────────────
+
+def test_publish_reaches_matching_subscribers():
+    everything = events.subscribe()
+    reminders  = events.subscribe(["reminder"])
+    events.publish("reminder", {"message": "tea"})
+    events.publish("study", {"phase": "break"})
+    assert _topics(everything.get(0)) == [("reminder", {"message": "tea"}),
+                                          ("study", {"phase": "break"})]
+    assert _topics(reminders.get(0)) == [("reminder", {"message": "tea"})]
+    assert everything.get(0) == []
+
+
+def test_slow_client_loses_the_oldest_events():
+    sub = events.Subscriber(max_queued=3)
+    for n in range(5):
+        sub.offer({"id": n, "topic": "study", "data": n, "time": 0.0})
+    assert [e["data"] for e in sub.get(0)] == [2, 3, 4]
+    assert sub.dropped == 2
+
+
+def test_subscriber_cap(monkeypatch):
+    monkeypatch.setattr(events, "MAX_SUBSCRIBERS", 2)
+    first = events.subscribe()
+    assert events.subscribe() is not None
+    assert events.subscribe() is None
+    events.unsubscribe(first)
+    assert first.closed and events.subscriber_count() == 1
+    assert events.subscribe() is not None
+
+
+def test_replay_from_memory():
+    first = events.publish("reminder", "a")["id"]
+    events.publish("study", "b")
+    events.publish("reminder", "c")
+    assert [e["data"] for e in events.subscribe(last_id=first).get(0)] == ["b", "c"]
+    assert [e["data"] for e in events.subscribe(["reminder"], last_id=0).get(0)] == ["a", "c"]
+
+
+def test_stream_formats_events_and_heartbeats():
+    sub    = events.subscribe()
+    stream = events.stream(sub, heartbeat=0.01)
+    assert next(stream) == f"retry: {events.RETRY_MS}\n\n"
+    event = events.publish("reminder", {"message": "tea"})
+    assert next(stream) == (f"id: {event['id']}\nevent: reminder\n"
+                            'data: {"message": "tea"}\n\n')
+    assert next(stream) == ": keep-alive\n\n"
+    stream.close()
+    assert sub.closed and events.subscriber_count() == 0
+
+
+# ── Across processes (the events table) ────────────────────────────────────────
+
+def test_published_events_are_logged_with_table_ids(relayed):
+    event = events.publish("reminder", {"message": "tea"})
+    (row,) = relayed.get_events_after(event["id"] - 1)
+    assert (row["id"], row["topic"], row["origin"]) == (event["id"], "reminder", os.getpid())
+    assert json.loads(row["payload"]) == {"message": "tea"}
+
+
+def test_relay_delivers_other_workers_events_once(relayed):
+    sub = events.subscribe()
+    events.publish("study", "mine")
+    _from_other_worker(relayed, "reminder", "theirs")
+    events._relay_once()
+    events._relay_once()
+    assert _topics(sub.get(0)) == [("study", "mine"), ("reminder", "theirs")]
+
+
+def test_replay_from_the_log(relayed):
+    listener = events.subscribe()                      # keeps the relay running
+    seen = _from_other_worker(relayed, "reminder", "a")
+    _from_other_worker(relayed, "study", "b")
+    events._relay_once()
+    _from_other_worker(relayed, "reminder", "not relayed yet")
+
+    # Only what the relay has passed; the rest arrives through the relay
+    reconnected = events.subscribe(last_id=seen)
+    assert _topics(reconnected.get(0)) == [("study", "b")]
+    events._relay_once()
+    assert _topics(reconnected.get(0)) == [("reminder", "not relayed yet")]
+    assert len(listener.get(0)) == 3
+
+
+def test_first_subscriber_starts_the_relay_from_now(relayed):
+    _from_other_worker(relayed, "reminder", "while nobody listened")
+    sub = events.subscribe()
+    events._relay_once()
+    assert sub.get(0) == []
@@ -0,0 +1,131 @@
+"""Expense analytics and budgets: inclusive UTC day ranges, aggregates, plans."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+ROWS = [
+    # created_at (UTC),     amount, category,        merchant
+    ("2026-03-01 00:00:00", 100.0, "food",          "cafe"),
+    ("2026-03-01 23:59:59",  50.0, "transport",     "uber"),
+    ("2026-03-02 12:00:00", 200.0, "food",          "cafe"),
+    ("2026-03-09 08:30:00",  25.0, "food",          None),
+    ("2026-03-31 23:00:00", 400.0, "shopping",      "amazon"),
+    ("2026-04-01 00:00:00", 999.0, "food",          "cafe"),
+    ("2026-02-28 23:59:59", 999.0, "food",          "cafe"),
+]
+
+
+@pytest.fixture
+def expenses(temp_db):
+    conn = temp_db.get_connection()
+    conn.executemany(
+        "INSERT INTO expenses (created_at, amount, category, note, merchant) "
+        "VALUES (?, ?, ?, '', ?)", ROWS)
+    conn.commit()
+    conn.close()
+    return temp_db
+
+
+def test_date_range_is_inclusive():
+    from modules import database as db
+    assert db._date_range("2026-03-01", "2026-03-31") == ("2026-03-01", "2026-04-01")
+    assert db._date_range("2026-12-31", "2026-12-31") == ("2026-12-31", "2027-01-01")
+    with pytest.raises(ValueError):
+        db._date_range("2026-02-30", "2026-03-01")
+
+
+def test_between_includes_both_edge_days_only(expenses):
+    rows = expenses.get_expenses_between("2026-03-01", "2026-03-31")
+    assert [r["created_at"] for r in rows] == [
+        "2026-03-31 23:00:00", "2026-03-09 08:30:00", "2026-03-02 12:00:00",
+        "2026-03-01 23:59:59", "2026-03-01 00:00:00"]
+    assert len(expenses.get_expenses_between("2026-03-01", "2026-03-31", limit=2)) == 2
+
+
+def test_category_breakdown(expenses):
+    rows = expenses.get_category_breakdown("2026-03-01", "2026-03-31")
+    assert rows == [
+        {"category": "shopping",  "total": 400.0, "count": 1, "percent": 51.61},
+        {"category": "food",      "total": 325.0, "count": 3, "percent": 41.94},
+        {"category": "transport", "total": 50.0,  "count": 1, "percent": 6.45},
+    ]
+
+
+def test_daily_trend_running_total_and_moving_average(expenses):
+    rows = expenses.get_expense_trend("2026-03-01", "2026-03-02")
+    assert rows == [
+        {"period": "2026-03-01", "total": 150.0, "count": 2,
+         "running_total": 150.0, "moving_average": 150.0},
+        {"period": "2026-03-02", "total": 200.0, "count": 1,
+         "running_total": 350.0, "moving_average": 175.0},
+    ]
+
+
+def test_monthly_trend_for_one_category(expenses):
+    rows = expenses.get_expense_trend("2026-02-01", "2026-04-30", "month", category="food")
+    assert [(r["period"], r["total"]) for r in rows] == [
+        ("2026-02", 999.0), ("2026-03", 325.0), ("2026-04", 999.0)]
+
+
+def test_top_merchants_skip_unknown_and_respect_limit(expenses):
+    rows = expenses.get_top_merchants("2026-03-01", "2026-03-31")
+    assert [(r["merchant"], r["total"], r["count"]) for r in rows] == [
+        ("amazon", 400.0, 1), ("cafe", 300.0, 2), ("uber", 50.0, 1)]
+    assert len(expenses.get_top_merchants("2026-03-01", "2026-03-31", limit=1)) == 1
+
+
+def test_top_merchants_seek_the_date_index(expenses):
+    conn = expenses.get_connection()
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN " + expenses._TOP_MERCHANTS_SQL, ("2026-03-01", "2026-04-01", 10)))
+    conn.close()
+    assert "idx_expenses_created_merchant (created_at>? AND created_at<?)" in plan
+
+
+def test_budget_status_counts_the_current_utc_period(temp_db):
+    temp_db.set_budget("food", "day", 200)
+    temp_db.set_budget("all", "month", 1000)
+    temp_db.add_expense(150, "food")
+    temp_db.add_expense(50, "transport")
+    conn = temp_db.get_connection()
+    yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).strftime("%Y-%m-%d 12:00:00")
+    conn.execute("INSERT INTO expenses (created_at, amount, category, note) "
+                 "VALUES (?, 500, 'food', '')", (yesterday,))
+    conn.commit()
+    conn.close()
+
+    food = temp_db.get_budget_status("food")[0]
+    assert (food["category"], food["spent"], food["percent"]) == ("food", 150.0, 75.0)
+    assert {b["category"] for b in temp_db.get_budget_status("food")} == {"food", "all"}
+    assert temp_db.get_budget_status("transport")[0]["category"] == "all"
+
+
+def test_budget_period_is_validated(temp_db):
+    with pytest.raises(ValueError):
+        temp_db.set_budget("food", "fortnight", 100)
+
+
+# ── Routes (need Flask) ────────────────────────────────────────────────────────
+
+@pytest.fixture
+def client(expenses, monkeypatch):
+    pytest.importorskip("flask")
+    import app as web
+    monkeypatch.setattr(web, "_worker_started", True)      # no model, no threads
+    return web.app.test_client()
+
+
+@pytest.mark.parametrize("url", ["/api/expenses?start=yesterday",
+                                 "/api/expenses/breakdown?end=2026-02-30",
+                                 "/api/expenses/trend?period=fortnight",
+                                 "/api/expenses/merchants?limit=abc"])
+def test_bad_arguments_are_400s(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+def test_default_range_ends_on_the_utc_date(client):
+    body = client.get("/api/expenses/breakdown").get_json()
+    assert body["end"] == datetime.now(timezone.utc).date().isoformat()
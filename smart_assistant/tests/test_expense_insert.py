@@ -0,0 +1,51 @@
+"""Logging an expense and reading its totals in one transaction."""
+
+import threading
+
+from modules import expense_tracker
+
+
+def test_totals_include_the_new_expense(temp_db):
+    temp_db.add_expense(40, "transport")
+    result = temp_db.add_expense_with_totals(100, "food", "lunch", "cafe")
+    assert result["id"] > 0
+    assert (result["daily_total"], result["category_total"]) == (140.0, 100.0)
+    assert result["budgets"] == []
+
+
+def test_budgets_are_read_in_the_same_transaction(temp_db):
+    temp_db.set_budget("food", "day", 200)
+    temp_db.set_budget("transport", "day", 10)
+    result = temp_db.add_expense_with_totals(170, "food")
+    assert [(b["category"], b["spent"], b["percent"]) for b in result["budgets"]] == [
+        ("food", 170.0, 85.0)]
+
+
+def test_concurrent_inserts_see_distinct_totals(temp_db):
+    threads, per_thread, results = 8, 10, []
+    lock = threading.Lock()
+
+    def insert():
+        for _ in range(per_thread):
+            result = temp_db.add_expense_with_totals(1, "food")
+            with lock:
+                results.append(result["daily_total"])
+
+    workers = [threading.Thread(target=insert) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    # Every insert saw exactly the expenses committed before it, itself included
+    assert sorted(results) == [float(n) for n in range(1, threads * per_thread + 1)]
+    assert temp_db.get_total_expenses_today() == threads * per_thread
+
+
+def test_log_expense_reports_total_and_alerts(temp_db):
+    temp_db.set_budget("food", "day", 100)
+    reply = expense_tracker.log_expense("spent 90 on pizza")
+    assert reply.startswith("Logged expense: ₹90.00 under 'food'. "
+                            "Your total spending today is ₹90.00.")
+    assert "Heads up: you've used 90% of your daily 'food' budget." in reply
+    assert "over your daily 'food' budget" in expense_tracker.log_expense("spent 20 on pizza")
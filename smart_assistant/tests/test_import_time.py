@@ -0,0 +1,53 @@
+"""Cold-import budget for the entry points (see IMPORT_BUDGETS in benchmarks/startup.py)."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks import ROOT
+from benchmarks.startup import IMPORT_BUDGETS
+
+RUNS = 3
+
+# Must stay unimported until they are actually needed: heavy dependencies,
+# and intent handler modules (loaded by intents.preload() or at the call site)
+LAZY_MODULES = ("pyttsx3", "speech_recognition", "numpy", "sklearn",
+                "modules.reminder", "modules.study_mode", "modules.expense_tracker",
+                "modules.app_launcher", "modules.process_manager", "modules.web_search",
+                "modules.contact_index")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def _cold_import(module: str) -> dict:
+    """Best-of-RUNS import time of `module` in a fresh headless interpreter."""
+    env  = {**os.environ, "ASSISTANT_HEADLESS": "1"}
+    code = _PROBE.format(module=module, lazy=LAZY_MODULES)
+    best = None
+    for _ in range(RUNS):
+        out    = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+def test_import_stays_within_budget(module):
+    if module == "app":
+        pytest.importorskip("flask")
+    result = _cold_import(module)
+    assert result["loaded"] == [], f"import {module} pulled in {result['loaded']}"
+    assert result["seconds"] <= IMPORT_BUDGETS[module], (
+        f"import {module} took {result['seconds'] * 1000:.0f} ms "
+        f"(budget {IMPORT_BUDGETS[module] * 1000:.0f} ms)")
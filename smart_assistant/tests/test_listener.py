@@ -0,0 +1,78 @@
+"""Continuous listener driven by recorded WAV fixtures and a canned recogniser."""
+
+import pytest
+
+from audio_fixtures import write_wav
+from modules import listener
+
+# Phrase lengths (seconds) in the fixture; they start 1.0 s in, 1.2 s apart
+PHRASES     = [0.6, 0.4, 1.5]
+STARTS      = [1.0, 2.8, 4.4]
+TRANSCRIPTS = ["What time is it", "open chrome", "remind me to stretch in 5 minutes"]
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """commands.wav plus its commands.txt transcript sidecar."""
+    wav_path = tmp_path / "commands.wav"
+    write_wav(str(wav_path), PHRASES)
+    (tmp_path / "commands.txt").write_text("\n".join(TRANSCRIPTS), encoding="utf-8")
+    return str(wav_path)
+
+
+class PositionedSource(listener.WavFileSource):
+    """WavFileSource that knows how many seconds of audio have been read."""
+
+    position = 0.0
+
+    def read(self, n_frames: int) -> bytes:
+        data = super().read(n_frames)
+        self.position += len(data) / (self.sample_width * self.sample_rate)
+        return data
+
+
+def _run(source, recognizer, muted=None) -> list[str]:
+    lst = listener.Listener(source, recognizer, muted=muted).start()
+    assert lst.finished.wait(timeout=30)
+    got = []
+    while (text := lst.get(timeout=0)) is not None:
+        got.append(text)
+    return got
+
+
+def test_vad_finds_each_phrase_once(recording):
+    with listener.WavFileSource(recording) as source:
+        segments = list(listener.segment_stream(source))
+    assert len(segments) == len(PHRASES)
+    for segment, start, length in zip(segments, STARTS, PHRASES):
+        assert segment.started == pytest.approx(start, abs=listener.PRE_ROLL_SECONDS + 0.05)
+        assert length <= segment.duration <= length + listener.PRE_ROLL_SECONDS + \
+            listener.PAUSE_SECONDS + 0.05
+
+
+def test_recorded_phrases_come_out_as_queued_text(recording):
+    recognizer = listener.FixtureRecognizer.from_wav(recording)
+    got = _run(listener.WavFileSource(recording), recognizer)
+    assert got == [text.lower() for text in TRANSCRIPTS]
+    assert len(recognizer.segments) == len(PHRASES)
+
+
+def test_audio_is_dropped_while_muted(recording):
+    source     = PositionedSource(recording)
+    recognizer = listener.FixtureRecognizer(["first", "third"])
+    # The assistant "speaks" over the second phrase
+    got = _run(source, recognizer, muted=lambda: 2.6 <= source.position <= 3.4)
+    assert got == ["first", "third"]
+    assert [round(s.started) for s in recognizer.segments] == [1, 4]
+
+
+def test_recogniser_failures_do_not_stop_the_listener(recording):
+    class Flaky(listener.FixtureRecognizer):
+        def recognize(self, segment):
+            if not self.segments:
+                self.segments.append(segment)
+                raise RuntimeError("service unavailable")
+            return super().recognize(segment)
+
+    got = _run(listener.WavFileSource(recording), Flaky(["two", "three"]))
+    assert got == ["two", "three"]
@@ -0,0 +1,90 @@
+"""Counters, histograms and their Prometheus text exposition."""
+
+import pytest
+
+from modules import metrics
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """Metrics made by a test stay out of the process-wide registry."""
+    monkeypatch.setattr(metrics, "_registry", [])
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    return metrics._registry
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = metrics.Histogram("t_seconds", "Test.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value, "parse")
+    assert hist.render() == [
+        't_seconds_bucket{stage="parse",le="0.1"} 2',
+        't_seconds_bucket{stage="parse",le="1"} 3',
+        't_seconds_bucket{stage="parse",le="+Inf"} 4',
+        't_seconds_sum{stage="parse"} 3.65',
+        't_seconds_count{stage="parse"} 4',
+    ]
+
+
+def test_render_has_help_type_and_escaped_labels():
+    counter = metrics.Counter("t_total", "Things.", ("intent", "status"))
+    counter.inc('say "hi"\\', 200)
+    counter.inc('say "hi"\\', 200, amount=1234567)
+    metrics.Gauge("t_depth", "Queue depth.", lambda: {("chat",): 3}, ("queue",))
+    assert metrics.render() == (
+        "# HELP t_total Things.\n"
+        "# TYPE t_total counter\n"
+        't_total{intent="say \\"hi\\"\\\\",status="200"} 1234568.0\n'
+        "# HELP t_depth Queue depth.\n"
+        "# TYPE t_depth gauge\n"
+        't_depth{queue="chat"} 3.0\n')
+
+
+def test_failing_gauge_is_left_out():
+    metrics.Gauge("t_broken", "Broken.", lambda: 1 / 0)
+    assert metrics.render() == "# HELP t_broken Broken.\n# TYPE t_broken gauge\n"
+
+
+def test_timed_labels_with_the_function_name():
+    hist = metrics.Histogram("t_db_seconds", "Test.", ("helper",))
+
+    @metrics.timed(hist)
+    def get_contact():
+        return "found"
+
+    @metrics.timed(hist, "explicit")
+    def other():
+        pass
+
+    assert get_contact() == "found" and get_contact.__name__ == "get_contact"
+    other()
+    assert (hist.count("get_contact"), hist.count("explicit")) == (1, 1)
+
+
+def test_timed_unlabelled_histogram_and_errors():
+    hist = metrics.Histogram("t_classify_seconds", "Test.")
+
+    @metrics.timed(hist)
+    def classify():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        classify()
+    assert hist.count() == 1
+
+
+def test_trace_collects_timing_histograms():
+    hist = metrics.Histogram("t_handler_seconds", "Test.", timing="handler")
+    trace = metrics.start_trace()
+    hist.observe(0.002)
+    hist.observe(0.003)
+    assert metrics.end_trace() is trace
+    hist.observe(1.0)                                    # outside any trace
+    assert metrics.server_timing(trace) == "handler;dur=5.00"
+
+
+def test_disabled_records_nothing(monkeypatch):
+    hist = metrics.Histogram("t_off_seconds", "Test.")
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    hist.observe(0.1)
+    assert hist.count() == 0 and hist.render() == []
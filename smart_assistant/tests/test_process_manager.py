@@ -0,0 +1,82 @@
+"""Launched apps: reaping, closing the whole process group, the running cap."""
+
+import os
+import sys
+import time
+
+import pytest
+
+from modules import process_manager as pm
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX process groups")
+
+
+@pytest.fixture(autouse=True)
+def no_leftovers():
+    yield
+    pm.close(timeout=1.0)
+
+
+def _sleeper(seconds: float = 30) -> list[str]:
+    return [sys.executable, "-c", f"import time; time.sleep({seconds})"]
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def _alive(pid: int) -> bool:
+    """Running (a killed zombie waiting for init to reap it counts as gone)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+def test_exited_child_is_reaped_and_removed():
+    app = pm.launch("quick", [sys.executable, "-c", "pass"])
+    assert _wait_for(lambda: app.pid not in pm._apps)      # the reaper, not running()
+    assert app.popen.returncode == 0
+    assert app not in pm.running()
+
+
+def test_argv_is_never_run_through_a_shell(tmp_path):
+    marker = tmp_path / "ran"
+    app = pm.launch("echo", [sys.executable, "-c", "import sys; print(sys.argv)",
+                             f"; touch {marker}"])
+    assert _wait_for(lambda: app.popen.poll() is not None)
+    assert not marker.exists()
+
+
+def test_close_kills_the_whole_process_group(tmp_path):
+    pid_file = tmp_path / "grandchild.pid"
+    script = ("import subprocess, sys, time\n"
+              f"child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+              f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+              "time.sleep(30)\n")
+    app = pm.launch("parent", [sys.executable, "-c", script])
+    assert _wait_for(lambda: pid_file.exists() and pid_file.read_text())
+    grandchild = int(pid_file.read_text())
+
+    assert pm.close(name="parent", timeout=1.0) == [app]
+    assert app.popen.returncode is not None and app not in pm.running()
+    assert _wait_for(lambda: not _alive(grandchild))
+
+
+def test_launch_beyond_the_cap_is_refused():
+    apps = [pm.launch(f"app {n}", _sleeper()) for n in range(pm.MAX_RUNNING_APPS)]
+    assert all(apps) and len(pm.running()) == pm.MAX_RUNNING_APPS
+    assert pm.launch("one too many", _sleeper()) is None
+
+    pm.close(pid=apps[0].pid, timeout=1.0)
+    assert pm.launch("fits again", _sleeper()) is not None
@@ -0,0 +1,111 @@
+"""On-demand profiling: sampled cProfile dumps, stack samples, slow queries."""
+
+import os
+import pstats
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from modules import profiling, scheduler
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "SAMPLE_RATE", profiling.SAMPLE_RATE)
+    monkeypatch.setattr(profiling, "SLOW_QUERY_MS", profiling.SLOW_QUERY_MS)
+    yield tmp_path
+    profiling.disable()
+
+
+def _files(directory, suffix):
+    return sorted(name for name in os.listdir(directory) if name.endswith(suffix))
+
+
+def test_off_by_default_costs_nothing(profile_dir):
+    assert profiling.profile("chat") is profiling._NO_PROFILE
+    assert profiling.connection_factory is sqlite3.Connection
+    with profiling.profile("chat"):
+        pass
+    assert os.listdir(profile_dir) == []
+
+
+def test_sampled_call_writes_a_readable_profile(profile_dir):
+    profiling.enable(sample_rate=1.0, sample_stacks=False)
+    with profiling.profile("chat-tell time"):
+        sum(range(1000))
+    (name,) = _files(profile_dir, ".prof")
+    assert "-chat-tell_time-" in name
+    pstats.Stats(str(profile_dir / name))                 # loads
+
+
+def test_unsampled_and_overlapping_calls_are_not_profiled(profile_dir):
+    profiling.enable(sample_rate=0.0, sample_stacks=False)
+    assert profiling.profile("chat") is profiling._NO_PROFILE
+    profiling.enable(sample_rate=1.0)
+    outer = profiling.profile("outer")
+    with outer:
+        assert profiling.profile("inner") is profiling._NO_PROFILE
+    assert len(_files(profile_dir, ".prof")) == 1
+    assert profiling.profile("next") is not profiling._NO_PROFILE
+    profiling._cprofile.release()                         # the lock "next" took
+
+
+def test_timer_callbacks_are_profiled(profile_dir):
+    profiling.enable(sample_rate=1.0, sample_stacks=False)
+    scheduler.start()
+    scheduler.call_later(0, sum, range(1000), name="reminder 1")
+    deadline = time.monotonic() + 5
+    while not any("-timer-reminder_1-" in name for name in _files(profile_dir, ".prof")):
+        assert time.monotonic() < deadline, "the timer callback was not profiled"
+        time.sleep(0.01)
+
+
+def test_prune_keeps_the_newest(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling, "MAX_FILES", 3)
+    for n in range(5):
+        path = profile_dir / f"{n}.prof"
+        path.write_bytes(b"x")
+        os.utime(path, (n, n))
+    (profile_dir / "slow-queries.log").write_text("kept\n")
+    profiling._prune()
+    assert sorted(os.listdir(profile_dir)) == ["2.prof", "3.prof", "4.prof", "slow-queries.log"]
+
+
+def test_stack_sampler_sees_other_threads(profile_dir):
+    stop = threading.Event()
+
+    def idle_worker():
+        stop.wait(5)
+
+    worker = threading.Thread(target=idle_worker, name="Idle Worker")
+    worker.start()
+    sampler = profiling.StackSampler(hz=1000)
+    sampler.sample()
+    stop.set()
+    worker.join()
+    stacks = [stack for stack in sampler.counts if stack.startswith("Idle_Worker;")]
+    assert stacks and "idle_worker (test_profiling.py:" in stacks[0]
+
+    sampler.flush()
+    (name,) = _files(profile_dir, ".folded")
+    lines = (profile_dir / name).read_text().splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert sampler.counts == {}
+
+
+def test_slow_queries_are_logged(temp_db, profile_dir):
+    profiling.enable(slow_query_ms=0, sample_stacks=False)
+    conn = temp_db.get_connection()
+    assert isinstance(conn, profiling.TimedConnection)
+    conn.execute("SELECT name FROM contacts WHERE name = ?", ("Mom",)).fetchall()
+    conn.cursor().executemany("DELETE FROM contacts WHERE name = ?", [("Dad",)])
+    conn.close()
+    log = (profile_dir / "slow-queries.log").read_text()
+    assert "SELECT name FROM contacts WHERE name = ? ('Mom',)" in log
+    assert "DELETE FROM contacts WHERE name = ? '(executemany)'" in log
+
+    profiling.disable()
+    assert type(temp_db.get_connection()) is sqlite3.Connection
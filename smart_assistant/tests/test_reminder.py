@@ -0,0 +1,137 @@
+"""Reminder scheduling: wakeups, the cross-process watch and time parsing."""
+
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from modules import reminder, scheduler
+
+
+@pytest.fixture
+def reminders(temp_db, monkeypatch):
+    """A started reminder module on a fresh database; spoken text in `spoken`."""
+    spoken = []
+    monkeypatch.setattr(reminder, "speak", lambda text, **kw: spoken.append(text))
+    monkeypatch.setattr(reminder, "_started", False)
+    monkeypatch.setattr(reminder, "_wakeup", None)
+    monkeypatch.setattr(reminder, "_seen", None)
+    yield spoken
+    with scheduler._cond:
+        for _, _, job in scheduler._heap:
+            job.cancelled = True
+
+
+def _jobs(name: str) -> list:
+    with scheduler._cond:
+        return [job for _, _, job in scheduler._heap if job.name == name and not job.cancelled]
+
+
+def test_single_process_schedules_nothing_while_idle(reminders):
+    reminder.start_reminder_thread()
+    assert _jobs("reminders") == [] and _jobs("reminders-watch") == []
+
+
+def test_shared_database_is_watched(reminders):
+    reminder.start_reminder_thread(watch=True)
+    assert len(_jobs("reminders-watch")) == 1
+
+
+def test_own_write_arms_without_a_reread(reminders, temp_db):
+    reminder.start_reminder_thread(watch=True)
+    reminder.set_reminder("remind me to stretch in 10 minutes")
+    wakeup, = _jobs("reminders")
+    assert wakeup.due == temp_db.get_next_reminder_time()
+    assert reminder._seen == temp_db.table_version("reminders")
+
+
+def test_watch_picks_up_another_process(reminders, temp_db):
+    reminder.start_reminder_thread(watch=True)
+    reminder.set_reminder("remind me to stretch in 10 minutes")
+    soon = int(time.time()) + 60
+    temp_db.add_reminder("from another worker", "later", next_fire_at=soon)
+    reminder._watch()
+    assert min(job.due for job in _jobs("reminders")) == soon
+
+
+def test_due_reminder_is_spoken(reminders, temp_db):
+    temp_db.add_reminder("drink water", "now", next_fire_at=int(time.time()))
+    reminder.start_reminder_thread()
+    deadline = time.time() + 2
+    while not reminders and time.time() < deadline:
+        time.sleep(0.01)
+    assert reminders == ["⏰ Reminder: drink water"]
+    assert temp_db.get_pending_reminders() == []
+
+
+# ── Parsing ────────────────────────────────────────────────────────────────────
+
+NOW = datetime(2026, 10, 19, 10, 0)          # a Monday morning
+
+
+@pytest.mark.parametrize("text, at, recurrence", [
+    ("in 20 minutes",             datetime(2026, 10, 19, 10, 20), None),
+    ("in an hour",                datetime(2026, 10, 19, 11, 0),  None),
+    ("in 2 days",                 datetime(2026, 10, 21, 10, 0),  None),
+    ("in 2 days at 5pm",          datetime(2026, 10, 21, 17, 0),  None),
+    ("in 1 day at 08:15",         datetime(2026, 10, 20, 8, 15),  None),
+    ("at 3 pm",                   datetime(2026, 10, 19, 15, 0),  None),
+    ("at 7",                      datetime(2026, 10, 19, 19, 0),  None),
+    ("at 9 am",                   datetime(2026, 10, 20, 9, 0),   None),
+    ("tomorrow at 10:30 am",      datetime(2026, 10, 20, 10, 30), None),
+    ("tonight",                   datetime(2026, 10, 19, 20, 0),  None),
+    ("on friday at 5 pm",         datetime(2026, 10, 23, 17, 0),  None),
+    ("next monday at 9",          datetime(2026, 10, 26, 9, 0),   None),
+    ("on 25 december",            datetime(2026, 12, 25, 9, 0),   None),
+    ("25/12",                     datetime(2026, 12, 25, 9, 0),   None),
+    ("every day at 7 am",         datetime(2026, 10, 20, 7, 0),   "daily"),
+    ("every weekday at 9",        datetime(2026, 10, 20, 9, 0),   "weekdays"),
+    ("every 3 hours",             datetime(2026, 10, 19, 13, 0),  "hourly:3"),
+    ("in 2 hours every day",      datetime(2026, 10, 19, 12, 0),  "daily"),
+    ("in 2 days every day at 7am", datetime(2026, 10, 21, 7, 0),  "daily"),
+])
+def test_parse_time(text, at, recurrence):
+    assert reminder._parse_time(text, NOW) == {"at": at, "recurrence": recurrence}
+
+
+@pytest.mark.parametrize("text", ["remind me to call mom", "on 2026-10-18 at 9", "every 0 hours"])
+def test_parse_time_rejects(text):
+    assert reminder._parse_time(text, NOW) is None
+
+
+@pytest.mark.parametrize("text, message", [
+    ("remind me to drink water tomorrow at 3 pm", "drink water"),
+    ("remind me in 2 days at 5pm to call mom",    "call mom"),
+    ("remind me every day at 7 am to take pills", "take pills"),
+    ("remind me in 10 minutes",                   reminder.DEFAULT_MESSAGE),
+])
+def test_extract_message(text, message):
+    assert reminder._extract_message(text) == message
+
+
+# ── Claiming ───────────────────────────────────────────────────────────────────
+
+def test_concurrent_claims_fire_once(temp_db):
+    due = int(time.time()) - 1
+    temp_db.add_reminder("once", "now", next_fire_at=due)
+    temp_db.add_reminder("hourly", "now", next_fire_at=due, recurrence="hourly:1")
+    start   = threading.Barrier(2)
+    claimed = []
+
+    def slow_next_fire(row):
+        time.sleep(0.05)                    # hold the write lock a while
+        return row["next_fire_at"] + 3600 if row["recurrence"] else None
+
+    def checker():
+        start.wait()
+        claimed.extend(r["message"] for r in temp_db.claim_due_reminders(time.time(), slow_next_fire))
+
+    threads = [threading.Thread(target=checker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == ["hourly", "once"]
+    assert temp_db.get_next_reminder_time() == due + 3600
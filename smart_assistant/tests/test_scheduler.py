@@ -0,0 +1,98 @@
+"""The shared timer thread: ordering, cancellation and robustness."""
+
+import threading
+import time
+
+import pytest
+
+from modules import scheduler
+
+
+@pytest.fixture(autouse=True)
+def running():
+    scheduler.start()
+    yield
+    with scheduler._cond:
+        for _, _, job in scheduler._heap:
+            job.cancelled = True
+
+
+def _collect(n: int, timeout: float = 2.0):
+    """(record, wait) – record(x) appends x; wait() blocks for n records."""
+    seen, done = [], threading.Event()
+
+    def record(x):
+        seen.append(x)
+        if len(seen) >= n:
+            done.set()
+
+    def wait():
+        assert done.wait(timeout), f"only ran {seen}"
+        return seen
+
+    return record, wait
+
+
+def test_jobs_run_in_due_order():
+    record, wait = _collect(3)
+    now = time.time()
+    scheduler.call_at(now + 0.15, record, "c")
+    scheduler.call_at(now + 0.05, record, "a")
+    scheduler.call_at(now + 0.10, record, "b")
+    assert wait() == ["a", "b", "c"]
+
+
+def test_same_due_time_keeps_insertion_order():
+    record, wait = _collect(3)
+    due = time.time() + 0.05
+    for x in "xyz":
+        scheduler.call_at(due, record, x)
+    assert wait() == ["x", "y", "z"]
+
+
+def test_earlier_job_wakes_a_sleeping_thread():
+    record, wait = _collect(1)
+    scheduler.call_later(60, record, "late")
+    start = time.time()
+    scheduler.call_later(0.05, record, "early")
+    assert wait() == ["early"]
+    assert time.time() - start < 1
+
+
+def test_cancelled_job_never_runs():
+    record, wait = _collect(1)
+    job = scheduler.call_later(0.05, record, "cancelled")
+    scheduler.call_later(0.1, record, "kept")
+    scheduler.cancel(job)
+    assert wait() == ["kept"]
+    time.sleep(0.05)
+    assert job.cancelled and scheduler.pending() == 0
+
+
+def test_cancel_none_is_a_no_op():
+    scheduler.cancel(None)
+
+
+def test_call_later_from_inside_a_callback():
+    record, wait = _collect(3)
+
+    def tick(n):
+        record(n)
+        if n < 3:
+            scheduler.call_later(0.01, tick, n + 1)
+
+    scheduler.call_later(0.01, tick, 1)
+    assert wait() == [1, 2, 3]
+
+
+def test_raising_callback_does_not_kill_the_thread(capsys):
+    record, wait = _collect(1)
+
+    def boom():
+        raise RuntimeError("boom")
+
+    scheduler.call_later(0.01, boom, name="boom")
+    scheduler.call_later(0.05, record, "after")
+    assert wait() == ["after"]
+    assert scheduler._thread.is_alive()
+    assert "job boom failed: boom" in capsys.readouterr().out
@@ -0,0 +1,106 @@
+"""Speech output queue driven by a stub engine (no audio device needed)."""
+
+import threading
+import time
+
+import pytest
+
+from modules import speech
+
+
+class StubEngine:
+    """Records what it was asked to say; runAndWait() blocks while `gate` is clear."""
+
+    def __init__(self):
+        self.spoken = []
+        self.gate   = threading.Event()
+        self.gate.set()
+        self._text  = None
+
+    def say(self, text):
+        self._text = text
+
+    def runAndWait(self):
+        self.gate.wait(5)
+        self.spoken.append(self._text)
+
+
+@pytest.fixture
+def engine():
+    stub = StubEngine()
+    speech.set_engine(stub)
+    speech.set_player(None)          # speak directly, bypass the audio cache
+    yield stub
+    stub.gate.set()
+    assert speech.flush(timeout=5)
+    speech.set_engine(None)
+
+
+def _hold_worker(engine, text="hold"):
+    """Park the worker on one utterance so the next ones pile up in the queue."""
+    engine.gate.clear()
+    speech.speak(text)
+    deadline = time.monotonic() + 5
+    while not speech._busy:
+        assert time.monotonic() < deadline, "speech worker never started"
+        time.sleep(0.01)
+
+
+def test_speak_returns_before_speaking(engine):
+    engine.gate.clear()
+    start = time.perf_counter()
+    speech.speak("hello")
+    assert time.perf_counter() - start < 0.5
+    assert speech.is_speaking()
+    engine.gate.set()
+    assert speech.wait_until_quiet(timeout=5)
+    assert engine.spoken == ["hello"]
+    assert not speech.is_speaking()
+
+
+def test_higher_priority_is_spoken_first(engine):
+    _hold_worker(engine)
+    speech.speak("progress", priority=speech.PRIORITY_LOW)
+    speech.speak("reply")
+    speech.speak("reminder", priority=speech.PRIORITY_HIGH)
+    engine.gate.set()
+    assert speech.flush(timeout=5)
+    assert engine.spoken == ["hold", "reminder", "reply", "progress"]
+
+
+def test_identical_pending_utterances_are_coalesced(engine):
+    _hold_worker(engine)
+    speech.speak("later", priority=speech.PRIORITY_LOW)
+    speech.speak("twice", priority=speech.PRIORITY_LOW)
+    speech.speak("twice", priority=speech.PRIORITY_HIGH)
+    engine.gate.set()
+    assert speech.flush(timeout=5)
+    # Said once, at the more urgent priority
+    assert engine.spoken == ["hold", "twice", "later"]
+
+
+def test_full_backlog_drops_least_important(engine, monkeypatch):
+    monkeypatch.setattr(speech, "MAX_BACKLOG", 3)
+    _hold_worker(engine)
+    for text in ("low 1", "low 2", "low 3"):
+        speech.speak(text, priority=speech.PRIORITY_LOW)
+    speech.speak("urgent", priority=speech.PRIORITY_HIGH)     # evicts "low 3", the newest
+    speech.speak("lower", priority=speech.PRIORITY_IDLE)      # less important than all: dropped
+    engine.gate.set()
+    assert speech.flush(timeout=5)
+    assert engine.spoken == ["hold", "urgent", "low 1", "low 2"]
+
+
+def test_full_backlog_refuses_an_equal_priority_newcomer(engine, monkeypatch):
+    monkeypatch.setattr(speech, "MAX_BACKLOG", 3)
+    _hold_worker(engine)
+    for text in ("low 1", "low 2", "low 3", "low 4", "low 5"):
+        speech.speak(text, priority=speech.PRIORITY_LOW)
+    engine.gate.set()
+    assert speech.flush(timeout=5)
+    assert engine.spoken == ["hold", "low 1", "low 2", "low 3"]
+
+
+def test_wait_blocks_until_spoken(engine):
+    speech.speak("done", wait=True)
+    assert engine.spoken == ["done"]
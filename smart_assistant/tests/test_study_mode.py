@@ -0,0 +1,101 @@
+"""Pomodoro sessions: pause / resume, stale timer jobs and the start reply."""
+
+import time
+
+import pytest
+
+from modules import scheduler, study_mode
+
+
+@pytest.fixture
+def spoken(temp_db, monkeypatch):
+    """Announcements made during the test; timers are cancelled afterwards."""
+    said = []
+    monkeypatch.setattr(study_mode, "speak", lambda text, **kw: said.append(text))
+    monkeypatch.setattr(study_mode, "_jobs", {})
+    yield said
+    for job in study_mode._jobs.values():
+        scheduler.cancel(job)
+
+
+def _row(session):
+    return study_mode.db.get_study_session(session["id"])
+
+
+def _end_phase_now(session):
+    """Pretend the current phase is over (as a later wakeup would see it)."""
+    study_mode.db.update_study_session(session["id"], phase_ends_at=int(time.time()) - 1)
+
+
+def test_start_arms_one_job(spoken):
+    session = study_mode.start_session(25, 5, 2)
+    job = study_mode._jobs[session["id"]]
+    assert job.args == (session["id"], 0) and not job.cancelled
+    assert _row(session)["status"] == "running"
+
+
+def test_pause_and_resume_keep_the_time_left(spoken):
+    session = study_mode.start_session(25)
+    job     = study_mode._jobs[session["id"]]
+
+    paused = study_mode.pause_session()
+    assert job.cancelled and session["id"] not in study_mode._jobs
+    row = _row(session)
+    assert (row["status"], row["phase_ends_at"], row["generation"]) == ("paused", None, 1)
+    assert 25 * 60 - 2 <= row["remaining_seconds"] <= 25 * 60
+    assert study_mode.pause_session() is None          # nothing left to pause
+
+    resumed = study_mode.resume_session()
+    row = _row(session)
+    assert (row["status"], row["generation"]) == ("running", 2)
+    assert row["phase_ends_at"] == pytest.approx(time.time() + paused["remaining_seconds"], abs=2)
+    assert study_mode._jobs[session["id"]].args == (session["id"], 2)
+    assert resumed["id"] == session["id"]
+
+
+def test_phase_change_bumps_the_generation(spoken):
+    session = study_mode.start_session(25, 5)
+    _end_phase_now(session)
+    study_mode._on_timer(session["id"], 0)
+    row = _row(session)
+    assert (row["phase"], row["generation"]) == ("break", 1)
+    assert spoken and spoken[-1].startswith("Great work!")
+    assert study_mode._jobs[session["id"]].args == (session["id"], 1)
+
+
+def test_stale_job_does_nothing(spoken):
+    session = study_mode.start_session(25)
+    study_mode.pause_session()
+    study_mode.resume_session()                         # generation 2 now
+    _end_phase_now(session)
+    study_mode._on_timer(session["id"], 0)              # armed before the pause
+    row = _row(session)
+    assert (row["phase"], row["generation"]) == ("work", 2)
+    assert spoken == []
+
+
+def test_pause_during_the_callback_wins(spoken, monkeypatch):
+    session = study_mode.start_session(25)
+    _end_phase_now(session)
+    read = study_mode.db.get_study_session
+
+    def read_then_pause_elsewhere(session_id):
+        # Another worker pauses right after this one read the row
+        row = read(session_id)
+        study_mode.db.update_study_session(session_id, status="paused", phase_ends_at=None,
+                                           remaining_seconds=60, generation=1)
+        return row
+
+    monkeypatch.setattr(study_mode.db, "get_study_session", read_then_pause_elsewhere)
+    study_mode._on_timer(session["id"], 0)
+    monkeypatch.setattr(study_mode.db, "get_study_session", read)
+
+    row = _row(session)
+    assert (row["status"], row["phase"], row["phase_ends_at"]) == ("paused", "work", None)
+    assert spoken == [] and session["id"] not in study_mode._jobs
+
+
+def test_start_reply_is_not_spoken_twice(spoken):
+    reply = study_mode.start_study_mode("start study mode")
+    assert reply.startswith("Study mode activated!")
+    assert spoken == []
@@ -0,0 +1,102 @@
+"""Web search providers: malformed responses, fallback, pooled keep-alive connections."""
+
+import pytest
+
+from modules import web_search
+
+
+class CannedProvider(web_search.HttpSearchProvider):
+    """HTTP provider whose endpoint always answers with `body`."""
+
+    def __init__(self, body: bytes):
+        super().__init__("http://127.0.0.1:9/search")
+        self.body = body
+
+    def _get(self, target: str) -> bytes:
+        return self.body
+
+
+@pytest.fixture(autouse=True)
+def restore_provider():
+    yield
+    web_search.set_provider(None)
+
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b'"text"', b"null", b"not json"])
+def test_non_object_body_is_a_search_error(body):
+    with pytest.raises(web_search.SearchError):
+        CannedProvider(body).search("python")
+
+
+def test_odd_fields_are_ignored():
+    found = CannedProvider(b'{"results": {"url": "x"}, "answers": "yes"}').search("python")
+    assert found == {"answer": None, "results": []}
+
+
+def test_search_falls_back_to_the_browser(monkeypatch):
+    monkeypatch.setattr(web_search, "_fallback", web_search.BrowserProvider(open_browser=False))
+    web_search.set_provider(CannedProvider(b"[]"))
+    found = web_search.search("python", use_cache=False)
+    assert found["provider"] == "browser"
+    assert not found["cached"]
+
+
+# ── Keep-alive against a local endpoint ───────────────────────────────────────
+
+@pytest.fixture
+def stub():
+    """SearxNG-like endpoint on 127.0.0.1 that counts the connections it accepts."""
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    state = {"connections": 0, "requests": 0, "drop_after_reply": False}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            state["connections"] += 1
+            super().setup()
+
+        def do_GET(self):
+            state["requests"] += 1
+            # Like an idle timeout: the reply promises keep-alive, the socket goes anyway
+            self.close_connection = state["drop_after_reply"]
+            body = json.dumps({"results": [{"title": "Python", "url": "https://python.org",
+                                            "content": "A language."}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    provider = web_search.HttpSearchProvider(f"http://127.0.0.1:{server.server_port}/search")
+    yield provider, state
+    provider.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_searches_reuse_one_connection(stub):
+    provider, state = stub
+    for query in ["python", "flask", "sqlite", "pytest"]:
+        assert provider.search(query)["results"][0]["url"] == "https://python.org"
+    assert (state["connections"], state["requests"]) == (1, 4)
+    assert (provider.connections_opened, provider.requests) == (1, 4)
+
+
+def test_dropped_connection_is_reopened(stub):
+    provider, state = stub
+    state["drop_after_reply"] = True
+    provider.search("python")
+    state["drop_after_reply"] = False
+    assert provider.search("flask")["results"]          # stale socket → one retry
+    assert provider.search("sqlite")["results"]         # the new socket stays pooled
+    assert (state["connections"], state["requests"]) == (2, 3)
+    assert provider.connections_opened == 2
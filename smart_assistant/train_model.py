@@ -2,26 +2,42 @@
 train_model.py
 ==============
 Trains a TF-IDF + Logistic Regression intent classifier and saves
-the model and vectorizer using joblib.
+the model and vectorizer using joblib.  A softmax temperature fitted on
+held-out decision scores is saved next to them so the classifier can
+report calibrated confidences.
 
 Run this once before starting the assistant:
     python train_model.py
+
+For large generated corpora (see data/augment.py) use the streaming path,
+which reads the JSONL file in mini-batches through a HashingVectorizer and
+an SGD classifier so memory stays flat as the corpus grows:
+    python train_model.py --stream data/generated_training_data.jsonl
 """
 
+import argparse
 import os
 import sys
+from collections import Counter
+from itertools import islice
 
 # Make sure the project root is on the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from scipy.sparse import vstack
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.pipeline import Pipeline
-from sklearn.model_selection import cross_val_score
+from sklearn.model_selection import cross_val_predict, cross_val_score
 import joblib
 import numpy as np
 
-from data.training_data import TRAINING_DATA
+from data.training_data import TRAINING_DATA as BUILT_IN_DATA
+from data.augment import iter_jsonl
+from modules import intents
+
+# Intent plugins (plugins/, ASSISTANT_PLUGINS) bring their own examples
+TRAINING_DATA = BUILT_IN_DATA + intents.plugin_training_data()
 
 # ── paths ──────────────────────────────────────────────────────────────────────
 MODEL_DIR = os.path.join(os.path.dirname(__file__), "model")
@@ -29,6 +45,25 @@ os.makedirs(MODEL_DIR, exist_ok=True)
 
 VECTORIZER_PATH = os.path.join(MODEL_DIR, "vectorizer.joblib")
 MODEL_PATH      = os.path.join(MODEL_DIR, "intent_model.joblib")
+CALIBRATION_PATH = os.path.join(MODEL_DIR, "calibration.joblib")
+
+
+def _fit_temperature(scores: np.ndarray, labels, classes: np.ndarray) -> float:
+    """
+    Pick the softmax temperature T that minimises the negative log-likelihood
+    of held-out decision scores (temperature scaling).
+    """
+    index   = {label: i for i, label in enumerate(classes)}
+    targets = np.array([index[label] for label in labels])
+    best_t, best_nll = 1.0, np.inf
+    for t in np.geomspace(0.05, 20.0, 200):
+        logits = scores / t
+        logits = logits - logits.max(axis=1, keepdims=True)
+        log_p  = logits - np.log(np.exp(logits).sum(axis=1, keepdims=True))
+        nll    = -log_p[np.arange(len(targets)), targets].mean()
+        if nll < best_nll:
+            best_t, best_nll = float(t), nll
+    return best_t
 
 
 def train():
@@ -61,6 +96,12 @@ def train():
     print(f"\n✔  5-fold CV accuracy: {np.mean(scores):.2%} "
           f"(±{np.std(scores):.2%})")
 
+    # Out-of-fold decision scores → calibration temperature
+    oof = cross_val_predict(pipeline, sentences, labels, cv=5,
+                            method="decision_function")
+    temperature = _fit_temperature(oof, labels, np.unique(labels))
+    print(f"✔  Calibration temperature: {temperature:.3f}")
+
     # Train on ALL data before saving
     pipeline.fit(sentences, labels)
     print("✔  Final model trained on full dataset.")
@@ -68,11 +109,101 @@ def train():
     # Save vectorizer and model separately (so modules can load them independently)
     joblib.dump(pipeline.named_steps["tfidf"], VECTORIZER_PATH)
     joblib.dump(pipeline.named_steps["clf"],   MODEL_PATH)
+    joblib.dump({"temperature": temperature}, CALIBRATION_PATH)
+
+    print(f"\n✔  Vectorizer saved → {VECTORIZER_PATH}")
+    print(f"✔  Model saved      → {MODEL_PATH}")
+    print(f"✔  Calibration saved → {CALIBRATION_PATH}")
+    print("\nTraining complete! You can now run:  python main.py\n")
+
+
+def _iter_batches(path: str, batch_size: int):
+    """Yield (sentences, labels) mini-batches from a JSONL training file."""
+    rows = iter_jsonl(path)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield [text for text, _ in batch], [intent for _, intent in batch]
+
+
+def train_streaming(path: str, batch_size: int = 10_000, epochs: int = 1):
+    """
+    Train on a JSONL corpus without loading it into memory.
+
+    A first pass only counts labels (for the class list and class weights);
+    training passes then feed mini-batches to
+    SGDClassifier.partial_fit.  Accuracy is reported prequentially: each
+    batch is scored before the model learns from it.  No temperature is
+    fitted here: templated batches are too easy to calibrate against, so
+    the SGD model's own predict_proba is used.
+
+    The hand-written TRAINING_DATA is replayed alongside every mini-batch.
+    Slot-free intents run out of unique paraphrases early in the file, and
+    without the replay SGD forgets them by the end of a pass.
+    """
+    print("=" * 50)
+    print("  Smart Assistant – Streaming Model Training")
+    print("=" * 50)
+
+    counts  = Counter(intent for _, intent in iter_jsonl(path))
+    classes = np.array(sorted(counts))
+    total   = sum(counts.values())
+    print(f"\n✔  Found {total} training examples across {len(classes)} intents.")
+
+    # HashingVectorizer is stateless – no vocabulary to hold in memory
+    vectorizer = HashingVectorizer(
+        ngram_range=(1, 2),
+        analyzer="word",
+        lowercase=True,
+        alternate_sign=False,
+        n_features=2 ** 18,
+    )
+    # Square-root balancing: slot-free intents (greeting, exit) only have a
+    # few dozen unique phrasings, and fully balanced weights let them swamp SGD
+    weights = {label: (total / (len(classes) * n)) ** 0.5 for label, n in counts.items()}
+    clf = SGDClassifier(loss="log_loss", alpha=1e-5, class_weight=weights,
+                        random_state=42)
+
+    replay_sentences = [item[0] for item in TRAINING_DATA if item[1] in counts]
+    replay_labels    = [item[1] for item in TRAINING_DATA if item[1] in counts]
+    # The vectorizer is stateless, so the replay rows are hashed once
+    X_replay = vectorizer.transform(replay_sentences)
+
+    for epoch in range(1, epochs + 1):
+        seen = correct = 0
+        for sentences, labels in _iter_batches(path, batch_size):
+            X = vectorizer.transform(sentences)
+            if hasattr(clf, "coef_"):
+                correct += int((clf.predict(X) == np.array(labels)).sum())
+                seen    += len(labels)
+            clf.partial_fit(vstack([X, X_replay]), labels + replay_labels,
+                            classes=classes)
+        if seen:
+            print(f"✔  Epoch {epoch}: progressive accuracy {correct / seen:.2%}")
+        else:
+            print(f"✔  Epoch {epoch}: single batch, no progressive score")
+
+    joblib.dump(vectorizer, VECTORIZER_PATH)
+    joblib.dump(clf,        MODEL_PATH)
 
     print(f"\n✔  Vectorizer saved → {VECTORIZER_PATH}")
     print(f"✔  Model saved      → {MODEL_PATH}")
+    if os.path.exists(CALIBRATION_PATH):
+        # A stale temperature from another model would skew the confidences
+        os.remove(CALIBRATION_PATH)
     print("\nTraining complete! You can now run:  python main.py\n")
 
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train the intent classifier.")
+    parser.add_argument("--stream", metavar="JSONL",
+                        help="train incrementally from a JSONL corpus")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--epochs", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.stream:
+        train_streaming(args.stream, batch_size=args.batch_size, epochs=args.epochs)
+    else:
+        train()
@@ -0,0 +1,21 @@
+"""
+wsgi.py
+=======
+WSGI entry point for production servers:
+
+    gunicorn                     # picks up gunicorn.conf.py (preload, workers)
+
+Importing this module runs init_app() – database, intent model, app index,
+category matcher and contact index – so with a preloading server it
+happens once in the master and every forked worker starts warm.
+"""
+
+import gc
+
+from app import app, init_app
+
+init_app()
+
+# Objects loaded so far live as long as the process; take them out of the
+# cyclic GC so collections in workers don't write to (and un-share) them
+gc.freeze()